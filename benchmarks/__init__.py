@@ -0,0 +1,6 @@
+"""Paquete `benchmarks` con scripts de medición de rendimiento y memoria.
+
+Ejecutar desde la raíz del repositorio, por ejemplo:
+
+    python -m benchmarks.memoria_pedido 1000000
+"""
@@ -0,0 +1,101 @@
+"""Benchmark del arranque con `RecuperacionGestor`: foto + cola de la bitácora vs. reproducir todo.
+
+Para cada tamaño de historial H simula H pedidos con su ciclo completo
+(alta, cola, preparación, LISTO, ENTREGADO) más `--vivos` pedidos que quedan
+en curso (PENDIENTE, EN_COLA o EN_PREPARACION) y mide cuánto tarda un gestor
+nuevo en recuperar el estado:
+
+- foto + cola: checkpoints cada `--cada` pedidos (sin pedidos terminados en la
+  foto); el último queda `--cada`/2 pedidos antes del final, así que al
+  arrancar se reaplica una cola de bitácora de tamaño fijo.
+- reproducir todo: sin checkpoints; se reaplica la bitácora completa (lo que
+  costaría reconstruir desde el historial).
+
+El primero debe mantenerse plano al crecer H; el segundo crece linealmente.
+
+Uso:
+
+    python -m benchmarks.arranque_recuperacion
+    python -m benchmarks.arranque_recuperacion --tamanos 10000 100000 500000 --cada 10000
+"""
+from __future__ import annotations
+from typing import Dict, List, Optional
+import argparse
+import gc
+import os
+import shutil
+import tempfile
+import time
+
+from benchmarks.suite import items_sinteticos
+from src.models.estacion_cocina import EstacionCocina
+from src.services.gestor_pedidos import GestorPedidos
+from src.services.recuperacion import RecuperacionGestor
+
+
+def _gestor() -> GestorPedidos:
+    gestor = GestorPedidos()
+    gestor.registrar_estacion(EstacionCocina('A', capacidad=10 ** 9))
+    return gestor
+
+
+def simular(directorio: str, n: int, vivos: int, cada: Optional[int]) -> None:
+    """Escribir la bitácora (y fotos si `cada`) de n pedidos cerrados más `vivos` en curso."""
+    recuperacion = RecuperacionGestor(directorio, incluir_terminados=False, fsync='nunca')
+    gestor = _gestor()
+    recuperacion.conectar(gestor)
+    estacion = gestor.estaciones['A']
+    for i in range(n):
+        pedido = gestor.crear_pedido(items_sinteticos(i))
+        gestor.asignar_a_estacion(pedido.id, 'A')
+        estacion.iniciar_preparacion()
+        estacion.finalizar_pedido(pedido.id)
+        pedido.update_estado('ENTREGADO')
+        if cada and (i + 1) % cada == cada // 2:
+            recuperacion.checkpoint()
+    en_curso = [gestor.crear_pedido(items_sinteticos(i)) for i in range(vivos)]
+    for pedido in en_curso[:vivos // 3]:
+        gestor.asignar_a_estacion(pedido.id, 'A')
+    estacion.iniciar_preparacion()
+    for pedido in en_curso[vivos // 3:2 * vivos // 3]:
+        gestor.asignar_a_estacion(pedido.id, 'A')
+    recuperacion.cerrar(checkpoint_final=False)  # Como una caída: lo último solo está en la bitácora
+
+
+def medir_arranque(directorio: str) -> Dict[str, float]:
+    gc.collect()
+    inicio = time.perf_counter()
+    recuperacion = RecuperacionGestor(directorio, incluir_terminados=False)
+    gestor = _gestor()
+    resultado = recuperacion.restaurar(gestor)
+    segundos = time.perf_counter() - inicio
+    recuperacion.cerrar(checkpoint_final=False)
+    return {'segundos': segundos, 'pedidos': resultado['pedidos'], 'eventos': resultado['eventos'],
+            'en_estacion': gestor.estaciones['A'].carga_actual()}
+
+
+def _tamano_mb(directorio: str) -> float:
+    return sum(os.path.getsize(os.path.join(raiz, f)) for raiz, _, fs in os.walk(directorio) for f in fs) / 2 ** 20
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tamanos', type=int, nargs='+', default=[10_000, 50_000, 200_000])
+    parser.add_argument('--vivos', type=int, default=1_000, help='pedidos en curso al "caer" el proceso')
+    parser.add_argument('--cada', type=int, default=10_000, help='pedidos entre checkpoints')
+    args = parser.parse_args(argv)
+    print(f"{'historial':>10s} {'modo':16s} {'disco MB':>9s} {'eventos':>9s} {'pedidos':>9s} {'arranque':>10s}")
+    for n in args.tamanos:
+        for modo, cada in (('foto + cola', args.cada), ('reproducir todo', None)):
+            directorio = tempfile.mkdtemp(prefix='bench-recuperacion-')
+            try:
+                simular(directorio, n, args.vivos, cada)
+                r = medir_arranque(directorio)
+                print(f"{n:10,d} {modo:16s} {_tamano_mb(directorio):9.1f} {r['eventos']:9,d} {r['pedidos']:9,d} "
+                      f"{r['segundos'] * 1000:8.1f}ms")
+            finally:
+                shutil.rmtree(directorio, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""Prueba de estrés multihilo de `GestorPedidos`.
+
+Cada hilo crea pedidos, los despacha automáticamente, los prepara y los
+finaliza (uno de cada diez se cancela). Al final se comprueba que:
+- no se perdió ningún pedido y no hay ids repetidos;
+- los índices por estado y por estación coinciden con el estado real;
+- todas las estaciones quedaron vacías.
+
+También mide pedidos/s según el número de hilos (con el GIL no se espera
+escalado lineal; el objetivo es que no haya pérdidas ni interbloqueos).
+
+Uso:
+
+    python -m benchmarks.concurrencia_gestor            # 20.000 pedidos por ronda
+    python -m benchmarks.concurrencia_gestor 50000 1 2 4 8 16
+"""
+from __future__ import annotations
+from typing import Dict, List
+import sys
+import threading
+import time
+
+from src.main import PRODUCTS
+from src.models.estacion_cocina import EstacionCocina
+from src.services.gestor_pedidos import GestorPedidos
+
+
+def _trabajador(gestor: GestorPedidos, n: int, ids: List[str], barrera: threading.Barrier) -> None:
+    barrera.wait()
+    for i in range(n):
+        producto = PRODUCTS[i % len(PRODUCTS)]
+        pedido = gestor.crear_pedido([{'name': producto['name'], 'qty': 1 + i % 3,
+                                       'prep_time_min': producto['prep_time_min'], 'price': producto['price']}],
+                                     cliente_info={'telefono': str(600000000 + i % 500)})
+        ids.append(pedido.id)
+        if i % 10 == 0:
+            gestor.cancelar_pedido(pedido.id)
+            continue
+        estacion_id = None
+        while estacion_id is None:  # Todas llenas: reintentar mientras otros hilos liberan
+            estacion_id = gestor.asignar_automaticamente(pedido.id)
+            if estacion_id is None:
+                time.sleep(0)
+        estacion = gestor.estaciones[estacion_id]
+        while not estacion.finalizar_pedido(pedido.id):
+            estacion.iniciar_preparacion()
+            time.sleep(0)
+
+
+def verificar(gestor: GestorPedidos, ids: List[str], esperados: int) -> Dict[str, bool]:
+    """Comprobar que no hubo pérdidas ni inconsistencias."""
+    por_estado = {e: gestor.listar_pedidos(e) for e in ('PENDIENTE', 'EN_COLA', 'EN_PREPARACION', 'LISTO',
+                                                         'CANCELADO')}
+    return {
+        'sin_perdidas': len(gestor.pedidos) == esperados == len(ids),
+        'ids_unicos': len(set(ids)) == esperados,
+        'indice_estado': sum(len(v) for v in por_estado.values()) == esperados
+        and all(p.estado == e for e, ps in por_estado.items() for p in ps),
+        'indice_estacion': sum(len(gestor.listar_por_estacion(e)) for e in gestor.estaciones)
+        == len(por_estado['LISTO']),
+        'estaciones_vacias': all(e.carga_actual() == 0 for e in gestor.estaciones.values()),
+    }
+
+
+def ronda(hilos: int, total: int) -> Dict:
+    gestor = GestorPedidos()
+    for estacion_id in 'ABCD':
+        gestor.registrar_estacion(EstacionCocina(estacion_id, capacidad=8))
+    por_hilo = total // hilos
+    listas: List[List[str]] = [[] for _ in range(hilos)]
+    barrera = threading.Barrier(hilos + 1)
+    trabajadores = [threading.Thread(target=_trabajador, args=(gestor, por_hilo, listas[i], barrera))
+                    for i in range(hilos)]
+    for t in trabajadores:
+        t.start()
+    inicio = time.perf_counter()
+    barrera.wait()
+    for t in trabajadores:
+        t.join()
+    segundos = time.perf_counter() - inicio
+    ids = [pid for lista in listas for pid in lista]
+    return {'hilos': hilos, 'pedidos': len(ids), 'pedidos_s': len(ids) / segundos,
+            'checks': verificar(gestor, ids, por_hilo * hilos)}
+
+
+def main(total: int = 20_000, hilos: List[int] = (1, 2, 4, 8)) -> bool:
+    todo_ok = True
+    print(f"{'hilos':>5s} {'pedidos':>8s} {'pedidos/s':>10s}  comprobaciones")
+    for n in hilos:
+        r = ronda(n, total)
+        ok = all(r['checks'].values())
+        todo_ok &= ok
+        fallos = [k for k, v in r['checks'].items() if not v]
+        print(f"{r['hilos']:5d} {r['pedidos']:8d} {r['pedidos_s']:10.0f}  {'OK' if ok else 'FALLO: ' + ', '.join(fallos)}")
+    return todo_ok
+
+
+if __name__ == '__main__':
+    args = [int(a) for a in sys.argv[1:]]
+    ok = main(args[0], args[1:]) if len(args) > 1 else main(*args[:1])
+    sys.exit(0 if ok else 1)
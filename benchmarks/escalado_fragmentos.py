@@ -0,0 +1,64 @@
+"""Benchmark de escalado de `GestorFragmentado` de 1 a N procesos.
+
+Reparte siempre las mismas `--cocinas` cocinas (4 estaciones cada una) entre
+1, 2, 4... procesos y mide pedidos/s de un ciclo completo. Cada lote de
+pedidos se crea y despacha con `crear_pedidos(..., politica='menor_carga')` y
+después se dan pasos de cocina (`avanzar`) hasta que todo queda LISTO.
+
+Con un solo núcleo disponible no hay escalado: los procesos se turnan en la CPU.
+
+Uso:
+
+    python -m benchmarks.escalado_fragmentos
+    python -m benchmarks.escalado_fragmentos --pedidos 200000 --procesos 1 2 4 8 --cocinas 8
+"""
+from __future__ import annotations
+from typing import Dict, List, Optional
+import argparse
+import os
+import time
+
+from benchmarks.suite import items_sinteticos
+from src.services.fragmentado import GestorFragmentado
+
+
+def _cocinas(n: int, capacidad: int) -> Dict[str, List]:
+    return {f"cocina-{c}": [(f"{c}-{e}", capacidad) for e in range(4)] for c in range(n)}
+
+
+def medir(procesos: int, pedidos: int, lote: int, cocinas: int, capacidad: int) -> Dict[str, float]:
+    solicitudes = [{'items': items_sinteticos(i), 'cliente_info': {'telefono': str(600000000 + i % 500)}}
+                   for i in range(lote)]
+    with GestorFragmentado(_cocinas(cocinas, capacidad), procesos=procesos) as motor:
+        inicio = time.perf_counter()
+        for _ in range(0, pedidos, lote):
+            motor.crear_pedidos(solicitudes, politica='menor_carga')
+            motor.avanzar()
+            motor.avanzar()
+        while motor.contar('LISTO') < pedidos:
+            motor.avanzar()
+        segundos = time.perf_counter() - inicio
+    return {'segundos': segundos, 'pedidos_s': pedidos / segundos}
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    nucleos = os.cpu_count() or 1
+    por_defecto = sorted({1, nucleos} | {k for k in (2, 4) if k <= nucleos})
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pedidos', type=int, default=100_000)
+    parser.add_argument('--lote', type=int, default=2_000, help='pedidos por llamada a crear_pedidos')
+    parser.add_argument('--procesos', type=int, nargs='+', default=por_defecto)
+    parser.add_argument('--cocinas', type=int, default=8)
+    parser.add_argument('--capacidad', type=int, default=64, help='capacidad de cada estación')
+    args = parser.parse_args(argv)
+    print(f"Pedidos: {args.pedidos:,}  cocinas: {args.cocinas}  núcleos disponibles: {nucleos}")
+    base = None
+    for procesos in args.procesos:
+        r = medir(procesos, args.pedidos, args.lote, args.cocinas, args.capacidad)
+        base = base or r['pedidos_s']
+        print(f"  {procesos:3d} procesos  {r['segundos']:7.2f} s  {r['pedidos_s']:10,.0f} pedidos/s  "
+              f"x{r['pedidos_s'] / base:4.2f}")
+
+
+if __name__ == '__main__':
+    main()
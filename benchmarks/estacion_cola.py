@@ -0,0 +1,89 @@
+"""Micro-benchmark de la cola de `EstacionCocina` (deque + dicts vs. listas).
+
+Con N pedidos encolados (10.000 por defecto) mide:
+- asignar: encolar los N pedidos.
+- iniciar: `iniciar_preparacion` de todos (antes `list.pop(0)`).
+- finalizar: `finalizar_pedido` en orden aleatorio (antes búsqueda lineal + `list.remove`).
+
+Uso:
+
+    python -m benchmarks.estacion_cola
+    python -m benchmarks.estacion_cola 50000
+"""
+from __future__ import annotations
+from typing import Dict, List
+import random
+import sys
+import time
+
+from src.models.estacion_cocina import EstacionCocina
+from src.models.pedido import Pedido
+
+
+class EstacionListas:
+    """Réplica de la implementación anterior basada en listas, solo para comparar."""
+
+    def __init__(self, id, capacidad: int = 1) -> None:
+        self.id = id
+        self.capacidad = capacidad
+        self.cola: List[Pedido] = []
+        self.en_preparacion: List[Pedido] = []
+
+    def asignar_pedido(self, pedido: Pedido) -> bool:
+        pedido.update_estado('EN_COLA')
+        if len(self.cola) + len(self.en_preparacion) < self.capacidad:
+            self.cola.append(pedido)
+            return True
+        return False
+
+    def iniciar_preparacion(self) -> List[Pedido]:
+        iniciados = []
+        while self.cola and len(self.en_preparacion) < self.capacidad:
+            pedido = self.cola.pop(0)
+            pedido.update_estado('EN_PREPARACION')
+            self.en_preparacion.append(pedido)
+            iniciados.append(pedido)
+        return iniciados
+
+    def finalizar_pedido(self, pedido_id) -> bool:
+        for pedido in self.en_preparacion:
+            if pedido.id == pedido_id:
+                pedido.update_estado('LISTO')
+                self.en_preparacion.remove(pedido)
+                return True
+        return False
+
+
+def medir(clase, n: int, semilla: int = 3) -> Dict[str, float]:
+    """Ejecutar las tres fases sobre una estación de capacidad n y devolver segundos por fase."""
+    pedidos = [Pedido(f"PED-{i:06d}", [{'name': 'Pizza', 'qty': 1, 'prep_time_min': 12}]) for i in range(n)]
+    orden_fin = [p.id for p in pedidos]
+    random.Random(semilla).shuffle(orden_fin)
+    estacion = clase('A', capacidad=n)
+    tiempos = {}
+    inicio = time.perf_counter()
+    for p in pedidos:
+        estacion.asignar_pedido(p)
+    tiempos['asignar'] = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    estacion.iniciar_preparacion()
+    tiempos['iniciar'] = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    for pid in orden_fin:
+        estacion.finalizar_pedido(pid)
+    tiempos['finalizar'] = time.perf_counter() - inicio
+    return tiempos
+
+
+def main(n: int = 10_000) -> None:
+    print(f"Pedidos encolados: {n:,}")
+    print(f"  {'implementación':16s} {'asignar':>10s} {'iniciar':>10s} {'finalizar':>10s}")
+    for nombre, clase in (('listas', EstacionListas), ('deque + dicts', EstacionCocina)):
+        t = medir(clase, n)
+        print(f"  {nombre:16s} {t['asignar'] * 1e3:8.1f}ms {t['iniciar'] * 1e3:8.1f}ms {t['finalizar'] * 1e3:8.1f}ms")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000)
@@ -0,0 +1,79 @@
+"""Benchmark de memoria de `Pedido` (representación compacta vs. basada en dicts).
+
+Crea N pedidos con 1-3 líneas del catálogo `PRODUCTS` y mide con
+`tracemalloc` los bytes retenidos por pedido. Como referencia construye los
+mismos pedidos con la representación anterior (objeto con `__dict__`, lista de
+dicts por ítem y dict de timestamps por estado).
+
+Uso:
+
+    python -m benchmarks.memoria_pedido            # 1.000.000 pedidos
+    python -m benchmarks.memoria_pedido 100000
+"""
+from __future__ import annotations
+from typing import Callable, Dict, List
+from datetime import datetime
+import gc
+import random
+import sys
+import time
+import tracemalloc
+
+from src.main import PRODUCTS
+from src.models.pedido import Pedido
+
+
+class PedidoDicts:
+    """Réplica de la representación anterior de `Pedido`, solo para comparar memoria."""
+
+    def __init__(self, id, items: List[Dict], cliente_info=None) -> None:
+        self.id = id
+        self.items = [{'name': it['name'], 'qty': it['qty'], 'prep_time_min': int(it.get('prep_time_min', 5)),
+                       'price': round(float(it.get('price', 0.0)), 2)} for it in items]
+        self.cliente_info = dict(cliente_info) if cliente_info else None
+        self.estado = 'PENDIENTE'
+        self.tiempo_estimado_min = None
+        self.timestamp_creado = datetime.now()
+        self.estacion_id = None
+        self._timestamps_estado = {'PENDIENTE': self.timestamp_creado}
+
+
+def _items_sinteticos(n: int, semilla: int = 7) -> List[List[Dict]]:
+    rnd = random.Random(semilla)
+    plantillas = []
+    for _ in range(min(n, 4096)):  # Un pool de combinaciones reutilizado, como en un día real
+        elegidos = rnd.sample(PRODUCTS, rnd.randint(1, 3))
+        plantillas.append([{'name': p['name'], 'qty': rnd.randint(1, 4), 'prep_time_min': p['prep_time_min'],
+                            'price': p['price']} for p in elegidos])
+    return [plantillas[i % len(plantillas)] for i in range(n)]
+
+
+def medir(constructor: Callable, items: List[List[Dict]]) -> Dict[str, float]:
+    """Construir len(items) pedidos y devolver bytes/pedido y segundos."""
+    gc.collect()
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    pedidos = [constructor(f"PED-{i:07d}", its) for i, its in enumerate(items)]
+    segundos = time.perf_counter() - inicio
+    actual, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    n = len(pedidos)
+    del pedidos
+    return {'bytes_por_pedido': actual / n, 'pico_mb': pico / 2**20, 'total_mb': actual / 2**20, 'segundos': segundos}
+
+
+def main(n: int = 1_000_000) -> None:
+    items = _items_sinteticos(n)
+    print(f"Pedidos: {n:,}")
+    resultados = {}
+    for nombre, constructor in (('dicts (anterior)', PedidoDicts), ('compacto (__slots__)', Pedido)):
+        r = medir(constructor, items)
+        resultados[nombre] = r
+        print(f"  {nombre:22s} {r['bytes_por_pedido']:8.1f} B/pedido  {r['total_mb']:9.1f} MB  "
+              f"pico {r['pico_mb']:9.1f} MB  {r['segundos']:6.2f} s")
+    anterior, compacto = resultados['dicts (anterior)'], resultados['compacto (__slots__)']
+    print(f"  Ahorro: {100 * (1 - compacto['total_mb'] / anterior['total_mb']):.1f}%")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
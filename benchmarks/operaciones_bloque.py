@@ -0,0 +1,118 @@
+"""Benchmark de las operaciones en bloque de `GestorPedidos` frente al bucle pedido a pedido.
+
+Importa un lote de `--pedidos` pedidos (por defecto 5.000, como un lote de
+una plataforma de reparto) con un almacén SQLite temporal y mide cada fase:
+
+- crear:      `crear_pedido` por pedido       vs. `crear_pedidos_bulk`
+- asignar:    `asignar_a_estacion` por pedido vs. `asignar_bulk`
+- transición: `update_estado` por pedido      vs. `actualizar_estados_bulk` (EN_COLA -> EN_PREPARACION)
+
+Modos:
+- bucle + flush: el bucle con una escritura (`almacen.flush()`) por llamada,
+  como cuando cada operación se persiste por separado.
+- bucle:         el bucle dejando que el almacén agrupe las escrituras.
+- bloque:        una llamada por fase y una escritura por llamada.
+
+Uso:
+
+    python -m benchmarks.operaciones_bloque
+    python -m benchmarks.operaciones_bloque --pedidos 50000 --repeticiones 3
+"""
+from __future__ import annotations
+from typing import Callable, Dict, List, Optional
+import argparse
+import gc
+import os
+import shutil
+import tempfile
+import time
+
+from benchmarks.suite import items_sinteticos
+from src.models.estacion_cocina import EstacionCocina
+from src.services.almacen_sqlite import abrir_sqlite
+from src.services.gestor_pedidos import GestorPedidos
+
+FASES = ('crear', 'asignar', 'transicion')
+
+
+def _bucle(gestor: GestorPedidos, solicitudes: List[Dict], flush_por_llamada: bool) -> Dict[str, float]:
+    almacen = gestor.almacen
+    tiempos = {}
+    inicio = time.perf_counter()
+    ids = []
+    for s in solicitudes:
+        ids.append(gestor.crear_pedido(s['items'], s['cliente_info']).id)
+        if flush_por_llamada:
+            almacen.flush()
+    almacen.flush()
+    tiempos['crear'] = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    for pedido_id in ids:
+        gestor.asignar_a_estacion(pedido_id, 'A')
+        if flush_por_llamada:
+            almacen.flush()
+    almacen.flush()
+    tiempos['asignar'] = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    for pedido_id in ids:
+        gestor.pedidos[pedido_id].update_estado('EN_PREPARACION')
+        if flush_por_llamada:
+            almacen.flush()
+    almacen.flush()
+    tiempos['transicion'] = time.perf_counter() - inicio
+    return tiempos
+
+
+def _bloque(gestor: GestorPedidos, solicitudes: List[Dict]) -> Dict[str, float]:
+    tiempos = {}
+    inicio = time.perf_counter()
+    ids = [r.id for r in gestor.crear_pedidos_bulk(solicitudes)]
+    tiempos['crear'] = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    gestor.asignar_bulk([(pedido_id, 'A') for pedido_id in ids])
+    tiempos['asignar'] = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    gestor.actualizar_estados_bulk([(pedido_id, 'EN_PREPARACION') for pedido_id in ids])
+    tiempos['transicion'] = time.perf_counter() - inicio
+    return tiempos
+
+
+def medir(modo: Callable[[GestorPedidos, List[Dict]], Dict[str, float]], n: int) -> Dict[str, float]:
+    solicitudes = [{'items': items_sinteticos(i), 'cliente_info': {'telefono': str(600000000 + i % 500)}}
+                   for i in range(n)]
+    directorio = tempfile.mkdtemp(prefix='bench-bloque-')
+    almacen = abrir_sqlite(os.path.join(directorio, 'pedidos.db'))
+    try:
+        gestor = GestorPedidos(almacen=almacen)
+        gestor.registrar_estacion(EstacionCocina('A', capacidad=n))
+        gc.collect()
+        tiempos = modo(gestor, solicitudes)
+        assert almacen.contar(estado='EN_PREPARACION', estacion_id='A') == n
+        return tiempos
+    finally:
+        almacen.cerrar()
+        shutil.rmtree(directorio, ignore_errors=True)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pedidos', type=int, default=5_000)
+    parser.add_argument('--repeticiones', type=int, default=3, help='se informa la mejor')
+    args = parser.parse_args(argv)
+    modos = {
+        'bucle + flush': lambda g, s: _bucle(g, s, flush_por_llamada=True),
+        'bucle': lambda g, s: _bucle(g, s, flush_por_llamada=False),
+        'bloque': _bloque,
+    }
+    print(f"Pedidos: {args.pedidos:,}  (pedidos/s, mejor de {args.repeticiones})")
+    print(f"{'modo':14s}" + ''.join(f"{fase:>14s}" for fase in FASES) + f"{'total':>14s}")
+    for nombre, modo in modos.items():
+        corridas = [medir(modo, args.pedidos) for _ in range(args.repeticiones)]
+        mejores = {fase: min(r[fase] for r in corridas) for fase in FASES}
+        total = sum(mejores.values())
+        print(f"{nombre:14s}" + ''.join(f"{args.pedidos / mejores[f]:14,.0f}" for f in FASES)
+              + f"{args.pedidos * len(FASES) / total:14,.0f}")
+
+
+if __name__ == '__main__':
+    main()
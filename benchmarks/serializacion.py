@@ -0,0 +1,68 @@
+"""Benchmark de los códecs de `src.services.serializacion`.
+
+Serializa N pedidos sintéticos (`as_dict()`) con cada códec disponible y mide:
+
+- codificar / decodificar el lote completo (`codificar_lote`/`decodificar_lote`)
+- codificar / decodificar registro a registro
+- tamaño total en bytes
+- reconstrucción de objetos `Pedido` desde los dicts decodificados, con
+  validación (`Pedido.from_dict`) y por la ruta de confianza (`Pedido.desde_dicts`)
+
+Uso:
+
+    python -m benchmarks.serializacion            # 100.000 pedidos
+    python -m benchmarks.serializacion 10000
+"""
+from __future__ import annotations
+from typing import Callable, Dict, List
+import gc
+import sys
+import time
+
+from benchmarks.suite import items_sinteticos
+from src.models.pedido import Pedido
+from src.services.serializacion import codecs_disponibles, obtener_codec
+
+
+def _medir(funcion: Callable[[], object]) -> float:
+    gc.collect()
+    inicio = time.perf_counter()
+    funcion()
+    return time.perf_counter() - inicio
+
+
+def registros_sinteticos(n: int) -> List[Dict]:
+    registros = []
+    for i in range(n):
+        pedido = Pedido(f"PED-{i:07d}", items_sinteticos(i), cliente_info={'telefono': f"600{i % 1000000:06d}"})
+        pedido.estado = Pedido.ESTADOS_VALIDOS[i % 4]
+        registros.append(pedido.as_dict())
+    return registros
+
+
+def main(n: int = 100_000) -> None:
+    registros = registros_sinteticos(n)
+    print(f"Pedidos: {n:,}")
+    print(f"  {'códec':8s} {'MB':>7s} {'cod. lote':>10s} {'dec. lote':>10s} {'cod. 1x1':>10s} {'dec. 1x1':>10s}")
+    decodificados: List[Dict] = registros
+    for nombre in codecs_disponibles():
+        codec = obtener_codec(nombre)
+        datos = codec.codificar_lote(registros)
+        t_cod = _medir(lambda: codec.codificar_lote(registros))
+        t_dec = _medir(lambda: codec.decodificar_lote(datos))
+        sueltos = [codec.codificar(r) for r in registros]
+        t_cod1 = _medir(lambda: [codec.codificar(r) for r in registros])
+        t_dec1 = _medir(lambda: [codec.decodificar(d) for d in sueltos])
+        decodificados = codec.decodificar_lote(datos)
+        assert decodificados[-1]['items'] == registros[-1]['items'], nombre
+        print(f"  {nombre:8s} {len(datos) / 2**20:7.1f} {t_cod:9.3f}s {t_dec:9.3f}s {t_cod1:9.3f}s {t_dec1:9.3f}s")
+
+    print("Reconstrucción de objetos Pedido:")
+    t_validar = _medir(lambda: [Pedido.from_dict(r) for r in decodificados])
+    t_confiable = _medir(lambda: Pedido.desde_dicts(decodificados))
+    print(f"  from_dict (validando)     {t_validar:7.3f}s  {n / t_validar:12,.0f} pedidos/s")
+    print(f"  desde_dicts (confianza)   {t_confiable:7.3f}s  {n / t_confiable:12,.0f} pedidos/s")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,278 @@
+"""Suite de benchmarks de los caminos calientes del ciclo de vida de un pedido.
+
+Mide sobre cargas sintéticas construidas con el catálogo `PRODUCTS`:
+
+- pedido_init            `Pedido.__init__`
+- update_estado          `Pedido.update_estado` (PENDIENTE -> EN_COLA)
+- update_estado_metricas el mismo paso con un `SinkMetricas` suscrito al bus
+- crear_pedido           `GestorPedidos.crear_pedido`
+- asignar_a_estacion     `GestorPedidos.asignar_a_estacion`
+- listar_pedidos         `GestorPedidos.listar_pedidos(estado=...)` (1.000 consultas)
+- iniciar_preparacion    `EstacionCocina.iniciar_preparacion` (un pedido por llamada)
+- guardar_pedido         `src.main.guardar_pedido` sobre una base SQLite temporal
+
+Para cada benchmark y tamaño registra ops/s, latencias p50/p95/p99 (µs) y
+memoria pico (tracemalloc, en una segunda pasada). Los resultados se guardan
+como línea base JSON y se pueden comparar contra ella marcando regresiones.
+
+Uso:
+
+    python -m benchmarks.suite --guardar benchmarks/linea_base.json
+    python -m benchmarks.suite --comparar benchmarks/linea_base.json --tolerancia 0.15
+    python -m benchmarks.suite --tamanos 1000 100000 --solo crear_pedido listar_pedidos
+"""
+from __future__ import annotations
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from array import array
+from datetime import datetime
+import argparse
+import gc
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import src.main as app
+from src.main import PRODUCTS
+from src.models.estacion_cocina import EstacionCocina
+from src.models.eventos import BUS_EVENTOS, SinkMetricas
+from src.models.pedido import Pedido
+from src.services.almacen_sqlite import abrir_sqlite
+from src.services.gestor_pedidos import GestorPedidos
+from src.utils.utils import percentil
+
+TAMANOS = [1_000, 100_000, 1_000_000]
+ESTADOS_MEZCLA = ['PENDIENTE', 'EN_COLA', 'EN_PREPARACION', 'LISTO']
+
+
+def items_sinteticos(i: int) -> List[Dict]:
+    """Ítems deterministas del pedido i (1-3 productos del catálogo)."""
+    n = 1 + i % 3
+    return [{'name': p['name'], 'qty': 1 + (i + k) % 4, 'prep_time_min': p['prep_time_min'], 'price': p['price']}
+            for k, p in enumerate(PRODUCTS[(i * 7 + j * 13) % len(PRODUCTS)] for j in range(n))]
+
+
+def _gestor_con_pedidos(n: int, capacidad: Optional[int] = None) -> GestorPedidos:
+    gestor = GestorPedidos()
+    gestor.registrar_estacion(EstacionCocina('A', capacidad=capacidad or n))
+    for i in range(n):
+        gestor.crear_pedido(items_sinteticos(i), cliente_info={'telefono': str(600000000 + i % 1000)})
+    return gestor
+
+
+# Cada benchmark: preparar(n) -> (estado, pasos) y paso(estado, i)
+
+def _prep_pedido_init(n: int) -> Tuple[Any, int]:
+    return [items_sinteticos(i) for i in range(n)], n
+
+
+def _paso_pedido_init(items: List[List[Dict]], i: int) -> None:
+    Pedido(f"PED-{i:07d}", items[i], {'telefono': '600111222'})
+
+
+def _prep_update_estado(n: int) -> Tuple[Any, int]:
+    return [Pedido(f"PED-{i:07d}", items_sinteticos(i)) for i in range(n)], n
+
+
+def _paso_update_estado(pedidos: List[Pedido], i: int) -> None:
+    pedidos[i].update_estado('EN_COLA')
+
+
+def _prep_update_metricas(n: int) -> Tuple[Any, int]:
+    sink = SinkMetricas()
+    BUS_EVENTOS.suscribir(sink)
+    return ([Pedido(f"PED-{i:07d}", items_sinteticos(i)) for i in range(n)], sink), n
+
+
+def _paso_update_metricas(estado: Tuple[List[Pedido], SinkMetricas], i: int) -> None:
+    estado[0][i].update_estado('EN_COLA')
+
+
+def _limpiar_update_metricas(estado: Tuple[List[Pedido], SinkMetricas]) -> None:
+    BUS_EVENTOS.desuscribir(estado[1])
+
+
+def _prep_crear_pedido(n: int) -> Tuple[Any, int]:
+    return (GestorPedidos(), [items_sinteticos(i) for i in range(n)]), n
+
+
+def _paso_crear_pedido(estado: Tuple[GestorPedidos, List], i: int) -> None:
+    gestor, items = estado
+    gestor.crear_pedido(items[i], cliente_info={'telefono': str(600000000 + i % 1000)})
+
+
+def _prep_asignar(n: int) -> Tuple[Any, int]:
+    gestor = _gestor_con_pedidos(n)
+    return (gestor, list(gestor.pedidos)), n
+
+
+def _paso_asignar(estado: Tuple[GestorPedidos, List[str]], i: int) -> None:
+    gestor, ids = estado
+    gestor.asignar_a_estacion(ids[i], 'A')
+
+
+def _prep_listar(n: int) -> Tuple[Any, int]:
+    gestor = _gestor_con_pedidos(n)
+    estacion = gestor.estaciones['A']
+    for i, pid in enumerate(list(gestor.pedidos)):
+        objetivo = ESTADOS_MEZCLA[i % len(ESTADOS_MEZCLA)]
+        if objetivo == 'PENDIENTE':
+            continue
+        gestor.asignar_a_estacion(pid, 'A')
+        if objetivo in ('EN_PREPARACION', 'LISTO'):
+            estacion.capacidad = len(estacion._en_preparacion) + 1
+            estacion.iniciar_preparacion()
+            estacion.capacidad = n
+        if objetivo == 'LISTO':
+            estacion.finalizar_pedido(pid)
+    return gestor, min(n, 1_000)
+
+
+def _paso_listar(gestor: GestorPedidos, i: int) -> None:
+    gestor.listar_pedidos(estado=ESTADOS_MEZCLA[i % len(ESTADOS_MEZCLA)])
+
+
+def _prep_iniciar(n: int) -> Tuple[Any, int]:
+    gestor = _gestor_con_pedidos(n)
+    for pid in list(gestor.pedidos):
+        gestor.asignar_a_estacion(pid, 'A')
+    return gestor.estaciones['A'], n
+
+
+def _paso_iniciar(estacion: EstacionCocina, i: int) -> None:
+    estacion.capacidad = i + 1  # Deja entrar exactamente un pedido más a preparación
+    estacion.iniciar_preparacion()
+
+
+def _prep_guardar(n: int) -> Tuple[Any, int]:
+    directorio = tempfile.mkdtemp(prefix='bench-almacen-')
+    app._almacen = abrir_sqlite(os.path.join(directorio, 'pedidos.db'))
+    pedidos = [Pedido(f"PED-{i:07d}", items_sinteticos(i), {'telefono': '600111222'}) for i in range(n)]
+    return (directorio, pedidos), n
+
+
+def _paso_guardar(estado: Tuple[str, List[Pedido]], i: int) -> None:
+    app.guardar_pedido(estado[1][i])
+
+
+def _limpiar_guardar(estado: Tuple[str, List[Pedido]]) -> None:
+    app._almacen.cerrar()
+    app._almacen = None
+    shutil.rmtree(estado[0], ignore_errors=True)
+
+
+BENCHMARKS: Dict[str, Tuple[Callable, Callable, Optional[Callable]]] = {
+    'pedido_init': (_prep_pedido_init, _paso_pedido_init, None),
+    'update_estado': (_prep_update_estado, _paso_update_estado, None),
+    'update_estado_metricas': (_prep_update_metricas, _paso_update_metricas, _limpiar_update_metricas),
+    'crear_pedido': (_prep_crear_pedido, _paso_crear_pedido, None),
+    'asignar_a_estacion': (_prep_asignar, _paso_asignar, None),
+    'listar_pedidos': (_prep_listar, _paso_listar, None),
+    'iniciar_preparacion': (_prep_iniciar, _paso_iniciar, None),
+    'guardar_pedido': (_prep_guardar, _paso_guardar, _limpiar_guardar),
+}
+
+
+def _ejecutar(nombre: str, n: int, con_memoria: bool) -> Dict[str, float]:
+    preparar, paso, limpiar = BENCHMARKS[nombre]
+    gc.collect()
+    if con_memoria:
+        tracemalloc.start()
+        base = tracemalloc.get_traced_memory()[0]
+    estado, pasos = preparar(n)
+    latencias = array('q', bytes(8 * pasos))
+    reloj = time.perf_counter_ns
+    inicio = reloj()
+    for i in range(pasos):
+        t0 = reloj()
+        paso(estado, i)
+        latencias[i] = reloj() - t0
+    total_ns = reloj() - inicio
+    resultado: Dict[str, float] = {}
+    if con_memoria:
+        resultado['memoria_pico_mb'] = (tracemalloc.get_traced_memory()[1] - base) / 2**20
+        tracemalloc.stop()
+    if limpiar is not None:
+        limpiar(estado)
+    ordenadas = sorted(latencias)
+    resultado.update({
+        'pasos': pasos,
+        'ops_s': pasos / (total_ns / 1e9) if total_ns else 0.0,
+        'p50_us': percentil(ordenadas, 50) / 1e3,
+        'p95_us': percentil(ordenadas, 95) / 1e3,
+        'p99_us': percentil(ordenadas, 99) / 1e3,
+    })
+    return resultado
+
+
+def ejecutar_suite(tamanos: List[int], nombres: Optional[List[str]] = None,
+                   memoria: bool = True) -> Dict[str, Dict[str, float]]:
+    """Ejecutar los benchmarks indicados y devolver {"nombre@n": métricas}."""
+    resultados: Dict[str, Dict[str, float]] = {}
+    for n in tamanos:
+        for nombre in nombres or list(BENCHMARKS):
+            r = _ejecutar(nombre, n, con_memoria=False)
+            if memoria:  # Segunda pasada: tracemalloc distorsiona los tiempos
+                r['memoria_pico_mb'] = _ejecutar(nombre, n, con_memoria=True)['memoria_pico_mb']
+            resultados[f"{nombre}@{n}"] = r
+            print(f"  {nombre + '@' + str(n):30s} {r['ops_s']:12.0f} ops/s  p50 {r['p50_us']:8.2f}µs  "
+                  f"p95 {r['p95_us']:8.2f}µs  p99 {r['p99_us']:8.2f}µs"
+                  + (f"  pico {r['memoria_pico_mb']:8.1f} MB" if 'memoria_pico_mb' in r else ''), flush=True)
+    return resultados
+
+
+def comparar(actual: Dict[str, Dict[str, float]], base: Dict[str, Dict[str, float]],
+             tolerancia: float) -> List[str]:
+    """Devolver descripciones de las regresiones que superan `tolerancia` (fracción)."""
+    regresiones = []
+    for clave, r in actual.items():
+        b = base.get(clave)
+        if b is None:
+            continue
+        if b.get('ops_s') and r['ops_s'] < b['ops_s'] * (1 - tolerancia):
+            regresiones.append(f"{clave}: ops/s {b['ops_s']:.0f} -> {r['ops_s']:.0f}")
+        if b.get('p95_us') and r['p95_us'] > b['p95_us'] * (1 + tolerancia):
+            regresiones.append(f"{clave}: p95 {b['p95_us']:.2f}µs -> {r['p95_us']:.2f}µs")
+        if b.get('memoria_pico_mb') and 'memoria_pico_mb' in r \
+                and r['memoria_pico_mb'] > b['memoria_pico_mb'] * (1 + tolerancia):
+            regresiones.append(f"{clave}: memoria {b['memoria_pico_mb']:.1f} -> {r['memoria_pico_mb']:.1f} MB")
+    return regresiones
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmarks del ciclo de vida de los pedidos')
+    parser.add_argument('--tamanos', type=int, nargs='+', default=TAMANOS)
+    parser.add_argument('--solo', nargs='+', choices=list(BENCHMARKS), default=None)
+    parser.add_argument('--sin-memoria', action='store_true', help='omitir la pasada con tracemalloc')
+    parser.add_argument('--guardar', metavar='JSON', help='guardar los resultados como línea base')
+    parser.add_argument('--comparar', metavar='JSON', help='comparar contra una línea base')
+    parser.add_argument('--tolerancia', type=float, default=0.15, help='fracción admitida (0.15 = 15%%)')
+    args = parser.parse_args(argv)
+
+    print(f"Python {platform.python_version()} en {platform.platform()}")
+    resultados = ejecutar_suite(args.tamanos, args.solo, memoria=not args.sin_memoria)
+    if args.guardar:
+        with open(args.guardar, 'w', encoding='utf-8') as f:
+            json.dump({'meta': {'python': platform.python_version(), 'plataforma': platform.platform(),
+                                'fecha': datetime.now().isoformat(timespec='seconds')},
+                       'resultados': resultados}, f, indent=2)
+        print(f"Línea base guardada en {args.guardar}")
+    if args.comparar:
+        with open(args.comparar, 'r', encoding='utf-8') as f:
+            base = json.load(f)['resultados']
+        regresiones = comparar(resultados, base, args.tolerancia)
+        if regresiones:
+            print(f"REGRESIONES (tolerancia {args.tolerancia:.0%}):")
+            for r in regresiones:
+                print(f"  - {r}")
+            return 1
+        print(f"Sin regresiones respecto a {args.comparar} (tolerancia {args.tolerancia:.0%})")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,112 @@
+"""Benchmark de la validación de ítems (`VALIDADOR_ITEMS`) con `--pedidos` pedidos (100.000 por defecto).
+
+Cada pedido tiene 1-3 líneas del catálogo `PRODUCTS`, en dos formas:
+
+- libre:  {'name', 'qty', 'prep_time_min', 'price'} (se valida contra el esquema)
+- por id: {'id', 'qty'} (tiempo y precio salen del catálogo)
+
+Fases (pedidos/s, mejor de `--repeticiones`):
+
+- validar:     solo traducir los ítems a líneas (código, qty). `anterior` es
+               la validación que hacía `Pedido` antes del validador compartido.
+- Pedido:      `Pedido(id, items, cliente_info)`.
+- crear_bulk:  `GestorPedidos.crear_pedidos_bulk` sin almacén.
+
+Uso:
+
+    python -m benchmarks.validacion_items
+    python -m benchmarks.validacion_items --pedidos 1000000 --repeticiones 3
+"""
+from __future__ import annotations
+from typing import Callable, Dict, List, Optional, Tuple
+import argparse
+import gc
+import time
+
+from benchmarks.suite import items_sinteticos
+from src.main import PRODUCTS
+from src.models.catalogo import CATALOGO
+from src.models.pedido import Pedido
+from src.models.validacion_items import VALIDADOR_ITEMS
+from src.services.gestor_pedidos import GestorPedidos
+
+
+def items_por_id(i: int) -> List[Dict]:
+    """Los mismos productos y cantidades que `items_sinteticos(i)`, referenciados por id."""
+    n = 1 + i % 3
+    return [{'id': p['id'], 'qty': 1 + (i + k) % 4}
+            for k, p in enumerate(PRODUCTS[(i * 7 + j * 13) % len(PRODUCTS)] for j in range(n))]
+
+
+def _codificar_anterior(it: Dict) -> Tuple[int, int]:
+    """Validación por ítem previa a `ValidadorItems` (referencia)."""
+    if not isinstance(it, dict) or 'name' not in it or 'qty' not in it:
+        raise ValueError("Cada item debe ser dict con 'name' y 'qty'")
+    name = it['name']
+    qty = it['qty']
+    if not isinstance(name, str) or not isinstance(qty, int) or qty <= 0:
+        raise ValueError("Item inválido: 'name' str y 'qty' int>0")
+    prep = int(it.get('prep_time_min', 5))
+    price = round(float(it.get('price', 0.0)), 2)
+    return CATALOGO.registrar(name, prep, price, producto_id=it.get('id')), qty
+
+
+def _validar_anterior(pedidos: List[List[Dict]]) -> None:
+    for items in pedidos:
+        for it in items:
+            _codificar_anterior(it)
+
+
+def _validar(pedidos: List[List[Dict]]) -> None:
+    codificar_items = VALIDADOR_ITEMS.codificar_items
+    for items in pedidos:
+        codificar_items(items)
+
+
+def _construir(pedidos: List[List[Dict]]) -> None:
+    cliente = {'telefono': '600111222'}
+    for i, items in enumerate(pedidos):
+        Pedido(i, items, cliente)
+
+
+def _crear_bulk(pedidos: List[List[Dict]]) -> None:
+    GestorPedidos().crear_pedidos_bulk([{'items': items, 'cliente_info': {'telefono': '600111222'}}
+                                        for items in pedidos])
+
+
+def medir(funcion: Callable[[List[List[Dict]]], None], pedidos: List[List[Dict]], repeticiones: int) -> float:
+    """Mejor tiempo (s) de `repeticiones` corridas."""
+    mejor = float('inf')
+    for _ in range(repeticiones):
+        gc.collect()
+        inicio = time.perf_counter()
+        funcion(pedidos)
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pedidos', type=int, default=100_000)
+    parser.add_argument('--repeticiones', type=int, default=3, help='se informa la mejor')
+    args = parser.parse_args(argv)
+    libres = [items_sinteticos(i) for i in range(args.pedidos)]
+    por_id = [items_por_id(i) for i in range(args.pedidos)]
+    casos = [
+        ('validar', 'anterior', _validar_anterior, libres),
+        ('validar', 'libre', _validar, libres),
+        ('validar', 'por id', _validar, por_id),
+        ('Pedido', 'libre', _construir, libres),
+        ('Pedido', 'por id', _construir, por_id),
+        ('crear_bulk', 'libre', _crear_bulk, libres),
+        ('crear_bulk', 'por id', _crear_bulk, por_id),
+    ]
+    print(f"Pedidos: {args.pedidos:,}  (mejor de {args.repeticiones})")
+    print(f"{'fase':12s}{'ítems':10s}{'segundos':>10s}{'pedidos/s':>14s}")
+    for fase, forma, funcion, pedidos in casos:
+        segundos = medir(funcion, pedidos, args.repeticiones)
+        print(f"{fase:12s}{forma:10s}{segundos:10.3f}{args.pedidos / segundos:14,.0f}")
+
+
+if __name__ == '__main__':
+    main()
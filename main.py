@@ -4,13 +4,65 @@ Este archivo permite seguir ejecutando `python main.py` en la raíz durante
 la transición. Recomendamos `python -m src.main`, pero este wrapper
 invoca la implementación del paquete `src`.
 """
-from src.main import main as _main
+from src.main import main as _main, obtener_almacen
+from src.services.historial import LectorHistorial
+from src.models.pedido import Pedido
 import sys
 import time
 import os
-import json
 
-ped = os.path.join(os.path.dirname(__file__), 'pedidos.json')
+TAM_PAGINA = 10
+
+
+def _ver_historial(titulo, mostrar) -> None:
+    """Vista paginada del historial (página más reciente primero) con filtros opcionales."""
+    os.system("cls")
+    print('______________________________________________')
+    print(f"----------------{titulo}----------------\n")
+    estado = input(f"Filtrar por estado ({', '.join(Pedido.ESTADOS_VALIDOS)}; ENTER = todos):\t").strip().upper()
+    desde = input("Desde (AAAA-MM-DD; ENTER = sin límite):\t").strip()
+    hasta = input("Hasta (AAAA-MM-DD; ENTER = sin límite):\t").strip()
+    try:
+        lector = LectorHistorial(obtener_almacen(), tam_pagina=TAM_PAGINA, estado=estado or None,
+                                 desde=desde or None, hasta=(hasta + 'T23:59:59.999999') if hasta else None)
+        paginas = lector.paginas()
+        numero = 0
+        while paginas:
+            os.system("cls")
+            print(f"Total de pedidos:\t{len(lector)}\t(página {numero + 1} de {paginas}, más recientes primero)\n")
+            for i, p in enumerate(lector.pagina(numero), numero * TAM_PAGINA + 1):
+                mostrar(i, p)
+            accion = input("[S]iguiente, [A]nterior, nº de página o ENTER para salir:\t").strip().lower()
+            if accion in ('s', 'siguiente'):
+                numero = min(numero + 1, paginas - 1)
+            elif accion in ('a', 'anterior'):
+                numero = max(numero - 1, 0)
+            elif accion.isdigit() and 1 <= int(accion) <= paginas:
+                numero = int(accion) - 1
+            elif accion == '':
+                break
+        if not paginas:
+            print("No hay pedidos registrados.")
+    except Exception as e:
+        print(f"Error: {e}")
+    print('______________________________________________\n')
+    input("\nPresiona ENTER para regresar al menú...")
+    os.system("cls")
+
+
+def _mostrar_resumen(i, p) -> None:
+    print(f"{i}. ID: {p.get('id')} | Estado: {p.get('estado')} | {str(p.get('timestamp_creado', ''))[:16]}")
+    if p.get('cliente_info'):
+        print(f"\tCliente: {p['cliente_info'].get('nombre', 'N/A')}")
+    print(f"\tTotal: ${p.get('total_price') or 0:.2f}\n")
+
+
+def _mostrar_items(i, p) -> None:
+    print(f"{i}. Pedido: {p.get('id')}")
+    for item in p.get('items', []):
+        print(f"   - {item.get('name')} x {item.get('qty')}\t(${(item.get('price') or 0) * (item.get('qty') or 0):.2f})")
+    print()
+
 
 while True:
     op = input ("""----------MENU----------\n  1. Ingresar registro.\n  2. Ver pedidos.\n  3. Ver productos pedidos.\n
@@ -46,56 +98,11 @@ while True:
                             os.system("cls")
                             continue
         case '2':
-            os.system("cls")
-            print('______________________________________________')
-            print("----------------Ver Pedidos----------------\n")
-            try:
-                if os.path.exists(ped):
-                    with open(ped, 'r', encoding='utf-8') as f:
-                        pedidos = json.load(f)
-                    
-                    if pedidos:
-                        print(f"Total de pedidos:\t{len(pedidos)}\n")
-                        for i, p in enumerate(pedidos, 1):
-                            print(f"{i}. ID: {p.get('id')} | Estado: LISTO")
-                            if p.get('cliente_info'):
-                                print(f"\tCliente: {p['cliente_info'].get('nombre', 'N/A')}")
-                            print(f"\tTotal: ${p.get('total_price', 0):.2f}\n")
-                    else:
-                        print("No hay pedidos registrados.")
-                else:
-                    print("No hay historial de pedidos.")
-            except Exception as e:
-                print(f"Error: {e}")
-            print('______________________________________________\n')
-            input("\nPresiona ENTER para regresar al menú...")
-            os.system("cls")
-        
+            _ver_historial("Ver Pedidos", _mostrar_resumen)
+
         case '3':
-            os.system("cls")
-            print('______________________________________________')
-            print("----------------Ver Pedidos----------------\n")
-            try:
-                if os.path.exists(ped):
-                    with open(ped, 'r', encoding='utf-8') as f:
-                        pedidos = json.load(f)
-                    
-                    if pedidos:
-                        for i, p in enumerate(pedidos, 1):
-                            print(f"{i}. Pedido: {p.get('id')}")
-                            for item in p.get('items', []):
-                                print(f"   - {item.get('name')} x {item.get('qty')}\t(${item.get('price')*item.get('qty'):.2f})")
-                            print()
-                    else:
-                        print("No hay pedidos registrados.")
-                else:
-                    print("No hay historial de pedidos.")
-            except Exception as e:
-                print(f"Error: {e}")
-            print('______________________________________________\n')
-            input("\nPresiona ENTER para regresar al menú...")
-            os.system("cls")
-        
+            _ver_historial("Ver Productos Pedidos", _mostrar_items)
+
         case _:
             if op == '':
                 print("Valor blanco. Selecciona una opción válida.\n\n")
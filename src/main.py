@@ -11,72 +11,45 @@ from .services.gestor_pedidos import GestorPedidos
 from .models.estacion_cocina import EstacionCocina
 from .services.notificador import Notificador
 from .services.temporizador import calcular_tiempo_estimado
+from .services.almacenamiento import AlmacenPedidos
+from .services.almacen_sqlite import abrir_sqlite
+from .services.recuperacion import RecuperacionGestor
+from .models.productos import PRODUCTS  # Re-exportado: el menú y los benchmarks lo usan desde aquí
+from .models.eventos import BUS_EVENTOS, SinkLogging
+import argparse
+import atexit
+import logging
 import sys
 import time
 import os
 import re
 import json
 
-PRODUCTS = [
-    # Pizzas ($50-$120)
-    {"id": "PIZ", "name": "Pizza Margarita", "prep_time_min": 12, "price": 50.00},
-    {"id": "PIZ-PEP", "name": "Pizza de Pepperoni", "prep_time_min": 12, "price": 65.00},
-    {"id": "PIZ-CHM", "name": "Pizza de Champiñones", "prep_time_min": 12, "price": 62.00},
-    {"id": "PIZ-BBQ", "name": "Pizza BBQ", "prep_time_min": 13, "price": 75.00},
-    {"id": "PIZ-HAM", "name": "Pizza Hawaiana", "prep_time_min": 12, "price": 70.00},
-    {"id": "PIZ-4QS", "name": "Pizza 4 Quesos", "prep_time_min": 13, "price": 80.00},
-    {"id": "PIZ-VEG", "name": "Pizza Vegetariana", "prep_time_min": 12, "price": 58.00},
-    {"id": "PIZ-ESP", "name": "Pizza Especial", "prep_time_min": 14, "price": 120.00},
-    
-    # Hamburguesas ($55-$140)
-    {"id": "HMB", "name": "Hamburguesa Clásica", "prep_time_min": 8, "price": 55.00},
-    {"id": "HMB-DBL", "name": "Hamburguesa Doble", "prep_time_min": 10, "price": 90.00},
-    {"id": "HMB-BCS", "name": "Hamburguesa con Bacon", "prep_time_min": 9, "price": 85.00},
-    {"id": "HMB-CHZ", "name": "Hamburguesa con Queso", "prep_time_min": 8, "price": 65.00},
-    {"id": "HMB-PIC", "name": "Hamburguesa Picante", "prep_time_min": 9, "price": 78.00},
-    {"id": "HMB-EGG", "name": "Hamburguesa con Huevo", "prep_time_min": 10, "price": 95.00},
-    
-    # Sándwiches ($50-$110)
-    {"id": "SND", "name": "Sándwich de Jamón", "prep_time_min": 5, "price": 50.00},
-    {"id": "SND-POL", "name": "Sándwich de Pollo", "prep_time_min": 6, "price": 68.00},
-    {"id": "SND-TUN", "name": "Sándwich de Atún", "prep_time_min": 5, "price": 75.00},
-    {"id": "SND-CRN", "name": "Sándwich de Carne Asada", "prep_time_min": 7, "price": 110.00},
-    {"id": "SND-VEG", "name": "Sándwich Vegetariano", "prep_time_min": 5, "price": 55.00},
-    
-    # Ensaladas ($60-$130)
-    {"id": "ENS", "name": "Ensalada César", "prep_time_min": 4, "price": 65.00},
-    {"id": "ENS-GRG", "name": "Ensalada Griega", "prep_time_min": 4, "price": 70.00},
-    {"id": "ENS-POL", "name": "Ensalada de Pollo", "prep_time_min": 5, "price": 130.00},
-    {"id": "ENS-MXD", "name": "Ensalada Mixta", "prep_time_min": 4, "price": 60.00},
-    {"id": "ENS-CAP", "name": "Ensalada Caprese", "prep_time_min": 4, "price": 85.00},
-    
-    # Bebidas ($15-$35)
-    {"id": "BEB", "name": "Bebida 500ml", "prep_time_min": 1, "price": 20.00},
-    {"id": "BEB-JGO", "name": "Jugo Natural 300ml", "prep_time_min": 2, "price": 35.00},
-    {"id": "BEB-SDA", "name": "Refresco Soda 500ml", "prep_time_min": 1, "price": 22.00},
-    {"id": "BEB-CAF", "name": "Café Americano", "prep_time_min": 3, "price": 25.00},
-    {"id": "BEB-LAT", "name": "Café Latte", "prep_time_min": 4, "price": 32.00},
-    
-    # Postres ($50-$85)
-    {"id": "PST-FLN", "name": "Flan", "prep_time_min": 2, "price": 50.00},
-    {"id": "PST-TPL", "name": "Tiramisu", "prep_time_min": 2, "price": 60.00},
-    {"id": "PST-CHC", "name": "Cheesecake", "prep_time_min": 2, "price": 85.00},
-    {"id": "PST-ARL", "name": "Arroz con Leche", "prep_time_min": 2, "price": 45.00},
-    
-    # Acompañamientos ($20-$50)
-    {"id": "ACP-PAP", "name": "Papas Fritas", "prep_time_min": 5, "price": 35.00},
-    {"id": "ACP-ONI", "name": "Aros de Cebolla", "prep_time_min": 5, "price": 40.00},
-    {"id": "ACP-ALT", "name": "Alitas de Pollo", "prep_time_min": 8, "price": 75.00},
-    {"id": "ACP-CHZ", "name": "Bastones de Queso", "prep_time_min": 6, "price": 50.00},
-    
-    # Extras/Complementos ($15-$45)
-    {"id": "EXT-GSA", "name": "Guacamole", "prep_time_min": 1, "price": 28.00},
-    {"id": "EXT-SAL", "name": "Salsa Picante", "prep_time_min": 1, "price": 15.00},
-    {"id": "EXT-MAY", "name": "Mayonesa Extra", "prep_time_min": 1, "price": 12.00},
-    {"id": "EXT-ACT", "name": "Aceitunas", "prep_time_min": 1, "price": 22.00},
-]
+_PATRON_REPETIDAS = re.compile(r'(.)\1{2,}')  # Tres o más caracteres iguales seguidos
+_PRODUCTOS_POR_CLAVE = {**{p['name']: p for p in PRODUCTS}, **{p['id']: p for p in PRODUCTS}}
 
 PEDIDOS_PATH = os.path.join(os.path.dirname(__file__), '..', 'pedidos.json')
+JOURNAL_PATH = os.path.join(os.path.dirname(__file__), '..', 'pedidos.journal')
+DB_PATH = os.path.join(os.path.dirname(__file__), '..', 'pedidos.db')
+ESTADO_PATH = os.path.join(os.path.dirname(__file__), '..', 'pedidos.estado')  # Foto del gestor + bitácora
+
+_almacen: AlmacenPedidos | None = None
+_gestor: GestorPedidos | None = None
+_SINK_CONSOLA = SinkLogging()
+
+
+def obtener_almacen() -> AlmacenPedidos:
+    """Devolver el almacén del historial (SQLite), abriéndolo la primera vez.
+
+    Al abrirse migra una sola vez el historial anterior: el journal si existe
+    (que ya incluye `pedidos.json`) o, si no, `pedidos.json`.
+    """
+    global _almacen
+    if _almacen is None:
+        anterior = JOURNAL_PATH if os.path.isdir(JOURNAL_PATH) else PEDIDOS_PATH
+        _almacen = abrir_sqlite(DB_PATH, migrar_desde=anterior)
+        atexit.register(_almacen.cerrar)  # Volcar lo pendiente aunque no se llame a cerrar
+    return _almacen
 
 
 def mostrar_catalogo() -> None:
@@ -145,13 +118,8 @@ def elegir_productos() -> list[dict]:
                 print('Entrada inválida, introduce un número.\n')
                 continue
 
-        # Agregar al pedido usando la info del catálogo
-        items.append({
-            'name': producto['name'],
-            'qty': qty,
-            'prep_time_min': producto['prep_time_min'],
-            'price': producto['price'],
-        })
+        # Agregar al pedido por id: nombre, tiempo y precio los completa el catálogo
+        items.append({'id': producto['id'], 'qty': qty})
 
         seguir = input('¿Deseas agregar otro producto? (s/N) \n\to Enter para continuar:\t').strip().lower()
         match seguir:
@@ -166,29 +134,204 @@ def elegir_productos() -> list[dict]:
     return items
 
 
-def guardar_pedido(pedido) -> None:
-    """Guarda pedido en JSON."""
-    try:
-        pedidos = []
-        if os.path.exists(PEDIDOS_PATH):
-            with open(PEDIDOS_PATH, 'r', encoding='utf-8') as f:
-                pedidos = json.load(f)
+def validar_nombre(nombre: str) -> str | None:
+    """Reglas del nombre del cliente. Devuelve el mensaje de error o None si es válido."""
+    if nombre == '':
+        return 'Debe ingresar un nombre.'
+    if nombre.isdigit() or not all(c.isalpha() or c.isspace() for c in nombre):
+        return 'No se aceptan números ni caracteres especiales. Intenta de nuevo.'
+    if _PATRON_REPETIDAS.search(nombre):
+        return 'No se permiten más de dos letras consecutivas iguales. Intenta de nuevo.'
+    if nombre.islower() or nombre.isupper():
+        return 'El nombre debe tener mayúsculas y minúsculas. Intenta de nuevo.'
+    if not nombre.istitle():
+        return 'El nombre debe iniciar con mayúscula. Intenta de nuevo.'
+    if len(nombre) < 3:
+        return 'El nombre es muy corto. Intenta de nuevo.'
+    if len(nombre) > 30:
+        return 'El nombre es muy largo. Intenta de nuevo.'
+    return None
+
+
+def validar_telefono(telefono: str) -> str | None:
+    """Reglas del teléfono del cliente. Devuelve el mensaje de error o None si es válido."""
+    if telefono == '':
+        return 'Debe ingresar un número de teléfono'
+    if not telefono.isdigit():
+        return 'Solo se aceptan números. Intenta de nuevo.'
+    if telefono.startswith('0'):
+        return 'El número no debe iniciar con cero. Intenta de nuevo.'
+    if len(telefono) < 7:
+        return 'El número es muy corto. Intenta de nuevo.'
+    if len(telefono) > 14:
+        return 'El número es muy largo. Intenta de nuevo.'
+    return None
 
-        pedidos.append(pedido.as_dict())
 
-        with open(PEDIDOS_PATH, 'w', encoding='utf-8') as f:
-            json.dump(pedidos, f, indent=2, ensure_ascii=False)
+def guardar_pedido(pedido) -> None:
+    """Guarda una foto del pedido en el historial (nueva fila).
+
+    Los pedidos creados con un `GestorPedidos(almacen=...)` ya se guardan y
+    actualizan solos; esta función es para pedidos sueltos.
+    """
+    try:
+        obtener_almacen().guardar(pedido.as_dict())
     except Exception:
         pass
 
 
+def _crear_gestor() -> GestorPedidos:
+    """Gestor con el almacén SQLite (persiste altas y cambios de estado) y las estaciones A-D.
+
+    Los ids continúan tras el mayor PED-NNNN del historial: la app y la
+    ingesta comparten la numeración y ninguna reutiliza ids ya guardados
+    (los cambios de estado se aplican a la última fila con ese id).
+    """
+    almacen = obtener_almacen()
+    gestor = GestorPedidos(almacen=almacen)
+    if almacen is not None:
+        gestor.restaurar([], ultimo_id=almacen.ultimo_numero_id())
+    gestor.registrar_estacion(EstacionCocina('A', capacidad=2))
+    gestor.registrar_estacion(EstacionCocina('B', capacidad=3))
+    gestor.registrar_estacion(EstacionCocina('C', capacidad=1))
+    gestor.registrar_estacion(EstacionCocina('D', capacidad=3))
+    return gestor
+
+
+def completar_pedidos(gestor: GestorPedidos) -> int:
+    """Preparar y finalizar, sin pausas, todo lo asignado a las estaciones y lo que espera hueco.
+
+    Salida esperada: número de pedidos que pasaron a LISTO.
+    """
+    listos = 0
+    while True:
+        activo = False
+        for estacion in list(gestor.estaciones.values()):
+            estacion.iniciar_preparacion()
+            for pedido in estacion.en_preparacion:  # Cada finalización drena la espera hacia el hueco
+                activo = True
+                listos += estacion.finalizar_pedido(pedido.id)
+        if not activo:
+            return listos
+
+
+def preparar_gestor() -> GestorPedidos:
+    """Devolver el gestor de la app, creándolo la primera vez: almacén SQLite, estaciones A-D y
+    recuperación de la sesión anterior.
+
+    Uno por proceso: la recuperación (hilo de checkpoints y `atexit`) es dueña
+    de `pedidos.estado`, y una segunda instancia sobre el mismo directorio
+    pisaría su foto y podría purgar la bitácora en uso.
+    """
+    global _gestor
+    if _gestor is not None:
+        return _gestor
+    gestor = _crear_gestor()
+    # Recuperar pedidos en curso y colas de la sesión anterior (foto + cola de la bitácora)
+    recuperacion = RecuperacionGestor(ESTADO_PATH, incluir_terminados=False)
+    recuperacion.restaurar(gestor)
+    for pedido in gestor.listar_pedidos(estado='PENDIENTE'):  # Los que esperaban hueco vuelven a la cola
+        if pedido.estacion_id is None:
+            gestor.despachar(pedido.id)
+    recuperacion.iniciar(intervalo_s=30)
+    atexit.register(recuperacion.cerrar)  # Checkpoint final al salir
+    _gestor = gestor
+    return gestor
+
+
+def items_desde_registro(items: list) -> list[dict]:
+    """Resolver los ítems de un registro de ingesta contra el catálogo `PRODUCTS`.
+
+    Cada ítem es {'id' o 'name', 'qty'} y se traduce a {'id', 'qty'}: tiempo
+    y precio los completa el catálogo al validar el pedido, como en
+    `elegir_productos`. Lanza ValueError si un producto no existe; la
+    cantidad la valida `Pedido` (`VALIDADOR_ITEMS`).
+    """
+    if not isinstance(items, list) or not items:
+        raise ValueError('El pedido debe tener al menos un producto')
+    resueltos = []
+    for it in items:
+        if not isinstance(it, dict):
+            raise ValueError('Cada producto debe ser un objeto con id/name y qty')
+        claves = [it.get(campo) for campo in ('id', 'name') if it.get(campo) is not None]
+        if not all(isinstance(clave, str) for clave in claves):
+            raise ValueError('El id y el nombre del producto deben ser texto')
+        producto = next((_PRODUCTOS_POR_CLAVE[c] for c in claves if c in _PRODUCTOS_POR_CLAVE), None)
+        if producto is None:
+            raise ValueError(f"Producto desconocido: {it.get('id') or it.get('name')}")
+        resueltos.append({'id': producto['id'], 'qty': it.get('qty')})
+    return resueltos
+
+
+def ingerir(ruta: str, politica: str = 'menor_carga', completar: bool = False) -> dict:
+    """Ingerir pedidos desde un fichero JSONL sin interacción (`-` lee de stdin).
+
+    Cada línea es {"cliente": {"nombre", "telefono"}, "items": [{"id" o
+    "name", "qty"}, ...]}. Se aplican las mismas validaciones que en el flujo
+    interactivo y cada pedido válido sigue el camino normal: `crear_pedido`,
+    despacho con `politica` (o cola de espera del gestor si no hay hueco),
+    estimación y persistencia.
+
+    La ingesta usa un gestor propio, sin la recuperación de la app
+    (`pedidos.estado`), que continúa la numeración del historial. Los
+    pedidos se guardan con su estado real al terminar de leer (EN_COLA,
+    EN_PREPARACION o PENDIENTE si esperaban hueco). Solo con completar=True
+    (`--completar`) se prepara y termina el lote (`completar_pedidos`) y todo
+    queda LISTO.
+
+    Salida esperada: {'ingeridos', 'rechazados', 'despachados', 'en_espera'
+    (al terminar de leer), 'completados' (0 sin `completar`), 'segundos', 'pedidos_s',
+    'motivos': {mensaje: n}}.
+    """
+    gestor = _crear_gestor()
+    ingeridos = rechazados = despachados = 0
+    motivos: dict[str, int] = {}
+    inicio = time.perf_counter()
+    f = sys.stdin if ruta == '-' else open(ruta, 'r', encoding='utf-8')
+    try:
+        for linea in f:
+            if not linea.strip():
+                continue
+            try:
+                registro = json.loads(linea)
+                if not isinstance(registro, dict):
+                    raise ValueError('Cada línea debe ser un objeto JSON')
+                cliente = registro.get('cliente') or registro.get('cliente_info') or {}
+                nombre = str(cliente.get('nombre', '')).strip()
+                telefono = str(cliente.get('telefono', '')).strip()
+                error = validar_nombre(nombre) or validar_telefono(telefono)
+                if error:
+                    raise ValueError(error)
+                items = items_desde_registro(registro.get('items'))
+                pedido = gestor.crear_pedido(items, cliente_info={'nombre': nombre, 'telefono': telefono})
+            except (ValueError, TypeError, AttributeError) as e:
+                rechazados += 1
+                motivo = str(e) if not isinstance(e, json.JSONDecodeError) else 'JSON inválido'
+                motivos[motivo] = motivos.get(motivo, 0) + 1
+                continue
+            ingeridos += 1
+            gestor.despachar(pedido.id, politica=politica)
+            if pedido.estacion_id is not None:
+                despachados += 1
+                calcular_tiempo_estimado(pedido, gestor.estaciones[pedido.estacion_id])
+    finally:
+        if f is not sys.stdin:
+            f.close()
+    en_espera = gestor.profundidad_espera()
+    completados = completar_pedidos(gestor) if completar else 0
+    gestor.almacen.flush()
+    segundos = time.perf_counter() - inicio
+    return {'ingeridos': ingeridos, 'rechazados': rechazados, 'despachados': despachados,
+            'en_espera': en_espera, 'completados': completados, 'segundos': segundos,
+            'pedidos_s': ingeridos / segundos if segundos > 0 else 0.0, 'motivos': motivos}
+
+
 def main() -> None:
 
-    gestor = GestorPedidos()
-    gestor.estaciones['A'] = EstacionCocina('A', capacidad=2)
-    gestor.estaciones['B'] = EstacionCocina('B', capacidad=3)
-    gestor.estaciones['C'] = EstacionCocina('C', capacidad=1)
-    gestor.estaciones['D'] = EstacionCocina('D', capacidad=3)
+    # Las transiciones de estado se muestran vía logging (antes eran un print en update_estado)
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    BUS_EVENTOS.suscribir(_SINK_CONSOLA)
+    gestor = preparar_gestor()
 
     os.system("cls")
     print('=== Nuevo pedido interactivo ===\n')
@@ -196,75 +339,25 @@ def main() -> None:
     
     while True:
         cliente_nombre = input('Nombre del cliente:\n ->\t').strip()
-        if cliente_nombre == '':
-            print ('Debe ingresar un nombre.\n')
-            time.sleep(.5)
-            os.system("cls")
-            continue
-        elif cliente_nombre .isdigit() or not all(c.isalpha() or c.isspace() for c in cliente_nombre):
-            print ('No se aceptan números ni caracteres especiales. Intenta de nuevo.\n')
+        error = validar_nombre(cliente_nombre)
+        if error:
+            print (error + '\n')
             time.sleep(.5)
             os.system("cls")
             continue
-        elif cliente_nombre != re.sub(r'(.)\1{2,}', r'\1\1', cliente_nombre):
-            print ('No se permiten más de dos letras consecutivas iguales. Intenta de nuevo.\n')
-            time.sleep(.5)
-            os.system("cls")
-            continue
-        elif cliente_nombre.islower() or cliente_nombre.isupper():
-            print ('El nombre debe tener mayúsculas y minúsculas. Intenta de nuevo.\n')
-            time.sleep(.5)
-            os.system("cls")
-            continue
-        elif cliente_nombre.istitle() is False:
-            print ('El nombre debe iniciar con mayúscula. Intenta de nuevo.\n')
-            time.sleep(.5)
-            os.system("cls")
-            continue
-        elif len(cliente_nombre) < 3:
-            print ('El nombre es muy corto. Intenta de nuevo.\n')
-            time.sleep(.5)
-            os.system("cls")
-            continue
-        elif len(cliente_nombre) > 30:
-            print ('El nombre es muy largo. Intenta de nuevo.\n')
-            time.sleep(.5)
-            os.system("cls")
-            continue    
-        else:
-            print ('Nombre aceptado.\n')
-            break
+        print ('Nombre aceptado.\n')
+        break
 
     while True:
         cliente_telefono = input('Teléfono del cliente:\n ->\t').strip()
-        if cliente_telefono == '':
-            print ('Debe ingresar un número de teléfono\n')
-            time.sleep(.5)
-            os.system("cls")
-            continue
-        elif not cliente_telefono.isdigit():
-            print ('Solo se aceptan números. Intenta de nuevo.\n')
-            time.sleep(.5)
-            os.system("cls")
-            continue
-        elif cliente_telefono.startswith('0'):
-            print ('El número no debe iniciar con cero. Intenta de nuevo.\n')
-            time.sleep(.5)
-            os.system("cls")
-            continue
-        elif len(cliente_telefono) < 7:
-            print ('El número es muy corto. Intenta de nuevo.\n')
+        error = validar_telefono(cliente_telefono)
+        if error:
+            print (error + '\n')
             time.sleep(.5)
             os.system("cls")
             continue
-        elif len(cliente_telefono) > 14:
-            print ('El número es muy largo. Intenta de nuevo.\n')
-            time.sleep(.5)
-            os.system("cls")
-            continue
-        else:
-            print ('Número de teléfono aceptado.\n')
-            break
+        print ('Número de teléfono aceptado.\n')
+        break
     
     while True:
         op = input ('¿Deseas continuar con el pedido? (Si/No):\n     Respuesta:\t').strip().lower()
@@ -295,15 +388,20 @@ def main() -> None:
 
     pedido = gestor.crear_pedido(items, cliente_info=cliente)
     print(f'Pedido creado:\n\tid:{pedido.id}')
-    guardar_pedido(pedido)
     time.sleep(1)
 
-    asignado = gestor.asignar_a_estacion(pedido.id, 'A')
-    print(f'Asignado a estación A: {asignado}\n')
+    gestor.despachar(pedido.id, politica='menor_carga')
+    estacion_id = pedido.estacion_id
+    if estacion_id is None:
+        print(f'No hay estaciones con capacidad libre; el pedido espera en cola '
+              f'(posición {gestor.profundidad_espera()}) y se asignará al liberarse un hueco.\n')
+        return
+    estacion = gestor.estaciones[estacion_id]
+    print(f'Asignado a estación {estacion_id}: True\n')
 
     # Calcular estimado (robusto si el temporizador falla)
     try:
-        minutos = calcular_tiempo_estimado(pedido, gestor.estaciones['A'])
+        minutos = calcular_tiempo_estimado(pedido, estacion)
         if minutos is not None:
             print(f'Tiempo estimado: {minutos} minutos')
     except Exception:
@@ -314,21 +412,40 @@ def main() -> None:
     time.sleep(1)
     print('\n\n\tSimulando preparación...')
     time.sleep(2)
-    iniciados = gestor.estaciones['A'].iniciar_preparacion()
+    iniciados = estacion.iniciar_preparacion()
     print(f'Pedidos en preparación: {[p.id for p in iniciados]}')
     time.sleep(1)
     notificador.enviar(pedido, 'EN_PREPARACION')
     time.sleep(4)  
     print('\n\n\tSimulando finalización...')
     time.sleep(1)
-    finished = gestor.estaciones['A'].finalizar_pedido(pedido.id)
+    finished = estacion.finalizar_pedido(pedido.id)
     time.sleep(1)
     notificador.enviar(pedido, 'FINALIZADO')
+    notificador.cerrar()  # Esperar a que se entreguen los tickets encolados
+
+
+def _imprimir_resumen_ingesta(r: dict) -> None:
+    print(f"Ingeridos: {r['ingeridos']}  rechazados: {r['rechazados']}  despachados: {r['despachados']}  "
+          f"en espera: {r['en_espera']}  completados: {r['completados']}")
+    print(f"Tiempo: {r['segundos']:.2f} s  ({r['pedidos_s']:,.0f} pedidos/s)")
+    for motivo, n in sorted(r['motivos'].items(), key=lambda mn: -mn[1])[:5]:
+        print(f"  rechazo x{n}: {motivo}")
 
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Gestión de pedidos de cocina')
+    parser.add_argument('--ingest', metavar='PEDIDOS.jsonl',
+                        help='ingerir pedidos desde un JSONL sin interacción ("-" para stdin)')
+    parser.add_argument('--politica', default='menor_carga', help='política de despacho en la ingesta')
+    parser.add_argument('--completar', action='store_true',
+                        help='preparar y terminar el lote ingerido (todo queda LISTO en el historial)')
+    args = parser.parse_args()
     try:
-        main()
+        if args.ingest:
+            _imprimir_resumen_ingesta(ingerir(args.ingest, politica=args.politica, completar=args.completar))
+        else:
+            main()
     except KeyboardInterrupt:
         print('\nInterrumpido por el usuario')
         sys.exit(0)
@@ -1,7 +1,15 @@
 """Paquete `src.models` con las entidades del dominio (modelos).
 """
 
-from .pedido import Pedido
-from .estacion_cocina import EstacionCocina
+from .pedido import Pedido, SubPedido
+from .estacion_cocina import EstacionCocina, TrabajoEstacion
+from .catalogo import CATALOGO, CatalogoLineas, CODIGO_LOCAL
+from .productos import PRODUCTS
+from .metricas_rodantes import MetricasRodantes
+from .validacion_items import CampoItem, ESQUEMA_ITEM, QTY_MAXIMA, ValidadorItems, VALIDADOR_ITEMS
+from .eventos import BUS_EVENTOS, BusEventos, EventoTransicion, SinkEventos, SinkNulo, SinkLogging, SinkMetricas
 
-__all__ = ["Pedido", "EstacionCocina"]
+__all__ = ["Pedido", "SubPedido", "EstacionCocina", "TrabajoEstacion", "CATALOGO", "CatalogoLineas", "CODIGO_LOCAL", "PRODUCTS",
+           "CampoItem", "ESQUEMA_ITEM", "QTY_MAXIMA", "ValidadorItems", "VALIDADOR_ITEMS",
+           "MetricasRodantes",
+           "BUS_EVENTOS", "BusEventos", "EventoTransicion", "SinkEventos", "SinkNulo", "SinkLogging", "SinkMetricas"]
@@ -0,0 +1,124 @@
+"""Módulo `src.models.catalogo`.
+
+Tabla de productos internada que usan los pedidos para guardar sus líneas de
+forma compacta: cada producto recibe un código entero pequeño y los pedidos
+guardan solo (código, qty) en arrays empaquetados. `CATALOGO` nace con la
+carta (`src.models.productos.PRODUCTS`) ya registrada y solo crece con
+`registrar` explícitos: los ítems libres de los pedidos (sin id de catálogo o
+con uno desconocido) no se internan aquí, los guarda el propio pedido (ver
+`CODIGO_LOCAL`), así la tabla no crece con el tráfico.
+
+Ejemplo de uso:
+
+from src.models.catalogo import CATALOGO
+
+CATALOGO.codigo_de_producto('PIZ-PEP')  # Código de la carta
+codigo = CATALOGO.registrar('Pizza Margarita', 12, 50.0, producto_id='PIZ')
+CATALOGO.obtener(codigo)   # ('PIZ', 'Pizza Margarita', 12, 50.0)
+CATALOGO.categoria(codigo) # 'PIZ' (prefijo del id: 'PIZ-PEP' -> 'PIZ')
+CATALOGO.codigo_de_valores('Pizza Margarita', 12, 50.0)  # El mismo código (o None)
+"""
+from __future__ import annotations
+from typing import Dict, List, Optional, Tuple, Any
+import threading
+
+from .productos import PRODUCTS
+
+# (producto_id, name, prep_time_min, price)
+EntradaCatalogo = Tuple[Optional[str], str, int, float]
+
+# Los códigos desde aquí no son del catálogo: indexan las entradas propias de
+# cada pedido (`Pedido._libres`), así que el catálogo nunca los asigna
+CODIGO_LOCAL = 1 << 31
+
+
+def categoria_producto(producto_id: Optional[str]) -> Optional[str]:
+    """Categoría de un id de catálogo: su prefijo antes del primer '-' ('HMB-DBL' -> 'HMB').
+
+    Salida esperada: str o None si el producto no tiene id.
+    """
+    if not producto_id:
+        return None
+    return producto_id.split('-', 1)[0]
+
+
+class CatalogoLineas:
+    """Interna productos y devuelve códigos enteros estables durante el proceso.
+
+    - Un producto con id siempre obtiene el código de su id, así miles de
+      pedidos comparten una sola entrada (y dos ids con el mismo nombre,
+      tiempo y precio conservan cada uno su categoría).
+    - Los productos sin id se internan por (name, prep_time_min, price).
+      `codigo_de_valores` busca por esos valores el primer producto
+      registrado con ellos (así un ítem libre igual a uno de la carta es ese
+      producto) sin internar nada.
+    """
+
+    def __init__(self) -> None:
+        self._entradas: List[EntradaCatalogo] = []
+        self._codigos: Dict[Tuple[str, int, float], int] = {}
+        self._por_producto_id: Dict[str, int] = {}
+        self._categorias: List[Optional[str]] = []  # Categoría por código (ver `categoria_producto`)
+        self._lock = threading.Lock()  # Solo se toma al internar un producto nuevo
+
+    def registrar(self, name: str, prep_time_min: int, price: float, producto_id: Optional[str] = None) -> int:
+        """Devolver el código del producto, internándolo si es nuevo.
+
+        Con `producto_id` el producto se identifica por su id; sin él, por
+        (name, prep_time_min, price).
+
+        Salida esperada: int >= 0.
+
+        Raises:
+            ValueError: si el producto es nuevo y ya no quedan códigos por debajo de `CODIGO_LOCAL`.
+        """
+        clave = (name, prep_time_min, price)
+        indice, buscada = (self._codigos, clave) if producto_id is None else (self._por_producto_id, producto_id)
+        codigo = indice.get(buscada)
+        if codigo is not None:
+            return codigo
+        with self._lock:
+            codigo = indice.get(buscada)
+            if codigo is None:
+                if len(self._entradas) >= CODIGO_LOCAL:
+                    raise ValueError("Catálogo lleno: no quedan códigos de producto")
+                codigo = len(self._entradas)
+                self._entradas.append((producto_id, name, prep_time_min, price))
+                self._categorias.append(categoria_producto(producto_id))
+                self._codigos.setdefault(clave, codigo)
+                if producto_id is not None:
+                    self._por_producto_id[producto_id] = codigo
+            return codigo
+
+    def registrar_productos(self, productos: List[Dict[str, Any]]) -> None:
+        """Internar una lista de productos con keys id, name, prep_time_min, price."""
+        for p in productos:
+            self.registrar(p['name'], int(p.get('prep_time_min', 0)), round(float(p.get('price', 0.0)), 2),
+                           producto_id=p.get('id'))
+
+    def obtener(self, codigo: int) -> EntradaCatalogo:
+        """Devolver la entrada (producto_id, name, prep_time_min, price) del código."""
+        return self._entradas[codigo]
+
+    def categoria(self, codigo: int) -> Optional[str]:
+        """Devolver la categoría del código ('PIZ', 'BEB'...) o None si el producto no tiene id."""
+        return self._categorias[codigo]
+
+    def codigo_de_producto(self, producto_id: str) -> Optional[int]:
+        """Devolver el código asociado a un id de catálogo o None si no se registró."""
+        return self._por_producto_id.get(producto_id)
+
+    def codigo_de_valores(self, name: str, prep_time_min: int, price: float) -> Optional[int]:
+        """Devolver el código del primer producto registrado con esos valores o None (no interna)."""
+        return self._codigos.get((name, prep_time_min, price))
+
+    def tiempos_preparacion(self) -> List[int]:
+        """Lista prep_time_min indexada por código (útil para cálculos vectorizados)."""
+        return [entrada[2] for entrada in self._entradas]
+
+    def __len__(self) -> int:
+        return len(self._entradas)
+
+
+CATALOGO = CatalogoLineas()
+CATALOGO.registrar_productos(PRODUCTS)  # Los pedidos referencian estos productos por id
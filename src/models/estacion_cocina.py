@@ -4,11 +4,24 @@ Contiene la clase `EstacionCocina` que representa una estación de preparación.
 Esqueleto con docstrings; implementar lógica posteriormente.
 """
 from __future__ import annotations
-from typing import List, Optional, Dict, Union
+from typing import List, Optional, Dict, Union, Tuple, Callable, Iterable, NamedTuple
+from collections import deque
+import threading
 
+from .metricas_rodantes import MetricasRodantes
 from .pedido import Pedido
 
 
+class TrabajoEstacion(NamedTuple):
+    """Foto del trabajo de una estación (`EstacionCocina.trabajo`).
+
+    - en_preparacion: id -> minutos de cada pedido en preparación.
+    - cola: pares (id, minutos) de los pedidos en espera, en orden FIFO.
+    """
+    en_preparacion: Dict[Union[str, int], int]
+    cola: List[Tuple[Union[str, int], int]]
+
+
 class EstacionCocina:
     """Modelo de estación de cocina.
 
@@ -18,39 +31,191 @@ class EstacionCocina:
 
     - cola: estructura para pedidos en espera
     - en_preparacion: lista/colección de pedidos actualmente en preparación
+
+    Internamente la cola es un `deque` de (secuencia, pedido) más un dict
+    id -> (secuencia, pedido) con los pedidos vivos; quitar un pedido de la
+    cola solo lo borra del dict y la entrada del deque se descarta al llegar
+    al frente (borrado perezoso). `en_preparacion` es un dict por id. Así
+    encolar, iniciar, finalizar y remover son O(1) y se conserva el orden FIFO.
+    `cola` y `en_preparacion` se exponen como listas (vistas de solo lectura).
+
+    Especialización (opcional): `categorias` declara las categorías de
+    producto que prepara la estación ('PIZ', 'BEB'...; ver
+    `CATALOGO.categoria`). Solo acepta pedidos cuyos ítems sean todos de esas
+    categorías (los ítems sin categoría valen en cualquier estación). Sin
+    `categorias` la estación acepta cualquier pedido.
+
+    Los observadores registrados con `agregar_observador` se invocan cada vez
+    que cambia la carga o el trabajo pendiente de la estación.
+
+    `metricas` (`MetricasRodantes`) guarda la última hora por minutos:
+    pedidos iniciados y finalizados, profundidad de la cola, puestos en
+    preparación frente a `capacidad` y espera en cola (EN_COLA ->
+    EN_PREPARACION). Consulta: `estacion.metricas.snapshot(estacion.capacidad)`.
+
+    Concurrencia: las mutaciones se serializan con un `RLock` por estación y
+    los observadores se avisan después de soltarlo (nunca con el lock tomado);
+    `carga_actual`, `puede_aceptar_pedido` y `fin_estimado` son lecturas sin
+    lock (orientativas) y `asignar_pedido` vuelve a comprobar la capacidad
+    con el lock tomado.
     """
     
     id: Union[str, int]
     capacidad: int
-    cola: List[Pedido]
-    en_preparacion: List[Pedido]
+    _cola: deque
+    _en_cola: Dict[Union[str, int], Tuple[int, Pedido]]
+    _en_preparacion: Dict[Union[str, int], Pedido]
 
-    def __init__(self, id: Union[str, int], capacidad: int = 1) -> None:
+    def __init__(self, id: Union[str, int], capacidad: int = 1, categorias: Optional[Iterable[str]] = None) -> None:
         """Inicializar estación.
 
         Salida esperada: instancia con `capacidad` definida y colas vacías.hñetd
         """
         self.id = id
         self.capacidad = capacidad
-        self.cola = []
-        self.en_preparacion = []
+        self.categorias: Optional[frozenset] = frozenset(categorias) if categorias else None
+        self._cola = deque()
+        self._en_cola = {}
+        self._en_preparacion = {}
+        self._secuencia = 0
+        self._minutos: Dict[Union[str, int], int] = {}  # Minutos de trabajo por pedido asignado
+        self._minutos_pendientes = 0
+        self._observadores: Tuple[Callable[['EstacionCocina'], None], ...] = ()
+        self._cambios = 0  # Cambios de carga registrados (detecta si hay que avisar tras soltar el lock)
+        self._lock = threading.RLock()
+        self.metricas = MetricasRodantes()
+
+    def agregar_observador(self, observador: Callable[['EstacionCocina'], None]) -> None:
+        """Registrar un callable que recibe la estación tras cada cambio de carga."""
+        self._observadores = self._observadores + (observador,)
+
+    def _registrar_carga(self, finalizados: int = 0) -> None:
+        # Con el lock tomado: la métrica ve la carga exacta; los observadores se avisan al soltarlo
+        self.metricas.registrar(len(self._en_cola), len(self._en_preparacion), finalizados=finalizados)
+        self._cambios += 1
+
+    def _avisar(self) -> None:
+        """Avisar a los observadores de un cambio de carga, ya sin el lock de la estación."""
+        for observador in self._observadores:
+            observador(self)
+
+    def _liberar(self, pedido_id: Union[str, int], finalizado: bool = False) -> None:
+        self._minutos_pendientes -= self._minutos.pop(pedido_id, 0)
+        self._registrar_carga(1 if finalizado else 0)
+
+    def minutos_pendientes(self) -> int:
+        """Minutos de trabajo de los pedidos en cola y en preparación."""
+        return self._minutos_pendientes
+
+    def fin_estimado(self) -> float:
+        """Minutos hasta que la estación vacíe su trabajo actual (trabajo / capacidad)."""
+        return self._minutos_pendientes / self.capacidad if self.capacidad > 0 else float('inf')
+
+    def trabajo(self) -> TrabajoEstacion:
+        """Minutos de cada pedido en preparación y en cola, en una foto consistente (tomada con el lock)."""
+        with self._lock:
+            minutos = self._minutos
+            return TrabajoEstacion({pid: minutos.get(pid, 0) for pid in self._en_preparacion},
+                                   [(pid, minutos.get(pid, 0)) for pid in self._en_cola])
+
+    @property
+    def cola(self) -> List[Pedido]:
+        """Pedidos en espera, en orden FIFO."""
+        with self._lock:
+            return [pedido for _, pedido in self._en_cola.values()]
+
+    @property
+    def en_preparacion(self) -> List[Pedido]:
+        """Pedidos en preparación, en orden de inicio."""
+        with self._lock:
+            return list(self._en_preparacion.values())
+
+    def _encolar(self, pedido: Pedido) -> None:
+        self._secuencia += 1
+        entrada = (self._secuencia, pedido)
+        self._cola.append(entrada)
+        self._en_cola[pedido.id] = entrada
+
+    def _desencolar(self) -> Optional[Pedido]:
+        """Sacar el primer pedido vivo de la cola (descarta entradas borradas)."""
+        while self._cola:
+            entrada = self._cola.popleft()
+            pedido = entrada[1]
+            if self._en_cola.get(pedido.id) is entrada:
+                del self._en_cola[pedido.id]
+                return pedido
+        return None
+
+    def _compactar_cola(self) -> None:
+        # Evita que las entradas borradas crezcan sin límite (coste amortizado O(1))
+        if len(self._cola) > 2 * len(self._en_cola) + 32:
+            self._cola = deque(self._en_cola.values())
         
     def asignar_pedido(self, pedido: Pedido) -> bool:
         """Intentar asignar un pedido a la estación.
 
         Salida esperada: bool indicando si la asignación fue exitosa.
         """
-        # Intentar usar la API de Pedido para cambiar el estado a EN_COLA (si está permitido)
+        with self._lock:
+            if self.carga_actual() >= self.capacidad:
+                return False
+            # Intentar usar la API de Pedido para cambiar el estado a EN_COLA (si está permitido)
+            try:
+                pedido.update_estado('EN_COLA')
+            except Exception:
+                # si no es válida la transición, no interrumpimos; seguimos intentando encolar
+                pass
+            self._encolar(pedido)
+            minutos = pedido.minutos_preparacion()
+            self._minutos[pedido.id] = minutos
+            self._minutos_pendientes += minutos
+            self._registrar_carga()
+        self._avisar()
+        return True
+
+    def asignar_pedidos(self, pedidos: List[Pedido]) -> int:
+        """Asignar varios pedidos en orden con una sola toma del lock y un solo aviso.
+
+        Se detiene en el primero que no cabe o cuya categoría no prepara la estación.
+
+        Salida esperada: número de pedidos asignados (los primeros de la lista).
+        """
+        with self._lock:
+            asignados = 0
+            for pedido in pedidos:
+                if self.carga_actual() >= self.capacidad or not self.acepta(pedido):
+                    break
+                try:
+                    pedido.update_estado('EN_COLA')
+                except Exception:
+                    pass  # Igual que en `asignar_pedido`
+                self._encolar(pedido)
+                minutos = pedido.minutos_preparacion()
+                self._minutos[pedido.id] = minutos
+                self._minutos_pendientes += minutos
+                asignados += 1
+            if asignados:
+                self._registrar_carga()
+        if asignados:
+            self._avisar()
+        return asignados
+
+    def _iniciar(self, pedido: Pedido) -> bool:
+        """Pasar a preparación un pedido ya sacado de la cola (con el lock tomado)."""
         try:
-            pedido.update_estado('EN_COLA')
+            pedido.update_estado('EN_PREPARACION')
         except Exception:
-            # si no es válida la transición, no interrumpimos; seguimos intentando encolar
-            pass
-
-        if len(self.cola) + len(self.en_preparacion) < self.capacidad:
-            self.cola.append(pedido)
-            return True
-        return False
+            if pedido.estado == 'CANCELADO':  # Cancelado desde otro hilo: se descarta
+                self._liberar(pedido.id)
+                return False
+            pedido.estado = 'EN_PREPARACION'
+        self._en_preparacion[pedido.id] = pedido  # Agregar a en_preparacion
+        encolado = pedido.instante_estado('EN_COLA')
+        iniciado = pedido.instante_estado('EN_PREPARACION')
+        # La carga no cambia (no se avisa a observadores), pero sí cuántos se preparan
+        self.metricas.registrar(len(self._en_cola), len(self._en_preparacion), iniciados=1,
+                                espera_s=iniciado - encolado if encolado and iniciado else None)
+        return True
 
     def iniciar_preparacion(self) -> List[Pedido]:
         """Marcar pedidos que comienzan a prepararse.
@@ -59,30 +224,86 @@ class EstacionCocina:
     
         """
         pedidos_iniciados = [] # Lista para almacenar pedidos que inician preparación
-        while self.cola and len(self.en_preparacion) < self.capacidad:
-            pedido = self.cola.pop(0)  # Sacar el primer pedido de la cola
-            try:
-                pedido.update_estado('EN_PREPARACION')
-            except Exception:
-                pedido.estado = 'EN_PREPARACION'
-            self.en_preparacion.append(pedido)  # Agregar a en_preparacion
-            pedidos_iniciados.append(pedido)  # Agregar a la lista de iniciados
+        with self._lock:
+            cambios = self._cambios
+            while self._en_cola and len(self._en_preparacion) < self.capacidad:
+                pedido = self._desencolar()  # Sacar el primer pedido de la cola
+                if self._iniciar(pedido):
+                    pedidos_iniciados.append(pedido)  # Agregar a la lista de iniciados
+            liberados = self._cambios != cambios  # Cancelados que se descartaron al sacarlos
+        if liberados:
+            self._avisar()
         return pedidos_iniciados
 
+    def iniciar_pedido(self, pedido_id: Union[str, int]) -> bool:
+        """Pasar a preparación un pedido concreto de la cola, fuera del orden FIFO.
+
+        Salida esperada: True si pasó a preparación, False si no está en la
+        cola o no queda puesto libre.
+        """
+        with self._lock:
+            if pedido_id not in self._en_cola or len(self._en_preparacion) >= self.capacidad:
+                return False
+            _, pedido = self._en_cola.pop(pedido_id)
+            self._compactar_cola()
+            iniciado = self._iniciar(pedido)
+        if not iniciado:
+            self._avisar()  # Estaba cancelado: se descartó y liberó su hueco
+        return iniciado
+
     def finalizar_pedido(self, pedido_id: Union[str, int]) -> bool:
         """Marcar un pedido como `LISTO`.
 
         Salida esperada: True si se finalizó y se actualizó el estado, False si no se encontró.
         """
-        for pedido in self.en_preparacion:
-            if pedido.id == pedido_id:
-                try:
-                    pedido.update_estado('LISTO')
-                except Exception:
+        with self._lock:
+            pedido = self._en_preparacion.pop(pedido_id, None)  # Búsqueda y borrado O(1) por id
+            if pedido is None:
+                return False
+            finalizado = True
+            try:
+                pedido.update_estado('LISTO')
+            except Exception:
+                if pedido.estado == 'CANCELADO':  # Cancelado desde otro hilo: no se marca LISTO
+                    finalizado = False
+                else:
                     pedido.estado = 'LISTO'
-                self.en_preparacion.remove(pedido)  # Eliminar de en_preparacion
-                return True
-        return False
+            self._liberar(pedido_id, finalizado=finalizado)
+        self._avisar()
+        return finalizado
+
+    def remover_pedido(self, pedido_id: Union[str, int]) -> bool:
+        """Quitar un pedido de la estación (en cola o en preparación) sin cambiar su estado.
+
+        Salida esperada: True si estaba en la estación, False en caso contrario.
+        """
+        with self._lock:
+            if self._en_cola.pop(pedido_id, None) is not None:
+                self._compactar_cola()
+            elif self._en_preparacion.pop(pedido_id, None) is None:
+                return False
+            self._liberar(pedido_id)
+        self._avisar()
+        return True
+
+    def restaurar(self, cola: List[Pedido], en_preparacion: List[Pedido]) -> None:
+        """Cargar pedidos recuperados tras un reinicio, sin cambiar su estado.
+
+        `cola` se añade al final de la cola en el orden dado y `en_preparacion`
+        a los pedidos en preparación. No se comprueba la capacidad: se
+        restaura la carga tal como estaba.
+        """
+        with self._lock:
+            for pedido in cola:
+                self._encolar(pedido)
+            for pedido in en_preparacion:
+                self._en_preparacion[pedido.id] = pedido
+            for pedido in (*cola, *en_preparacion):
+                minutos = pedido.minutos_preparacion()
+                self._minutos[pedido.id] = minutos
+                self._minutos_pendientes += minutos
+            self._registrar_carga()
+        self._avisar()
 
     def carga_actual(self) -> int:
         """Devolver la carga actual (en preparación + en cola).
@@ -90,7 +311,7 @@ class EstacionCocina:
         Salida esperada: int >= 0 representando número de pedidos gestionados por la estación.
         
         """
-        Total_de_Pedidos = len(self.cola) + len(self.en_preparacion)
+        Total_de_Pedidos = len(self._en_cola) + len(self._en_preparacion)
         return Total_de_Pedidos
     
     #Fucion agregada para validacion de capacidad
@@ -99,4 +320,8 @@ class EstacionCocina:
 
         Salida esperada: True si hay capacidad para aceptar el pedido, False en caso contrario.
         """
-        return (len(self.cola) + len(self.en_preparacion)) < self.capacidad
\ No newline at end of file
+        return self.carga_actual() < self.capacidad and self.acepta(pedido)
+
+    def acepta(self, pedido: Pedido) -> bool:
+        """Verificar si la estación prepara todas las categorías del pedido (sin mirar la capacidad)."""
+        return self.categorias is None or pedido.categorias() <= self.categorias
\ No newline at end of file
@@ -0,0 +1,217 @@
+"""Módulo `src.models.eventos`.
+
+Bus de eventos de transición de estado de los pedidos. `Pedido.update_estado`
+publica un `EventoTransicion` en `BUS_EVENTOS` y los sinks suscritos deciden
+qué hacer con él. Sin sinks, publicar no cuesta nada más que una comprobación.
+
+Sinks incluidos:
+- `SinkNulo`: descarta los eventos.
+- `SinkLogging`: registra cada transición con `logging`.
+- `SinkMetricas`: contadores e histogramas de latencia por transición
+  (PENDIENTE->EN_COLA, EN_COLA->EN_PREPARACION, ...), exportables con
+  `snapshot()`.
+
+Ejemplo de uso:
+
+from src.models.eventos import BUS_EVENTOS, SinkMetricas
+
+metricas = SinkMetricas()
+BUS_EVENTOS.suscribir(metricas)
+...
+metricas.snapshot()['transiciones']['EN_COLA->EN_PREPARACION']['p95_s']
+"""
+from __future__ import annotations
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple, Union, Any
+from bisect import bisect_left
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Límites superiores (segundos) de los cubos del histograma: 1 µs, 2 µs, 4 µs ... ~9,5 h
+LIMITES_HISTOGRAMA: Tuple[float, ...] = tuple(1e-6 * 2 ** k for k in range(36))
+
+
+class EventoTransicion(NamedTuple):
+    """Cambio de estado de un pedido.
+
+    - ts / ts_anterior: instantes (epoch) en que se alcanzaron `nuevo` y
+      `anterior` (los de `Pedido._timestamps_estado`); ts_anterior puede ser
+      None si el estado anterior se asignó sin `update_estado`.
+    """
+    pedido_id: Union[str, int]
+    anterior: str
+    nuevo: str
+    ts: float
+    ts_anterior: Optional[float]
+
+    @property
+    def transicion(self) -> str:
+        return f"{self.anterior}->{self.nuevo}"
+
+    @property
+    def latencia_s(self) -> Optional[float]:
+        """Segundos pasados en el estado anterior (None si no se conoce)."""
+        return None if self.ts_anterior is None else self.ts - self.ts_anterior
+
+
+class SinkEventos:
+    """Interfaz de un destino de eventos."""
+
+    def publicar(self, evento: EventoTransicion) -> None:
+        raise NotImplementedError()
+
+
+class SinkNulo(SinkEventos):
+    """Sink que descarta los eventos."""
+
+    def publicar(self, evento: EventoTransicion) -> None:
+        return None
+
+
+class SinkLogging(SinkEventos):
+    """Registra cada transición con `logging` (por defecto en el logger de este módulo, nivel INFO)."""
+
+    def __init__(self, registrador: Optional[logging.Logger] = None, nivel: int = logging.INFO) -> None:
+        self.registrador = registrador or logger
+        self.nivel = nivel
+
+    def publicar(self, evento: EventoTransicion) -> None:
+        if self.registrador.isEnabledFor(self.nivel):
+            self.registrador.log(self.nivel, "Pedido %s: %s -> %s (%.3f s en %s)", evento.pedido_id,
+                                 evento.anterior, evento.nuevo, evento.latencia_s or 0.0, evento.anterior)
+
+
+class _Histograma:
+    """Histograma de cubos fijos (potencias de 2) con conteo, suma, mínimo y máximo."""
+
+    __slots__ = ('cubos', 'conteo', 'suma', 'minimo', 'maximo')
+
+    def __init__(self) -> None:
+        self.cubos = [0] * (len(LIMITES_HISTOGRAMA) + 1)  # El último recoge lo que supera el mayor límite
+        self.conteo = 0
+        self.suma = 0.0
+        self.minimo = float('inf')
+        self.maximo = 0.0
+
+    def registrar(self, valor: float) -> None:
+        self.cubos[bisect_left(LIMITES_HISTOGRAMA, valor)] += 1
+        self.conteo += 1
+        self.suma += valor
+        if valor < self.minimo:
+            self.minimo = valor
+        if valor > self.maximo:
+            self.maximo = valor
+
+    def percentil(self, p: float) -> float:
+        """Estimación del percentil p: límite superior del cubo que lo contiene (acotado por el máximo)."""
+        return percentil_cubos(self.cubos, self.conteo, self.maximo, p)
+
+
+def percentil_cubos(cubos: Sequence[int], conteo: int, maximo: float, p: float) -> float:
+    """Percentil p de unos cubos sobre `LIMITES_HISTOGRAMA`: límite superior del cubo que lo contiene.
+
+    Salida esperada: float acotado por `maximo`; 0.0 si no hay valores.
+    """
+    if not conteo:
+        return 0.0
+    objetivo = max(1, -(-conteo * p // 100))
+    acumulado = 0
+    for i, n in enumerate(cubos):
+        acumulado += n
+        if acumulado >= objetivo:
+            return min(LIMITES_HISTOGRAMA[i], maximo) if i < len(LIMITES_HISTOGRAMA) else maximo
+    return maximo
+
+
+class SinkMetricas(SinkEventos):
+    """Contadores e histogramas de latencia por transición, en memoria fija.
+
+    La latencia de una transición anterior->nuevo es el tiempo que el pedido
+    pasó en `anterior` (diferencia de los instantes de `_timestamps_estado`).
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._conteos: Dict[str, int] = {}
+        self._histogramas: Dict[str, _Histograma] = {}
+
+    def publicar(self, evento: EventoTransicion) -> None:
+        clave = evento.transicion
+        latencia = evento.latencia_s
+        with self._lock:
+            self._conteos[clave] = self._conteos.get(clave, 0) + 1
+            if latencia is not None:
+                histograma = self._histogramas.get(clave)
+                if histograma is None:
+                    histograma = self._histogramas[clave] = _Histograma()
+                histograma.registrar(max(0.0, latencia))
+
+    def snapshot(self, con_cubos: bool = False) -> Dict[str, Any]:
+        """Exportar las métricas como dict serializable a JSON.
+
+        Salida esperada: {'total': n, 'transiciones': {'A->B': {'conteo',
+        'latencia_media_s', 'min_s', 'max_s', 'p50_s', 'p95_s', 'p99_s'
+        [, 'cubos': [[límite_s, n], ...]]}}}. Los percentiles son estimaciones
+        por cubo (error máximo: un factor 2).
+        """
+        with self._lock:
+            transiciones: Dict[str, Dict[str, Any]] = {}
+            for clave, conteo in self._conteos.items():
+                datos: Dict[str, Any] = {'conteo': conteo}
+                h = self._histogramas.get(clave)
+                if h is not None:
+                    datos.update({'latencia_media_s': h.suma / h.conteo, 'min_s': h.minimo, 'max_s': h.maximo,
+                                  'p50_s': h.percentil(50), 'p95_s': h.percentil(95), 'p99_s': h.percentil(99)})
+                    if con_cubos:
+                        limites: List[Any] = list(LIMITES_HISTOGRAMA) + ['inf']
+                        datos['cubos'] = [[limites[i], n] for i, n in enumerate(h.cubos) if n]
+                transiciones[clave] = datos
+            return {'total': sum(self._conteos.values()), 'transiciones': transiciones}
+
+    def reiniciar(self) -> None:
+        """Poner a cero contadores e histogramas."""
+        with self._lock:
+            self._conteos.clear()
+            self._histogramas.clear()
+
+
+class BusEventos:
+    """Reparte eventos entre los sinks suscritos.
+
+    Un sink que lanza una excepción no interrumpe la transición: el error se
+    registra con `logging` y el resto de sinks recibe el evento.
+    """
+
+    def __init__(self) -> None:
+        self._sinks: Tuple[SinkEventos, ...] = ()
+        self._lock = threading.Lock()
+
+    @property
+    def activo(self) -> bool:
+        """True si hay algún sink suscrito (permite saltarse la creación del evento)."""
+        return bool(self._sinks)
+
+    def suscribir(self, sink: SinkEventos) -> None:
+        with self._lock:
+            if sink not in self._sinks:
+                self._sinks = self._sinks + (sink,)
+
+    def desuscribir(self, sink: SinkEventos) -> bool:
+        """Quitar un sink; False si no estaba suscrito."""
+        with self._lock:
+            if sink not in self._sinks:
+                return False
+            self._sinks = tuple(s for s in self._sinks if s is not sink)
+            return True
+
+    def publicar(self, evento: EventoTransicion) -> None:
+        for sink in self._sinks:  # Tupla inmutable: se puede recorrer sin lock
+            try:
+                sink.publicar(evento)
+            except Exception:
+                logger.exception("Sink %r falló al publicar %s", sink, evento.transicion)
+
+
+# Bus global que usan los pedidos (sin sinks: no-op)
+BUS_EVENTOS = BusEventos()
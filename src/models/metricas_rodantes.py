@@ -0,0 +1,235 @@
+"""Módulo `src.models.metricas_rodantes`.
+
+Series temporales en anillo para vigilar la carga en vivo. `MetricasRodantes`
+guarda las últimas `ventanas` franjas de `intervalo_s` segundos (por defecto
+60 franjas de 1 minuto) en listas de tamaño fijo: la memoria no crece con el
+tiempo que lleve el proceso en marcha. Cada franja acumula:
+
+- pedidos iniciados y finalizados,
+- profundidad de cola (media ponderada por tiempo y máxima),
+- puestos ocupados (media ponderada por tiempo; con la capacidad da la
+  utilización),
+- histograma de esperas (mismos cubos que `SinkMetricas`) para el p95 rodante.
+
+Cada `EstacionCocina` tiene su instancia (`estacion.metricas`) y
+`GestorPedidos` la suya para el conjunto de la cocina (ver
+`GestorPedidos.metricas_rodantes`).
+
+Ejemplo de uso:
+
+from src.models.metricas_rodantes import MetricasRodantes
+
+metricas = MetricasRodantes(ventanas=60, intervalo_s=60)
+metricas.registrar(profundidad=3, ocupados=2)                            # Cambio de carga
+metricas.registrar(profundidad=2, ocupados=3, iniciados=1, espera_s=42.0)  # Empieza uno
+metricas.registrar(profundidad=2, ocupados=2, finalizados=1)              # Termina uno
+metricas.snapshot(capacidad=4)['espera_p95_s']
+"""
+from __future__ import annotations
+from typing import Any, Callable, Dict, List, Optional
+from bisect import bisect_left
+import threading
+import time
+
+from .eventos import LIMITES_HISTOGRAMA, percentil_cubos
+
+_NUM_CUBOS = len(LIMITES_HISTOGRAMA) + 1  # El último recoge lo que supera el mayor límite
+
+
+class MetricasRodantes:
+    """Ventana deslizante de `ventanas` franjas de `intervalo_s` segundos en memoria fija.
+
+    Cada franja del anillo recuerda a qué intervalo (int(t // intervalo_s))
+    pertenece; al llegar un intervalo nuevo se reutiliza la franja más
+    antigua. Las magnitudes instantáneas (profundidad y ocupados) se integran
+    en el tiempo entre cambios, así las medias no dependen de cuántas veces
+    se registren.
+
+    - reloj: función que devuelve el instante actual en segundos (por defecto
+      `time.time`, la misma base que los instantes de estado de `Pedido`).
+
+    Raises (en `__init__`):
+        ValueError: si ventanas < 1 o intervalo_s <= 0.
+    """
+
+    def __init__(self, ventanas: int = 60, intervalo_s: float = 60.0,
+                 reloj: Callable[[], float] = time.time) -> None:
+        if ventanas < 1 or intervalo_s <= 0:
+            raise ValueError("ventanas debe ser >= 1 e intervalo_s > 0")
+        self.ventanas = ventanas
+        self.intervalo_s = float(intervalo_s)
+        self._reloj = reloj
+        self._lock = threading.Lock()
+        # Una posición por franja
+        self._periodo = [-1] * ventanas  # Intervalo que ocupa cada franja (-1: libre)
+        self._iniciados = [0] * ventanas
+        self._finalizados = [0] * ventanas
+        self._profundidad_max = [0] * ventanas
+        self._area_profundidad = [0.0] * ventanas  # Integral de la profundidad (pedidos * s)
+        self._area_ocupados = [0.0] * ventanas
+        self._esperas = [[0] * _NUM_CUBOS for _ in range(ventanas)]
+        self._espera_max = [0.0] * ventanas
+        self._cubos_ventana = [0] * _NUM_CUBOS  # Suma de los histogramas del anillo
+        self._profundidad = 0
+        self._ocupados = 0
+        self._creado = self._t = reloj()
+        self._periodo_t = int(self._t // self.intervalo_s)  # Intervalo y franja del último registro
+        self._fin_t = (self._periodo_t + 1) * self.intervalo_s
+        self._k_t = self._franja(self._periodo_t)
+
+    def _franja(self, periodo: int) -> int:
+        """Índice de la franja del `periodo`, vaciándola si guardaba uno anterior; -1 si ya salió del anillo."""
+        k = periodo % self.ventanas
+        actual = self._periodo[k]
+        if actual != periodo:
+            if actual > periodo:
+                return -1  # Reloj hacia atrás: el intervalo ya no está en la ventana
+            self._periodo[k] = periodo
+            self._iniciados[k] = self._finalizados[k] = self._profundidad_max[k] = 0
+            self._area_profundidad[k] = self._area_ocupados[k] = self._espera_max[k] = 0.0
+            esperas = self._esperas[k]
+            if actual >= 0:
+                ventana = self._cubos_ventana
+                for i, n in enumerate(esperas):
+                    if n:
+                        ventana[i] -= n
+                esperas[:] = [0] * _NUM_CUBOS
+        return k
+
+    def _integrar(self, ahora: float) -> int:
+        """Acumular profundidad y ocupados desde el último registro hasta `ahora`; devuelve la franja actual."""
+        t = self._t
+        intervalo = self.intervalo_s
+        periodo_fin = int(ahora // intervalo)
+        if ahora > t:
+            periodo = self._periodo_t
+            if periodo_fin - periodo >= self.ventanas:  # Solo cuentan las franjas que siguen en el anillo
+                periodo = periodo_fin - self.ventanas + 1
+                t = periodo * intervalo
+            while True:
+                fin = ahora if periodo == periodo_fin else (periodo + 1) * intervalo
+                k = self._franja(periodo)
+                if k >= 0:
+                    self._area_profundidad[k] += self._profundidad * (fin - t)
+                    self._area_ocupados[k] += self._ocupados * (fin - t)
+                    if self._profundidad > self._profundidad_max[k]:
+                        self._profundidad_max[k] = self._profundidad
+                if periodo == periodo_fin:
+                    break
+                periodo += 1
+                t = fin
+            self._t = ahora
+            self._periodo_t = periodo_fin
+            self._fin_t = (periodo_fin + 1) * intervalo
+            self._k_t = k
+            return k
+        return self._franja(periodo_fin)
+
+    def registrar(self, profundidad: int, ocupados: int, iniciados: int = 0, finalizados: int = 0,
+                  espera_s: Optional[float] = None) -> None:
+        """Anotar la carga actual (profundidad de cola y puestos ocupados desde ahora) y, opcionalmente,
+        pedidos iniciados (con su espera en segundos, si se conoce) o finalizados.
+
+        Una sola llamada por cambio: es el camino caliente de estaciones y gestor.
+        """
+        with self._lock:
+            ahora = self._reloj()
+            t = self._t
+            if t <= ahora < self._fin_t:  # Mismo intervalo que el último registro
+                k = self._k_t
+                dt = ahora - t
+                self._area_profundidad[k] += self._profundidad * dt
+                self._area_ocupados[k] += self._ocupados * dt
+                self._t = ahora
+            else:
+                k = self._integrar(ahora)
+            self._profundidad = profundidad
+            self._ocupados = ocupados
+            if k < 0:
+                return
+            if profundidad > self._profundidad_max[k]:
+                self._profundidad_max[k] = profundidad
+            if finalizados:
+                self._finalizados[k] += finalizados
+            if iniciados:
+                self._iniciados[k] += iniciados
+                if espera_s is not None:
+                    if espera_s < 0:
+                        espera_s = 0.0
+                    cubo = bisect_left(LIMITES_HISTOGRAMA, espera_s)
+                    self._esperas[k][cubo] += 1
+                    self._cubos_ventana[cubo] += 1
+                    if espera_s > self._espera_max[k]:
+                        self._espera_max[k] = espera_s
+
+    def snapshot(self, capacidad: Optional[int] = None, serie: bool = False) -> Dict[str, Any]:
+        """Resumen de la ventana como dict serializable a JSON.
+
+        Salida esperada: {'ventana_s', 'iniciados', 'finalizados',
+        'iniciados_min', 'finalizados_min' (por minuto), 'profundidad'
+        (actual), 'profundidad_media', 'profundidad_max', 'ocupados' (actual),
+        'utilizacion' (ocupados medios / capacidad; None sin capacidad),
+        'esperas', 'espera_p50_s', 'espera_p95_s', 'espera_max_s'
+        [, 'serie': una entrada por franja, de la más antigua a la actual]}.
+        Los percentiles son estimaciones por cubo (error máximo: un factor 2).
+        Coste: O(ventanas) (con `serie`, O(ventanas x cubos)), independiente
+        del número de pedidos: el histograma de la ventana se mantiene al día.
+        """
+        with self._lock:
+            ahora = self._reloj()
+            self._integrar(ahora)
+            intervalo = self.intervalo_s
+            periodo_fin = int(ahora // intervalo)
+            cubos = self._cubos_ventana  # `_integrar` ya vació las franjas que salieron de la ventana
+            totales = {'iniciados': 0, 'finalizados': 0, 'profundidad_max': 0}
+            area_profundidad = area_ocupados = duracion_total = espera_max = 0.0
+            franjas: List[Dict[str, Any]] = []
+            for periodo in range(periodo_fin - self.ventanas + 1, periodo_fin + 1):
+                inicio = max(periodo * intervalo, self._creado)
+                duracion = min((periodo + 1) * intervalo, ahora) - inicio
+                if duracion <= 0:
+                    continue  # Antes de crear las métricas
+                duracion_total += duracion
+                k = periodo % self.ventanas
+                if self._periodo[k] != periodo:  # Solo si el reloj retrocedió: la franja ya se reutilizó
+                    datos = (0, 0, 0, 0.0, 0.0, None)
+                else:
+                    esperas = self._esperas[k]
+                    espera_max = max(espera_max, self._espera_max[k])
+                    datos = (self._iniciados[k], self._finalizados[k], self._profundidad_max[k],
+                             self._area_profundidad[k], self._area_ocupados[k], esperas)
+                iniciados, finalizados, profundidad_max, area_p, area_o, esperas = datos
+                totales['iniciados'] += iniciados
+                totales['finalizados'] += finalizados
+                totales['profundidad_max'] = max(totales['profundidad_max'], profundidad_max)
+                area_profundidad += area_p
+                area_ocupados += area_o
+                if serie:
+                    n_esperas = sum(esperas) if esperas else 0
+                    franjas.append({
+                        'inicio': periodo * intervalo, 'iniciados': iniciados, 'finalizados': finalizados,
+                        'profundidad_media': area_p / duracion, 'profundidad_max': profundidad_max,
+                        'utilizacion': area_o / duracion / capacidad if capacidad else None,
+                        'espera_p95_s': percentil_cubos(esperas, n_esperas, self._espera_max[k], 95)
+                        if n_esperas else 0.0,
+                    })
+            minutos = max(duracion_total, intervalo) / 60  # Sin disparar la tasa en los primeros segundos
+            n_esperas = sum(cubos)
+            resultado: Dict[str, Any] = {
+                'ventana_s': duracion_total,
+                **totales,
+                'iniciados_min': totales['iniciados'] / minutos,
+                'finalizados_min': totales['finalizados'] / minutos,
+                'profundidad': self._profundidad,
+                'profundidad_media': area_profundidad / duracion_total if duracion_total > 0 else 0.0,
+                'ocupados': self._ocupados,
+                'utilizacion': (area_ocupados / duracion_total / capacidad
+                                if capacidad and duracion_total > 0 else None),
+                'esperas': n_esperas,
+                'espera_p50_s': percentil_cubos(cubos, n_esperas, espera_max, 50),
+                'espera_p95_s': percentil_cubos(cubos, n_esperas, espera_max, 95),
+                'espera_max_s': espera_max,
+            }
+            if serie:
+                resultado['serie'] = franjas
+            return resultado
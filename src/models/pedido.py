@@ -1,8 +1,8 @@
-"""Modulo `src.models.pedido`.
+"""Módulo `src.models.pedido`.
 
-Este archivo define la interfaz de la entidad `Pedido`. Cada método incluye
-una descripción clara de lo que debe hacer, qué debe devolver y un ejemplo de
-uso. Este archivo es un esqueleto: los métodos lanzan `NotImplementedError`.
+Define la entidad `Pedido` (y `SubPedido`, la parte de un pedido repartido
+entre estaciones): validación de ítems, transiciones de estado con sus
+instantes, totales mantenidos y serialización con `as_dict`/`from_dict`.
 
 Concepto general:
 - Un `Pedido` encapsula datos y reglas triviales sobre un pedido de cocina.
@@ -22,23 +22,96 @@ data = pedido.as_dict()
 """
 
 from __future__ import annotations
-from typing import List, Dict, Optional, Union
+from typing import List, Dict, Optional, Union, Callable, Tuple
 from datetime import datetime
+from array import array
+import threading
+import time
+
+from .catalogo import CATALOGO, CODIGO_LOCAL, EntradaCatalogo, categoria_producto
+from .eventos import BUS_EVENTOS, EventoTransicion
+from .validacion_items import VALIDADOR_ITEMS, _indice_libre
+
+# Firma de los observadores de cambio de estado: (pedido, estado_anterior, estado_nuevo)
+ObservadorEstado = Callable[['Pedido', str, str], None]
+
+_ESTADOS = ['PENDIENTE', 'EN_COLA', 'EN_PREPARACION', 'LISTO', 'ENTREGADO', 'CANCELADO']
+# Un slot fijo por estado con el instante (epoch, float) en que se alcanzó, o None
+_SLOT_TS = {estado: '_ts_' + estado.lower() for estado in _ESTADOS}
+
+# Locks repartidos por hash del id: serializan las transiciones de un mismo
+# pedido sin pagar un lock por instancia
+_LOCKS_PEDIDO = [threading.RLock() for _ in range(64)]
+
+
+def _lock_de(pedido_id: Union[str, int]) -> threading.RLock:
+    return _LOCKS_PEDIDO[hash(pedido_id) % len(_LOCKS_PEDIDO)]
+
+
+# Caché acotado de `as_dict`: id(pedido) -> (pedido, versión, dict). Guardarlo
+# fuera del pedido evita que cada pedido serializado retenga su dict
+# (~1 KB) de por vida; al llenarse se vacía entero
+TAM_CACHE_AS_DICT = 8192
+_CACHE_AS_DICT: Dict[int, Tuple['Pedido', int, Dict]] = {}
+
+
+def _copiar_as_dict(data: Dict) -> Dict:
+    """Copia de un dict de `as_dict` que no comparte nada mutable con el caché."""
+    copia = dict(data)
+    copia['items'] = [dict(it) for it in data['items']]
+    if data['cliente_info'] is not None:
+        copia['cliente_info'] = dict(data['cliente_info'])
+    return copia
+
+
+def _resolver_confiable(name: str, prep: int, price: float, producto_id: Optional[str]) -> Union[int, EntradaCatalogo]:
+    """Código del catálogo si su entrada tiene exactamente estos valores; si no, la entrada para `_libres`.
+
+    Así un registro antiguo con otro precio conserva su precio (y su id y
+    categoría) en lugar de mostrar el del catálogo actual.
+    """
+    if producto_id is not None:
+        codigo = CATALOGO.codigo_de_producto(producto_id)
+    else:
+        codigo = CATALOGO.codigo_de_valores(name, prep, price)
+    if codigo is not None and CATALOGO.obtener(codigo)[1:] == (name, prep, price):
+        return codigo
+    return (producto_id, name, prep, price)
+
 
 class Pedido:
     """Representa un pedido.
 
     Atributos:
     - id: Identificador único del pedido (str|int)
-    - items: Lista de diccionarios con keys: name, qty, prep_time_min (opcional)
+    - items: Lista de diccionarios con keys: name, qty, prep_time_min (opcional),
+      o bien id de catálogo y qty (ver `src.models.validacion_items`)
     - estado: Estado actual (PENDIENTE, EN_PREPARACION, LISTO, ENTREGADO, CANCELADO)
     - tiempo_estimado_min: Estimación en minutos (int o None)
     - timestamp_creado: datetime de creación
     - estacion_id: id de estación asignada o None
+
+    Representación compacta: la clase usa `__slots__` (sin `__dict__`), las
+    líneas se guardan en un `array('I')` empaquetado con pares (código de
+    `CATALOGO`, qty) y los instantes de cada estado en slots fijos. `items` y
+    `_timestamps_estado` son vistas construidas bajo demanda. Los productos
+    que no están en el catálogo los guarda el propio pedido en `_libres`
+    (None si no hay), con código `CODIGO_LOCAL` + posición: viven lo que vive
+    el pedido y no hacen crecer el catálogo.
+
+    Totales mantenidos: precio, minutos de preparación y unidades se
+    actualizan en `items`, `add_item` y `remove_item`, así que
+    `total_price()`, `minutos_preparacion()` y `num_items()` son O(1).
+    Cada cambio visible en `as_dict()` incrementa `_version`, que invalida el
+    resultado cacheado de `as_dict()`.
     """
 
-    
-    ESTADOS_VALIDOS = ['PENDIENTE', 'EN_COLA', 'EN_PREPARACION', 'LISTO', 'ENTREGADO', 'CANCELADO']
+    __slots__ = ('id', '_cliente_info', '_tiempo_estimado_min', '_estacion_id',
+                 '_estado', '_observadores', '_lineas', '_total', '_minutos', '_unidades',
+                 '_version', '_libres') + tuple(_SLOT_TS.values())
+
+    ESTADOS_VALIDOS = _ESTADOS
+    PUBLICAR_EVENTOS = True  # Las partes de un pedido (`SubPedido`) no publican en el bus
     TRANSICIONES_VALIDAS = {
         'PENDIENTE': ['EN_COLA', 'EN_PREPARACION', 'CANCELADO'],
         'EN_COLA': ['EN_PREPARACION', 'CANCELADO'],
@@ -61,30 +134,152 @@ class Pedido:
         Ejemplo:
         >>> Pedido('PED-1', [{'name':'Taco','qty':2}])
 
-        Returns: None (construye el objeto). Si items no es válido, lanzar ValueError.
+        Returns: None (construye el objeto). Si items o cliente_info no son válidos, lanzar ValueError.
         """
-        if not isinstance(items, list):
-            raise ValueError("Items debe ser una lista")
+        if cliente_info is not None and not isinstance(cliente_info, dict):
+            raise ValueError("cliente_info debe ser un dict")
         self.id = id
-        norm_items: List[Dict] = []
-        for it in items:
-            if not isinstance(it, dict) or 'name' not in it or 'qty' not in it:
-                raise ValueError("Cada item debe ser dict con 'name' y 'qty'")
-            name = it['name']
-            qty = it['qty']
-            if not isinstance(name, str) or not isinstance(qty, int) or qty <= 0:
-                raise ValueError("Item inválido: 'name' str y 'qty' int>0")
-            prep = int(it.get('prep_time_min', 5))
-            price = round(float(it.get('price', 0.0)), 2)
-            norm_items.append({'name': name, 'qty': qty, 'prep_time_min': prep, 'price': price})
-        self.items = norm_items
-        self.cliente_info = dict(cliente_info) if cliente_info else None
+        self._version = 0
+        self.items = items  # Valida y empaqueta las líneas (ver setter)
+        self._cliente_info = dict(cliente_info) if cliente_info else None
+        self._observadores: Tuple[ObservadorEstado, ...] = ()  # Tupla vacía compartida: sin coste por pedido
         self.estado = 'PENDIENTE'
-        self.tiempo_estimado_min = None
-        self.timestamp_creado = datetime.now()
-        self.estacion_id = None
-        self._timestamps_estado: Dict[str, datetime] = {'PENDIENTE': self.timestamp_creado} # Para registrar los timestamps de cada estado
+        self._tiempo_estimado_min = None
+        self._estacion_id = None
+        for slot in _SLOT_TS.values():
+            setattr(self, slot, None)
+        self._ts_pendiente = time.time()
+
+    def _entrada(self, codigo: int) -> EntradaCatalogo:
+        """Entrada (producto_id, name, prep_time_min, price) de un código: del catálogo o de `_libres`."""
+        if codigo < CODIGO_LOCAL:
+            return CATALOGO.obtener(codigo)
+        return self._libres[codigo - CODIGO_LOCAL]
+
+    def _obtenedor(self) -> Callable[[int], EntradaCatalogo]:
+        # Sin productos propios basta el catálogo (el caso habitual, sin la indirección de `_entrada`)
+        return CATALOGO.obtener if self._libres is None else self._entrada
+
+    @property
+    def items(self) -> List[Dict]:
+        """Vista de las líneas como lista de dicts {id (si el producto tiene), name, qty, prep_time_min, price}."""
+        lineas = self._lineas
+        obtener = self._obtenedor()
+        items = []
+        for i in range(0, len(lineas), 2):
+            producto_id, name, prep, price = obtener(lineas[i])
+            item = {'name': name, 'qty': lineas[i + 1], 'prep_time_min': prep, 'price': price}
+            if producto_id is not None:
+                item = {'id': producto_id, **item}
+            items.append(item)
+        return items
+
+    @items.setter
+    def items(self, items: List[Dict]) -> None:
+        self._lineas, self._libres = VALIDADOR_ITEMS.codificar_items(items)
+        self._recalcular_totales()
+
+    def _recalcular_totales(self) -> None:
+        lineas = self._lineas
+        obtener = self._obtenedor()
+        total = 0.0
+        minutos = 0
+        for i in range(0, len(lineas), 2):
+            _, _, prep, price = obtener(lineas[i])
+            total += lineas[i + 1] * price
+            minutos += lineas[i + 1] * prep
+        self._total = total
+        self._minutos = minutos
+        self._unidades = sum(lineas[1::2])
+        self._version += 1
+
+    def _sumar_linea(self, codigo: int, qty: int) -> None:
+        """Ajustar los totales por `qty` unidades (negativo para restar) del producto `codigo`."""
+        _, _, prep, price = self._entrada(codigo)
+        self._total += qty * price
+        self._minutos += qty * prep
+        self._unidades += qty
+        self._version += 1
+
+    @property
+    def cliente_info(self) -> Optional[Dict]:
+        """Copia de los datos del cliente (o None).
+
+        Se fijan al crear el pedido y son de solo lectura: `GestorPedidos`
+        indexa el teléfono al registrar el pedido y no vería un cambio
+        posterior. Modificar el dict devuelto no afecta al pedido.
+        """
+        return dict(self._cliente_info) if self._cliente_info is not None else None
+
+    @property
+    def tiempo_estimado_min(self) -> Optional[int]:
+        return self._tiempo_estimado_min
+
+    @tiempo_estimado_min.setter
+    def tiempo_estimado_min(self, valor: Optional[int]) -> None:
+        self._tiempo_estimado_min = valor
+        self._version += 1
+
+    @property
+    def estacion_id(self) -> Optional[Union[str, int]]:
+        return self._estacion_id
+
+    @estacion_id.setter
+    def estacion_id(self, valor: Optional[Union[str, int]]) -> None:
+        self._estacion_id = valor
+        self._version += 1
+
+    @property
+    def timestamp_creado(self) -> datetime:
+        """datetime de creación (instante en que el pedido quedó PENDIENTE)."""
+        return datetime.fromtimestamp(self._ts_pendiente)
+
+    @timestamp_creado.setter
+    def timestamp_creado(self, valor: datetime) -> None:
+        self._ts_pendiente = valor.timestamp()
+        self._version += 1
+
+    @property
+    def _timestamps_estado(self) -> Dict[str, datetime]:
+        """Vista {estado: datetime} de los estados alcanzados, en orden cronológico."""
+        alcanzados = [(getattr(self, slot), estado) for estado, slot in _SLOT_TS.items()
+                      if getattr(self, slot) is not None]
+        alcanzados.sort()
+        return {estado: datetime.fromtimestamp(ts) for ts, estado in alcanzados}
+
+
+    def instante_estado(self, estado: str) -> Optional[float]:
+        """Instante (epoch) en que el pedido alcanzó `estado`, o None si no pasó por él. O(1)."""
+        return getattr(self, _SLOT_TS[estado])
+
+    @property
+    def estado(self) -> str:
+        """Estado actual del pedido."""
+        return self._estado
+
+    @estado.setter
+    def estado(self, nuevo_estado: str) -> None:
+        # Cualquier asignación (incluidas las directas desde estaciones) avisa a los observadores
+        anterior = getattr(self, '_estado', None)
+        self._estado = nuevo_estado
+        self._version += 1
+        if anterior is not None and anterior != nuevo_estado:
+            for observador in self._observadores:
+                observador(self, anterior, nuevo_estado)
+
+    def lock_estado(self) -> threading.RLock:
+        """Lock (repartido por id) que serializa los cambios de estado de este pedido.
+
+        Permite a los servicios comprobar y cambiar el estado de forma atómica.
+        """
+        return _lock_de(self.id)
 
+    def agregar_observador(self, observador: ObservadorEstado) -> None:
+        """Registrar un callable que se invoca tras cada cambio de estado.
+
+        Salida esperada: None. El observador recibe (pedido, anterior, nuevo).
+        """
+        self._observadores = self._observadores + (observador,)
 
     def update_estado(self, nuevo_estado: str) -> None:
         # Del parámetro base, surge la necesidad de implementar estados de venta (Valida si el estado es real)
@@ -95,6 +290,7 @@ class Pedido:
           (y CANCELADO desde PENDIENTE o EN_PREPARACION).
         - Actualizar estado y devolver None.
         - Registrar (internamente) timestamp opcional de cambio (no obligatorio).
+        - Publicar un `EventoTransicion` en `BUS_EVENTOS` (ver `src.models.eventos`).
 
         Ejemplo:
         >>> pedido.update_estado('EN_PREPARACION')
@@ -105,22 +301,25 @@ class Pedido:
         if nuevo_estado not in self.ESTADOS_VALIDOS:
             raise ValueError(f"Estado inválido: {nuevo_estado}. Debe ser uno de: {', '.join(self.ESTADOS_VALIDOS)}")
 
-        if self.estado not in self.TRANSICIONES_VALIDAS or nuevo_estado not in self.TRANSICIONES_VALIDAS[self.estado]:
-            raise ValueError(f"Transición inválida: No se puede pasar de {self.estado} a {nuevo_estado}")
+        with self.lock_estado():  # Comprobar y cambiar el estado de forma atómica
+            if self.estado not in self.TRANSICIONES_VALIDAS or nuevo_estado not in self.TRANSICIONES_VALIDAS[self.estado]:
+                raise ValueError(f"Transición inválida: No se puede pasar de {self.estado} a {nuevo_estado}")
 
-        self.estado = nuevo_estado
-        if not hasattr(self, '_timestamps_estado'): # Verificación extra de robustez
-            self._timestamps_estado = {}
-        self._timestamps_estado[nuevo_estado] = datetime.now()
-        
-        print(f"Estado actualizado a {self.estado} en {self._timestamps_estado[nuevo_estado]}")
+            anterior = self._estado
+            ts = time.time()
+            setattr(self, _SLOT_TS[nuevo_estado], ts)
+            self.estado = nuevo_estado
+
+        if BUS_EVENTOS.activo and self.PUBLICAR_EVENTOS:  # Fuera del lock: los sinks pueden hacer E/S
+            BUS_EVENTOS.publicar(EventoTransicion(self.id, anterior, nuevo_estado, ts,
+                                                  getattr(self, _SLOT_TS[anterior])))
 
 
     def add_item(self, item: Dict) -> None:
         """Añadir un ítem al pedido.
 
         Comportamiento esperado:
-        - Validar que item contiene al menos name y qty (qty > 0).
+        - Validar que item contiene al menos name (o id de catálogo) y qty (qty > 0).
         - Si un item con el mismo name ya existe, acumular qty o añadir nuevo
           según política del equipo (aquí documentamos que se suma qty).
         - No calcular tiempos aquí: el temporizador es responsable de actualizar
@@ -131,16 +330,27 @@ class Pedido:
 
         Returns: None. En caso de entrada inválida, lanzar ValueError.
         """
-        if not isinstance(item, dict) or 'name' not in item or 'qty' not in item:
-            raise ValueError("Item debe ser un diccionario con 'name' y 'qty'")
-        if not isinstance(item['qty'], int) or item['qty'] <= 0:
-            raise ValueError("La cantidad (qty) debe ser un entero mayor que cero")
-
-        existing_item = next((i for i in self.items if i['name'] == item['name']), None)
-        if existing_item:
-            existing_item['qty'] += item['qty']
+        codigo, qty = VALIDADOR_ITEMS.codificar(item)
+        if type(codigo) is not int:  # Producto fuera del catálogo: lo guarda el pedido
+            libres = list(self._libres or ())
+            codigo = CODIGO_LOCAL + _indice_libre(libres, codigo)
+            self._libres = tuple(libres)
+        idx = self._indice_linea(self._entrada(codigo)[1])
+        if idx >= 0:
+            self._lineas[idx + 1] += qty
+            self._sumar_linea(self._lineas[idx], qty)
         else:
-            self.items.append(item)
+            self._lineas.extend((codigo, qty))
+            self._sumar_linea(codigo, qty)
+
+    def _indice_linea(self, name: str) -> int:
+        """Posición en `_lineas` del código cuyo producto se llama `name`, o -1."""
+        lineas = self._lineas
+        obtener = self._obtenedor()
+        for i in range(0, len(lineas), 2):
+            if obtener(lineas[i])[1] == name:
+                return i
+        return -1
         
     def remove_item(self, item_name: str) -> bool:
         """Remover un ítem por nombre.
@@ -157,22 +367,58 @@ class Pedido:
         Returns:
             bool: True si se eliminó, False si no se encontró.
         """
-        for i, item in enumerate(self.items):
-            if item['name'] == item_name:
-                del self.items[i]
-                return True
-        return False
+        idx = self._indice_linea(item_name)
+        if idx < 0:
+            return False
+        codigo, qty = self._lineas[idx], self._lineas[idx + 1]
+        del self._lineas[idx:idx + 2]
+        self._sumar_linea(codigo, -qty)
+        return True
     
     
     
+    def _categoria(self, codigo: int) -> Optional[str]:
+        if codigo < CODIGO_LOCAL:
+            return CATALOGO.categoria(codigo)
+        return categoria_producto(self._libres[codigo - CODIGO_LOCAL][0])
+
+    def categorias(self) -> frozenset:
+        """Categorías de producto del pedido ('PIZ', 'BEB'...; ver `CATALOGO.categoria`).
+
+        Los ítems sin id de catálogo no aportan categoría.
+        """
+        categoria = CATALOGO.categoria if self._libres is None else self._categoria
+        lineas = self._lineas
+        return frozenset(c for c in (categoria(lineas[i]) for i in range(0, len(lineas), 2)) if c is not None)
+
+    def lineas_por_categoria(self) -> Dict[Optional[str], array]:
+        """Repartir las líneas (código, qty) por categoría, en orden de aparición.
+
+        Salida esperada: {categoría o None: array('I') de pares (código, qty)}.
+        """
+        categoria = CATALOGO.categoria if self._libres is None else self._categoria
+        lineas = self._lineas
+        grupos: Dict[Optional[str], array] = {}
+        for i in range(0, len(lineas), 2):
+            clave = categoria(lineas[i])
+            grupo = grupos.get(clave)
+            if grupo is None:
+                grupo = grupos[clave] = array('I')
+            grupo.append(lineas[i])
+            grupo.append(lineas[i + 1])
+        return grupos
+
+    def minutos_preparacion(self) -> int:
+        """Minutos de trabajo del pedido (suma prep_time_min * qty por ítem). O(1)."""
+        return self._minutos
+
     def total_price(self) -> float:
-        """Calcular total del pedido (suma qty * price por ítem)."""
-        total = 0.0
-        for it in getattr(self, 'items', []):
-            qty = int(it.get('qty', 0))
-            price = float(it.get('price', 0.0))
-            total += qty * price
-        return round(total, 2)
+        """Calcular total del pedido (suma qty * price por ítem). O(1)."""
+        return round(self._total, 2)
+
+    def num_items(self) -> int:
+        """Unidades del pedido (suma de qty). O(1)."""
+        return self._unidades
 
     def as_dict(self) -> Dict:
         """Devolver una representación serializable del pedido.
@@ -190,15 +436,161 @@ class Pedido:
         }
 
         Este método facilita la serialización a JSON para APIs o almacenamiento.
+
+        Mientras el pedido no cambie se reutiliza el dict calculado; cada
+        llamada devuelve una copia propia (también de `items` y
+        `cliente_info`), así que modificarla no corrompe el caché.
         """
+        entrada = _CACHE_AS_DICT.get(id(self))
+        if entrada is not None and entrada[0] is self and entrada[1] == self._version:
+            return _copiar_as_dict(entrada[2])
+        version = self._version
         data = {
             'id': self.id,
             'items': self.items,
             'estado': self.estado,
             'tiempo_estimado_min': self.tiempo_estimado_min,
-            'timestamp_creado': self.timestamp_creado.isoformat() if hasattr(self, 'timestamp_creado') else None,
+            'timestamp_creado': self.timestamp_creado.isoformat(),
             'estacion_id': self.estacion_id,
             'cliente_info': self.cliente_info,
             'total_price': self.total_price()
         }
-        return data
\ No newline at end of file
+        if len(_CACHE_AS_DICT) >= TAM_CACHE_AS_DICT:
+            _CACHE_AS_DICT.clear()
+        _CACHE_AS_DICT[id(self)] = (self, version, data)
+        return _copiar_as_dict(data)
+
+    @classmethod
+    def from_dict(cls, data: Dict, validar: bool = True) -> 'Pedido':
+        """Reconstruir un Pedido a partir de un dict con la forma de `as_dict()`.
+
+        - validar=True: los ítems pasan por las mismas validaciones que en
+          `__init__` y el estado debe ser uno de `ESTADOS_VALIDOS`.
+        - validar=False: ruta rápida para registros de confianza (escritos por
+          este sistema); asigna los slots directamente sin revalidar.
+
+        El estado se restaura sin pasar por `update_estado` (no se avisa a
+        observadores ni se publican eventos). Solo se conserva el instante de
+        creación: `as_dict()` no guarda los del resto de estados.
+
+        Ejemplo:
+        >>> Pedido.from_dict(pedido.as_dict()).as_dict() == pedido.as_dict()
+        True
+
+        Raises:
+            ValueError: con validar=True, si los ítems o el estado son inválidos.
+        """
+        if not validar:
+            return cls._desde_dict_confiable(data)
+        estado = data.get('estado') or 'PENDIENTE'
+        if estado not in cls.ESTADOS_VALIDOS:
+            raise ValueError(f"Estado inválido: {estado}. Debe ser uno de: {', '.join(cls.ESTADOS_VALIDOS)}")
+        pedido = cls(data['id'], data.get('items') or [], data.get('cliente_info'))
+        pedido._estado = estado
+        pedido._tiempo_estimado_min = data.get('tiempo_estimado_min')
+        pedido._estacion_id = data.get('estacion_id')
+        creado = data.get('timestamp_creado')
+        if creado:
+            pedido._ts_pendiente = (datetime.fromisoformat(creado) if isinstance(creado, str) else creado).timestamp()
+        return pedido
+
+    @classmethod
+    def _desde_dict_confiable(cls, data: Dict, codigos: Optional[Dict[tuple, Union[int, EntradaCatalogo]]] = None
+                              ) -> 'Pedido':
+        """Ruta sin validación de `from_dict`; `codigos` es un caché local (name, prep, price, id) -> código o entrada.
+
+        Los totales salen de los valores del registro, que son también los de
+        cada línea: un código del catálogo solo se usa si su entrada coincide
+        exactamente (ver `_resolver_confiable`).
+        """
+        if codigos is None:
+            codigos = {}
+        pedido = object.__new__(cls)
+        lineas = array('I')
+        libres: Optional[List[EntradaCatalogo]] = None
+        total = 0.0
+        minutos = 0
+        unidades = 0
+        for it in data['items']:
+            qty = it['qty']
+            prep = it.get('prep_time_min', 5)
+            price = it.get('price', 0.0)
+            clave = (it['name'], prep, price, it.get('id'))
+            codigo = codigos.get(clave)
+            if codigo is None:
+                codigo = codigos[clave] = _resolver_confiable(*clave)
+            if type(codigo) is not int:
+                if libres is None:
+                    libres = []
+                codigo = CODIGO_LOCAL + _indice_libre(libres, codigo)
+            lineas.append(codigo)
+            lineas.append(qty)
+            total += qty * price
+            minutos += qty * prep
+            unidades += qty
+        pedido.id = data['id']
+        pedido._lineas = lineas
+        pedido._libres = tuple(libres) if libres else None
+        pedido._total = total
+        pedido._minutos = minutos
+        pedido._unidades = unidades
+        pedido._version = 0
+        cliente_info = data.get('cliente_info')
+        pedido._cliente_info = dict(cliente_info) if cliente_info else None
+        pedido._observadores = ()
+        pedido._estado = data.get('estado') or 'PENDIENTE'
+        pedido._tiempo_estimado_min = data.get('tiempo_estimado_min')
+        pedido._estacion_id = data.get('estacion_id')
+        creado = data.get('timestamp_creado')
+        pedido._ts_pendiente = datetime.fromisoformat(creado).timestamp() if creado else time.time()
+        pedido._ts_en_cola = pedido._ts_en_preparacion = pedido._ts_listo = None
+        pedido._ts_entregado = pedido._ts_cancelado = None
+        return pedido
+
+    @classmethod
+    def desde_dicts(cls, registros: List[Dict], validar: bool = False) -> List['Pedido']:
+        """Reconstruir muchos pedidos de una vez (por defecto, registros de confianza sin revalidar).
+
+        Salida esperada: lista de Pedido en el mismo orden que `registros`.
+        """
+        if validar:
+            return [cls.from_dict(data) for data in registros]
+        desde = cls._desde_dict_confiable
+        codigos: Dict[tuple, Union[int, EntradaCatalogo]] = {}  # Evita resolver cada línea contra el catálogo
+        return [desde(data, codigos) for data in registros]
+
+
+class SubPedido(Pedido):
+    """Parte de un pedido con los ítems de una categoría.
+
+    `GestorPedidos.despachar` reparte los pedidos con varias categorías en
+    subpedidos que se preparan en paralelo en estaciones especializadas. Un
+    subpedido pasa por los mismos estados que un pedido y el gestor recombina:
+    el pedido `padre` queda LISTO cuando termina su último subpedido. Comparte
+    el lock de estado del padre (`lock_estado`). Solo vive en memoria y no
+    publica eventos en `BUS_EVENTOS` (los publica el padre).
+
+    Ejemplo:
+    >>> SubPedido(pedido, 'PIZ', pedido.lineas_por_categoria()['PIZ']).id
+    'PED-0001/PIZ'
+    """
+
+    __slots__ = ('padre', 'categoria')
+
+    PUBLICAR_EVENTOS = False
+
+    def __init__(self, padre: Pedido, categoria: Optional[str], lineas: array) -> None:
+        super().__init__(f"{padre.id}/{categoria or '*'}", [], padre.cliente_info)
+        self.padre = padre
+        self.categoria = categoria
+        self._lineas = array('I', lineas)
+        self._libres = padre._libres  # Los códigos locales de las líneas son los del padre
+        self._recalcular_totales()
+
+    def lock_estado(self) -> threading.RLock:
+        """El lock del pedido padre: partes y padre cambian de estado bajo el mismo lock.
+
+        Así el gestor recombina el padre desde el aviso de una parte sin tomar
+        un segundo lock (no hay orden entre locks repartidos que respetar).
+        """
+        return self.padre.lock_estado()
@@ -0,0 +1,75 @@
+"""Módulo `src.models.productos`.
+
+Carta de la cocina: los productos que se pueden pedir por id de catálogo
+({'id': 'PIZ-PEP', 'qty': 2}). `src.models.catalogo` los interna al crear
+`CATALOGO`, así cualquier proceso que importe los modelos (el menú, las
+cargas en bloque o los workers de `src.services.fragmentado`) resuelve los
+mismos ids sin pasos previos.
+
+Ejemplo de uso:
+
+from src.models.productos import PRODUCTS
+
+[p['name'] for p in PRODUCTS if p['id'].startswith('BEB')]
+"""
+from __future__ import annotations
+from typing import Any, Dict, List
+
+PRODUCTS: List[Dict[str, Any]] = [
+    # Pizzas ($50-$120)
+    {"id": "PIZ", "name": "Pizza Margarita", "prep_time_min": 12, "price": 50.00},
+    {"id": "PIZ-PEP", "name": "Pizza de Pepperoni", "prep_time_min": 12, "price": 65.00},
+    {"id": "PIZ-CHM", "name": "Pizza de Champiñones", "prep_time_min": 12, "price": 62.00},
+    {"id": "PIZ-BBQ", "name": "Pizza BBQ", "prep_time_min": 13, "price": 75.00},
+    {"id": "PIZ-HAM", "name": "Pizza Hawaiana", "prep_time_min": 12, "price": 70.00},
+    {"id": "PIZ-4QS", "name": "Pizza 4 Quesos", "prep_time_min": 13, "price": 80.00},
+    {"id": "PIZ-VEG", "name": "Pizza Vegetariana", "prep_time_min": 12, "price": 58.00},
+    {"id": "PIZ-ESP", "name": "Pizza Especial", "prep_time_min": 14, "price": 120.00},
+    
+    # Hamburguesas ($55-$140)
+    {"id": "HMB", "name": "Hamburguesa Clásica", "prep_time_min": 8, "price": 55.00},
+    {"id": "HMB-DBL", "name": "Hamburguesa Doble", "prep_time_min": 10, "price": 90.00},
+    {"id": "HMB-BCS", "name": "Hamburguesa con Bacon", "prep_time_min": 9, "price": 85.00},
+    {"id": "HMB-CHZ", "name": "Hamburguesa con Queso", "prep_time_min": 8, "price": 65.00},
+    {"id": "HMB-PIC", "name": "Hamburguesa Picante", "prep_time_min": 9, "price": 78.00},
+    {"id": "HMB-EGG", "name": "Hamburguesa con Huevo", "prep_time_min": 10, "price": 95.00},
+    
+    # Sándwiches ($50-$110)
+    {"id": "SND", "name": "Sándwich de Jamón", "prep_time_min": 5, "price": 50.00},
+    {"id": "SND-POL", "name": "Sándwich de Pollo", "prep_time_min": 6, "price": 68.00},
+    {"id": "SND-TUN", "name": "Sándwich de Atún", "prep_time_min": 5, "price": 75.00},
+    {"id": "SND-CRN", "name": "Sándwich de Carne Asada", "prep_time_min": 7, "price": 110.00},
+    {"id": "SND-VEG", "name": "Sándwich Vegetariano", "prep_time_min": 5, "price": 55.00},
+    
+    # Ensaladas ($60-$130)
+    {"id": "ENS", "name": "Ensalada César", "prep_time_min": 4, "price": 65.00},
+    {"id": "ENS-GRG", "name": "Ensalada Griega", "prep_time_min": 4, "price": 70.00},
+    {"id": "ENS-POL", "name": "Ensalada de Pollo", "prep_time_min": 5, "price": 130.00},
+    {"id": "ENS-MXD", "name": "Ensalada Mixta", "prep_time_min": 4, "price": 60.00},
+    {"id": "ENS-CAP", "name": "Ensalada Caprese", "prep_time_min": 4, "price": 85.00},
+    
+    # Bebidas ($15-$35)
+    {"id": "BEB", "name": "Bebida 500ml", "prep_time_min": 1, "price": 20.00},
+    {"id": "BEB-JGO", "name": "Jugo Natural 300ml", "prep_time_min": 2, "price": 35.00},
+    {"id": "BEB-SDA", "name": "Refresco Soda 500ml", "prep_time_min": 1, "price": 22.00},
+    {"id": "BEB-CAF", "name": "Café Americano", "prep_time_min": 3, "price": 25.00},
+    {"id": "BEB-LAT", "name": "Café Latte", "prep_time_min": 4, "price": 32.00},
+    
+    # Postres ($50-$85)
+    {"id": "PST-FLN", "name": "Flan", "prep_time_min": 2, "price": 50.00},
+    {"id": "PST-TPL", "name": "Tiramisu", "prep_time_min": 2, "price": 60.00},
+    {"id": "PST-CHC", "name": "Cheesecake", "prep_time_min": 2, "price": 85.00},
+    {"id": "PST-ARL", "name": "Arroz con Leche", "prep_time_min": 2, "price": 45.00},
+    
+    # Acompañamientos ($20-$50)
+    {"id": "ACP-PAP", "name": "Papas Fritas", "prep_time_min": 5, "price": 35.00},
+    {"id": "ACP-ONI", "name": "Aros de Cebolla", "prep_time_min": 5, "price": 40.00},
+    {"id": "ACP-ALT", "name": "Alitas de Pollo", "prep_time_min": 8, "price": 75.00},
+    {"id": "ACP-CHZ", "name": "Bastones de Queso", "prep_time_min": 6, "price": 50.00},
+    
+    # Extras/Complementos ($15-$45)
+    {"id": "EXT-GSA", "name": "Guacamole", "prep_time_min": 1, "price": 28.00},
+    {"id": "EXT-SAL", "name": "Salsa Picante", "prep_time_min": 1, "price": 15.00},
+    {"id": "EXT-MAY", "name": "Mayonesa Extra", "prep_time_min": 1, "price": 12.00},
+    {"id": "EXT-ACT", "name": "Aceitunas", "prep_time_min": 1, "price": 22.00},
+]
@@ -0,0 +1,216 @@
+"""Módulo `src.models.validacion_items`.
+
+Validación única de los ítems de un pedido. `ValidadorItems` se prepara una
+vez a partir de un esquema (`ESQUEMA_ITEM`) y del catálogo (`CATALOGO`, que
+ya trae la carta `PRODUCTS` registrada), y
+devuelve directamente las líneas (código, qty) que guarda `Pedido`.
+Lo comparten `Pedido.__init__`, `Pedido.add_item`, `validar_items` y las
+cargas en bloque (`GestorPedidos.crear_pedidos_bulk`, la ingesta de `src.main`).
+
+Dos formas de indicar un ítem:
+- Por id de catálogo: {'id': 'PIZ-PEP', 'qty': 2}. Nombre, tiempo y precio
+  salen del catálogo; los que traiga el ítem se ignoran.
+- qty es un entero entre 1 y `QTY_MAXIMA`.
+- Libre: {'name': 'Taco', 'qty': 2, 'prep_time_min': 6, 'price': 30.0} (o
+  con un 'id' que no está en el catálogo). Se valida contra el esquema; si
+  coincide con un producto del catálogo usa su código y si no, su entrada
+  (producto_id, name, prep_time_min, price) la guarda el propio pedido: el
+  catálogo no crece con los ítems libres.
+
+Ejemplo de uso:
+
+from src.models.validacion_items import VALIDADOR_ITEMS
+
+VALIDADOR_ITEMS.codificar({'id': 'PIZ-PEP', 'qty': 2})   # (código, 2)
+VALIDADOR_ITEMS.codificar({'name': 'Taco', 'qty': 1})    # ((None, 'Taco', 5, 0.0), 1)
+VALIDADOR_ITEMS.es_valida([{'name': 'Agua', 'qty': 0}])  # False
+"""
+from __future__ import annotations
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
+from array import array
+import math
+
+from .catalogo import CATALOGO, CODIGO_LOCAL, CatalogoLineas, EntradaCatalogo
+
+
+class CampoItem(NamedTuple):
+    """Campo del esquema de un ítem.
+
+    - tipos: tipos admitidos (comparación exacta: `True` no pasa por int).
+    - defecto: valor si el campo falta o es None (solo si no es obligatorio).
+    - minimo / maximo: valores admitidos (inclusive) para campos numéricos.
+      Los float no finitos (nan, inf) se rechazan siempre.
+    """
+    nombre: str
+    tipos: Tuple[type, ...]
+    obligatorio: bool = False
+    defecto: Any = None
+    minimo: Optional[float] = None
+    maximo: Optional[float] = None
+
+
+QTY_MAXIMA = 2 ** 32 - 1  # Las líneas se guardan en array('I') (enteros sin signo de 32 bits)
+
+# 'name' solo es obligatorio en los ítems libres: los de catálogo se resuelven por 'id'
+ESQUEMA_ITEM: Tuple[CampoItem, ...] = (
+    CampoItem('id', (str,)),
+    CampoItem('name', (str,), obligatorio=True),
+    CampoItem('qty', (int,), obligatorio=True, minimo=1, maximo=QTY_MAXIMA),
+    CampoItem('prep_time_min', (int, float), defecto=5, minimo=0),
+    CampoItem('price', (int, float), defecto=0.0, minimo=0),
+)
+
+_ERROR_ITEM = "Cada item debe ser dict con 'name' (o 'id' de catálogo) y 'qty'"
+
+
+class ValidadorItems:
+    """Valida ítems contra un esquema y los traduce a códigos del catálogo.
+
+    El esquema se prepara en `__init__` (tupla de campos y límites de qty)
+    y cada ítem se valida con una clausura sobre esos datos. Los ítems
+    libres ya vistos se resuelven con un caché acotado (name, tiempo, precio,
+    id) -> código o entrada, sin volver a normalizar; las entradas repetidas
+    se comparten entre pedidos. El catálogo solo se consulta, nunca se
+    modifica.
+
+    - solo_catalogo=True: rechaza los ítems cuyo 'id' no esté en el catálogo
+      (no se aceptan productos libres).
+
+    Raises (en `__init__`):
+        ValueError: si el esquema no define 'name', 'qty', 'prep_time_min' y 'price'.
+    """
+
+    def __init__(self, esquema: Sequence[CampoItem] = ESQUEMA_ITEM, catalogo: CatalogoLineas = CATALOGO,
+                 solo_catalogo: bool = False) -> None:
+        self.catalogo = catalogo
+        self.solo_catalogo = solo_catalogo
+        self._codificar = _compilar(tuple(esquema), catalogo, solo_catalogo)
+
+    def codificar(self, it: Dict) -> Tuple[Union[int, EntradaCatalogo], int]:
+        """Validar un ítem y devolver (código de catálogo, qty), o (entrada, qty) si es libre.
+
+        La entrada de un ítem libre es (producto_id, name, prep_time_min,
+        price) y la guarda el pedido (ver `codificar_items`).
+
+        Raises:
+            ValueError: si el ítem no cumple el esquema.
+        """
+        return self._codificar(it)
+
+    def codificar_items(self, items: List[Dict]) -> Tuple[array, Optional[Tuple[EntradaCatalogo, ...]]]:
+        """Validar una lista de ítems y devolver (líneas, libres).
+
+        Salida esperada: `líneas` es un array('I') de pares (código, qty) y
+        `libres` la tupla de entradas de los ítems libres (None si no hay):
+        su código es `CODIGO_LOCAL` + posición en `libres`.
+
+        Raises:
+            ValueError: si `items` no es una lista o algún ítem es inválido.
+        """
+        if not isinstance(items, list):
+            raise ValueError("Items debe ser una lista")
+        lineas = array('I')
+        libres: Optional[List[EntradaCatalogo]] = None
+        codificar = self._codificar
+        for it in items:
+            codigo, qty = codificar(it)
+            if type(codigo) is not int:
+                if libres is None:
+                    libres = []
+                codigo = CODIGO_LOCAL + _indice_libre(libres, codigo)
+            lineas.append(codigo)
+            lineas.append(qty)
+        return lineas, (tuple(libres) if libres else None)
+
+    def es_valida(self, items: Any) -> bool:
+        """Comprobar una lista de ítems.
+
+        Salida esperada: True si `items` es una lista y todos sus ítems son válidos.
+        """
+        if not isinstance(items, list):
+            return False
+        codificar = self._codificar
+        try:
+            for it in items:
+                codificar(it)
+        except ValueError:
+            return False
+        return True
+
+
+def _indice_libre(libres: List[EntradaCatalogo], entrada: EntradaCatalogo) -> int:
+    """Posición de `entrada` en `libres`, añadiéndola al final si no estaba."""
+    for i, existente in enumerate(libres):
+        if existente == entrada:
+            return i
+    libres.append(entrada)
+    return len(libres) - 1
+
+
+def _compilar(esquema: Tuple[CampoItem, ...], catalogo: CatalogoLineas,
+              solo_catalogo: bool) -> Callable[[Any], Tuple[Union[int, EntradaCatalogo], int]]:
+    """Construir `codificar(it)` para el esquema.
+
+    El esquema se recorre una sola vez aquí: la función devuelta solo itera
+    una tupla precalculada de campos libres.
+    """
+    campos = {campo.nombre: campo for campo in esquema}
+    if not {'name', 'qty', 'prep_time_min', 'price'} <= set(campos):
+        raise ValueError("El esquema de ítem debe definir 'name', 'qty', 'prep_time_min' y 'price'")
+    campo_qty = campos['qty']
+    minimo_qty = campo_qty.minimo if campo_qty.minimo is not None else 1
+    maximo_qty = min(campo_qty.maximo, QTY_MAXIMA) if campo_qty.maximo is not None else QTY_MAXIMA
+    error_qty = f"La cantidad (qty) debe ser un entero entre {minimo_qty} y {maximo_qty}"
+    # Campos de los ítems libres: (nombre, tipos, obligatorio, defecto, minimo, maximo)
+    libres = tuple((c.nombre, c.tipos, c.obligatorio, c.defecto, c.minimo, c.maximo)
+                   for c in esquema if c.nombre not in ('qty', 'id'))
+    nombres = [c[0] for c in libres]
+    i_name, i_prep, i_price = nombres.index('name'), nombres.index('prep_time_min'), nombres.index('price')
+    codigo_de_producto = catalogo.codigo_de_producto
+    codigo_de_valores = catalogo.codigo_de_valores
+    isfinite = math.isfinite
+    cache: Dict[Tuple[Any, ...], Union[int, EntradaCatalogo]] = {}
+
+    def codificar(it: Any) -> Tuple[Union[int, EntradaCatalogo], int]:
+        if not isinstance(it, dict):
+            raise ValueError(_ERROR_ITEM)
+        qty = it.get('qty')
+        if type(qty) is not int or not minimo_qty <= qty <= maximo_qty:
+            raise ValueError(error_qty if 'qty' in it else _ERROR_ITEM)
+        producto_id = it.get('id')
+        if producto_id is not None:
+            if type(producto_id) is not str:
+                raise ValueError(f"Item inválido: 'id' = {producto_id!r}")
+            codigo = codigo_de_producto(producto_id)
+            if codigo is not None:
+                return codigo, qty
+        if solo_catalogo:
+            raise ValueError(f"Producto desconocido: {producto_id or it.get('name')}")
+        valores = []
+        for nombre, tipos, obligatorio, defecto, minimo, maximo in libres:
+            v = it.get(nombre)
+            if v is None:
+                if obligatorio:
+                    raise ValueError(_ERROR_ITEM)
+                v = defecto
+            elif (type(v) not in tipos or (minimo is not None and v < minimo)
+                  or (maximo is not None and v > maximo)  # type(): `True` no pasa por int
+                  or (type(v) is float and not isfinite(v))):  # nan no cumple ni incumple los límites
+                raise ValueError(f"Item inválido: '{nombre}' = {v!r}")
+            valores.append(v)
+        clave = (valores[i_name], valores[i_prep], valores[i_price], producto_id)
+        codigo = cache.get(clave)
+        if codigo is None:
+            name, prep, price = clave[0], int(clave[1]), round(float(clave[2]), 2)
+            codigo = None if producto_id is not None else codigo_de_valores(name, prep, price)
+            if codigo is None:
+                codigo = (producto_id, name, prep, price)
+            if len(cache) >= 65536:  # Acotado: solo importa para los productos repetidos
+                cache.clear()
+            cache[clave] = codigo
+        return codigo, qty
+
+    return codificar
+
+
+VALIDADOR_ITEMS = ValidadorItems()
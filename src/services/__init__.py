@@ -1,8 +1,19 @@
 """Paquete `src.services` con la lógica de negocio y servicios de la app.
 """
 
-from .gestor_pedidos import GestorPedidos
-from .temporizador import calcular_tiempo_estimado, formato_tiempo
+from .gestor_pedidos import GestorPedidos, ResultadoLote
+from .temporizador import (calcular_tiempo_estimado, formato_tiempo, estimar_tiempos, actualizar_tiempos_estimados,
+                           estimar_tiempo_partes)
 from .notificador import Notificador
+from .almacenamiento import AlmacenPedidos, JournalPedidos, PosicionObsoleta, abrir_journal
+from .almacen_sqlite import AlmacenSQLite, abrir_sqlite
+from .historial import LectorHistorial
+from .recuperacion import RecuperacionGestor
+from .fragmentado import GestorFragmentado
+from .serializacion import Codec, CodecJSON, CodecBinario, codec_rapido, obtener_codec, decodificar_pedidos
 
-__all__ = ["GestorPedidos", "calcular_tiempo_estimado", "formato_tiempo", "Notificador"]
+__all__ = ["GestorPedidos", "ResultadoLote", "calcular_tiempo_estimado", "formato_tiempo", "estimar_tiempos",
+           "actualizar_tiempos_estimados", "estimar_tiempo_partes", "Notificador",
+           "AlmacenPedidos", "JournalPedidos", "PosicionObsoleta", "abrir_journal", "AlmacenSQLite", "abrir_sqlite",
+           "LectorHistorial", "Codec", "CodecJSON", "CodecBinario", "codec_rapido", "obtener_codec",
+           "decodificar_pedidos", "RecuperacionGestor", "GestorFragmentado"]
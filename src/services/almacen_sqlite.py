@@ -0,0 +1,399 @@
+"""Módulo `src.services.almacen_sqlite`.
+
+Backend SQLite del almacén de pedidos (`AlmacenPedidos`). A diferencia del
+journal, cada pedido es una fila que se actualiza en sitio, con índices por
+estado, estación y fecha de creación para consultas del historial sin leerlo
+entero.
+
+- Modo WAL: los lectores no bloquean al escritor ni al revés.
+- Escrituras por lotes: inserciones y cambios se acumulan en memoria y se
+  vuelcan en una sola transacción cada `tam_lote` operaciones o cada
+  `intervalo_s` segundos (un hilo daemon vigila la antigüedad aunque no
+  lleguen más escrituras) y siempre antes de leer y al cerrar. Si la
+  transacción falla, el lote vuelve a la cola de pendientes y el error se
+  propaga: el siguiente volcado lo reintenta. Si lo que falla es una
+  restricción de la tabla (`sqlite3.IntegrityError`), reintentar no
+  serviría: el lote se aplica operación a operación y las que la incumplen
+  se descartan con un aviso en el log.
+- Sentencias preparadas: SQL constante con parámetros `?` y `executemany`;
+  el módulo `sqlite3` reutiliza las sentencias compiladas de su caché.
+
+Los ids de pedido se reinician en cada ejecución (PED-0001...), así que la
+clave de cada fila es un número de secuencia propio (`seq`) y los cambios de
+un id afectan a la última fila guardada con ese id.
+
+Ejemplo de uso:
+
+from src.services.almacen_sqlite import abrir_sqlite
+
+almacen = abrir_sqlite('pedidos.db', migrar_desde='pedidos.journal')
+gestor = GestorPedidos(almacen=almacen)      # persiste altas y cambios de estado
+almacen.consultar(estado='LISTO', recientes_primero=True, limite=20)
+almacen.cerrar()
+"""
+from __future__ import annotations
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+from array import array
+from datetime import datetime
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from .almacenamiento import AlmacenPedidos, JournalPedidos, migrar_desde_json, _iso, _a_json
+
+logger = logging.getLogger(__name__)
+
+SINCRONIZACIONES = ['OFF', 'NORMAL', 'FULL']
+_MAX_PARAMETROS = 900  # Por debajo del límite clásico de 999 parámetros por sentencia
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS pedidos (
+    seq INTEGER PRIMARY KEY,
+    id NOT NULL,                      -- Sin tipo: conserva str o int tal cual
+    estado TEXT NOT NULL,
+    estacion_id,
+    timestamp_creado TEXT NOT NULL,   -- ISO 8601: el orden de texto es el cronológico
+    tiempo_estimado_min INTEGER,
+    total_price REAL,
+    items TEXT NOT NULL,              -- JSON
+    cliente_info TEXT                 -- JSON o NULL
+);
+CREATE INDEX IF NOT EXISTS idx_pedidos_id ON pedidos (id);
+CREATE INDEX IF NOT EXISTS idx_pedidos_estado ON pedidos (estado);
+CREATE INDEX IF NOT EXISTS idx_pedidos_estacion ON pedidos (estacion_id);
+CREATE INDEX IF NOT EXISTS idx_pedidos_creado ON pedidos (timestamp_creado);
+CREATE TABLE IF NOT EXISTS meta (clave TEXT PRIMARY KEY, valor TEXT);
+"""
+
+_COLUMNAS = 'id, items, estado, tiempo_estimado_min, timestamp_creado, estacion_id, cliente_info, total_price'
+_SQL_INSERTAR = (f"INSERT INTO pedidos (seq, {_COLUMNAS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)")
+# Columnas actualizables en sitio -> sentencia preparada
+_SQL_ACTUALIZAR = {
+    campo: f"UPDATE pedidos SET {campo} = ? WHERE seq = ?"
+    for campo in ('estado', 'estacion_id', 'tiempo_estimado_min', 'total_price')
+}
+
+
+def _fila_a_registro(fila: Tuple) -> Dict:
+    id_, items, estado, tiempo, creado, estacion_id, cliente, total = fila
+    return {'id': id_, 'items': json.loads(items), 'estado': estado, 'tiempo_estimado_min': tiempo,
+            'timestamp_creado': creado, 'estacion_id': estacion_id,
+            'cliente_info': json.loads(cliente) if cliente else None, 'total_price': total}
+
+
+class AlmacenSQLite(AlmacenPedidos):
+    """Almacén de pedidos en SQLite (WAL) con escrituras agrupadas en transacciones.
+
+    Parámetros:
+    - ruta: fichero de la base de datos.
+    - tam_lote: operaciones pendientes que fuerzan un volcado.
+    - intervalo_s: antigüedad máxima de lo pendiente antes de volcarlo (se
+      comprueba en cada escritura y desde el hilo `almacen-sqlite-volcado`;
+      con intervalo_s <= 0 cada escritura se vuelca al momento y no hay hilo).
+    - sincronizacion: PRAGMA synchronous ('OFF', 'NORMAL' o 'FULL'). En WAL,
+      'NORMAL' no corrompe la base ante caídas; solo puede perder las
+      últimas transacciones.
+
+    Pensado para un único proceso escritor (los `seq` se asignan en memoria);
+    otros procesos pueden leer la base a la vez gracias al WAL.
+    """
+
+    def __init__(self, ruta: str, tam_lote: int = 500, intervalo_s: float = 0.5,
+                 sincronizacion: str = 'NORMAL') -> None:
+        if sincronizacion not in SINCRONIZACIONES:
+            raise ValueError(f"Sincronización inválida: {sincronizacion}. "
+                             f"Debe ser una de: {', '.join(SINCRONIZACIONES)}")
+        if tam_lote <= 0:
+            raise ValueError("tam_lote debe ser mayor que cero")
+        self.ruta = os.path.abspath(ruta)
+        self.tam_lote = tam_lote
+        self.intervalo_s = intervalo_s
+        self._lock = threading.RLock()  # Serializa la conexión y el buffer de pendientes
+        self._conexion: Optional[sqlite3.Connection] = sqlite3.connect(
+            self.ruta, check_same_thread=False, isolation_level=None, cached_statements=256)
+        self._conexion.execute('PRAGMA journal_mode=WAL')
+        self._conexion.execute(f'PRAGMA synchronous={sincronizacion}')
+        self._conexion.executescript(_ESQUEMA)
+        self._pendientes: List[Tuple[str, Tuple]] = []
+        self._primer_pendiente = 0.0
+        self._seq = self._conexion.execute('SELECT COALESCE(MAX(seq), 0) FROM pedidos').fetchone()[0]
+        self._seq_por_id: Dict[Union[str, int], int] = {}  # Última fila de cada id escrita en esta sesión
+        self._aviso = threading.Condition(self._lock)  # Despierta al hilo de volcado con el primer pendiente
+        self._hilo: Optional[threading.Thread] = None
+        if intervalo_s > 0:
+            self._hilo = threading.Thread(target=self._volcar_periodico, name='almacen-sqlite-volcado', daemon=True)
+            self._hilo.start()
+
+    # --- escritura ---------------------------------------------------------
+
+    def _fila(self, registro: Dict) -> Tuple:
+        if not isinstance(registro, dict):
+            raise ValueError("El registro debe ser un diccionario")
+        pedido_id = registro.get('id')
+        if type(pedido_id) not in (str, int):  # Columna `id NOT NULL` sin tipo: solo str o int
+            raise ValueError(f"El registro debe tener 'id' str o int: {pedido_id!r}")
+        self._seq += 1
+        self._seq_por_id[pedido_id] = self._seq
+        cliente = registro.get('cliente_info')
+        return (self._seq, pedido_id,
+                _a_json(registro.get('items') or []),
+                registro.get('estado') or 'PENDIENTE', registro.get('tiempo_estimado_min'),
+                _iso(registro.get('timestamp_creado')) or datetime.now().isoformat(), registro.get('estacion_id'),
+                _a_json(cliente) if cliente else None,
+                registro.get('total_price'))
+
+    def _encolar(self, operaciones: List[Tuple[str, Tuple]]) -> None:
+        # Se llama con self._lock tomado
+        if self._conexion is None:
+            raise ValueError("El almacén está cerrado")
+        if not self._pendientes:
+            self._primer_pendiente = time.monotonic()
+            self._aviso.notify()
+        self._pendientes.extend(operaciones)
+        if len(self._pendientes) >= self.tam_lote or time.monotonic() - self._primer_pendiente >= self.intervalo_s:
+            self._volcar()
+
+    def guardar(self, registro: Dict) -> None:
+        """Encolar el alta de un registro. Lanza ValueError si no es un dict con 'id' str o int."""
+        with self._lock:
+            self._encolar([(_SQL_INSERTAR, self._fila(registro))])
+
+    def guardar_lote(self, registros: List[Dict]) -> None:
+        with self._lock:
+            self._encolar([(_SQL_INSERTAR, self._fila(r)) for r in registros])
+
+    def actualizar(self, pedido_id: Union[str, int], cambios: Dict) -> None:
+        """Actualizar en sitio estado, estacion_id, tiempo_estimado_min o total_price.
+
+        Se aplica a la última fila guardada en esta sesión con ese id; si no
+        hay ninguna, a la última fila de la base con ese id. Lanza ValueError
+        si algún campo no es actualizable.
+        """
+        self.actualizar_lote([(pedido_id, cambios)])
+
+    def actualizar_lote(self, cambios: Sequence[Tuple[Union[str, int], Dict]]) -> None:
+        """Aplicar varios `actualizar` de una vez: se validan todos antes y se encolan juntos."""
+        invalidos = {c for _, cambio in cambios for c in cambio if c not in _SQL_ACTUALIZAR}
+        if invalidos:
+            raise ValueError(f"Campos no actualizables: {', '.join(sorted(map(str, invalidos)))}")
+        with self._lock:
+            operaciones = []
+            for pedido_id, cambio in cambios:
+                seq = self._seq_por_id.get(pedido_id)
+                if seq is None:
+                    seq = self._seq_en_base(pedido_id)
+                    if seq is None:
+                        continue
+                operaciones.extend((_SQL_ACTUALIZAR[campo], (valor, seq)) for campo, valor in cambio.items())
+            if operaciones:
+                self._encolar(operaciones)
+
+    def _seq_en_base(self, pedido_id: Union[str, int]) -> Optional[int]:
+        # Se llama con self._lock tomado: última fila de la base con ese id (o None)
+        self._volcar()
+        fila = self._conexion.execute('SELECT MAX(seq) FROM pedidos WHERE id = ?', (pedido_id,)).fetchone()
+        if fila is None or fila[0] is None:
+            return None
+        self._seq_por_id[pedido_id] = fila[0]
+        return fila[0]
+
+    def _volcar(self) -> None:
+        # Se llama con self._lock tomado: una transacción, un executemany por racha de la misma sentencia
+        if not self._pendientes:
+            return
+        pendientes = self._pendientes
+        conexion = self._conexion
+        try:
+            conexion.execute('BEGIN')
+            inicio = 0
+            for i in range(1, len(pendientes) + 1):
+                if i == len(pendientes) or pendientes[i][0] != pendientes[inicio][0]:
+                    conexion.executemany(pendientes[inicio][0], [p[1] for p in pendientes[inicio:i]])
+                    inicio = i
+            conexion.execute('COMMIT')
+        except sqlite3.IntegrityError:
+            conexion.execute('ROLLBACK')
+            self._volcar_descartando(pendientes)
+        except BaseException:
+            # El lote sigue en self._pendientes (no se ha tocado): el próximo volcado lo reintenta entero
+            if conexion.in_transaction:
+                conexion.execute('ROLLBACK')
+            raise
+        self._pendientes = []
+
+    def _volcar_descartando(self, pendientes: List[Tuple[str, Tuple]]) -> None:
+        # Se llama con self._lock tomado: camino lento, una sentencia por operación para aislar las que
+        # incumplen una restricción (reintentarlas fallaría siempre y bloquearía todo el almacén)
+        conexion = self._conexion
+        descartadas = 0
+        conexion.execute('BEGIN')
+        try:
+            for sql, parametros in pendientes:
+                try:
+                    conexion.execute(sql, parametros)
+                except sqlite3.IntegrityError as e:
+                    descartadas += 1
+                    logger.warning("Operación descartada en %s (%s): %s %r", self.ruta, e, sql, parametros)
+            conexion.execute('COMMIT')
+        except BaseException:
+            if conexion.in_transaction:
+                conexion.execute('ROLLBACK')
+            raise
+        logger.warning("%d de %d operaciones descartadas por restricciones de la tabla",
+                       descartadas, len(pendientes))
+
+    def _volcar_periodico(self) -> None:
+        # Hilo daemon: vuelca lo pendiente en cuanto cumple `intervalo_s`, aunque no haya más escrituras
+        with self._aviso:
+            while self._conexion is not None:
+                if not self._pendientes:
+                    self._aviso.wait()
+                    continue
+                restante = self._primer_pendiente + self.intervalo_s - time.monotonic()
+                if restante > 0:
+                    self._aviso.wait(restante)
+                    continue
+                try:
+                    self._volcar()
+                except Exception:
+                    logger.exception("Falló el volcado periódico de %s; se reintentará", self.ruta)
+                    self._aviso.wait(self.intervalo_s)
+
+    def flush(self) -> None:
+        """Volcar a la base las operaciones pendientes en una transacción."""
+        with self._lock:
+            if self._conexion is not None:
+                self._volcar()
+
+    # --- lectura -----------------------------------------------------------
+
+    def _leer(self, sql: str, parametros: Tuple = ()) -> List[Tuple]:
+        with self._lock:
+            if self._conexion is None:
+                raise ValueError("El almacén está cerrado")
+            self._volcar()  # Leer lo propio: lo pendiente se escribe antes de consultar
+            return self._conexion.execute(sql, parametros).fetchall()
+
+    def iterar(self, tam_pagina: int = 1000) -> Iterator[Dict]:
+        # Paginación por clave (seq): cada página es una consulta corta sobre la clave primaria
+        ultimo = 0
+        while True:
+            filas = self._leer(f"SELECT seq, {_COLUMNAS} FROM pedidos WHERE seq > ? ORDER BY seq LIMIT ?",
+                               (ultimo, tam_pagina))
+            for fila in filas:
+                yield _fila_a_registro(fila[1:])
+            if len(filas) < tam_pagina:
+                return
+            ultimo = filas[-1][0]
+
+    @staticmethod
+    def _where(estado, estacion_id, desde, hasta) -> Tuple[str, Tuple]:
+        condiciones: List[str] = []
+        parametros: List[Any] = []
+        for sql, valor in (('estado = ?', estado), ('estacion_id = ?', estacion_id),
+                           ('timestamp_creado >= ?', _iso(desde)), ('timestamp_creado <= ?', _iso(hasta))):
+            if valor is not None:
+                condiciones.append(sql)
+                parametros.append(valor)
+        return (' WHERE ' + ' AND '.join(condiciones) if condiciones else ''), tuple(parametros)
+
+    def consultar(self, estado: Optional[str] = None, estacion_id: Optional[Union[str, int]] = None,
+                  desde: Optional[Union[str, datetime]] = None, hasta: Optional[Union[str, datetime]] = None,
+                  limite: Optional[int] = None, desplazamiento: int = 0,
+                  recientes_primero: bool = False) -> List[Dict]:
+        where, parametros = self._where(estado, estacion_id, desde, hasta)
+        orden = 'DESC' if recientes_primero else 'ASC'
+        sql = (f"SELECT {_COLUMNAS} FROM pedidos{where} "
+               f"ORDER BY timestamp_creado {orden}, seq {orden} LIMIT ? OFFSET ?")
+        filas = self._leer(sql, parametros + (-1 if limite is None else limite, desplazamiento))
+        return [_fila_a_registro(f) for f in filas]
+
+    def contar(self, estado: Optional[str] = None, estacion_id: Optional[Union[str, int]] = None,
+               desde: Optional[Union[str, datetime]] = None, hasta: Optional[Union[str, datetime]] = None) -> int:
+        where, parametros = self._where(estado, estacion_id, desde, hasta)
+        return self._leer(f"SELECT COUNT(*) FROM pedidos{where}", parametros)[0][0]
+
+    def posiciones(self, estado: Optional[str] = None, estacion_id: Optional[Union[str, int]] = None,
+                   desde: Optional[Union[str, datetime]] = None,
+                   hasta: Optional[Union[str, datetime]] = None) -> Sequence[int]:
+        """`seq` de las filas que cumplen los filtros, por `timestamp_creado` (array('q'))."""
+        where, parametros = self._where(estado, estacion_id, desde, hasta)
+        filas = self._leer(f"SELECT seq FROM pedidos{where} ORDER BY timestamp_creado, seq", parametros)
+        return array('q', (f[0] for f in filas))
+
+    def leer_posiciones(self, posiciones: Sequence[int]) -> List[Dict]:
+        por_seq: Dict[int, Dict] = {}
+        posiciones = list(posiciones)
+        for i in range(0, len(posiciones), _MAX_PARAMETROS):
+            tramo = posiciones[i:i + _MAX_PARAMETROS]
+            marcas = ', '.join('?' * len(tramo))
+            for fila in self._leer(f"SELECT seq, {_COLUMNAS} FROM pedidos WHERE seq IN ({marcas})", tuple(tramo)):
+                por_seq[fila[0]] = _fila_a_registro(fila[1:])
+        return [por_seq[seq] for seq in posiciones if seq in por_seq]
+
+    def ultimo_numero_id(self, prefijo: str = 'PED-') -> int:
+        """Como `AlmacenPedidos.ultimo_numero_id`, en una consulta sobre el rango del índice por id."""
+        if not prefijo:
+            raise ValueError("prefijo no puede estar vacío")
+        fin = prefijo[:-1] + chr(ord(prefijo[-1]) + 1)  # Rango de los textos que empiezan por `prefijo`
+        filas = self._leer("SELECT MAX(CAST(SUBSTR(id, ?1) AS INTEGER)) FROM pedidos "
+                           "WHERE id >= ?2 AND id < ?3 AND SUBSTR(id, ?1) != '' "
+                           "AND SUBSTR(id, ?1) NOT GLOB '*[^0-9]*'",
+                           (len(prefijo) + 1, prefijo, fin))
+        return filas[0][0] or 0
+
+    # --- metadatos y cierre --------------------------------------------------
+
+    def meta(self, clave: str) -> Optional[str]:
+        """Valor guardado en la tabla `meta` o None."""
+        filas = self._leer('SELECT valor FROM meta WHERE clave = ?', (clave,))
+        return filas[0][0] if filas else None
+
+    def fijar_meta(self, clave: str, valor: str) -> None:
+        """Guardar un valor en la tabla `meta` (se escribe de inmediato)."""
+        with self._lock:
+            self._volcar()
+            self._conexion.execute('INSERT OR REPLACE INTO meta (clave, valor) VALUES (?, ?)', (clave, valor))
+
+    def cerrar(self) -> None:
+        with self._lock:
+            if self._conexion is None:
+                return
+            self._volcar()
+            self._conexion.close()
+            self._conexion = None
+            self._aviso.notify()
+        if self._hilo is not None and self._hilo is not threading.current_thread():
+            self._hilo.join()
+            self._hilo = None
+
+
+def abrir_sqlite(ruta: str, migrar_desde: Optional[Union[str, List[str]]] = None,
+                 **opciones: Any) -> AlmacenSQLite:
+    """Abrir (o crear) la base SQLite, migrando una única vez el historial anterior.
+
+    `migrar_desde` admite la ruta de un journal (directorio) o de un
+    `pedidos.json` (o una lista de ellas); lo migrado se anota en la tabla
+    `meta` para no repetirse. Salida esperada: instancia `AlmacenSQLite`.
+    """
+    almacen = AlmacenSQLite(ruta, **opciones)
+    origenes = [migrar_desde] if isinstance(migrar_desde, str) else list(migrar_desde or [])
+    for origen in origenes:
+        clave = f"migrado:{os.path.abspath(origen)}"
+        if almacen.meta(clave) is not None:
+            continue
+        if os.path.isdir(origen):
+            journal = JournalPedidos(origen)
+            try:
+                registros = list(journal.iterar())
+            finally:
+                journal.cerrar()
+            almacen.guardar_lote(registros)
+            migrados = len(registros)
+        else:
+            migrados = migrar_desde_json(origen, almacen)
+        almacen.fijar_meta(clave, str(migrados))
+    return almacen
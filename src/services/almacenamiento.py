@@ -0,0 +1,576 @@
+"""Módulo `src.services.almacenamiento`.
+
+Define la interfaz de almacenamiento del historial de pedidos y una
+implementación basada en un journal de solo-anexado (una línea JSON por
+registro). Guardar un pedido cuesta O(1) en lugar de releer y reescribir todo
+el historial.
+
+Estructura en disco del journal (un directorio):
+
+    pedidos.journal/
+        segmento-000001.jsonl   # segmentos sellados (solo lectura)
+        segmento-000002.jsonl   # segmento activo (se anexa al final)
+        MIGRADO                 # marca de migración desde pedidos.json
+
+Ejemplo de uso:
+
+from src.services.almacenamiento import abrir_journal
+
+almacen = abrir_journal('pedidos.journal', migrar_desde='pedidos.json')
+almacen.guardar(pedido.as_dict())
+for registro in almacen.iterar():
+    print(registro['id'])
+"""
+from __future__ import annotations
+from typing import Dict, Iterator, List, Optional, Callable, Any, Union, Sequence, Tuple
+from array import array
+from datetime import datetime
+import json
+import os
+import re
+import threading
+import time
+
+
+FSYNC_POLITICAS = ['siempre', 'intervalo', 'nunca']
+
+_PATRON_SEGMENTO = re.compile(r'^segmento-(\d{6})\.jsonl$')
+_MARCA_MIGRACION = 'MIGRADO'
+# Posición en el journal: (nº de segmento << 41) | (compactado << 40) | offset en bytes dentro del
+# segmento. `compactado` dice si el segmento ya venía de una compactación al indexarlo: la compactación
+# reescribe su último segmento con el mismo número, y así un offset anterior a ella se detecta.
+_BITS_OFFSET = 40
+_MASCARA_OFFSET = (1 << _BITS_OFFSET) - 1
+_BIT_COMPACTADO = 1 << _BITS_OFFSET
+_DESPLAZAMIENTO_SEGMENTO = _BITS_OFFSET + 1
+
+
+class PosicionObsoleta(ValueError):
+    """La posición es de un índice anterior a una compactación o purga del journal: hay que volver a pedirlo."""
+
+
+# Codificador JSON compacto reutilizado (json.dumps con opciones crea uno nuevo en cada llamada)
+_a_json = json.JSONEncoder(ensure_ascii=False, separators=(',', ':')).encode
+
+
+def _iso(valor: Optional[Union[str, datetime]]) -> Optional[str]:
+    """Normalizar un límite de fecha a texto ISO (comparable con `timestamp_creado`)."""
+    return valor.isoformat() if isinstance(valor, datetime) else valor
+
+
+def _cumple(registro: Dict, estado: Optional[str], estacion_id: Optional[Union[str, int]],
+            desde: Optional[str], hasta: Optional[str]) -> bool:
+    """¿Cumple el registro los filtros? (`desde`/`hasta` ya en ISO)."""
+    if estado is not None and registro.get('estado') != estado:
+        return False
+    if estacion_id is not None and registro.get('estacion_id') != estacion_id:
+        return False
+    ts = str(registro.get('timestamp_creado') or '')
+    return not ((desde is not None and ts < desde) or (hasta is not None and ts > hasta))
+
+
+class AlmacenPedidos:
+    """Interfaz de almacenamiento del historial de pedidos.
+
+    Las implementaciones guardan registros serializables (normalmente el
+    resultado de `Pedido.as_dict()`) y permiten recorrerlos en orden de
+    inserción.
+    """
+
+    def guardar(self, registro: Dict) -> None:
+        """Persistir un registro.
+
+        Salida esperada: None. Lanza `ValueError` si el registro no es un dict.
+        """
+        raise NotImplementedError()
+
+    def guardar_lote(self, registros: List[Dict]) -> None:
+        """Persistir varios registros de una sola vez.
+
+        Salida esperada: None. Por defecto delega en `guardar` por registro.
+        """
+        for registro in registros:
+            self.guardar(registro)
+
+    def iterar(self) -> Iterator[Dict]:
+        """Recorrer los registros guardados en orden de inserción.
+
+        Salida esperada: iterador de diccionarios.
+        """
+        raise NotImplementedError()
+
+    def actualizar(self, pedido_id: Union[str, int], cambios: Dict) -> None:
+        """Registrar cambios (estado, estacion_id...) del último registro de `pedido_id`.
+
+        Por defecto no hace nada: los almacenes de solo-anexado guardan fotos
+        completas con `guardar`. Los backends con actualización en sitio
+        (p. ej. `AlmacenSQLite`) la sobrescriben.
+        """
+        return None
+
+    def actualizar_lote(self, cambios: Sequence[Tuple[Union[str, int], Dict]]) -> None:
+        """Registrar varios cambios (pedido_id, cambios) de una sola vez, en orden.
+
+        Salida esperada: None. Por defecto delega en `actualizar` por cambio.
+        """
+        for pedido_id, cambio in cambios:
+            self.actualizar(pedido_id, cambio)
+
+    def ultimo_numero_id(self, prefijo: str = 'PED-') -> int:
+        """Mayor N de los ids `prefijo` + N (N solo dígitos) guardados; 0 si no hay ninguno.
+
+        Sirve para que un gestor nuevo continúe la numeración del historial en
+        vez de repetir ids. Por defecto recorre `iterar()`.
+        """
+        ultimo = 0
+        for registro in self.iterar():
+            pedido_id = registro.get('id')
+            if isinstance(pedido_id, str) and pedido_id.startswith(prefijo):
+                numero = pedido_id[len(prefijo):]
+                if numero.isdigit():
+                    ultimo = max(ultimo, int(numero))
+        return ultimo
+
+    def flush(self) -> None:
+        """Forzar la escritura de lo pendiente. Por defecto no hace nada."""
+        return None
+
+    def consultar(self, estado: Optional[str] = None, estacion_id: Optional[Union[str, int]] = None,
+                  desde: Optional[Union[str, datetime]] = None, hasta: Optional[Union[str, datetime]] = None,
+                  limite: Optional[int] = None, desplazamiento: int = 0,
+                  recientes_primero: bool = False) -> List[Dict]:
+        """Devolver los registros que cumplen los filtros, ordenados por `timestamp_creado`.
+
+        `desde`/`hasta` acotan `timestamp_creado` (inclusive; datetime o ISO).
+        Implementación genérica: recorre `iterar()` entero. Los backends con
+        índices la sobrescriben con una consulta indexada.
+
+        Salida esperada: lista de diccionarios.
+        """
+        # Empates de timestamp_creado: por orden de inserción (invertido si recientes_primero)
+        ordenados = sorted(enumerate(self._filtrar(estado, estacion_id, desde, hasta)),
+                           key=lambda ir: (str(ir[1].get('timestamp_creado') or ''), ir[0]),
+                           reverse=recientes_primero)
+        fin = None if limite is None else desplazamiento + limite
+        return [r for _, r in ordenados[desplazamiento:fin]]
+
+    def contar(self, estado: Optional[str] = None, estacion_id: Optional[Union[str, int]] = None,
+               desde: Optional[Union[str, datetime]] = None, hasta: Optional[Union[str, datetime]] = None) -> int:
+        """Número de registros que cumplen los filtros (ver `consultar`)."""
+        return sum(1 for _ in self._filtrar(estado, estacion_id, desde, hasta))
+
+    def posiciones(self, estado: Optional[str] = None, estacion_id: Optional[Union[str, int]] = None,
+                   desde: Optional[Union[str, datetime]] = None,
+                   hasta: Optional[Union[str, datetime]] = None) -> Sequence[int]:
+        """Índice de posiciones de los registros que cumplen los filtros, en orden cronológico.
+
+        Las posiciones son opacas (dependen del backend) y sirven para leer
+        cualquier tramo con `leer_posiciones` sin recorrer lo anterior; si el
+        backend las invalida (compactación del journal), `leer_posiciones`
+        lanza `PosicionObsoleta`. Implementación genérica: ordinal del
+        registro en `iterar()`.
+        """
+        desde, hasta = _iso(desde), _iso(hasta)
+        return array('q', (i for i, r in enumerate(self.iterar()) if _cumple(r, estado, estacion_id, desde, hasta)))
+
+    def leer_posiciones(self, posiciones: Sequence[int]) -> List[Dict]:
+        """Leer los registros de `posiciones` (obtenidas con `posiciones`), en ese orden.
+
+        Implementación genérica: recorre `iterar()` hasta la última pedida.
+        """
+        buscadas = set(posiciones)
+        if not buscadas:
+            return []
+        ultima = max(buscadas)
+        encontrados: Dict[int, Dict] = {}
+        for i, r in enumerate(self.iterar()):
+            if i in buscadas:
+                encontrados[i] = r
+            if i >= ultima:
+                break
+        return [encontrados[p] for p in posiciones if p in encontrados]
+
+    def _filtrar(self, estado, estacion_id, desde, hasta) -> Iterator[Dict]:
+        desde, hasta = _iso(desde), _iso(hasta)
+        for r in self.iterar():
+            if _cumple(r, estado, estacion_id, desde, hasta):
+                yield r
+
+    def cerrar(self) -> None:
+        """Liberar recursos (ficheros, hilos). Idempotente."""
+        return None
+
+
+class JournalPedidos(AlmacenPedidos):
+    """Journal de solo-anexado con segmentos rotativos y compactación.
+
+    Parámetros:
+    - directorio: carpeta donde viven los segmentos.
+    - fsync: 'siempre' (fsync tras cada escritura), 'intervalo' (como mucho
+      uno cada `fsync_intervalo_s` segundos) o 'nunca' (lo decide el SO).
+    - max_bytes_segmento: al superarlo se sella el segmento activo y se abre otro.
+    - compactar_desde: nº de segmentos sellados que dispara la compactación en
+      segundo plano (0 la desactiva).
+    - clave: función opcional registro -> clave; si se indica, al compactar se
+      conserva solo el último registro de cada clave. Sin clave la compactación
+      solo fusiona segmentos (los ids del historial pueden repetirse).
+
+    Limitación: `actualizar` y `actualizar_lote` se heredan de
+    `AlmacenPedidos` y no escriben nada. El journal solo guarda las fotos
+    completas que llegan por `guardar`, así que un `GestorPedidos` con
+    `almacen=JournalPedidos(...)` persiste las altas pero no los cambios de
+    estado o de estación posteriores. Para conservarlos hay que volver a
+    `guardar` la foto del pedido (con `clave` la compactación deja solo la
+    última) o usar un backend con actualización en sitio (`AlmacenSQLite`).
+    """
+
+    def __init__(self, directorio: str, fsync: str = 'intervalo', fsync_intervalo_s: float = 1.0,
+                 max_bytes_segmento: int = 8 * 1024 * 1024, compactar_desde: int = 8,
+                 clave: Optional[Callable[[Dict], Any]] = None) -> None:
+        if fsync not in FSYNC_POLITICAS:
+            raise ValueError(f"Política fsync inválida: {fsync}. Debe ser una de: {', '.join(FSYNC_POLITICAS)}")
+        if max_bytes_segmento <= 0:
+            raise ValueError("max_bytes_segmento debe ser mayor que cero")
+        self.directorio = os.path.abspath(directorio)
+        self.fsync = fsync
+        self.fsync_intervalo_s = fsync_intervalo_s
+        self.max_bytes_segmento = max_bytes_segmento
+        self.compactar_desde = compactar_desde
+        self.clave = clave
+        self._lock = threading.Lock()  # Protege el segmento activo y la lista de segmentos
+        self._lock_compactacion = threading.Lock()  # Solo una compactación a la vez
+        self._hilo_compactacion: Optional[threading.Thread] = None
+        self._ultimo_fsync = time.monotonic()
+        os.makedirs(self.directorio, exist_ok=True)
+        self._recuperar_compactacion_interrumpida()
+        numeros = self._numeros_segmento()
+        self._activo_num = numeros[-1] if numeros else 1
+        self._activo = open(self._ruta_segmento(self._activo_num), 'ab')
+        self._activo_bytes = self._activo.tell()
+
+    # --- rutas y segmentos -------------------------------------------------
+
+    def _ruta_segmento(self, numero: int) -> str:
+        return os.path.join(self.directorio, f"segmento-{numero:06d}.jsonl")
+
+    def _numeros_segmento(self) -> List[int]:
+        numeros = []
+        for nombre in os.listdir(self.directorio):
+            m = _PATRON_SEGMENTO.match(nombre)
+            if m:
+                numeros.append(int(m.group(1)))
+        return sorted(numeros)
+
+    def segmentos(self) -> List[str]:
+        """Devolver las rutas de los segmentos en orden (el último es el activo)."""
+        with self._lock:
+            return [self._ruta_segmento(n) for n in self._numeros_segmento()]
+
+    def _recuperar_compactacion_interrumpida(self) -> None:
+        # Un segmento compactado empieza con {"_compacta": [desde, hasta]}; si el
+        # proceso murió antes de borrar los segmentos fusionados, se borran aquí.
+        for nombre in os.listdir(self.directorio):
+            if nombre.endswith('.jsonl.tmp'):
+                os.remove(os.path.join(self.directorio, nombre))  # Compactación sin terminar
+        for numero in self._numeros_segmento():
+            meta = self._leer_meta(self._ruta_segmento(numero))
+            if meta is None:
+                continue
+            desde, hasta = meta
+            for viejo in range(desde, hasta):
+                ruta = self._ruta_segmento(viejo)
+                if os.path.exists(ruta):
+                    os.remove(ruta)
+
+    @staticmethod
+    def _leer_meta(ruta: str) -> Optional[List[int]]:
+        try:
+            with open(ruta, 'rb') as f:
+                primera = f.readline()
+            registro = json.loads(primera)
+        except (OSError, ValueError):
+            return None
+        if isinstance(registro, dict) and '_compacta' in registro:
+            return registro['_compacta']
+        return None
+
+    # --- escritura ---------------------------------------------------------
+
+    @staticmethod
+    def _codificar(registro: Dict) -> bytes:
+        if not isinstance(registro, dict):
+            raise ValueError("El registro debe ser un diccionario")
+        return (_a_json(registro) + '\n').encode('utf-8')
+
+    def guardar(self, registro: Dict) -> None:
+        self._anexar(self._codificar(registro))
+
+    def guardar_lote(self, registros: List[Dict]) -> None:
+        datos = b''.join(self._codificar(r) for r in registros)
+        if datos:
+            self._anexar(datos)
+
+    def _anexar(self, datos: bytes) -> None:
+        rotado = False
+        with self._lock:
+            if self._activo.closed:
+                raise ValueError("El journal está cerrado")
+            self._activo.write(datos)
+            self._activo_bytes += len(datos)
+            self._aplicar_fsync()
+            if self._activo_bytes >= self.max_bytes_segmento:
+                self._rotar()
+                rotado = True
+        if rotado and self.compactar_desde and len(self._numeros_segmento()) - 1 >= self.compactar_desde:
+            self.compactar_en_segundo_plano()
+
+    def _aplicar_fsync(self, forzar: bool = False) -> None:
+        # Siempre se vacía el buffer de Python al SO; el fsync depende de la política
+        self._activo.flush()
+        if self.fsync == 'nunca':
+            return
+        ahora = time.monotonic()
+        if forzar or self.fsync == 'siempre' or ahora - self._ultimo_fsync >= self.fsync_intervalo_s:
+            os.fsync(self._activo.fileno())
+            self._ultimo_fsync = ahora
+
+    def _rotar(self) -> None:
+        # Se llama con self._lock tomado: sella el segmento activo y abre el siguiente
+        self._aplicar_fsync(forzar=True)
+        self._activo.close()
+        self._activo_num += 1
+        self._activo = open(self._ruta_segmento(self._activo_num), 'ab')
+        self._activo_bytes = 0
+
+    def rotar(self) -> int:
+        """Sellar el segmento activo y abrir uno nuevo (si el activo tiene datos).
+
+        Salida esperada: número del segmento activo tras la llamada; lo que se
+        guarde a partir de ahora queda en ese segmento o en posteriores.
+        """
+        with self._lock:
+            if self._activo.closed:
+                raise ValueError("El journal está cerrado")
+            if self._activo_bytes:
+                self._rotar()
+            return self._activo_num
+
+    def purgar_anteriores(self, numero: int) -> int:
+        """Borrar los segmentos sellados con número menor que `numero`.
+
+        Útil tras un checkpoint: lo anterior ya está en la foto. Salida
+        esperada: número de segmentos borrados.
+        """
+        with self._lock_compactacion:
+            with self._lock:
+                viejos = [n for n in self._numeros_segmento() if n < numero and n != self._activo_num]
+            for n in viejos:
+                os.remove(self._ruta_segmento(n))
+            return len(viejos)
+
+    def flush(self) -> None:
+        """Forzar escritura a disco del segmento activo (respeta fsync='nunca')."""
+        with self._lock:
+            if not self._activo.closed:
+                self._aplicar_fsync(forzar=True)
+
+    # --- lectura -----------------------------------------------------------
+
+    def iterar(self) -> Iterator[Dict]:
+        return self.iterar_desde(0)
+
+    def iterar_desde(self, numero: int) -> Iterator[Dict]:
+        """Recorrer en orden los registros de los segmentos con número >= `numero`."""
+        with self._lock:
+            if not self._activo.closed:
+                self._activo.flush()
+            rutas = [self._ruta_segmento(n) for n in self._numeros_segmento() if n >= numero]
+        for ruta in rutas:
+            yield from self._iterar_segmento(ruta)
+
+    def posiciones(self, estado: Optional[str] = None, estacion_id: Optional[Union[str, int]] = None,
+                   desde: Optional[Union[str, datetime]] = None,
+                   hasta: Optional[Union[str, datetime]] = None) -> Sequence[int]:
+        """Índice de offsets de los registros que cumplen los filtros (orden de inserción).
+
+        Cada posición empaqueta (nº de segmento, si el segmento estaba
+        compactado, offset en bytes) en un entero de un `array('q')`: una
+        pasada en streaming construye el índice y después cualquier página se
+        lee con `seek` directo. Una compactación o purga posterior invalida
+        el índice: `leer_posiciones` lanza `PosicionObsoleta` en lugar de leer
+        otro registro; basta con volver a pedirlo.
+        """
+        desde, hasta = _iso(desde), _iso(hasta)
+        with self._lock:
+            if not self._activo.closed:
+                self._activo.flush()
+            numeros = self._numeros_segmento()
+        indice = array('q')
+        for numero in numeros:
+            base = numero << _DESPLAZAMIENTO_SEGMENTO
+            for offset, registro in self._iterar_segmento_con_offsets(self._ruta_segmento(numero), con_meta=True):
+                if '_compacta' in registro:
+                    base |= _BIT_COMPACTADO  # La meta es la primera línea: vale para todo el segmento
+                elif _cumple(registro, estado, estacion_id, desde, hasta):
+                    indice.append(base | offset)
+        return indice
+
+    def leer_posiciones(self, posiciones: Sequence[int]) -> List[Dict]:
+        """Leer los registros de `posiciones` con `seek` directo, en ese orden.
+
+        Lanza `PosicionObsoleta` si alguna posición es de antes de una
+        compactación o purga de su segmento.
+        """
+        registros: List[Dict] = []
+        abiertos: Dict[int, Tuple[Any, int]] = {}  # nº de segmento -> (fichero, bit compactado)
+        try:
+            for posicion in posiciones:
+                numero, offset = posicion >> _DESPLAZAMIENTO_SEGMENTO, posicion & _MASCARA_OFFSET
+                abierto = abiertos.get(numero)
+                if abierto is None:
+                    try:
+                        f = open(self._ruta_segmento(numero), 'rb')
+                    except FileNotFoundError:
+                        raise PosicionObsoleta(f"El segmento {numero} ya no existe (compactado o purgado)") from None
+                    # La meta se lee del mismo descriptor: un reemplazo posterior no cambia lo que se lee
+                    abierto = abiertos[numero] = (f, _BIT_COMPACTADO if self._es_compactado(f) else 0)
+                f, compactado = abierto
+                if posicion & _BIT_COMPACTADO != compactado:
+                    raise PosicionObsoleta(f"El segmento {numero} se compactó después de construir el índice")
+                f.seek(offset)
+                try:
+                    registros.append(json.loads(f.readline()))
+                except ValueError:
+                    continue
+        finally:
+            for f, _ in abiertos.values():
+                f.close()
+        return registros
+
+    @staticmethod
+    def _es_compactado(f: Any) -> bool:
+        f.seek(0)
+        try:
+            registro = json.loads(f.readline())
+        except ValueError:
+            return False
+        return isinstance(registro, dict) and '_compacta' in registro
+
+    @staticmethod
+    def _iterar_segmento_con_offsets(ruta: str, con_meta: bool = False) -> Iterator[Tuple[int, Dict]]:
+        try:
+            f = open(ruta, 'rb')
+        except FileNotFoundError:
+            return  # Compactado mientras se iteraba; su contenido está en un segmento posterior
+        with f:
+            offset = 0
+            for linea in f:
+                inicio, offset = offset, offset + len(linea)
+                if not linea.endswith(b'\n'):
+                    break  # Escritura incompleta al final del segmento (caída del proceso)
+                try:
+                    registro = json.loads(linea)
+                except ValueError:
+                    continue
+                if isinstance(registro, dict) and (con_meta or '_compacta' not in registro):
+                    yield inicio, registro
+
+    @classmethod
+    def _iterar_segmento(cls, ruta: str) -> Iterator[Dict]:
+        for _, registro in cls._iterar_segmento_con_offsets(ruta):
+            yield registro
+
+    # --- compactación ------------------------------------------------------
+
+    def compactar(self) -> bool:
+        """Fusionar los segmentos sellados en uno solo.
+
+        El resultado reemplaza al último segmento sellado (mismo número, ya
+        marcado como compactado): las posiciones indexadas antes dejan de
+        valer (ver `leer_posiciones`).
+
+        Salida esperada: True si se compactó algo, False si no había al menos
+        dos segmentos sellados.
+        """
+        with self._lock_compactacion:
+            with self._lock:
+                sellados = [n for n in self._numeros_segmento() if n != self._activo_num]
+            if len(sellados) < 2:
+                return False
+            desde, hasta = sellados[0], sellados[-1]
+            registros: Iterator[Dict] = (r for n in sellados for r in self._iterar_segmento(self._ruta_segmento(n)))
+            if self.clave is not None:
+                ultimos: Dict[Any, Dict] = {}
+                for r in registros:
+                    k = self.clave(r)
+                    ultimos.pop(k, None)  # Reinsertar para conservar el orden del último
+                    ultimos[k] = r
+                registros = iter(ultimos.values())
+            destino = self._ruta_segmento(hasta)
+            temporal = destino + '.tmp'
+            with open(temporal, 'wb') as f:
+                f.write(self._codificar({'_compacta': [desde, hasta]}))
+                for r in registros:
+                    f.write(self._codificar(r))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temporal, destino)
+            for n in sellados[:-1]:
+                os.remove(self._ruta_segmento(n))
+            return True
+
+    def compactar_en_segundo_plano(self) -> Optional[threading.Thread]:
+        """Lanzar `compactar` en un hilo daemon si no hay otro en curso.
+
+        Salida esperada: el hilo lanzado o None si ya había una compactación activa.
+        """
+        if self._hilo_compactacion is not None and self._hilo_compactacion.is_alive():
+            return None
+        hilo = threading.Thread(target=self.compactar, name='journal-compactacion', daemon=True)
+        self._hilo_compactacion = hilo
+        hilo.start()
+        return hilo
+
+    def cerrar(self) -> None:
+        hilo = self._hilo_compactacion
+        if hilo is not None:
+            hilo.join()
+        with self._lock:
+            if not self._activo.closed:
+                self._aplicar_fsync(forzar=True)
+                self._activo.close()
+
+
+def migrar_desde_json(ruta_json: str, almacen: AlmacenPedidos) -> int:
+    """Copiar el array de `pedidos.json` al almacén indicado.
+
+    Salida esperada: número de registros migrados (0 si el fichero no existe
+    o no contiene un array JSON válido). Las entradas que no son un dict con
+    'id' se omiten.
+    """
+    try:
+        with open(ruta_json, 'r', encoding='utf-8') as f:
+            pedidos = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return 0
+    if not isinstance(pedidos, list):
+        return 0
+    registros = [p for p in pedidos if isinstance(p, dict) and p.get('id') is not None]
+    almacen.guardar_lote(registros)
+    return len(registros)
+
+
+def abrir_journal(directorio: str, migrar_desde: Optional[str] = None, **opciones: Any) -> JournalPedidos:
+    """Abrir (o crear) un journal, migrando una única vez desde `migrar_desde`.
+
+    La migración deja una marca `MIGRADO` en el directorio para no repetirse.
+    Salida esperada: instancia `JournalPedidos` lista para usar.
+    """
+    journal = JournalPedidos(directorio, **opciones)
+    marca = os.path.join(journal.directorio, _MARCA_MIGRACION)
+    if migrar_desde and not os.path.exists(marca):
+        migrados = migrar_desde_json(migrar_desde, journal)
+        journal.flush()
+        with open(marca, 'w', encoding='utf-8') as f:
+            f.write(f"{os.path.abspath(migrar_desde)}\t{migrados}\n")
+    return journal
@@ -0,0 +1,386 @@
+"""Módulo `src.services.analitica`.
+
+Caché analítica columnar del historial de pedidos. En lugar de releer el
+historial y recorrer los dicts de `as_dict()` en cada consulta, mantiene
+columnas empaquetadas (`array`) que se amplían de forma incremental al guardar
+cada pedido y sobre las que se agregan los datos de forma vectorizada con
+NumPy (o con bucles de Python si NumPy no está instalado).
+
+Columnas por pedido: instante de creación, hora local, total, estado, minutos
+teóricos de preparación y duraciones reales de espera (EN_COLA ->
+EN_PREPARACION) y preparación (EN_PREPARACION -> LISTO).
+Columnas por línea: fila del pedido, producto, qty e importe.
+
+Las duraciones reales llegan por `BUS_EVENTOS` (la analítica es un
+`SinkEventos`); los pedidos, por `AlmacenAnalitico`, que envuelve al almacén
+y registra cada pedido que se guarda.
+
+Ejemplo de uso:
+
+from src.services.analitica import AnaliticaPedidos
+
+analitica = AnaliticaPedidos.desde_almacen(almacen)   # carga inicial del historial
+almacen = analitica.envolver(almacen)                 # y desde aquí, incremental
+gestor = GestorPedidos(almacen=almacen)
+analitica.ingresos_por_producto()
+analitica.pedidos_por_hora()
+analitica.percentiles_preparacion()                   # {'p50_min': ..., 'p95_min': ...}
+
+o desde consola, sobre el historial de la app:
+
+    python -m src.services.analitica
+"""
+from __future__ import annotations
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+from array import array
+from datetime import datetime, timedelta
+import argparse
+import math
+import threading
+
+try:  # NumPy es opcional: sin él las agregaciones recorren las columnas en Python
+    import numpy as np
+except ImportError:  # pragma: no cover - depende del entorno
+    np = None
+
+from .almacenamiento import AlmacenPedidos, _iso
+from ..models.eventos import BUS_EVENTOS, EventoTransicion, SinkEventos
+from ..models.pedido import Pedido
+from ..utils.utils import percentil
+
+_CODIGO_ESTADO = {estado: i for i, estado in enumerate(Pedido.ESTADOS_VALIDOS)}
+_CANCELADO = _CODIGO_ESTADO['CANCELADO']
+_EPOCA = datetime(1970, 1, 1)
+_NAN = float('nan')
+
+
+def _vista(columna: array, dtype: str) -> Any:
+    # Copia (memcpy) en lugar de vista: un array con buffers exportados no puede crecer
+    return np.frombuffer(columna, dtype=dtype).copy()
+
+
+class AnaliticaPedidos(SinkEventos):
+    """Columnas del historial con agregaciones vectorizadas.
+
+    Los filtros `desde`/`hasta` (datetime o ISO, inclusive) acotan el
+    instante de creación. Los pedidos CANCELADOS no cuentan como ingresos.
+    Un id repetido (los ids se reinician en cada ejecución) se asocia a su
+    última fila para las actualizaciones de estado.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # Columnas por pedido
+        self._ts = array('d')            # epoch de creación
+        self._hora = array('q')          # horas locales desde 1970 (para agrupar por hora)
+        self._total = array('d')
+        self._estado = array('b')
+        self._prep_teorica = array('d')  # minutos (sum prep_time_min * qty)
+        self._espera_s = array('d')      # NaN hasta conocerse
+        self._prep_s = array('d')
+        # Columnas por línea
+        self._linea_fila = array('q')
+        self._linea_producto = array('l')
+        self._linea_qty = array('l')
+        self._linea_importe = array('d')
+        # Productos (por nombre) y última fila de cada id
+        self._productos: List[str] = []
+        self._codigo_producto: Dict[str, int] = {}
+        self._fila_por_id: Dict[Union[str, int], int] = {}
+
+    # --- ingesta -------------------------------------------------------------
+
+    def _codigo(self, nombre: str) -> int:
+        codigo = self._codigo_producto.get(nombre)
+        if codigo is None:
+            codigo = self._codigo_producto[nombre] = len(self._productos)
+            self._productos.append(nombre)
+        return codigo
+
+    def _agregar(self, registro: Dict) -> None:
+        # Se llama con self._lock tomado
+        creado = registro.get('timestamp_creado')
+        if isinstance(creado, str):
+            creado = datetime.fromisoformat(creado)
+        elif not isinstance(creado, datetime):
+            creado = datetime.now()
+        fila = len(self._ts)
+        prep = 0.0
+        total = 0.0
+        for it in registro.get('items') or ():
+            qty = int(it.get('qty', 1))
+            price = float(it.get('price', 0.0))
+            prep += qty * float(it.get('prep_time_min', 0))
+            total += qty * price
+            self._linea_fila.append(fila)
+            self._linea_producto.append(self._codigo(it.get('name', 'N/A')))
+            self._linea_qty.append(qty)
+            self._linea_importe.append(qty * price)
+        self._ts.append(creado.timestamp())
+        self._hora.append((creado.replace(tzinfo=None) - _EPOCA) // timedelta(hours=1))
+        self._total.append(float(registro['total_price']) if registro.get('total_price') is not None else total)
+        self._estado.append(_CODIGO_ESTADO.get(registro.get('estado'), 0))
+        self._prep_teorica.append(prep)
+        self._espera_s.append(_NAN)
+        self._prep_s.append(_NAN)
+        self._fila_por_id[registro.get('id')] = fila
+
+    def registrar(self, registro: Dict) -> None:
+        """Añadir un pedido guardado (con la forma de `Pedido.as_dict()`). O(nº de líneas)."""
+        if not isinstance(registro, dict):
+            raise ValueError("El registro debe ser un diccionario")
+        with self._lock:
+            self._agregar(registro)
+
+    def registrar_lote(self, registros: Sequence[Dict]) -> None:
+        with self._lock:
+            for registro in registros:
+                if isinstance(registro, dict):
+                    self._agregar(registro)
+
+    def publicar(self, evento: EventoTransicion) -> None:
+        """Actualizar estado y duraciones del pedido a partir de un evento de transición."""
+        with self._lock:
+            fila = self._fila_por_id.get(evento.pedido_id)
+            if fila is None:
+                return
+            self._estado[fila] = _CODIGO_ESTADO[evento.nuevo]
+            latencia = evento.latencia_s
+            if latencia is None:
+                return
+            if evento.anterior == 'EN_COLA' and evento.nuevo == 'EN_PREPARACION':
+                self._espera_s[fila] = latencia
+            elif evento.anterior == 'EN_PREPARACION' and evento.nuevo == 'LISTO':
+                self._prep_s[fila] = latencia
+
+    @classmethod
+    def desde_almacen(cls, almacen: AlmacenPedidos, tam_lote: int = 10_000) -> 'AnaliticaPedidos':
+        """Construir la analítica recorriendo el historial en streaming (por lotes)."""
+        analitica = cls()
+        lote: List[Dict] = []
+        for registro in almacen.iterar():
+            lote.append(registro)
+            if len(lote) >= tam_lote:
+                analitica.registrar_lote(lote)
+                lote = []
+        analitica.registrar_lote(lote)
+        return analitica
+
+    def envolver(self, almacen: AlmacenPedidos, suscribir: bool = True) -> 'AlmacenAnalitico':
+        """Devolver `almacen` envuelto para alimentar la analítica en cada guardado.
+
+        Con `suscribir` también se suscribe a `BUS_EVENTOS` para recibir los
+        cambios de estado y las duraciones reales.
+        """
+        if suscribir:
+            BUS_EVENTOS.suscribir(self)
+        return AlmacenAnalitico(almacen, self)
+
+    def __len__(self) -> int:
+        return len(self._ts)
+
+    # --- agregaciones --------------------------------------------------------
+
+    def _mascara_filas(self, desde, hasta, excluir_cancelados: bool) -> Any:
+        # Con NumPy: array bool por fila; sin NumPy: lista de bool
+        inicio = datetime.fromisoformat(_iso(desde)).timestamp() if desde is not None else None
+        fin = datetime.fromisoformat(_iso(hasta)).timestamp() if hasta is not None else None
+        if np is not None:
+            ts = _vista(self._ts, 'f8')
+            mascara = np.ones(len(ts), dtype=bool)
+            if inicio is not None:
+                mascara &= ts >= inicio
+            if fin is not None:
+                mascara &= ts <= fin
+            if excluir_cancelados:
+                mascara &= _vista(self._estado, 'i1') != _CANCELADO
+            return mascara
+        return [(inicio is None or t >= inicio) and (fin is None or t <= fin)
+                and not (excluir_cancelados and e == _CANCELADO)
+                for t, e in zip(self._ts, self._estado)]
+
+    def _por_producto(self, columna: array, dtype: str, desde, hasta) -> Dict[str, float]:
+        with self._lock:
+            filas = self._mascara_filas(desde, hasta, excluir_cancelados=True)
+            if np is not None:
+                productos = _vista(self._linea_producto, self._linea_producto.typecode)
+                mascara = filas[_vista(self._linea_fila, 'i8')]
+                sumas = np.bincount(productos[mascara], weights=_vista(columna, dtype)[mascara],
+                                    minlength=len(self._productos)).tolist()
+            else:
+                sumas = [0.0] * len(self._productos)
+                for fila, producto, valor in zip(self._linea_fila, self._linea_producto, columna):
+                    if filas[fila]:
+                        sumas[producto] += valor
+            nombres = list(self._productos)
+        resultado = {nombre: suma for nombre, suma in zip(nombres, sumas) if suma}
+        return dict(sorted(resultado.items(), key=lambda kv: kv[1], reverse=True))
+
+    def ingresos_por_producto(self, desde: Optional[Union[str, datetime]] = None,
+                              hasta: Optional[Union[str, datetime]] = None) -> Dict[str, float]:
+        """Ingresos (qty * price) por producto, de mayor a menor, sin pedidos cancelados."""
+        return {k: round(v, 2) for k, v in self._por_producto(self._linea_importe, 'f8', desde, hasta).items()}
+
+    def cantidades_por_producto(self, desde: Optional[Union[str, datetime]] = None,
+                                hasta: Optional[Union[str, datetime]] = None) -> Dict[str, int]:
+        """Unidades vendidas por producto, de mayor a menor, sin pedidos cancelados."""
+        return {k: int(v) for k, v in self._por_producto(self._linea_qty, self._linea_qty.typecode,
+                                                          desde, hasta).items()}
+
+    def pedidos_por_hora(self, desde: Optional[Union[str, datetime]] = None,
+                         hasta: Optional[Union[str, datetime]] = None,
+                         hora_del_dia: bool = False) -> Dict[str, int]:
+        """Número de pedidos creados por hora (incluye cancelados).
+
+        Salida esperada: {'2025-11-18T13:00': n, ...} en orden cronológico, o
+        con `hora_del_dia` {'00': n, ..., '23': n} acumulando todos los días.
+        """
+        with self._lock:
+            filas = self._mascara_filas(desde, hasta, excluir_cancelados=False)
+            if np is not None:
+                horas = _vista(self._hora, 'i8')[filas]
+                if hora_del_dia:
+                    conteos = np.bincount(horas % 24, minlength=24).tolist()
+                    return {f"{h:02d}": n for h, n in enumerate(conteos)}
+                claves, conteos = np.unique(horas, return_counts=True)
+                pares = zip(claves.tolist(), conteos.tolist())
+            else:
+                horas = [h for h, ok in zip(self._hora, filas) if ok]
+                if hora_del_dia:
+                    conteos = [0] * 24
+                    for h in horas:
+                        conteos[h % 24] += 1
+                    return {f"{h:02d}": n for h, n in enumerate(conteos)}
+                acumulado: Dict[int, int] = {}
+                for h in horas:
+                    acumulado[h] = acumulado.get(h, 0) + 1
+                pares = sorted(acumulado.items())
+        return {(_EPOCA + timedelta(hours=h)).strftime('%Y-%m-%dT%H:00'): n for h, n in pares}
+
+    def percentiles_preparacion(self, percentiles: Sequence[float] = (50, 95), real: Optional[bool] = None,
+                                desde: Optional[Union[str, datetime]] = None,
+                                hasta: Optional[Union[str, datetime]] = None) -> Dict[str, float]:
+        """Percentiles (nearest-rank) del tiempo de preparación en minutos.
+
+        - real=True: duración medida EN_PREPARACION -> LISTO (eventos).
+        - real=False: minutos teóricos del pedido (prep_time_min * qty).
+        - None (defecto): real si hay alguna medición, si no teórico.
+
+        Salida esperada: {'n': ..., 'fuente': 'real'|'teorica', 'p50_min': ..., 'p95_min': ...}.
+        """
+        with self._lock:
+            filas = self._mascara_filas(desde, hasta, excluir_cancelados=True)
+            if np is not None:
+                medidos = _vista(self._prep_s, 'f8')[filas] / 60.0
+                medidos = medidos[~np.isnan(medidos)]
+                if real or (real is None and len(medidos)):
+                    valores, fuente = medidos, 'real'
+                else:
+                    valores, fuente = _vista(self._prep_teorica, 'f8')[filas], 'teorica'
+                n = int(len(valores))
+                calculados = (np.percentile(valores, list(percentiles), method='inverted_cdf').tolist()
+                              if n else [0.0] * len(percentiles))
+            else:
+                medidos = [s / 60.0 for s, ok in zip(self._prep_s, filas) if ok and not math.isnan(s)]
+                if real or (real is None and medidos):
+                    valores, fuente = sorted(medidos), 'real'
+                else:
+                    valores, fuente = sorted(m for m, ok in zip(self._prep_teorica, filas) if ok), 'teorica'
+                n = len(valores)
+                calculados = [percentil(valores, p) for p in percentiles]
+        resultado: Dict[str, Any] = {'n': n, 'fuente': fuente}
+        for p, valor in zip(percentiles, calculados):
+            resultado[f"p{p:g}_min"] = float(valor)
+        return resultado
+
+    def resumen(self, desde: Optional[Union[str, datetime]] = None,
+                hasta: Optional[Union[str, datetime]] = None) -> Dict[str, Any]:
+        """Pedidos, cancelados, ingresos y ticket medio del periodo."""
+        with self._lock:
+            todas = self._mascara_filas(desde, hasta, excluir_cancelados=False)
+            validas = self._mascara_filas(desde, hasta, excluir_cancelados=True)
+            if np is not None:
+                pedidos, cobrados = int(todas.sum()), int(validas.sum())
+                ingresos = float(_vista(self._total, 'f8')[validas].sum())
+            else:
+                pedidos, cobrados = sum(todas), sum(validas)
+                ingresos = sum(t for t, ok in zip(self._total, validas) if ok)
+        return {'pedidos': pedidos, 'cancelados': pedidos - cobrados, 'ingresos': round(ingresos, 2),
+                'ticket_medio': round(ingresos / cobrados, 2) if cobrados else 0.0}
+
+
+class AlmacenAnalitico(AlmacenPedidos):
+    """Envuelve un `AlmacenPedidos` y registra en la analítica cada pedido guardado.
+
+    El resto de operaciones se delegan tal cual en el almacén envuelto.
+    """
+
+    def __init__(self, almacen: AlmacenPedidos, analitica: AnaliticaPedidos) -> None:
+        self.almacen = almacen
+        self.analitica = analitica
+
+    def guardar(self, registro: Dict) -> None:
+        self.almacen.guardar(registro)
+        self.analitica.registrar(registro)
+
+    def guardar_lote(self, registros: List[Dict]) -> None:
+        self.almacen.guardar_lote(registros)
+        self.analitica.registrar_lote(registros)
+
+    def iterar(self) -> Iterator[Dict]:
+        return self.almacen.iterar()
+
+    def actualizar(self, pedido_id: Union[str, int], cambios: Dict) -> None:
+        self.almacen.actualizar(pedido_id, cambios)
+
+    def actualizar_lote(self, cambios: Sequence[Tuple[Union[str, int], Dict]]) -> None:
+        self.almacen.actualizar_lote(cambios)
+
+    def flush(self) -> None:
+        self.almacen.flush()
+
+    def consultar(self, *args: Any, **kwargs: Any) -> List[Dict]:
+        return self.almacen.consultar(*args, **kwargs)
+
+    def contar(self, *args: Any, **kwargs: Any) -> int:
+        return self.almacen.contar(*args, **kwargs)
+
+    def posiciones(self, *args: Any, **kwargs: Any) -> Sequence[int]:
+        return self.almacen.posiciones(*args, **kwargs)
+
+    def leer_posiciones(self, posiciones: Sequence[int]) -> List[Dict]:
+        return self.almacen.leer_posiciones(posiciones)
+
+    def cerrar(self) -> None:
+        BUS_EVENTOS.desuscribir(self.analitica)
+        self.almacen.cerrar()
+
+
+def formatear_reporte(analitica: AnaliticaPedidos, top: int = 10) -> str:
+    """Devolver un resumen legible de la analítica."""
+    r = analitica.resumen()
+    prep = analitica.percentiles_preparacion()
+    lineas = [f"Pedidos: {r['pedidos']}  cancelados: {r['cancelados']}  ingresos: ${r['ingresos']:.2f}  "
+              f"ticket medio: ${r['ticket_medio']:.2f}",
+              f"Preparación ({prep['fuente']}, n={prep['n']}): p50 {prep['p50_min']:.1f} min  "
+              f"p95 {prep['p95_min']:.1f} min",
+              "", f"Top {top} productos por ingresos:"]
+    for nombre, ingresos in list(analitica.ingresos_por_producto().items())[:top]:
+        lineas.append(f"  {nombre:30s} ${ingresos:10.2f}")
+    lineas += ["", "Pedidos por hora del día:"]
+    for hora, n in analitica.pedidos_por_hora(hora_del_dia=True).items():
+        if n:
+            lineas.append(f"  {hora}:00  {n}")
+    return '\n'.join(lineas)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='Analítica del historial de pedidos')
+    parser.add_argument('--top', type=int, default=10, help='productos a mostrar')
+    args = parser.parse_args(argv)
+    from ..main import obtener_almacen  # Import diferido: src.main importa los servicios
+    print(formatear_reporte(AnaliticaPedidos.desde_almacen(obtener_almacen()), top=args.top))
+
+
+if __name__ == '__main__':
+    main()
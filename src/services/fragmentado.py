@@ -0,0 +1,396 @@
+"""Módulo `src.services.fragmentado`.
+
+Motor de pedidos repartido en varios procesos para usar más de un núcleo (un
+solo `GestorPedidos` queda limitado por el GIL).
+
+- Cada cocina es un `GestorPedidos` con sus estaciones. Las cocinas se
+  reparten por turnos entre `procesos` procesos trabajadores (fragmentos).
+- `GestorFragmentado` es el enrutador. Asigna los ids (PED-0001, ...) y envía
+  cada pedido a la cocina indicada o, si no se indica, a la que toca por hash
+  del id (crc32, estable entre procesos). Ofrece la misma API que
+  `GestorPedidos` (`crear_pedido`, `asignar_a_estacion`,
+  `asignar_automaticamente`, `obtener_pedido`, `listar_pedidos`...) y fusiona
+  los listados de todos los fragmentos.
+- Los `Pedido` devueltos son copias (reconstruidas con `Pedido.from_dict`):
+  modificarlas no cambia el pedido del fragmento.
+- Las operaciones por lotes (`crear_pedidos`, `avanzar`) envían un mensaje por
+  fragmento y esperan las respuestas después, así los fragmentos trabajan en
+  paralelo.
+
+Ejemplo de uso:
+
+from src.services.fragmentado import GestorFragmentado
+
+cocinas = {'norte': [('A', 2), ('B', 3)], 'sur': [('C', 1), ('D', 3)]}
+with GestorFragmentado(cocinas, procesos=2) as motor:
+    pedido = motor.crear_pedido(items, cliente_info={'telefono': '600111222'}, cocina='norte')
+    motor.asignar_automaticamente(pedido.id)
+    ids = motor.crear_pedidos([{'items': items}] * 1000, politica='menor_carga')
+    motor.avanzar()
+    motor.listar_pedidos(estado='EN_PREPARACION')
+"""
+from __future__ import annotations
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+import multiprocessing
+import os
+import re
+import threading
+import zlib
+
+from ..models.estacion_cocina import EstacionCocina
+from ..models.pedido import Pedido
+from .gestor_pedidos import GestorPedidos
+
+# Cocinas: nombre -> [(id de estación, capacidad), ...]
+DefinicionCocinas = Dict[str, List[Tuple[Union[str, int], int]]]
+
+_PATRON_ID = re.compile(r'^PED-(\d+)$')
+
+
+# --- lado del trabajador ---------------------------------------------------
+
+def _op_crear(gestores: Dict[str, GestorPedidos], solicitudes: List[Tuple], politica: Optional[str],
+              registros: bool) -> List[Tuple[Any, Any, Optional[str]]]:
+    """Crear (y despachar con `GestorPedidos.despachar` si hay `politica`) cada (cocina, id, items, cliente_info).
+
+    Salida: por solicitud (registro o id, estación asignada, error o None).
+    """
+    resultados = []
+    for cocina, pedido_id, items, cliente_info in solicitudes:
+        gestor = gestores[cocina]
+        try:
+            pedido = gestor.crear_pedido(items, cliente_info, pedido_id=pedido_id)
+        except ValueError as error:
+            resultados.append((pedido_id, None, str(error)))
+            continue
+        if politica:
+            gestor.despachar(pedido_id, politica)  # Sin hueco: espera en la cola de su cocina
+        resultados.append((pedido.as_dict() if registros else pedido_id, pedido.estacion_id, None))
+    return resultados
+
+
+def _op_asignar(gestores: Dict[str, GestorPedidos], cocina: str, pedido_id, estacion_id) -> bool:
+    return gestores[cocina].asignar_a_estacion(pedido_id, estacion_id)
+
+
+def _op_asignar_auto(gestores: Dict[str, GestorPedidos], cocina: str, pedido_id, politica: str):
+    return gestores[cocina].asignar_automaticamente(pedido_id, politica)
+
+
+def _op_cancelar(gestores: Dict[str, GestorPedidos], cocina: str, pedido_id) -> bool:
+    return gestores[cocina].cancelar_pedido(pedido_id)
+
+
+def _op_obtener(gestores: Dict[str, GestorPedidos], cocina: str, pedido_id) -> Optional[Dict]:
+    pedido = gestores[cocina].obtener_pedido(pedido_id)
+    return None if pedido is None else pedido.as_dict()
+
+
+def _op_listar(gestores: Dict[str, GestorPedidos], cocina: Optional[str], estado, estacion_id,
+               telefono) -> List[Dict]:
+    elegidos = [gestores[cocina]] if cocina is not None else gestores.values()
+    return [p.as_dict() for g in elegidos for p in g.listar_pedidos(estado, estacion_id, telefono)]
+
+
+def _op_contar(gestores: Dict[str, GestorPedidos], estado: Optional[str]) -> int:
+    return sum(len(g.listar_pedidos(estado)) if estado else len(g.pedidos) for g in gestores.values())
+
+
+def _op_avanzar(gestores: Dict[str, GestorPedidos]) -> int:
+    """Un paso de cocina: finalizar lo que está en preparación e iniciar colas.
+
+    Cada hueco liberado lo ocupa en el acto la cola de espera del gestor.
+    """
+    finalizados = 0
+    for gestor in gestores.values():
+        for estacion in gestor.estaciones.values():
+            for pedido in estacion.en_preparacion:
+                finalizados += estacion.finalizar_pedido(pedido.id)
+        for estacion in gestor.estaciones.values():
+            estacion.iniciar_preparacion()
+    return finalizados
+
+
+def _op_metricas_espera(gestores: Dict[str, GestorPedidos]) -> Dict[str, Dict]:
+    return {cocina: gestor.metricas_espera() for cocina, gestor in gestores.items()}
+
+
+def _op_metricas_rodantes(gestores: Dict[str, GestorPedidos], serie: bool) -> Dict[str, Dict]:
+    return {cocina: gestor.metricas_rodantes(serie=serie) for cocina, gestor in gestores.items()}
+
+
+_OPERACIONES: Dict[str, Callable[..., Any]] = {
+    'crear': _op_crear,
+    'asignar': _op_asignar,
+    'asignar_auto': _op_asignar_auto,
+    'cancelar': _op_cancelar,
+    'obtener': _op_obtener,
+    'listar': _op_listar,
+    'contar': _op_contar,
+    'avanzar': _op_avanzar,
+    'metricas_espera': _op_metricas_espera,
+    'metricas_rodantes': _op_metricas_rodantes,
+}
+
+
+def _servir(conexion, cocinas: DefinicionCocinas) -> None:
+    """Bucle de un proceso trabajador: un `GestorPedidos` por cocina y un mensaje (op, args) cada vez."""
+    gestores: Dict[str, GestorPedidos] = {}
+    for cocina, estaciones in cocinas.items():
+        gestor = gestores[cocina] = GestorPedidos()
+        for estacion_id, capacidad in estaciones:
+            gestor.registrar_estacion(EstacionCocina(estacion_id, capacidad=capacidad))
+    while True:
+        try:
+            op, args = conexion.recv()
+        except (EOFError, KeyboardInterrupt):
+            break
+        if op == 'fin':
+            conexion.send(('ok', None))
+            break
+        try:
+            conexion.send(('ok', _OPERACIONES[op](gestores, *args)))
+        except Exception as error:  # Se relanza en el enrutador
+            conexion.send(('error', error))
+    conexion.close()
+
+
+# --- enrutador -------------------------------------------------------------
+
+def _orden_id(registro: Dict) -> Tuple[int, str]:
+    pedido_id = str(registro['id'])
+    m = _PATRON_ID.match(pedido_id)
+    return (int(m.group(1)), pedido_id) if m else (0, pedido_id)
+
+
+class GestorFragmentado:
+    """Enrutador de un motor de pedidos repartido en procesos.
+
+    Parámetros:
+    - cocinas: nombre -> [(id de estación, capacidad), ...].
+    - procesos: nº de procesos trabajadores (por defecto, núcleos disponibles;
+      nunca más que cocinas).
+    - contexto: contexto de `multiprocessing` ('fork', 'spawn'...; por
+      defecto el de la plataforma).
+
+    Es seguro usarlo desde varios hilos: cada fragmento tiene su propio lock
+    y las difusiones los toman en orden.
+    """
+
+    def __init__(self, cocinas: DefinicionCocinas, procesos: Optional[int] = None,
+                 contexto: Optional[str] = None) -> None:
+        if not cocinas:
+            raise ValueError("Debe haber al menos una cocina")
+        procesos = max(1, min(procesos or os.cpu_count() or 1, len(cocinas)))
+        self.cocinas: List[str] = list(cocinas)
+        self._fragmento_de: Dict[str, int] = {c: i % procesos for i, c in enumerate(self.cocinas)}
+        ctx = multiprocessing.get_context(contexto)
+        self._conexiones = []
+        self._procesos = []
+        for n in range(procesos):
+            propias = {c: list(cocinas[c]) for c in self.cocinas if self._fragmento_de[c] == n}
+            extremo, remoto = ctx.Pipe()
+            proceso = ctx.Process(target=_servir, args=(remoto, propias), name=f'fragmento-{n}', daemon=True)
+            proceso.start()
+            remoto.close()
+            self._conexiones.append(extremo)
+            self._procesos.append(proceso)
+        self._locks = [threading.Lock() for _ in range(procesos)]
+        self._cocina_de: Dict[Union[str, int], str] = {}
+        self._ultimo_id = 0
+        self._lock_ids = threading.Lock()
+
+    @property
+    def procesos(self) -> int:
+        return len(self._procesos)
+
+    # --- mensajería --------------------------------------------------------
+
+    @staticmethod
+    def _respuesta(conexion) -> Any:
+        estado, valor = conexion.recv()
+        if estado == 'error':
+            raise valor
+        return valor
+
+    def _llamar(self, fragmento: int, op: str, *args: Any) -> Any:
+        with self._locks[fragmento]:
+            self._conexiones[fragmento].send((op, args))
+            return self._respuesta(self._conexiones[fragmento])
+
+    def _difundir(self, mensajes: Dict[int, Tuple[str, Tuple]]) -> Dict[int, Any]:
+        """Enviar un mensaje a cada fragmento indicado y después recoger todas las respuestas."""
+        fragmentos = sorted(mensajes)
+        for n in fragmentos:
+            self._locks[n].acquire()
+        try:
+            for n in fragmentos:
+                self._conexiones[n].send(mensajes[n])
+            respuestas: Dict[int, Any] = {}
+            error = None
+            for n in fragmentos:  # Leer todas aunque alguna falle: el canal queda sincronizado
+                try:
+                    respuestas[n] = self._respuesta(self._conexiones[n])
+                except Exception as e:
+                    error = error or e
+            if error is not None:
+                raise error
+            return respuestas
+        finally:
+            for n in fragmentos:
+                self._locks[n].release()
+
+    def _todos(self, op: str, *args: Any) -> List[Any]:
+        respuestas = self._difundir({n: (op, args) for n in range(self.procesos)})
+        return [respuestas[n] for n in range(self.procesos)]
+
+    # --- ids y rutas -------------------------------------------------------
+
+    def _reservar_ids(self, n: int) -> List[str]:
+        with self._lock_ids:
+            inicio = self._ultimo_id + 1
+            self._ultimo_id += n
+        return [f"PED-{i:04d}" for i in range(inicio, inicio + n)]
+
+    def _cocina_para(self, pedido_id: str, cocina: Optional[str]) -> str:
+        if cocina is None:
+            return self.cocinas[zlib.crc32(pedido_id.encode('utf-8')) % len(self.cocinas)]
+        if cocina not in self._fragmento_de:
+            raise ValueError(f"Cocina inválida: {cocina}. Debe ser una de: {', '.join(self.cocinas)}")
+        return cocina
+
+    def cocina_de(self, pedido_id: Union[str, int]) -> Optional[str]:
+        """Cocina a la que pertenece el pedido (None si el enrutador no lo conoce)."""
+        return self._cocina_de.get(pedido_id)
+
+    # --- API de GestorPedidos ----------------------------------------------
+
+    def crear_pedido(self, items: List[Dict], cliente_info: Optional[Dict] = None,
+                     cocina: Optional[str] = None) -> Pedido:
+        """Crear un pedido en su cocina (la indicada o la que toca por hash del id).
+
+        Salida esperada: copia del `Pedido` creado. Lanza ValueError si los
+        ítems o la cocina no son válidos.
+        """
+        pedido_id = self._reservar_ids(1)[0]
+        cocina = self._cocina_para(pedido_id, cocina)
+        registro, _, error = self._llamar(self._fragmento_de[cocina], 'crear',
+                                          [(cocina, pedido_id, items, cliente_info)], None, True)[0]
+        if error is not None:
+            raise ValueError(error)
+        self._cocina_de[pedido_id] = cocina
+        return Pedido.from_dict(registro, validar=False)
+
+    def crear_pedidos(self, solicitudes: Sequence[Dict], politica: Optional[str] = None) -> List[Optional[str]]:
+        """Crear muchos pedidos en paralelo (un mensaje por fragmento).
+
+        Cada solicitud es un dict con 'items' y, opcionalmente,
+        'cliente_info' y 'cocina'. Con `politica` cada pedido se despacha
+        además con `GestorPedidos.despachar` dentro de su cocina (si no hay
+        hueco espera en la cola de la cocina).
+
+        Salida esperada: lista de ids en el orden de `solicitudes`; None en
+        las rechazadas por ítems inválidos. Lanza ValueError si una cocina no
+        existe (antes de crear nada).
+        """
+        ids = self._reservar_ids(len(solicitudes))
+        cocinas = [self._cocina_para(pid, s.get('cocina')) for pid, s in zip(ids, solicitudes)]
+        lotes: Dict[int, List[Tuple]] = {}
+        for pid, cocina, s in zip(ids, cocinas, solicitudes):
+            lotes.setdefault(self._fragmento_de[cocina], []).append((cocina, pid, s['items'], s.get('cliente_info')))
+        respuestas = self._difundir({n: ('crear', (lote, politica, False)) for n, lote in lotes.items()})
+        creados = set()
+        for resultados in respuestas.values():
+            creados.update(pid for pid, _, error in resultados if error is None)
+        resultado: List[Optional[str]] = []
+        for pid, cocina in zip(ids, cocinas):
+            if pid in creados:
+                self._cocina_de[pid] = cocina
+                resultado.append(pid)
+            else:
+                resultado.append(None)
+        return resultado
+
+    def asignar_a_estacion(self, pedido_id: Union[str, int], estacion_id: Union[str, int]) -> bool:
+        """Asignar el pedido a una estación de su cocina. False si no existe o no se pudo."""
+        cocina = self._cocina_de.get(pedido_id)
+        if cocina is None:
+            return False
+        return self._llamar(self._fragmento_de[cocina], 'asignar', cocina, pedido_id, estacion_id)
+
+    def asignar_automaticamente(self, pedido_id: Union[str, int],
+                                politica: str = 'menor_carga') -> Optional[Union[str, int]]:
+        """Despachar el pedido a la mejor estación de su cocina (ver `GestorPedidos.asignar_automaticamente`)."""
+        cocina = self._cocina_de.get(pedido_id)
+        if cocina is None:
+            return None
+        return self._llamar(self._fragmento_de[cocina], 'asignar_auto', cocina, pedido_id, politica)
+
+    def cancelar_pedido(self, pedido_id: Union[str, int]) -> bool:
+        cocina = self._cocina_de.get(pedido_id)
+        if cocina is None:
+            return False
+        return self._llamar(self._fragmento_de[cocina], 'cancelar', cocina, pedido_id)
+
+    def obtener_pedido(self, pedido_id: Union[str, int]) -> Optional[Pedido]:
+        """Copia del `Pedido` o None si no existe."""
+        cocina = self._cocina_de.get(pedido_id)
+        if cocina is None:
+            return None
+        registro = self._llamar(self._fragmento_de[cocina], 'obtener', cocina, pedido_id)
+        return None if registro is None else Pedido.from_dict(registro, validar=False)
+
+    def listar_pedidos(self, estado: Optional[str] = None, estacion_id: Optional[Union[str, int]] = None,
+                       telefono: Optional[str] = None, cocina: Optional[str] = None) -> List[Pedido]:
+        """Listar pedidos de todos los fragmentos (o de una cocina), ordenados por id.
+
+        Los filtros son los de `GestorPedidos.listar_pedidos`; `estacion_id`
+        se aplica en cada cocina (los ids de estación pueden repetirse entre cocinas).
+        """
+        if cocina is not None:
+            registros = self._llamar(self._fragmento_de[self._cocina_para('', cocina)], 'listar',
+                                     cocina, estado, estacion_id, telefono)
+        else:
+            registros = [r for parte in self._todos('listar', None, estado, estacion_id, telefono) for r in parte]
+        registros.sort(key=_orden_id)
+        return Pedido.desde_dicts(registros)
+
+    def contar(self, estado: Optional[str] = None) -> int:
+        """Número de pedidos (en `estado`, si se indica) sumando todos los fragmentos, sin transferirlos."""
+        return sum(self._todos('contar', estado))
+
+    def avanzar(self) -> int:
+        """Un paso de cocina en todos los fragmentos a la vez.
+
+        En cada cocina: finaliza los pedidos en preparación (los huecos se
+        rellenan desde la cola de espera) e inicia las colas.
+        Salida esperada: número de pedidos finalizados.
+        """
+        return sum(self._todos('avanzar'))
+
+    def metricas_espera(self) -> Dict[str, Dict[str, Union[int, float]]]:
+        """`GestorPedidos.metricas_espera()` de cada cocina: {cocina: métricas}."""
+        return {cocina: m for parte in self._todos('metricas_espera') for cocina, m in parte.items()}
+
+    def metricas_rodantes(self, serie: bool = False) -> Dict[str, Dict[str, Any]]:
+        """`GestorPedidos.metricas_rodantes()` de cada cocina: {cocina: métricas}."""
+        return {cocina: m for parte in self._todos('metricas_rodantes', serie) for cocina, m in parte.items()}
+
+    def cerrar(self) -> None:
+        """Parar los procesos trabajadores. Idempotente."""
+        for n, (conexion, proceso) in enumerate(zip(self._conexiones, self._procesos)):
+            if proceso.is_alive():
+                try:
+                    self._llamar(n, 'fin')
+                except (OSError, EOFError):
+                    pass
+            proceso.join(timeout=5)
+            conexion.close()
+        self._procesos = []
+        self._conexiones = []
+
+    def __enter__(self) -> 'GestorFragmentado':
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.cerrar()
@@ -4,10 +4,126 @@ Contiene la clase `GestorPedidos` para crear, almacenar y asignar pedidos.
 Esqueleto: firmas y docstrings que describen salidas esperadas.
 """
 from __future__ import annotations
-from typing import Dict, Optional, List, Union
+from typing import Dict, Optional, List, Union, Tuple, Any, NamedTuple, Sequence
+from collections import OrderedDict
+from contextlib import contextmanager
+import heapq
+import threading
+import time
 
-from ..models.pedido import Pedido
+from ..models.pedido import Pedido, SubPedido
 from ..models.estacion_cocina import EstacionCocina
+from ..models.metricas_rodantes import MetricasRodantes
+from .almacenamiento import AlmacenPedidos
+
+
+# Políticas de despacho automático: clave a minimizar por estación
+POLITICAS_DESPACHO = {
+    'menor_carga': lambda e: e.carga_actual(),
+    'mas_libre': lambda e: e.carga_actual() - e.capacidad,  # Negativo de la capacidad libre
+    'fin_mas_temprano': lambda e: e.fin_estimado(),
+}
+
+
+class ResultadoLote(NamedTuple):
+    """Resultado de un registro en las operaciones en bloque de `GestorPedidos`.
+
+    - id: id del pedido (None si el registro no llegó a tener id).
+    - ok: True si la operación se aplicó.
+    - error: motivo del rechazo (None si ok).
+    - estacion_id: estación asignada (solo en `asignar_bulk`).
+    """
+    id: Optional[Union[str, int]]
+    ok: bool
+    error: Optional[str] = None
+    estacion_id: Optional[Union[str, int]] = None
+
+
+class _Estaciones(dict):
+    """dict id -> estación que cuenta sus modificaciones.
+
+    Así el gestor detecta en O(1) si alguien hizo `gestor.estaciones[id] = e`
+    (alta o reemplazo) o retiró una estación sin pasar por `registrar_estacion`.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.version = 0
+
+    def __setitem__(self, clave, valor) -> None:
+        super().__setitem__(clave, valor)
+        self.version += 1
+
+    def __delitem__(self, clave) -> None:
+        super().__delitem__(clave)
+        self.version += 1
+
+    def pop(self, *args):
+        valor = super().pop(*args)
+        self.version += 1
+        return valor
+
+    def popitem(self):
+        par = super().popitem()
+        self.version += 1
+        return par
+
+    def setdefault(self, clave, valor=None):
+        valor = super().setdefault(clave, valor)
+        self.version += 1
+        return valor
+
+    def update(self, *args, **kwargs) -> None:
+        super().update(*args, **kwargs)
+        self.version += 1
+
+    def clear(self) -> None:
+        super().clear()
+        self.version += 1
+
+
+class _Indice:
+    """Índice secundario clave -> ids (dict como conjunto ordenado) con su propio lock."""
+
+    def __init__(self) -> None:
+        self._datos: Dict[Any, Dict[Union[str, int], None]] = {}
+        self._lock = threading.Lock()
+
+    def agregar(self, clave, pedido_id: Union[str, int]) -> None:
+        with self._lock:
+            self._datos.setdefault(clave, {})[pedido_id] = None
+
+    def agregar_varios(self, clave, pedido_ids: Sequence[Union[str, int]]) -> None:
+        with self._lock:
+            self._datos.setdefault(clave, {}).update(dict.fromkeys(pedido_ids))
+
+    def quitar(self, clave, pedido_id: Union[str, int]) -> None:
+        with self._lock:
+            ids = self._datos.get(clave)
+            if ids is not None:
+                ids.pop(pedido_id, None)
+                if not ids:
+                    del self._datos[clave]
+
+    def mover(self, anterior, nueva, pedido_id: Union[str, int]) -> None:
+        with self._lock:
+            ids = self._datos.get(anterior)
+            if ids is not None:
+                ids.pop(pedido_id, None)
+                if not ids:
+                    del self._datos[anterior]
+            self._datos.setdefault(nueva, {})[pedido_id] = None
+
+    def tamano(self, clave) -> int:
+        return len(self._datos.get(clave, ()))
+
+    def ids(self, clave) -> List[Union[str, int]]:
+        """Copia de los ids de `clave` (segura frente a escrituras concurrentes)."""
+        with self._lock:
+            return list(self._datos.get(clave, ()))
+
+    def contiene(self, clave, pedido_id: Union[str, int]) -> bool:
+        return pedido_id in self._datos.get(clave, ())
 
 
 class GestorPedidos:
@@ -16,59 +132,741 @@ class GestorPedidos:
     Mantiene estructuras en memoria:
     - pedidos: dict[id, Pedido]
     - estaciones: dict[id, EstacionCocina]
+
+    Índices secundarios (dict usado como conjunto ordenado de ids), mantenidos
+    al crear, cambiar de estado y asignar pedidos:
+    - _por_estado: estado -> ids
+    - _por_estacion: estacion_id -> ids
+    - _por_telefono: teléfono del cliente -> ids (fijo: `Pedido.cliente_info`
+      es de solo lectura tras crear el pedido)
+
+    Despacho automático (`asignar_automaticamente`): un heap por política con
+    entradas (clave, versión, id) solo de estaciones con hueco libre. Cada
+    estación avisa al gestor cuando cambia su carga; entonces se invalida su
+    entrada anterior (versión) y se empuja una nueva, sin recorrer todas las
+    estaciones en cada asignación.
+
+    Concurrencia: los ids salen de un contador atómico; cada índice tiene su
+    propio lock, cada estación el suyo y las transiciones de un pedido usan
+    locks repartidos por id (ver `Pedido.update_estado`). Orden de adquisición:
+    estación -> pedido -> índice/despacho/almacén; el lock de despacho nunca
+    se mantiene mientras se llama a una estación.
+
+    Cola de espera (`despachar`): si ninguna estación tiene hueco, el pedido
+    queda PENDIENTE en una cola FIFO del gestor (como mucho `max_espera`
+    pedidos; con la cola llena se rechaza y se cuenta). El aviso de una
+    estación que libera capacidad drena la cola hacia ese hueco en el acto,
+    sin sondeo. `metricas_espera()` expone profundidad, esperas y rechazos.
+
+    Reparto por ítems: si alguna estación declara `categorias`, `despachar`
+    divide los pedidos con ítems de varias categorías en un `SubPedido` por
+    categoría, cada uno hacia una estación que la prepare, y las partes se
+    preparan en paralelo. El pedido pasa a EN_COLA / EN_PREPARACION con su
+    primera parte y a LISTO cuando termina la última; su `estacion_id` (y
+    `_por_estacion`) es la estación de su primera parte asignada. Los
+    subpedidos solo viven en memoria (`partes_de`); no se persisten ni se
+    indexan por estado.
+
+    Persistencia (opcional): con `almacen` (p. ej. `AlmacenSQLite`) cada alta
+    se guarda con `almacen.guardar(pedido.as_dict())` y cada cambio de estado
+    o de estación con `almacen.actualizar`; el almacén agrupa las escrituras.
+
+    Operaciones en bloque (`crear_pedidos_bulk`, `asignar_bulk`,
+    `actualizar_estados_bulk`): validan todos los registros en una pasada,
+    devuelven un `ResultadoLote` por registro y escriben en el almacén una
+    sola vez por llamada (`guardar_lote` / `actualizar_lote` y `flush`).
     """
     pedidos: dict[Union[str, int], Pedido]
     estaciones: dict[Union[str, int], EstacionCocina]
     
 
-    def __init__(self) -> None:
+    def __init__(self, almacen: Optional[AlmacenPedidos] = None, max_espera: Optional[int] = None) -> None:
         """Inicializar estructuras internas.
 
+        `max_espera` limita la cola de espera de `despachar` (None: sin límite).
+
         Salida esperada: instancia con `pedidos` y `estaciones` vacías.
-        
+        Lanza ValueError si `max_espera` es negativo.
         """
+        if max_espera is not None and max_espera < 0:
+            raise ValueError("max_espera no puede ser negativo")
         self.pedidos: dict = {} #Esto sirve para inicializar el diccionario de pedidos
-        self.estaciones: dict = {} #Esto sirve para inicializar el diccionario de estaciones
-        #raise NotImplementedError() # Inicializar dicts vacíos
+        self.estaciones: dict = _Estaciones() #Esto sirve para inicializar el diccionario de estaciones
+        self._por_estado = _Indice()
+        self._por_estacion = _Indice()
+        self._por_telefono = _Indice()
+        self._heaps: Dict[str, List[Tuple[float, int, Union[str, int]]]] = {}
+        self._version_estacion: Dict[Union[str, int], int] = {}
+        self._estaciones_observadas: Dict[Union[str, int], EstacionCocina] = {}
+        self._suscritas: Dict[int, EstacionCocina] = {}  # id(estación) -> estación con nuestro observador
+        self._version_estaciones: Optional[int] = None  # `estaciones.version` ya sincronizada
+        self._lock_despacho = threading.RLock()
+        self._ultimo_id = 0  # Número del último id PED-NNNN entregado
+        self._lock_ids = threading.Lock()
+        self.almacen = almacen
+        self.max_espera = max_espera
+        self._espera: 'OrderedDict[Union[str, int], float]' = OrderedDict()  # id -> instante de entrada
+        self._lock_espera = threading.Lock()
+        self._drenando = threading.local()  # Evita drenar de nuevo desde el aviso de la propia asignación
+        self._contadores_espera = {'admitidos': 0, 'rechazados': 0, 'drenados': 0, 'descartados': 0,
+                                   'max_profundidad': 0}
+        self._espera_total_s = 0.0
+        self._espera_max_s = 0.0
+        self._especializadas = False  # Alguna estación declara categorías: se reparte por ítems
+        self._partes: Dict[Union[str, int], List[SubPedido]] = {}  # id del pedido -> subpedidos vivos
+        self._subpedidos: Dict[str, SubPedido] = {}  # id del subpedido -> subpedido
+        self._lote = threading.local()  # Cambios por persistir al final de una operación en bloque
+        self.metricas = MetricasRodantes()  # Serie de la cocina entera (ver `metricas_rodantes`)
+
+    def _siguiente_id(self) -> str:
+        """Reservar el siguiente id legible (PED-0001, ...) sin colisiones entre hilos."""
+        with self._lock_ids:
+            self._ultimo_id += 1
+            return f"PED-{self._ultimo_id:04d}"
+
+    def _reservar_ids(self, n: int) -> List[str]:
+        """Reservar `n` ids consecutivos de una vez (un solo paso por el lock)."""
+        with self._lock_ids:
+            primero = self._ultimo_id + 1
+            self._ultimo_id += n
+        return [f"PED-{numero:04d}" for numero in range(primero, primero + n)]
+
+    def ultimo_id(self) -> int:
+        """Número del último id generado (0 si aún no se creó ninguno)."""
+        with self._lock_ids:
+            return self._ultimo_id
 
-    def crear_pedido(self, items: List[Dict], cliente_info: Optional[Dict] = None) -> Pedido: 
+    def _registrar(self, pedido: Pedido, persistir: bool = True) -> None:
+        """Guardar el pedido e indexarlo; se suscribe a sus cambios de estado."""
+        self.pedidos[pedido.id] = pedido
+        self._por_estado.agregar(pedido.estado, pedido.id)
+        if pedido.estacion_id is not None:
+            self._por_estacion.agregar(pedido.estacion_id, pedido.id)
+        telefono = (pedido.cliente_info or {}).get('telefono')
+        if telefono:
+            self._por_telefono.agregar(str(telefono), pedido.id)
+        pedido.agregar_observador(self._on_cambio_estado)
+        self._registrar_carga()
+        if persistir and self.almacen is not None:
+            self.almacen.guardar(pedido.as_dict())
+
+    def _on_cambio_estado(self, pedido: Pedido, anterior: str, nuevo: str) -> None:
+        self._por_estado.mover(anterior, nuevo, pedido.id)
+        if nuevo == 'EN_PREPARACION':
+            creado = pedido.instante_estado('PENDIENTE')
+            iniciado = pedido.instante_estado('EN_PREPARACION')
+            self._registrar_carga(1, 0, iniciado - creado if creado and iniciado else None)
+        elif nuevo == 'LISTO':
+            self._registrar_carga(0, 1)
+        elif nuevo == 'CANCELADO':  # PENDIENTE -> EN_COLA y LISTO -> ENTREGADO no cambian la carga
+            self._registrar_carga()
+        if self.almacen is not None:
+            self._persistir_cambio(pedido.id, {'estado': nuevo})
+
+    def _registrar_carga(self, iniciados: int = 0, finalizados: int = 0, espera_s: Optional[float] = None) -> None:
+        """Anotar en `metricas` los pedidos por empezar (PENDIENTE + EN_COLA) y los que se preparan."""
+        tamano = self._por_estado.tamano
+        self.metricas.registrar(tamano('PENDIENTE') + tamano('EN_COLA'), tamano('EN_PREPARACION'),
+                                iniciados, finalizados, espera_s)
+
+    def _persistir_cambio(self, pedido_id: Union[str, int], cambios: Dict) -> None:
+        pendientes = getattr(self._lote, 'cambios', None)
+        if pendientes is not None:
+            pendientes.append((pedido_id, cambios))  # Dentro de una operación en bloque de este hilo
+        else:
+            self.almacen.actualizar(pedido_id, cambios)
+
+    @contextmanager
+    def _persistencia_en_lote(self):
+        """Acumular los cambios de este hilo y escribirlos juntos al salir (una escritura)."""
+        if self.almacen is None or getattr(self._lote, 'cambios', None) is not None:
+            yield
+            return
+        self._lote.cambios = []
+        try:
+            yield
+        finally:
+            cambios, self._lote.cambios = self._lote.cambios, None
+            if cambios:
+                self.almacen.actualizar_lote(cambios)
+            self.almacen.flush()
+
+    def crear_pedido(self, items: List[Dict], cliente_info: Optional[Dict] = None,
+                     pedido_id: Optional[Union[str, int]] = None) -> Pedido: 
         """Crear y registrar un nuevo pedido.
 
+        `pedido_id` permite usar un id asignado fuera (p. ej. por el enrutador
+        de `src.services.fragmentado`); lanza ValueError si ya existe.
+
         Salida esperada: instancia `Pedido` registrada en `self.pedidos`.
         
         """
-        # Generación de ID legible: PED-0001, PED-0002, ...
-        new_id = f"PED-{len(self.pedidos) + 1:04d}"
+        if pedido_id is not None and pedido_id in self.pedidos:
+            raise ValueError(f"Ya existe un pedido con id {pedido_id}")
+        # Generación de ID legible: PED-0001, PED-0002, ... (contador atómico, sin colisiones)
+        new_id = self._siguiente_id() if pedido_id is None else pedido_id
         new_pedido = Pedido(id=new_id, items=items, cliente_info=cliente_info)
-        self.pedidos[new_id] = new_pedido
+        self._registrar(new_pedido)
         return new_pedido
 
+    def restaurar(self, pedidos: List[Pedido], ultimo_id: int = 0) -> None:
+        """Cargar pedidos recuperados tras un reinicio (ver `src.services.recuperacion`).
+
+        Los pedidos se indexan como en `crear_pedido` pero no se vuelven a
+        guardar en el almacén. El contador de ids continúa después de
+        `ultimo_id` (nunca retrocede). Las colas de las estaciones se
+        restauran aparte con `EstacionCocina.restaurar`.
+        """
+        for pedido in pedidos:
+            self._registrar(pedido, persistir=False)
+        with self._lock_ids:
+            self._ultimo_id = max(self._ultimo_id, ultimo_id)
+
+    def registrar_estacion(self, estacion: EstacionCocina) -> None:
+        """Añadir (o reemplazar) una estación y suscribirse a sus cambios de carga.
+
+        Salida esperada: None. Equivale a `gestor.estaciones[id] = estacion`,
+        que también funciona porque el despacho sincroniza las estaciones
+        nuevas o reemplazadas.
+        """
+        with self._lock_despacho:
+            self.estaciones[estacion.id] = estacion
+            self._observar_estacion(estacion)
+        if self._espera:  # Ya sin el lock de despacho: la estación nueva puede recibir pedidos en espera
+            self._drenar(estacion)
+
+    def _observar_estacion(self, estacion: EstacionCocina) -> bool:
+        """Suscribirse a `estacion` si aún no se observa esa misma instancia (True si es nueva)."""
+        if self._estaciones_observadas.get(estacion.id) is estacion:
+            return False
+        self._estaciones_observadas[estacion.id] = estacion
+        if estacion.categorias is not None:
+            self._especializadas = True
+        if id(estacion) not in self._suscritas:  # Una estación retirada y vuelta a añadir ya avisa
+            self._suscritas[id(estacion)] = estacion
+            estacion.agregar_observador(self._on_cambio_estacion)
+        self._actualizar_despacho(estacion)  # Con el lock de despacho tomado: aquí no se drena la espera
+        return True
+
+    def _sincronizar_estaciones(self) -> None:
+        """Observar las estaciones añadidas o reemplazadas directamente en `self.estaciones`.
+
+        O(1) si el dict no cambió desde la última vez (`_Estaciones.version`);
+        si `estaciones` se sustituyó por un dict normal se compara siempre por
+        identidad. Las estaciones retiradas dejan de ser candidatas porque el
+        despacho comprueba `self.estaciones.get(id) is estacion`.
+        """
+        version = getattr(self.estaciones, 'version', None)
+        if version is not None and version == self._version_estaciones:
+            return
+        with self._lock_despacho:
+            # La versión se lee antes de recorrer: un cambio concurrente fuerza otra pasada
+            nuevas = [e for e in list(self.estaciones.values()) if self._observar_estacion(e)]
+            for estacion_id in [i for i in self._estaciones_observadas if i not in self.estaciones]:
+                del self._estaciones_observadas[estacion_id]
+            self._version_estaciones = version
+        for estacion in nuevas:  # Ya sin el lock de despacho, como en `registrar_estacion`
+            if not self._espera:
+                break
+            self._drenar(estacion)
+
+    def _on_cambio_estacion(self, estacion: EstacionCocina) -> None:
+        self._actualizar_despacho(estacion)
+        # Ya sin el lock de despacho: el hueco liberado se ocupa con la cola de espera
+        if self._espera and estacion.carga_actual() < estacion.capacidad:
+            self._drenar(estacion)
+
+    def _actualizar_despacho(self, estacion: EstacionCocina) -> None:
+        with self._lock_despacho:
+            if self.estaciones.get(estacion.id) is not estacion:
+                return  # Estación reemplazada o retirada
+            version = self._version_estacion.get(estacion.id, 0) + 1
+            self._version_estacion[estacion.id] = version  # Invalida sus entradas anteriores
+            if estacion.carga_actual() >= estacion.capacidad:
+                return  # Sin hueco: no es candidata hasta que vuelva a liberar capacidad
+            for politica, heap in self._heaps.items():
+                heapq.heappush(heap, (POLITICAS_DESPACHO[politica](estacion), version, estacion.id))
+                if len(heap) > 4 * len(self.estaciones) + 64:
+                    self._reconstruir_heap(politica)
+
+    def _reconstruir_heap(self, politica: str) -> None:
+        clave = POLITICAS_DESPACHO[politica]
+        heap = [(clave(e), self._version_estacion.get(e.id, 0), e.id) for e in self._estaciones_observadas.values()
+                if self.estaciones.get(e.id) is e and e.carga_actual() < e.capacidad]
+        heapq.heapify(heap)
+        self._heaps[politica] = heap
+
+    def asignar_automaticamente(self, pedido_id: Union[str, int],
+                                politica: str = 'menor_carga') -> Optional[Union[str, int]]:
+        """Asignar el pedido a la mejor estación según `politica`.
+
+        Políticas: 'menor_carga' (menor `carga_actual()`), 'mas_libre' (más
+        capacidad libre) o 'fin_mas_temprano' (menor trabajo pendiente por
+        unidad de capacidad). Si la mejor candidata rechaza el pedido
+        (`puede_aceptar_pedido` False) se prueba la siguiente.
+
+        Salida esperada: id de la estación asignada o None si ninguna lo aceptó.
+        Lanza ValueError si la política no existe.
+        """
+        if politica not in POLITICAS_DESPACHO:
+            raise ValueError(f"Política inválida: {politica}. Debe ser una de: {', '.join(POLITICAS_DESPACHO)}")
+        pedido = self._buscar(pedido_id)
+        if pedido is None:
+            return None
+        self._sincronizar_estaciones()
+        descartadas = []  # Candidatas válidas que rechazaron este pedido concreto
+        elegida = None
+        while True:
+            with self._lock_despacho:
+                if politica not in self._heaps:
+                    self._reconstruir_heap(politica)
+                heap = self._heaps[politica]
+                entrada = None
+                while heap:
+                    candidata = heapq.heappop(heap)
+                    if self._version_estacion.get(candidata[2]) == candidata[1]:
+                        entrada = candidata
+                        break  # Las entradas con versión antigua se descartan
+            if entrada is None:
+                break
+            estacion = self.estaciones.get(entrada[2])
+            if estacion is None:
+                continue
+            descartadas.append(entrada)
+            # Fuera del lock de despacho: la estación toma su propio lock y avisa al observador
+            if estacion.puede_aceptar_pedido(pedido) and self.asignar_a_estacion(pedido_id, estacion.id):
+                descartadas.pop()  # Su nueva entrada ya la empujó el observador
+                elegida = estacion.id
+                break
+        if descartadas:
+            with self._lock_despacho:
+                heap = self._heaps[politica]
+                for entrada in descartadas:
+                    heapq.heappush(heap, entrada)
+        return elegida
+
+    def despachar(self, pedido_id: Union[str, int], politica: str = 'menor_carga') -> bool:
+        """Asignar el pedido según `politica` o dejarlo en la cola de espera.
+
+        Si ya hay pedidos esperando, el nuevo se pone detrás (orden de
+        llegada). Si la cola está llena (`max_espera`) el pedido se rechaza:
+        sigue PENDIENTE sin estación y se cuenta en `metricas_espera()`.
+        Los pedidos en espera se asignan solos cuando una estación libera hueco.
+
+        Con estaciones especializadas, un pedido con varias categorías se
+        reparte en subpedidos (ver `partes_de`) y cada uno se despacha igual.
+
+        Salida esperada: True si quedó asignado o en espera (todas sus partes);
+        False si no existe, no está PENDIENTE sin estación, ninguna estación
+        prepara alguna de sus categorías o fue rechazado.
+        Lanza ValueError si la política no existe.
+        """
+        if politica not in POLITICAS_DESPACHO:
+            raise ValueError(f"Política inválida: {politica}. Debe ser una de: {', '.join(POLITICAS_DESPACHO)}")
+        pedido = self.pedidos.get(pedido_id)
+        if (pedido is None or pedido.estado != 'PENDIENTE' or pedido.estacion_id is not None
+                or pedido_id in self._partes):
+            return False
+        self._sincronizar_estaciones()
+        estaciones = list(self.estaciones.values())
+        unidades: List[Pedido] = [pedido]
+        if self._especializadas:
+            grupos = pedido.lineas_por_categoria()
+            if len(grupos) > 1:
+                unidades = [SubPedido(pedido, categoria, lineas) for categoria, lineas in grupos.items()]
+        if not all(any(e.acepta(u) for e in estaciones) for u in unidades):
+            return False  # Ninguna estación prepara alguna de sus categorías: esperaría para siempre
+        if len(unidades) > 1:
+            with self._lock_espera:  # Admisión de todas las partes a la vez (no quedan partes sueltas)
+                if self.max_espera is not None and len(self._espera) + len(unidades) > self.max_espera:
+                    self._contadores_espera['rechazados'] += 1
+                    return False
+            self._partes[pedido_id] = unidades
+            for parte in unidades:
+                self._subpedidos[parte.id] = parte
+                parte.agregar_observador(self._on_cambio_parte)
+        encolado = False
+        for unidad in unidades:
+            if not self._espera and self.asignar_automaticamente(unidad.id, politica) is not None:
+                continue
+            with self._lock_espera:
+                if unidad.id not in self._espera:
+                    if len(unidades) == 1 and self.max_espera is not None and len(self._espera) >= self.max_espera:
+                        self._contadores_espera['rechazados'] += 1
+                        return False
+                    self._espera[unidad.id] = time.monotonic()
+                    contadores = self._contadores_espera
+                    contadores['admitidos'] += 1
+                    contadores['max_profundidad'] = max(contadores['max_profundidad'], len(self._espera))
+                    encolado = True
+        if encolado:
+            # Un hueco liberado entre el intento fallido y el encolado no volverá a avisar
+            for estacion in estaciones:
+                if not self._espera:
+                    break
+                if estacion.carga_actual() < estacion.capacidad:
+                    self._drenar(estacion)
+        return True
+
+    def _buscar(self, pedido_id: Union[str, int]) -> Optional[Pedido]:
+        """Pedido o subpedido por id."""
+        pedido = self.pedidos.get(pedido_id)
+        return pedido if pedido is not None else self._subpedidos.get(pedido_id)
+
+    def _siguiente_en_espera(self, estacion: EstacionCocina
+                             ) -> Optional[Tuple[Union[str, int], float, Optional[Pedido]]]:
+        """Sacar de la espera el primero que `estacion` acepta (o uno obsoleto, con pedido None)."""
+        with self._lock_espera:
+            for pedido_id in self._espera:
+                pedido = self._buscar(pedido_id)
+                if pedido is None or pedido.estado != 'PENDIENTE' or pedido.estacion_id is not None:
+                    return pedido_id, self._espera.pop(pedido_id), None  # Cancelado o asignado a mano
+                if estacion.acepta(pedido):  # Sin especialización siempre es el primero
+                    return pedido_id, self._espera.pop(pedido_id), pedido
+        return None
+
+    def _drenar(self, estacion: EstacionCocina) -> None:
+        """Asignar a `estacion` pedidos de la cola de espera mientras tenga hueco."""
+        if getattr(self._drenando, 'activo', False) or self.estaciones.get(estacion.id) is not estacion:
+            return
+        self._drenando.activo = True
+        try:
+            while self._espera and estacion.carga_actual() < estacion.capacidad:
+                siguiente = self._siguiente_en_espera(estacion)
+                if siguiente is None:
+                    break
+                pedido_id, entrada, pedido = siguiente
+                if pedido is None:
+                    with self._lock_espera:
+                        self._contadores_espera['descartados'] += 1
+                    continue
+                if not self.asignar_a_estacion(pedido_id, estacion.id):
+                    with self._lock_espera:  # Vuelve a la cabeza; otro aviso lo reintentará
+                        self._espera[pedido_id] = entrada
+                        self._espera.move_to_end(pedido_id, last=False)
+                    break
+                espera = time.monotonic() - entrada
+                with self._lock_espera:
+                    self._contadores_espera['drenados'] += 1
+                    self._espera_total_s += espera
+                    self._espera_max_s = max(self._espera_max_s, espera)
+        finally:
+            self._drenando.activo = False
+
+    def _on_cambio_parte(self, parte: SubPedido, anterior: str, nuevo: str) -> None:
+        """Recombinar: el pedido sigue a su primera parte y queda LISTO con la última.
+
+        Se llama con el lock de la parte tomado, que es el mismo del padre
+        (`SubPedido.lock_estado`): no se adquiere ningún lock repartido más.
+        """
+        padre = parte.padre
+        with padre.lock_estado():
+            if nuevo == 'EN_COLA' and padre.estado == 'PENDIENTE':
+                padre.update_estado('EN_COLA')
+            elif nuevo == 'EN_PREPARACION' and padre.estado in ('PENDIENTE', 'EN_COLA'):
+                padre.update_estado('EN_PREPARACION')
+            elif nuevo == 'LISTO' and padre.estado == 'EN_PREPARACION':
+                partes = self._partes.get(padre.id, ())
+                if all(p.estado == 'LISTO' for p in partes):
+                    padre.update_estado('LISTO')
+                    self._olvidar_partes(padre.id)
+
+    def _olvidar_partes(self, pedido_id: Union[str, int]) -> List[SubPedido]:
+        partes = self._partes.pop(pedido_id, [])
+        for parte in partes:
+            self._subpedidos.pop(parte.id, None)
+        return partes
+
+    def partes_de(self, pedido_id: Union[str, int]) -> List[SubPedido]:
+        """Subpedidos en curso del pedido (lista vacía si no se repartió o ya terminó)."""
+        return list(self._partes.get(pedido_id, ()))
+
+    def en_espera(self) -> List[Union[str, int]]:
+        """Ids de los pedidos en la cola de espera, en orden de llegada."""
+        with self._lock_espera:
+            return list(self._espera)
+
+    def profundidad_espera(self) -> int:
+        """Número de pedidos en la cola de espera."""
+        return len(self._espera)
+
+    def metricas_espera(self) -> Dict[str, Union[int, float]]:
+        """Contadores de saturación de la cola de espera.
+
+        Salida esperada: dict con 'profundidad', 'max_profundidad',
+        'admitidos', 'rechazados', 'drenados', 'descartados' (cancelados o
+        asignados a mano mientras esperaban), 'espera_media_s' y
+        'espera_max_s' (de los drenados) y 'espera_actual_s' (la del más
+        antiguo que sigue esperando).
+        """
+        ahora = time.monotonic()
+        with self._lock_espera:
+            metricas: Dict[str, Union[int, float]] = {'profundidad': len(self._espera), **self._contadores_espera}
+            drenados = self._contadores_espera['drenados']
+            metricas['espera_media_s'] = self._espera_total_s / drenados if drenados else 0.0
+            metricas['espera_max_s'] = self._espera_max_s
+            metricas['espera_actual_s'] = ahora - next(iter(self._espera.values())) if self._espera else 0.0
+        return metricas
+
+    def metricas_rodantes(self, serie: bool = False) -> Dict[str, Any]:
+        """Métricas de la última hora por minutos (`MetricasRodantes.snapshot`) de la cocina y de cada estación.
+
+        - 'gestor': pedidos enteros (no subpedidos). Profundidad: PENDIENTE +
+          EN_COLA; utilización: EN_PREPARACION frente a la capacidad total de
+          las estaciones; espera: desde la creación hasta EN_PREPARACION.
+        - 'estaciones': {id: snapshot} con la cola y la capacidad de cada
+          estación; espera: EN_COLA -> EN_PREPARACION en esa estación.
+
+        Coste fijo por estación, independiente del número de pedidos.
+        """
+        estaciones = list(self.estaciones.values())
+        return {
+            'gestor': self.metricas.snapshot(capacidad=sum(e.capacidad for e in estaciones), serie=serie),
+            'estaciones': {e.id: e.metricas.snapshot(capacidad=e.capacidad, serie=serie) for e in estaciones},
+        }
+
     def cancelar_pedido(self, pedido_id: Union[str, int]) -> bool:
         """Cancelar un pedido si es permitido.
 
+        Se cancela desde PENDIENTE o EN_PREPARACION; un pedido repartido en
+        subpedidos también desde EN_COLA (sus partes esperan en estaciones).
+        La cancelación se propaga a las partes en curso.
+
         Salida esperada: True si se canceló correctamente, False si no existe o no se puede cancelar.
         
         """
         pedido = self.pedidos.get(pedido_id)  # Obtener el pedido por id
-        if pedido  and pedido.estado in ['PENDIENTE', 'EN_PREPARACION']: # Verificar si existe y si se puede cancelar
+        if pedido is None:
+            return False
+        with pedido.lock_estado():  # Comprobar y cancelar sin que otro hilo cambie el estado entre medias
+            cancelables = ('PENDIENTE', 'EN_COLA', 'EN_PREPARACION') if pedido_id in self._partes \
+                else ('PENDIENTE', 'EN_PREPARACION')
+            if pedido.estado not in cancelables: # Verificar si se puede cancelar
+                return False
             pedido.update_estado('CANCELADO')  # Actualizar estado a CANCELADO
-            return True
-        return False  # Devolver False si no se pudo cancelar
+        for unidad in [pedido, *self._olvidar_partes(pedido_id)]:
+            if unidad is not pedido:
+                with unidad.lock_estado():
+                    if unidad.estado in ('PENDIENTE', 'EN_COLA', 'EN_PREPARACION'):
+                        unidad.update_estado('CANCELADO')
+            if unidad.id in self._espera:
+                with self._lock_espera:
+                    if self._espera.pop(unidad.id, None) is not None:
+                        self._contadores_espera['descartados'] += 1
+            estacion = self.estaciones.get(unidad.estacion_id)
+            if estacion is not None:
+                estacion.remover_pedido(unidad.id)  # Liberar el hueco en la estación (O(1))
+        return True
  
 
     def asignar_a_estacion(self, pedido_id: Union[str, int], estacion_id: Union[str, int]) -> bool:
         """Intentar asignar un pedido a una estación concreta.
 
+        Acepta también ids de subpedidos (ver `partes_de`); un pedido ya
+        repartido en subpedidos no se asigna entero.
+
         Salida esperada: True si la asignación fue exitosa, False en caso contrario.
         """
-        pedido = self.pedidos.get(pedido_id)# Obtener el pedido por id
+        pedido = self._buscar(pedido_id)# Obtener el pedido (o subpedido) por id
         estacion = self.estaciones.get(estacion_id)# Obtener la estación por id
-        if pedido and estacion and estacion.puede_aceptar_pedido(pedido): # Verificar existencia y capacidad
-            estacion.asignar_pedido(pedido)  # Asignar pedido a estación
+        if pedido_id in self._partes:
+            return False
+        if pedido and estacion and estacion.puede_aceptar_pedido(pedido): # Existencia, capacidad y categorías
+            with pedido.lock_estado():  # Reservar el pedido: un pedido solo puede estar en una estación
+                if pedido.estacion_id is not None:
+                    return False
+                pedido.estacion_id = estacion_id
+            # La estación se llama sin el lock del pedido (la estación lo toma después: evita interbloqueos)
+            if not estacion.asignar_pedido(pedido):  # Asignar pedido a estación
+                with pedido.lock_estado():
+                    pedido.estacion_id = None
+                return False
+            if isinstance(pedido, SubPedido):
+                padre = pedido.padre
+                with padre.lock_estado():  # La estación del pedido es la de su primera parte asignada
+                    primera = padre.estacion_id is None
+                    if primera:
+                        padre.estacion_id = estacion_id
+                if primera:  # El índice lista el pedido (no sus partes) con esa misma estación
+                    self._por_estacion.agregar(estacion_id, padre.id)
+                    if self.almacen is not None:
+                        self._persistir_cambio(padre.id, {'estacion_id': estacion_id})
+                return True
+            self._por_estacion.agregar(estacion_id, pedido.id)
+            if self.almacen is not None:
+                self._persistir_cambio(pedido.id, {'estacion_id': estacion_id})
             return True
         return False # Devolver False si no se pudo asignar
     
 
+    def crear_pedidos_bulk(self, solicitudes: Sequence[Dict]) -> List[ResultadoLote]:
+        """Crear muchos pedidos de una vez.
+
+        Cada solicitud es un dict con 'items' y, opcionalmente, 'cliente_info'.
+        Todas se validan en una pasada (mismas reglas que `Pedido`); las
+        válidas reciben un bloque de ids consecutivos y se guardan en el
+        almacén con un único `guardar_lote`. Un registro inválido falla solo,
+        con su error en el resultado, sin abortar el resto del lote.
+
+        Salida esperada: un `ResultadoLote` por solicitud, en el mismo orden.
+        """
+        resultados: List[Optional[ResultadoLote]] = [None] * len(solicitudes)
+        validos: List[Tuple[int, Pedido]] = []
+        for i, solicitud in enumerate(solicitudes):
+            try:
+                if not isinstance(solicitud, dict):
+                    raise ValueError("Cada solicitud debe ser un dict con 'items'")
+                validos.append((i, Pedido(None, solicitud.get('items'), solicitud.get('cliente_info'))))
+            except (ValueError, TypeError, OverflowError) as error:  # Un registro malo no aborta el lote
+                resultados[i] = ResultadoLote(None, False, str(error))
+        por_telefono: Dict[str, List[str]] = {}
+        observador = self._on_cambio_estado
+        for (i, pedido), pedido_id in zip(validos, self._reservar_ids(len(validos))):
+            pedido.id = pedido_id
+            self.pedidos[pedido_id] = pedido
+            telefono = (pedido.cliente_info or {}).get('telefono')
+            if telefono:
+                por_telefono.setdefault(str(telefono), []).append(pedido_id)
+            pedido.agregar_observador(observador)
+            resultados[i] = ResultadoLote(pedido_id, True)
+        # Índices: una toma de lock por clave en lugar de una por pedido (como `_registrar`)
+        self._por_estado.agregar_varios('PENDIENTE', [pedido.id for _, pedido in validos])
+        for telefono, ids in por_telefono.items():
+            self._por_telefono.agregar_varios(telefono, ids)
+        self._registrar_carga()
+        if self.almacen is not None and validos:
+            self.almacen.guardar_lote([pedido.as_dict() for _, pedido in validos])
+            self.almacen.flush()
+        return resultados
+
+    def asignar_bulk(self, asignaciones: Sequence[Tuple[Union[str, int], Optional[Union[str, int]]]],
+                     politica: str = 'menor_carga') -> List[ResultadoLote]:
+        """Asignar muchos pedidos: pares (pedido_id, estacion_id).
+
+        Con estacion_id None se usa `asignar_automaticamente` con `politica`.
+        Se valida todo antes de asignar (pedido existente, PENDIENTE y sin
+        estación, sin repetir en el lote; estación existente) y los cambios
+        se escriben en el almacén al final, de una vez. No usa la cola de
+        espera: sin hueco, el registro falla con error.
+
+        Salida esperada: un `ResultadoLote` por par, con la estación asignada.
+        Lanza ValueError si la política no existe.
+        """
+        if politica not in POLITICAS_DESPACHO:
+            raise ValueError(f"Política inválida: {politica}. Debe ser una de: {', '.join(POLITICAS_DESPACHO)}")
+        errores: List[Optional[str]] = []
+        vistos = set()
+        for pedido_id, estacion_id in asignaciones:
+            pedido = self.pedidos.get(pedido_id)
+            if pedido is None:
+                errores.append(f"No existe el pedido {pedido_id}")
+            elif pedido_id in vistos:
+                errores.append("Pedido repetido en el lote")
+            elif pedido.estado != 'PENDIENTE' or pedido.estacion_id is not None or pedido_id in self._partes:
+                errores.append(f"El pedido no está pendiente de asignar ({pedido.estado})")
+            elif estacion_id is not None and estacion_id not in self.estaciones:
+                errores.append(f"No existe la estación {estacion_id}")
+            else:
+                errores.append(None)
+            vistos.add(pedido_id)
+        asignada: Dict[Union[str, int], Union[str, int]] = {}
+        por_estacion: Dict[Union[str, int], List[Pedido]] = {}
+        for (pedido_id, estacion_id), error in zip(asignaciones, errores):
+            if error is None and estacion_id is not None:
+                por_estacion.setdefault(estacion_id, []).append(self.pedidos[pedido_id])
+        with self._persistencia_en_lote():
+            for estacion_id, pedidos in por_estacion.items():
+                for pedido in self._asignar_varios(pedidos, self.estaciones[estacion_id]):
+                    asignada[pedido.id] = estacion_id
+            for (pedido_id, estacion_id), error in zip(asignaciones, errores):
+                if error is None and estacion_id is None:
+                    estacion_id = self.asignar_automaticamente(pedido_id, politica)
+                    if estacion_id is not None:
+                        asignada[pedido_id] = estacion_id
+        resultados = []
+        for (pedido_id, _), error in zip(asignaciones, errores):
+            if error is None and pedido_id not in asignada:
+                error = "Sin capacidad libre"
+            resultados.append(ResultadoLote(pedido_id, False, error) if error is not None
+                              else ResultadoLote(pedido_id, True, None, asignada[pedido_id]))
+        return resultados
+
+    def _asignar_varios(self, pedidos: List[Pedido], estacion: EstacionCocina) -> List[Pedido]:
+        """`asignar_a_estacion` de varios pedidos a una estación con una sola llamada a la estación."""
+        reservados = []
+        for pedido in pedidos:
+            if not estacion.acepta(pedido):
+                continue
+            with pedido.lock_estado():  # Reservar como en `asignar_a_estacion`
+                if pedido.estacion_id is None:
+                    pedido.estacion_id = estacion.id
+                    reservados.append(pedido)
+        asignados = estacion.asignar_pedidos(reservados)
+        for pedido in reservados[asignados:]:
+            with pedido.lock_estado():
+                pedido.estacion_id = None
+        reservados = reservados[:asignados]
+        self._por_estacion.agregar_varios(estacion.id, [pedido.id for pedido in reservados])
+        if self.almacen is not None:
+            for pedido in reservados:
+                self._persistir_cambio(pedido.id, {'estacion_id': estacion.id})
+        return reservados
+
+    def actualizar_estados_bulk(self, cambios: Sequence[Tuple[Union[str, int], str]]) -> List[ResultadoLote]:
+        """Cambiar el estado de muchos pedidos: pares (pedido_id, nuevo_estado).
+
+        Las transiciones siguen las reglas de `Pedido.update_estado`;
+        'CANCELADO' pasa por `cancelar_pedido` (libera la estación y la cola
+        de espera) y EN_PREPARACION / LISTO de un pedido asignado pasan por
+        su estación (ocupan y liberan el puesto). Todos los cambios se escriben en el almacén al final, de
+        una vez.
+
+        Salida esperada: un `ResultadoLote` por par, en el mismo orden.
+        """
+        resultados = []
+        with self._persistencia_en_lote():
+            for pedido_id, nuevo_estado in cambios:
+                pedido = self.pedidos.get(pedido_id)
+                if pedido is None:
+                    resultados.append(ResultadoLote(pedido_id, False, f"No existe el pedido {pedido_id}"))
+                elif nuevo_estado not in Pedido.ESTADOS_VALIDOS:
+                    resultados.append(ResultadoLote(pedido_id, False, f"Estado inválido: {nuevo_estado}"))
+                elif nuevo_estado == 'CANCELADO':
+                    ok = self.cancelar_pedido(pedido_id)
+                    resultados.append(ResultadoLote(pedido_id, ok, None if ok else
+                                                    f"No se puede cancelar desde {pedido.estado}"))
+                else:
+                    error = self._cambiar_estado(pedido, nuevo_estado)
+                    resultados.append(ResultadoLote(pedido_id, error is None, error))
+        return resultados
+
+    def _cambiar_estado(self, pedido: Pedido, nuevo_estado: str) -> Optional[str]:
+        """Aplicar una transición (salvo CANCELADO) pasando por la estación si la tiene.
+
+        EN_PREPARACION y LISTO de un pedido asignado usan `iniciar_pedido` y
+        `finalizar_pedido` de su estación, que ocupan y liberan el puesto.
+
+        Salida esperada: None si se aplicó o el mensaje de error.
+        """
+        estacion = self.estaciones.get(pedido.estacion_id)
+        if nuevo_estado in ('EN_PREPARACION', 'LISTO') and (estacion is not None or pedido.id in self._partes):
+            if pedido.estado not in Pedido.TRANSICIONES_VALIDAS or \
+                    nuevo_estado not in Pedido.TRANSICIONES_VALIDAS[pedido.estado]:
+                return f"Transición inválida: No se puede pasar de {pedido.estado} a {nuevo_estado}"
+            if pedido.id in self._partes:
+                return "El pedido está repartido en subpedidos: su estado sigue al de sus partes"
+            if nuevo_estado == 'EN_PREPARACION':
+                if not estacion.iniciar_pedido(pedido.id):
+                    return f"El pedido {pedido.id} no está en la cola de {estacion.id} o no hay puesto libre"
+            elif not estacion.finalizar_pedido(pedido.id):
+                return f"El pedido {pedido.id} no está en preparación en {estacion.id}"
+            return None
+        try:
+            pedido.update_estado(nuevo_estado)
+        except ValueError as error:
+            return str(error)
+        return None
+
     def obtener_pedido(self, pedido_id: Union[str, int]) -> Optional[Pedido]: 
         """Devolver el `Pedido` por id o None si no existe.
 
@@ -78,12 +876,32 @@ class GestorPedidos:
         
         
 
-    def listar_pedidos(self, estado: Optional[str] = None) -> List[Pedido]:
-        """Listar pedidos, opcionalmente filtrando por `estado`.
+    def listar_pedidos(self, estado: Optional[str] = None, estacion_id: Optional[Union[str, int]] = None,
+                       telefono: Optional[str] = None) -> List[Pedido]:
+        """Listar pedidos, opcionalmente filtrando por `estado`, `estacion_id` y/o `telefono`.
+
+        Los filtros usan los índices secundarios: el coste es proporcional al
+        tamaño del índice más pequeño, no al total de pedidos.
 
         Salida esperada: lista de instancias `Pedido`.
         """
-        if estado is None: # Devolver todos los pedidos si no hay filtro con filtro nos referimos a que si no se especifica ningun estado
+        if estado is None and estacion_id is None and telefono is None: # Devolver todos los pedidos si no hay filtro
             return list(self.pedidos.values())
-        else:
-            return [pedido for pedido in self.pedidos.values() if pedido.estado == estado]
\ No newline at end of file
+        filtros = []
+        if estado is not None:
+            filtros.append((self._por_estado, estado))
+        if estacion_id is not None:
+            filtros.append((self._por_estacion, estacion_id))
+        if telefono is not None:
+            filtros.append((self._por_telefono, str(telefono)))
+        filtros.sort(key=lambda f: f[0].tamano(f[1]))
+        (base, clave), resto = filtros[0], filtros[1:]
+        return [self.pedidos[pid] for pid in base.ids(clave) if all(i.contiene(c, pid) for i, c in resto)]
+
+    def listar_por_estacion(self, estacion_id: Union[str, int]) -> List[Pedido]:
+        """Devolver los pedidos asignados a `estacion_id` (vía índice)."""
+        return self.listar_pedidos(estacion_id=estacion_id)
+
+    def listar_por_cliente(self, telefono: str) -> List[Pedido]:
+        """Devolver los pedidos del cliente con ese teléfono (vía índice)."""
+        return self.listar_pedidos(telefono=telefono)
@@ -0,0 +1,101 @@
+"""Módulo `src.services.historial`.
+
+Lector paginado del historial de pedidos para las vistas del menú. No carga
+el historial completo: construye una sola vez un índice lateral de
+posiciones (offsets en el journal o `seq` en SQLite, un entero de 8 bytes por
+pedido que cumple los filtros) y con él salta a la página N en O(1), leyendo
+solo los registros de esa página.
+
+La página 0 es la más reciente.
+
+Ejemplo de uso:
+
+from src.services.historial import LectorHistorial
+
+lector = LectorHistorial(almacen, tam_pagina=20, estado='LISTO', desde='2025-11-01')
+lector.paginas()          # nº de páginas
+lector.pagina(0)          # 20 pedidos más recientes (del más nuevo al más viejo)
+for registro in lector:   # todos, de uno en uno, del más reciente al más antiguo
+    ...
+"""
+from __future__ import annotations
+from typing import Dict, Iterator, List, Optional, Sequence, Union
+from datetime import datetime
+
+from .almacenamiento import AlmacenPedidos, PosicionObsoleta
+
+
+class LectorHistorial:
+    """Vista paginada (más recientes primero) y filtrada de un `AlmacenPedidos`.
+
+    Parámetros:
+    - almacen: backend del historial (journal, SQLite...).
+    - tam_pagina: pedidos por página.
+    - estado / estacion_id: filtros exactos.
+    - desde / hasta: rango de `timestamp_creado` (inclusive; datetime o ISO).
+
+    El orden es el del backend: `timestamp_creado` en SQLite y orden de
+    inserción (que es el de creación) en el journal. El índice se construye
+    en el primer acceso y es una foto: los pedidos guardados después no
+    aparecen hasta llamar a `recargar()`. Si el backend invalida el índice
+    (compactación del journal) se reconstruye solo al leer la página.
+    """
+
+    def __init__(self, almacen: AlmacenPedidos, tam_pagina: int = 20, estado: Optional[str] = None,
+                 estacion_id: Optional[Union[str, int]] = None, desde: Optional[Union[str, datetime]] = None,
+                 hasta: Optional[Union[str, datetime]] = None) -> None:
+        if tam_pagina <= 0:
+            raise ValueError("tam_pagina debe ser mayor que cero")
+        self.almacen = almacen
+        self.tam_pagina = tam_pagina
+        self.estado = estado
+        self.estacion_id = estacion_id
+        self.desde = desde
+        self.hasta = hasta
+        self._posiciones: Optional[Sequence[int]] = None
+
+    def recargar(self) -> None:
+        """(Re)construir el índice de posiciones con una pasada en streaming."""
+        self._posiciones = self.almacen.posiciones(estado=self.estado, estacion_id=self.estacion_id,
+                                                   desde=self.desde, hasta=self.hasta)
+
+    def _indice(self) -> Sequence[int]:
+        if self._posiciones is None:
+            self.recargar()
+        return self._posiciones
+
+    def __len__(self) -> int:
+        return len(self._indice())
+
+    def paginas(self) -> int:
+        """Número de páginas (0 si no hay pedidos que cumplan los filtros)."""
+        return -(-len(self._indice()) // self.tam_pagina)
+
+    def pagina(self, numero: int) -> List[Dict]:
+        """Devolver la página `numero` (0 = la más reciente), del pedido más nuevo al más viejo.
+
+        Salida esperada: lista de registros; vacía si la página no existe.
+        Lanza ValueError si `numero` es negativo.
+        """
+        if numero < 0:
+            raise ValueError("El número de página no puede ser negativo")
+        try:
+            registros = self._leer_pagina(numero)
+        except PosicionObsoleta:
+            self.recargar()  # El journal se compactó: índice nuevo y se vuelve a leer
+            registros = self._leer_pagina(numero)
+        registros.reverse()
+        return registros
+
+    def _leer_pagina(self, numero: int) -> List[Dict]:
+        indice = self._indice()
+        fin = len(indice) - numero * self.tam_pagina
+        if fin <= 0:
+            return []
+        inicio = max(0, fin - self.tam_pagina)
+        return self.almacen.leer_posiciones(indice[inicio:fin])
+
+    def __iter__(self) -> Iterator[Dict]:
+        """Recorrer todos los pedidos filtrados, de uno en uno, del más reciente al más antiguo."""
+        for numero in range(self.paginas()):
+            yield from self.pagina(numero)
@@ -1,55 +1,265 @@
 """Módulo `src.services.notificador`.
 
-Simula envíos de notificaciones al cliente. Define la interfaz y las salidas
-esperadas; la implementación real vendrá después.
+Envía notificaciones al cliente sin bloquear el flujo de pedidos: `enviar`
+solo toma una foto del pedido y la encola en un buffer acotado; un pool de
+hilos la entrega por el canal del notificador en lotes, con reintentos y
+backoff exponencial.
+
+Canales (`modo`):
+- 'console': imprime el ticket de cada evento (un único print por lote).
+- 'email': simulado; registra el ticket con `logging`.
+- 'webhook': POST JSON `{"eventos": [...]}` a `url` por cada lote.
+
+Ejemplo de uso:
+
+notificador = Notificador(modo='webhook', url='http://localhost:8080/eventos')
+notificador.enviar(pedido, 'CREADO')     # vuelve en cuanto queda encolado
+notificador.metricas()                   # profundidad, entregados, reintentos...
+notificador.cerrar()                     # espera a vaciar la cola
 """
 from __future__ import annotations
-from typing import Optional, Dict
+from typing import Optional, Dict, List, Any
+from collections import deque
+import json
+import logging
+import queue
+import random
+import threading
+import time
+import urllib.request
 
 from ..models.pedido import Pedido
+from ..utils.utils import ahora_iso, percentil
+
+logger = logging.getLogger(__name__)
+
+MODOS = ['console', 'email', 'webhook']
+POLITICAS_LLENO = ['bloquear', 'descartar']
+
+
+def renderizar_ticket(evento: Dict[str, Any], modo: str = 'console') -> str:
+    """Devolver el texto del ticket de un evento encolado."""
+    pedido = evento['pedido']
+    lineas = [f"[Notificador-{modo}] Evento: {evento['evento']} para Pedido ID: {pedido.get('id')}\n"]
+    items = pedido.get('items') or []
+    if items:
+        lineas.append("\n------------- TICKET -------------")
+        for it in items:
+            name = it.get('name', 'N/A')
+            qty = int(it.get('qty', 1))
+            price = float(it.get('price', 0.0))
+            lineas.append(f"{name}\tx{qty}\t${price:.2f}:\t${qty * price:.2f}")
+        lineas.append("----------------------------------")
+        lineas.append(f"TOTAL:\t${pedido.get('total_price', 0.0):.2f}")
+        if pedido.get('cliente_info'):
+            lineas.append(f"Cliente: {pedido['cliente_info']}")
+        lineas.append("----------------------------------")
+    else:
+        lineas.append("(No hay items para ticket)")
+    return '\n'.join(lineas)
 
 
 class Notificador:
-    """Simula un notificador con diferentes 'modos' (console, email, webhook).
+    """Notificador asíncrono con diferentes 'modos' (console, email, webhook).
+
+    Parámetros:
+    - modo: canal de entrega.
+    - url: destino del modo 'webhook'.
+    - capacidad: tamaño máximo del buffer de eventos pendientes.
+    - trabajadores: hilos de entrega.
+    - tam_lote / espera_lote_s: máximo de eventos por lote y tiempo máximo que
+      un trabajador espera para completar un lote.
+    - reintentos / backoff_s: reintentos por lote con espera backoff_s * 2**n.
+    - politica_lleno: con el buffer lleno, 'bloquear' (hasta `espera_max_s`) o
+      'descartar' inmediatamente. En ambos casos `enviar` devuelve False si
+      el evento no se pudo encolar.
     """
 
-    def __init__(self, modo: str = 'console') -> None:
-        """Inicializar notificador.
+    def __init__(self, modo: str = 'console', url: Optional[str] = None, capacidad: int = 1000,
+                 trabajadores: int = 2, tam_lote: int = 50, espera_lote_s: float = 0.05,
+                 reintentos: int = 3, backoff_s: float = 0.1, politica_lleno: str = 'bloquear',
+                 espera_max_s: float = 1.0, timeout_s: float = 5.0) -> None:
+        """Inicializar notificador y arrancar sus trabajadores.
 
         Salida esperada: instancia con `modo` guardado.
         """
+        if modo not in MODOS:
+            raise ValueError(f"Modo inválido: {modo}. Debe ser uno de: {', '.join(MODOS)}")
+        if modo == 'webhook' and not url:
+            raise ValueError("El modo 'webhook' requiere url")
+        if politica_lleno not in POLITICAS_LLENO:
+            raise ValueError(f"Política inválida: {politica_lleno}. Debe ser una de: {', '.join(POLITICAS_LLENO)}")
         self.modo = modo
-        
+        self.url = url
+        self.tam_lote = max(1, tam_lote)
+        self.espera_lote_s = espera_lote_s
+        self.reintentos = reintentos
+        self.backoff_s = backoff_s
+        self.politica_lleno = politica_lleno
+        self.espera_max_s = espera_max_s
+        self.timeout_s = timeout_s
+        self._cola: queue.Queue = queue.Queue(maxsize=capacidad)
+        self._lock = threading.Lock()
+        self._contadores = {'encolados': 0, 'entregados': 0, 'fallidos': 0, 'descartados': 0,
+                            'bloqueos': 0, 'reintentos': 0, 'lotes': 0}
+        self._profundidad_max = 0
+        self._latencias = deque(maxlen=1024)  # Segundos entre encolar y entregar (ventana acotada)
+        self._cerrado = False
+        self._enviando = 0  # Llamadas a `enviar` que pasaron el control de cierre y aún no encolaron
+        self._sin_envios = threading.Condition(self._lock)
+        self._hilos = [threading.Thread(target=self._trabajar, name=f"notificador-{modo}-{i}", daemon=True)
+                       for i in range(max(1, trabajadores))]
+        for hilo in self._hilos:
+            hilo.start()
+
+    def _contar(self, clave: str, n: int = 1) -> None:
+        with self._lock:
+            self._contadores[clave] += n
 
     def enviar(self, pedido: Pedido, evento: str, extra: Optional[Dict] = None) -> bool:
-        """Enviar una notificación sobre `pedido` y `evento`.
+        """Encolar una notificación sobre `pedido` y `evento`.
 
-        Salida esperada: True si la notificación se envió (o se simuló) correctamente,
-        False en caso de fallo.
+        Salida esperada: True si el evento quedó encolado para su entrega,
+        False si el notificador está cerrado o el buffer está lleno.
         """
+        with self._lock:
+            if self._cerrado:
+                return False
+            self._enviando += 1  # `cerrar` espera a que llegue a 0 antes de encolar las señales de parada
         try:
-            print(f"[Notificador-{self.modo}] Evento: {evento} para Pedido ID: {pedido.id}\n")
-
-            items = getattr(pedido, 'items', []) or []
-            if items:
-                print("\n------------- TICKET -------------")
-                running = 0.0
-                for it in items:
-                    name = it.get('name', 'N/A')
-                    qty = int(it.get('qty', 1))
-                    price = float(it.get('price', 0.0))
-                    subtotal = qty * price
-                    running += subtotal
-                    print(f"{name}\tx{qty}\t${price:.2f}:\t${subtotal:.2f}")
-                total = pedido.total_price() if hasattr(pedido, 'total_price') else running
-                print("----------------------------------")
-                print(f"TOTAL:\t${total:.2f}")
-                if getattr(pedido, 'cliente_info', None):
-                    print(f"Cliente: {pedido.cliente_info}")
-                print("----------------------------------")
-            else:
-                print("(No hay items para ticket)")
-            return True
+            return self._encolar(pedido, evento, extra)
+        finally:
+            with self._lock:
+                self._enviando -= 1
+                if not self._enviando:
+                    self._sin_envios.notify_all()
+
+    def _encolar(self, pedido: Pedido, evento: str, extra: Optional[Dict]) -> bool:
+        try:
+            registro = {'evento': evento, 'pedido': pedido.as_dict(), 'extra': extra,
+                        'timestamp': ahora_iso(), '_encolado': time.monotonic()}
         except Exception as e:
-            print(f"[Notificador] Error al enviar notificación: {e}")
+            logger.warning("[Notificador] Error al enviar notificación %s: %s", evento, e)
             return False
+        try:
+            self._cola.put_nowait(registro)
+        except queue.Full:
+            if self.politica_lleno == 'descartar':
+                self._contar('descartados')
+                return False
+            self._contar('bloqueos')
+            try:
+                self._cola.put(registro, timeout=self.espera_max_s)
+            except queue.Full:
+                self._contar('descartados')
+                return False
+        with self._lock:
+            self._contadores['encolados'] += 1
+            self._profundidad_max = max(self._profundidad_max, self._cola.qsize())
+        return True
+
+    def _siguiente_lote(self) -> Optional[List[Dict]]:
+        primero = self._cola.get()
+        if primero is None:
+            return None  # Señal de parada
+        lote = [primero]
+        limite = time.monotonic() + self.espera_lote_s
+        while len(lote) < self.tam_lote:
+            restante = limite - time.monotonic()
+            try:
+                registro = self._cola.get(timeout=restante) if restante > 0 else self._cola.get_nowait()
+            except queue.Empty:
+                break
+            if registro is None:
+                self._cola.task_done()
+                self._cola.put(None)  # Devolver la señal: la atenderá este u otro trabajador
+                break
+            lote.append(registro)
+        return lote
+
+    def _trabajar(self) -> None:
+        while True:
+            lote = self._siguiente_lote()
+            if lote is None:
+                self._cola.task_done()
+                return
+            try:
+                self._entregar_con_reintentos(lote)
+            finally:
+                for _ in lote:
+                    self._cola.task_done()
+
+    def _entregar_con_reintentos(self, lote: List[Dict]) -> None:
+        for intento in range(self.reintentos + 1):
+            try:
+                self._entregar(lote)
+            except Exception as e:
+                if intento == self.reintentos:
+                    logger.warning("[Notificador] Lote de %d eventos descartado tras %d intentos: %s",
+                                   len(lote), intento + 1, e)
+                    self._contar('fallidos', len(lote))
+                    return
+                self._contar('reintentos')
+                espera = self.backoff_s * (2 ** intento)
+                time.sleep(espera + random.uniform(0, espera / 2))  # Jitter para no sincronizar reintentos
+                continue
+            ahora = time.monotonic()
+            with self._lock:
+                self._contadores['entregados'] += len(lote)
+                self._contadores['lotes'] += 1
+                self._latencias.extend(ahora - r['_encolado'] for r in lote)
+            return
+
+    def _entregar(self, lote: List[Dict]) -> None:
+        """Entregar un lote por el canal del notificador (lanza excepción si falla)."""
+        if self.modo == 'console':
+            print('\n'.join(renderizar_ticket(r, self.modo) for r in lote))
+        elif self.modo == 'email':
+            for r in lote:
+                logger.info("Email simulado:\n%s", renderizar_ticket(r, self.modo))
+        else:
+            cuerpo = json.dumps({'eventos': [{k: v for k, v in r.items() if not k.startswith('_')} for r in lote]},
+                                ensure_ascii=False, default=str).encode('utf-8')
+            peticion = urllib.request.Request(self.url, data=cuerpo, method='POST',
+                                              headers={'Content-Type': 'application/json'})
+            with urllib.request.urlopen(peticion, timeout=self.timeout_s) as respuesta:
+                if respuesta.status >= 300:
+                    raise RuntimeError(f"Webhook respondió {respuesta.status}")
+
+    def metricas(self) -> Dict[str, Any]:
+        """Devolver contadores y métricas de contrapresión.
+
+        Salida esperada: dict con encolados, entregados, fallidos, descartados,
+        bloqueos, reintentos, lotes, profundidad actual/máxima y latencia
+        (p50/p95, segundos) entre encolar y entregar.
+        """
+        with self._lock:
+            datos: Dict[str, Any] = dict(self._contadores)
+            datos['profundidad'] = self._cola.qsize()
+            datos['profundidad_max'] = self._profundidad_max
+            latencias = sorted(self._latencias)
+        datos['latencia_p50_s'] = percentil(latencias, 50)
+        datos['latencia_p95_s'] = percentil(latencias, 95)
+        return datos
+
+    def vaciar(self) -> None:
+        """Esperar a que se entreguen (o descarten) todos los eventos encolados."""
+        self._cola.join()
+
+    def cerrar(self) -> None:
+        """Entregar lo pendiente y detener los trabajadores. Idempotente.
+
+        Los `enviar` concurrentes que ya pasaron el control de cierre terminan
+        de encolar antes que las señales de parada, así que todo evento
+        aceptado (True) se entrega; los posteriores devuelven False.
+        """
+        with self._lock:
+            if self._cerrado:
+                return
+            self._cerrado = True
+            while self._enviando:
+                self._sin_envios.wait()
+        for _ in self._hilos:
+            self._cola.put(None)  # Una señal de parada por trabajador, detrás de lo pendiente
+        for hilo in self._hilos:
+            hilo.join()
@@ -0,0 +1,368 @@
+"""Módulo `src.services.recuperacion`.
+
+Checkpoints del estado completo de un `GestorPedidos` (pedidos, colas y
+pedidos en preparación de cada estación y contador de ids) y recuperación
+tras un reinicio.
+
+Funcionamiento:
+- Cada alta y cada cambio (estado, estación) que el gestor persiste se anota
+  también en una bitácora de solo-anexado (`JournalPedidos` en
+  `<directorio>/bitacora`).
+- Un checkpoint sella el segmento activo de la bitácora, escribe una foto
+  binaria del gestor (`<directorio>/foto.bin`, reemplazo atómico) y borra los
+  segmentos anteriores: ya están reflejados en la foto.
+- Al arrancar, `restaurar` carga la foto (con `mmap`) y reaplica solo la cola
+  de la bitácora posterior a ella. El coste depende del estado vivo y de lo
+  ocurrido desde el último checkpoint, no del tamaño del historial.
+
+Formato de la foto (little-endian): cabecera fija, índice de N+1 offsets
+`uint64` y N registros `CodecBinario` (el registro i va de offset[i] a
+offset[i+1]); al final, las estaciones como JSON compacto. El índice permite
+leer cualquier pedido directamente sobre el fichero mapeado.
+
+Ejemplo de uso:
+
+from src.services.recuperacion import RecuperacionGestor
+
+recuperacion = RecuperacionGestor('pedidos.estado', incluir_terminados=False)
+gestor = GestorPedidos(almacen=almacen)
+gestor.registrar_estacion(EstacionCocina('A', capacidad=2))
+recuperacion.restaurar(gestor)       # foto + cola de la bitácora; engancha la bitácora
+recuperacion.iniciar(intervalo_s=30)  # checkpoints periódicos en segundo plano
+...
+recuperacion.cerrar()                # checkpoint final
+"""
+from __future__ import annotations
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Union
+from array import array
+import json
+import logging
+import mmap
+import os
+import re
+import struct
+import threading
+
+from ..models.estacion_cocina import EstacionCocina
+from ..models.pedido import Pedido
+from .almacenamiento import AlmacenPedidos, JournalPedidos
+from .gestor_pedidos import GestorPedidos
+from .serializacion import CodecBinario
+
+logger = logging.getLogger(__name__)
+
+# Cerrados para la cocina: LISTO ya salió de su estación y la app no marca ENTREGADO
+ESTADOS_TERMINALES = ('LISTO', 'ENTREGADO', 'CANCELADO')
+_ESTADOS_EN_ESTACION = ('EN_COLA', 'EN_PREPARACION')
+_MAGIA = b'PEDFOTO1'
+# magia, versión, último id, segmento de la bitácora, nº de pedidos, offset y longitud de las estaciones
+_CABECERA = struct.Struct('<8sHxxqIIQQ')
+_VERSION = 1
+_PATRON_ID = re.compile(r'^PED-(\d+)$')
+
+
+class FotoGestor(NamedTuple):
+    """Contenido de una foto del gestor.
+
+    - segmento: primer segmento de la bitácora que NO está reflejado en la foto.
+    - estaciones: [{'id', 'capacidad', 'cola': [ids], 'en_preparacion': [ids]}].
+    """
+    ultimo_id: int
+    segmento: int
+    registros: List[Dict]
+    estaciones: List[Dict]
+
+
+def escribir_foto(ruta: str, foto: FotoGestor) -> int:
+    """Escribir `foto` en `ruta` de forma atómica (temporal + fsync + replace).
+
+    Salida esperada: bytes escritos.
+    """
+    codec = CodecBinario()
+    cuerpos = [codec.codificar(r) for r in foto.registros]
+    n = len(cuerpos)
+    indice = array('Q', [0]) * (n + 1)
+    posicion = _CABECERA.size + indice.itemsize * (n + 1)
+    for i, cuerpo in enumerate(cuerpos):
+        indice[i] = posicion
+        posicion += len(cuerpo)
+    indice[n] = posicion
+    estaciones = json.dumps(foto.estaciones, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    cabecera = _CABECERA.pack(_MAGIA, _VERSION, foto.ultimo_id, foto.segmento, n, posicion, len(estaciones))
+    temporal = ruta + '.tmp'
+    with open(temporal, 'wb') as f:
+        f.write(cabecera)
+        f.write(indice.tobytes())
+        f.writelines(cuerpos)
+        f.write(estaciones)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporal, ruta)
+    return posicion + len(estaciones)
+
+
+class LectorFoto:
+    """Acceso a una foto mapeada en memoria: cabecera y registros por posición.
+
+    Solo decodifica los registros que se piden (`registro(i)`, `registros()`).
+    Usar como context manager o llamar a `cerrar()`.
+    """
+
+    def __init__(self, ruta: str) -> None:
+        with open(ruta, 'rb') as f:
+            self._mapa = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if len(self._mapa) < _CABECERA.size:
+                raise ValueError(f"Foto truncada: {ruta}")
+            magia, version, self.ultimo_id, self.segmento, self.n, offset, longitud = \
+                _CABECERA.unpack_from(self._mapa, 0)
+            if magia != _MAGIA or version != _VERSION:
+                raise ValueError(f"Formato de foto desconocido: {ruta}")
+            self._indice = array('Q')
+            self._indice.frombytes(self._mapa[_CABECERA.size:_CABECERA.size + 8 * (self.n + 1)])
+            self.estaciones: List[Dict] = json.loads(self._mapa[offset:offset + longitud])
+        except Exception:
+            self._mapa.close()
+            raise
+        self._codec = CodecBinario()
+
+    def __len__(self) -> int:
+        return self.n
+
+    def registro(self, i: int) -> Dict:
+        """Decodificar el registro i (0 <= i < len) directamente del fichero mapeado."""
+        if not 0 <= i < self.n:
+            raise IndexError(i)
+        return self._codec.decodificar(self._mapa[self._indice[i]:self._indice[i + 1]])
+
+    def registros(self) -> Iterator[Dict]:
+        for i in range(self.n):
+            yield self.registro(i)
+
+    def foto(self) -> FotoGestor:
+        """Cargar la foto completa."""
+        return FotoGestor(self.ultimo_id, self.segmento, list(self.registros()), self.estaciones)
+
+    def cerrar(self) -> None:
+        self._mapa.close()
+
+    def __enter__(self) -> 'LectorFoto':
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.cerrar()
+
+
+def leer_foto(ruta: str) -> Optional[FotoGestor]:
+    """Cargar la foto de `ruta`; None si no existe. Lanza ValueError si está corrupta."""
+    if not os.path.exists(ruta):
+        return None
+    with LectorFoto(ruta) as lector:
+        return lector.foto()
+
+
+class AlmacenConBitacora(AlmacenPedidos):
+    """Envuelve el almacén del gestor (puede ser None) y anota altas y cambios en la bitácora.
+
+    El resto de operaciones se delegan tal cual en el almacén envuelto.
+    """
+
+    def __init__(self, almacen: Optional[AlmacenPedidos], bitacora: JournalPedidos) -> None:
+        self.almacen = almacen
+        self.bitacora = bitacora
+
+    def guardar(self, registro: Dict) -> None:
+        if self.almacen is not None:
+            self.almacen.guardar(registro)
+        self.bitacora.guardar({'op': 'alta', 'r': registro})
+
+    def guardar_lote(self, registros: List[Dict]) -> None:
+        if self.almacen is not None:
+            self.almacen.guardar_lote(registros)
+        self.bitacora.guardar_lote([{'op': 'alta', 'r': r} for r in registros])
+
+    def actualizar(self, pedido_id: Union[str, int], cambios: Dict) -> None:
+        if self.almacen is not None:
+            self.almacen.actualizar(pedido_id, cambios)
+        self.bitacora.guardar({'op': 'cambio', 'id': pedido_id, 'c': cambios})
+
+    def actualizar_lote(self, cambios: Sequence[Tuple[Union[str, int], Dict]]) -> None:
+        if self.almacen is not None:
+            self.almacen.actualizar_lote(cambios)
+        self.bitacora.guardar_lote([{'op': 'cambio', 'id': pedido_id, 'c': c} for pedido_id, c in cambios])
+
+    def iterar(self) -> Iterator[Dict]:
+        return self.almacen.iterar() if self.almacen is not None else iter(())
+
+    def flush(self) -> None:
+        if self.almacen is not None:
+            self.almacen.flush()
+        self.bitacora.flush()
+
+    def consultar(self, *args: Any, **kwargs: Any) -> List[Dict]:
+        return self.almacen.consultar(*args, **kwargs) if self.almacen is not None else []
+
+    def contar(self, *args: Any, **kwargs: Any) -> int:
+        return self.almacen.contar(*args, **kwargs) if self.almacen is not None else 0
+
+    def posiciones(self, *args: Any, **kwargs: Any) -> Sequence[int]:
+        return self.almacen.posiciones(*args, **kwargs) if self.almacen is not None else array('q')
+
+    def leer_posiciones(self, posiciones: Sequence[int]) -> List[Dict]:
+        return self.almacen.leer_posiciones(posiciones) if self.almacen is not None else []
+
+    def cerrar(self) -> None:
+        if self.almacen is not None:
+            self.almacen.cerrar()
+
+
+def _numero_id(pedido_id: Union[str, int]) -> int:
+    m = _PATRON_ID.match(str(pedido_id))
+    return int(m.group(1)) if m else 0
+
+
+class RecuperacionGestor:
+    """Checkpoints periódicos y recuperación de un `GestorPedidos`.
+
+    Parámetros:
+    - directorio: carpeta con `foto.bin` y la bitácora (`bitacora/`).
+    - incluir_terminados: si es False, la foto omite los pedidos LISTO,
+      ENTREGADO y CANCELADO (`ESTADOS_TERMINALES`; su historial ya está en el
+      almacén) y el arranque no crece con los pedidos cerrados.
+    - fsync: política de la bitácora (ver `JournalPedidos`).
+
+    Los checkpoints no detienen al gestor: la foto se toma después de sellar
+    la bitácora, así que lo que cambie mientras se toma también queda en la
+    cola de la bitácora y se reaplica al restaurar (reaplicar es idempotente).
+    La bitácora no se compacta: sus segmentos viejos se borran en cada checkpoint.
+    """
+
+    def __init__(self, directorio: str, incluir_terminados: bool = True, fsync: str = 'intervalo') -> None:
+        self.directorio = os.path.abspath(directorio)
+        os.makedirs(self.directorio, exist_ok=True)
+        self.ruta_foto = os.path.join(self.directorio, 'foto.bin')
+        self.incluir_terminados = incluir_terminados
+        self.bitacora = JournalPedidos(os.path.join(self.directorio, 'bitacora'), fsync=fsync, compactar_desde=0)
+        self.gestor: Optional[GestorPedidos] = None
+        self._lock = threading.Lock()  # Un checkpoint a la vez
+        self._parar = threading.Event()
+        self._hilo: Optional[threading.Thread] = None
+        self._cerrado = False
+
+    def restaurar(self, gestor: GestorPedidos) -> Dict[str, int]:
+        """Cargar en `gestor` (recién creado) la última foto y la cola de la bitácora.
+
+        Las estaciones de la foto que el gestor no tenga registradas se crean
+        con su capacidad guardada. Después engancha la bitácora al almacén del
+        gestor para anotar los cambios siguientes.
+
+        Salida esperada: {'pedidos': n restaurados, 'eventos': n reaplicados,
+        'foto': 1 si había foto, 0 si no}.
+        """
+        foto = leer_foto(self.ruta_foto)
+        registros: Dict[Union[str, int], Dict] = {}
+        orden: Dict[Union[str, int], Tuple[int, int]] = {}  # Posición en su estación (foto primero, luego bitácora)
+        capacidades: Dict[Union[str, int], int] = {}
+        ultimo_id = segmento = 0
+        if foto is not None:
+            ultimo_id, segmento = foto.ultimo_id, foto.segmento
+            for registro in foto.registros:
+                registros[registro['id']] = registro
+            for e in foto.estaciones:
+                capacidades[e['id']] = e['capacidad']
+                for i, pedido_id in enumerate(e['cola'] + e['en_preparacion']):
+                    orden[pedido_id] = (0, i)
+        eventos = 0
+        for evento in self.bitacora.iterar_desde(segmento):
+            eventos += 1
+            if evento.get('op') == 'alta':
+                registro = evento['r']
+                registros[registro['id']] = registro
+                orden.pop(registro['id'], None)
+                ultimo_id = max(ultimo_id, _numero_id(registro['id']))
+            elif evento.get('op') == 'cambio':
+                registro = registros.get(evento['id'])
+                if registro is None:
+                    continue  # Pedido terminado que la foto omitió
+                registro.update(evento['c'])
+                if evento['c'].get('estado') in _ESTADOS_EN_ESTACION:
+                    orden[evento['id']] = (1, eventos)
+
+        pedidos = Pedido.desde_dicts(list(registros.values()))
+        gestor.restaurar(pedidos, ultimo_id)
+        por_estacion: Dict[Union[str, int], Tuple[List[Pedido], List[Pedido]]] = {}
+        for pedido in pedidos:
+            if pedido.estacion_id is not None and pedido.estado in _ESTADOS_EN_ESTACION:
+                cola, en_preparacion = por_estacion.setdefault(pedido.estacion_id, ([], []))
+                (cola if pedido.estado == 'EN_COLA' else en_preparacion).append(pedido)
+        for estacion_id, (cola, en_preparacion) in por_estacion.items():
+            estacion = gestor.estaciones.get(estacion_id)
+            if estacion is None:
+                estacion = EstacionCocina(estacion_id, capacidad=capacidades.get(estacion_id, 1))
+                gestor.registrar_estacion(estacion)
+            estacion.restaurar(sorted(cola, key=lambda p: orden.get(p.id, (2, 0))),
+                               sorted(en_preparacion, key=lambda p: orden.get(p.id, (2, 0))))
+        self.conectar(gestor)
+        return {'pedidos': len(pedidos), 'eventos': eventos, 'foto': int(foto is not None)}
+
+    def conectar(self, gestor: GestorPedidos) -> None:
+        """Anotar en la bitácora los cambios de `gestor` (sin restaurar nada)."""
+        if not isinstance(gestor.almacen, AlmacenConBitacora):
+            gestor.almacen = AlmacenConBitacora(gestor.almacen, self.bitacora)
+        self.gestor = gestor
+
+    def checkpoint(self) -> int:
+        """Escribir una foto del gestor y borrar la bitácora que ya refleja.
+
+        Salida esperada: número de pedidos guardados en la foto. Lanza
+        ValueError si aún no hay gestor (`restaurar` o `conectar`).
+        """
+        gestor = self.gestor
+        if gestor is None:
+            raise ValueError("No hay gestor: llama antes a restaurar() o conectar()")
+        with self._lock:
+            segmento = self.bitacora.rotar()  # Lo que cambie desde aquí queda en la cola de la bitácora
+            ultimo_id = gestor.ultimo_id()
+            estaciones = [{'id': e.id, 'capacidad': e.capacidad, 'cola': [p.id for p in e.cola],
+                           'en_preparacion': [p.id for p in e.en_preparacion]}
+                          for e in list(gestor.estaciones.values())]
+            registros = [p.as_dict() for p in list(gestor.pedidos.values())
+                         if self.incluir_terminados or p.estado not in ESTADOS_TERMINALES]
+            escribir_foto(self.ruta_foto, FotoGestor(ultimo_id, segmento, registros, estaciones))
+            self.bitacora.purgar_anteriores(segmento)
+            return len(registros)
+
+    def iniciar(self, intervalo_s: float = 30.0) -> threading.Thread:
+        """Lanzar checkpoints cada `intervalo_s` segundos en un hilo daemon."""
+        if intervalo_s <= 0:
+            raise ValueError("intervalo_s debe ser mayor que cero")
+        if self._hilo is not None and self._hilo.is_alive():
+            return self._hilo
+        self._parar.clear()
+        self._hilo = threading.Thread(target=self._bucle, args=(intervalo_s,), name='gestor-checkpoint', daemon=True)
+        self._hilo.start()
+        return self._hilo
+
+    def _bucle(self, intervalo_s: float) -> None:
+        while not self._parar.wait(intervalo_s):
+            try:
+                self.checkpoint()
+            except Exception:
+                logger.exception("Falló el checkpoint del gestor")
+
+    def detener(self) -> None:
+        """Parar los checkpoints periódicos (espera al que esté en curso)."""
+        self._parar.set()
+        if self._hilo is not None:
+            self._hilo.join()
+            self._hilo = None
+
+    def cerrar(self, checkpoint_final: bool = True) -> None:
+        """Parar el hilo, hacer un último checkpoint (si hay gestor) y cerrar la bitácora. Idempotente."""
+        if self._cerrado:
+            return
+        self.detener()
+        if checkpoint_final and self.gestor is not None:
+            self.checkpoint()
+        self.bitacora.cerrar()
+        self._cerrado = True
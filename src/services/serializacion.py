@@ -0,0 +1,308 @@
+"""Módulo `src.services.serializacion`.
+
+Códecs intercambiables para serializar registros de pedido (la forma de
+`Pedido.as_dict()`) y rutas rápidas de decodificación masiva a objetos
+`Pedido`.
+
+Códecs:
+- `CodecJSON`: JSON compacto de la librería estándar (sin sangría ni espacios).
+- `CodecOrjson` / `CodecMsgpack`: usan `orjson` o `msgpack` si están
+  instalados (dependencias opcionales). `codec_rapido()` devuelve el mejor
+  disponible y, si no hay ninguno, `CodecJSON`.
+- `CodecBinario`: formato binario compacto con `struct` (sin nombres de
+  campo; fechas como microsegundos enteros).
+
+Todos admiten `codificar`/`decodificar` (un registro) y
+`codificar_lote`/`decodificar_lote` (muchos registros en un solo bloque).
+
+Ejemplo de uso:
+
+from src.services.serializacion import codec_rapido, decodificar_pedidos
+
+codec = codec_rapido()
+datos = codec.codificar_lote([p.as_dict() for p in pedidos])
+pedidos = decodificar_pedidos(datos, codec)    # registros de confianza: sin revalidar
+"""
+from __future__ import annotations
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
+from datetime import datetime, timedelta
+import json
+import struct
+
+try:  # Dependencias opcionales: códecs más rápidos si están instaladas
+    import orjson
+except ImportError:  # pragma: no cover - depende del entorno
+    orjson = None
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - depende del entorno
+    msgpack = None
+
+from ..models.pedido import Pedido
+
+
+class Codec:
+    """Interfaz de un códec de registros.
+
+    - nombre: identificador legible.
+    - lineal: True si cada registro codificado es una sola línea sin b'\\n'
+      (apto para ficheros de una línea por registro, como el journal).
+    """
+
+    nombre = 'base'
+    lineal = False
+
+    def codificar(self, registro: Dict) -> bytes:
+        raise NotImplementedError()
+
+    def decodificar(self, datos: bytes) -> Dict:
+        raise NotImplementedError()
+
+    def codificar_lote(self, registros: Sequence[Dict]) -> bytes:
+        """Codificar varios registros en un bloque (por defecto, tramas con prefijo de longitud)."""
+        empaquetar = _LONGITUD.pack
+        partes = []
+        for registro in registros:
+            datos = self.codificar(registro)
+            partes.append(empaquetar(len(datos)))
+            partes.append(datos)
+        return b''.join(partes)
+
+    def decodificar_lote(self, datos: bytes) -> List[Dict]:
+        registros = []
+        vista = memoryview(datos)
+        posicion = 0
+        while posicion < len(datos):
+            (longitud,) = _LONGITUD.unpack_from(datos, posicion)
+            posicion += _LONGITUD.size
+            registros.append(self.decodificar(vista[posicion:posicion + longitud]))
+            posicion += longitud
+        return registros
+
+
+class CodecJSON(Codec):
+    """JSON compacto de la librería estándar (UTF-8, sin espacios)."""
+
+    nombre = 'json'
+    lineal = True
+
+    def __init__(self) -> None:
+        self._codificador = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'), default=str)
+
+    def codificar(self, registro: Dict) -> bytes:
+        return self._codificador.encode(registro).encode('utf-8')
+
+    def decodificar(self, datos: bytes) -> Dict:
+        return json.loads(bytes(datos))
+
+    def codificar_lote(self, registros: Sequence[Dict]) -> bytes:
+        return self._codificador.encode(list(registros)).encode('utf-8')  # Un array JSON: un solo paso en C
+
+    def decodificar_lote(self, datos: bytes) -> List[Dict]:
+        return json.loads(bytes(datos))
+
+
+class CodecOrjson(Codec):
+    """JSON con `orjson` (requiere el paquete opcional `orjson`)."""
+
+    nombre = 'orjson'
+    lineal = True
+
+    def __init__(self) -> None:
+        if orjson is None:
+            raise ImportError("CodecOrjson requiere el paquete 'orjson'")
+
+    def codificar(self, registro: Dict) -> bytes:
+        return orjson.dumps(registro, default=str)
+
+    def decodificar(self, datos: bytes) -> Dict:
+        return orjson.loads(datos)
+
+    def codificar_lote(self, registros: Sequence[Dict]) -> bytes:
+        return orjson.dumps(list(registros), default=str)
+
+    def decodificar_lote(self, datos: bytes) -> List[Dict]:
+        return orjson.loads(datos)
+
+
+class CodecMsgpack(Codec):
+    """MessagePack con `msgpack` (requiere el paquete opcional `msgpack`)."""
+
+    nombre = 'msgpack'
+
+    def __init__(self) -> None:
+        if msgpack is None:
+            raise ImportError("CodecMsgpack requiere el paquete 'msgpack'")
+
+    def codificar(self, registro: Dict) -> bytes:
+        return msgpack.packb(registro, use_bin_type=True, default=str)
+
+    def decodificar(self, datos: bytes) -> Dict:
+        return msgpack.unpackb(datos, raw=False)
+
+    def codificar_lote(self, registros: Sequence[Dict]) -> bytes:
+        return msgpack.packb(list(registros), use_bin_type=True, default=str)
+
+    def decodificar_lote(self, datos: bytes) -> List[Dict]:
+        return msgpack.unpackb(datos, raw=False)
+
+
+# --- binario -------------------------------------------------------------
+
+_LONGITUD = struct.Struct('<I')
+_CABECERA = struct.Struct('<Bidq')   # estado, tiempo_estimado_min (-1 = None), total_price, µs de creación
+_LINEA = struct.Struct('<Iid')       # qty, prep_time_min, price
+_U16 = struct.Struct('<H')
+_I64 = struct.Struct('<q')
+_EPOCA = datetime(1970, 1, 1)
+_MICRO = timedelta(microseconds=1)
+_CODIGO_ESTADO = {estado: i for i, estado in enumerate(Pedido.ESTADOS_VALIDOS)}
+# Etiquetas de valores id/estacion_id: pueden ser None, str o int
+_NINGUNO, _TEXTO, _ENTERO = 0, 1, 2
+# Bit alto de la longitud del nombre de una línea: tras el nombre va el id del producto
+# (los datos escritos antes nunca lo tienen, así que se siguen leyendo igual)
+_CON_ID = 0x8000
+
+
+def _escribir_valor(buffer: bytearray, valor: Union[str, int, None]) -> None:
+    if valor is None:
+        buffer.append(_NINGUNO)
+    elif isinstance(valor, int):
+        buffer.append(_ENTERO)
+        buffer += _I64.pack(valor)
+    else:
+        datos = str(valor).encode('utf-8')
+        buffer.append(_TEXTO)
+        buffer += _U16.pack(len(datos))
+        buffer += datos
+
+
+def _leer_valor(datos: bytes, posicion: int) -> Any:
+    etiqueta = datos[posicion]
+    posicion += 1
+    if etiqueta == _NINGUNO:
+        return None, posicion
+    if etiqueta == _ENTERO:
+        return _I64.unpack_from(datos, posicion)[0], posicion + 8
+    (longitud,) = _U16.unpack_from(datos, posicion)
+    posicion += 2
+    return str(datos[posicion:posicion + longitud], 'utf-8'), posicion + longitud
+
+
+class CodecBinario(Codec):
+    """Formato binario compacto y sin dependencias para registros de pedido.
+
+    Estructura (little-endian): id, estacion_id (etiqueta + valor), cabecera
+    fija (estado como código, tiempo estimado, total, creación en µs), número
+    de líneas y, por línea, nombre [+ id del producto] + (qty, prep_time_min,
+    price); al final cliente_info como JSON compacto. Solo admite registros
+    con la forma de `Pedido.as_dict()` (lanza ValueError con un estado
+    desconocido o un nombre de producto de 32 KiB o más).
+    """
+
+    nombre = 'binario'
+
+    def codificar(self, registro: Dict) -> bytes:
+        buffer = bytearray()
+        _escribir_valor(buffer, registro.get('id'))
+        _escribir_valor(buffer, registro.get('estacion_id'))
+        estado = registro.get('estado') or 'PENDIENTE'
+        if estado not in _CODIGO_ESTADO:
+            raise ValueError(f"Estado inválido: {estado}")
+        creado = registro.get('timestamp_creado')
+        if isinstance(creado, str):
+            creado = datetime.fromisoformat(creado)
+        micros = (creado - _EPOCA) // _MICRO if isinstance(creado, datetime) else -1
+        tiempo = registro.get('tiempo_estimado_min')
+        buffer += _CABECERA.pack(_CODIGO_ESTADO[estado], -1 if tiempo is None else tiempo,
+                                 float(registro.get('total_price') or 0.0), micros)
+        items = registro.get('items') or ()
+        buffer += _U16.pack(len(items))
+        for it in items:
+            nombre = it['name'].encode('utf-8')
+            if len(nombre) >= _CON_ID:
+                raise ValueError("Nombre de producto demasiado largo para el formato binario")
+            producto_id = it.get('id')
+            if producto_id is None:
+                buffer += _U16.pack(len(nombre))
+                buffer += nombre
+            else:
+                datos_id = str(producto_id).encode('utf-8')
+                buffer += _U16.pack(len(nombre) | _CON_ID)
+                buffer += nombre
+                buffer += _U16.pack(len(datos_id))
+                buffer += datos_id
+            buffer += _LINEA.pack(it['qty'], int(it.get('prep_time_min', 5)), float(it.get('price', 0.0)))
+        cliente = registro.get('cliente_info')
+        if cliente:
+            buffer += json.dumps(cliente, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        return bytes(buffer)
+
+    def decodificar(self, datos: bytes) -> Dict:
+        pedido_id, posicion = _leer_valor(datos, 0)
+        estacion_id, posicion = _leer_valor(datos, posicion)
+        estado, tiempo, total, micros = _CABECERA.unpack_from(datos, posicion)
+        posicion += _CABECERA.size
+        (n,) = _U16.unpack_from(datos, posicion)
+        posicion += 2
+        items = []
+        for _ in range(n):
+            (longitud,) = _U16.unpack_from(datos, posicion)
+            posicion += 2
+            nombre = str(datos[posicion:posicion + (longitud & ~_CON_ID)], 'utf-8')
+            posicion += longitud & ~_CON_ID
+            item = {}
+            if longitud & _CON_ID:
+                (longitud,) = _U16.unpack_from(datos, posicion)
+                posicion += 2
+                item['id'] = str(datos[posicion:posicion + longitud], 'utf-8')
+                posicion += longitud
+            qty, prep, price = _LINEA.unpack_from(datos, posicion)
+            posicion += _LINEA.size
+            item.update(name=nombre, qty=qty, prep_time_min=prep, price=price)
+            items.append(item)
+        resto = datos[posicion:]
+        return {'id': pedido_id, 'items': items, 'estado': Pedido.ESTADOS_VALIDOS[estado],
+                'tiempo_estimado_min': None if tiempo == -1 else tiempo,
+                'timestamp_creado': (_EPOCA + micros * _MICRO).isoformat() if micros >= 0 else None,
+                'estacion_id': estacion_id, 'cliente_info': json.loads(bytes(resto)) if len(resto) else None,
+                'total_price': total}
+
+
+CODECS: Dict[str, Callable[[], Codec]] = {
+    'json': CodecJSON,
+    'orjson': CodecOrjson,
+    'msgpack': CodecMsgpack,
+    'binario': CodecBinario,
+}
+
+
+def codecs_disponibles() -> List[str]:
+    """Nombres de los códecs utilizables en este entorno."""
+    return [nombre for nombre in CODECS
+            if not (nombre == 'orjson' and orjson is None) and not (nombre == 'msgpack' and msgpack is None)]
+
+
+def obtener_codec(nombre: str) -> Codec:
+    """Crear el códec `nombre`. Lanza ValueError si no existe e ImportError si falta su dependencia."""
+    if nombre not in CODECS:
+        raise ValueError(f"Códec inválido: {nombre}. Debe ser uno de: {', '.join(CODECS)}")
+    return CODECS[nombre]()
+
+
+def codec_rapido(lineal: bool = False) -> Codec:
+    """El códec más rápido disponible: orjson, msgpack (si no se pide `lineal`) o JSON estándar."""
+    if orjson is not None:
+        return CodecOrjson()
+    if msgpack is not None and not lineal:
+        return CodecMsgpack()
+    return CodecJSON()
+
+
+def decodificar_pedidos(datos: bytes, codec: Optional[Codec] = None, validar: bool = False) -> List[Pedido]:
+    """Decodificar un bloque de `codificar_lote` directamente a objetos `Pedido`.
+
+    Con `validar=False` (registros de confianza, p. ej. escritos por este
+    mismo sistema) se usa la ruta rápida de `Pedido.desde_dicts`.
+    """
+    return Pedido.desde_dicts((codec or CodecJSON()).decodificar_lote(datos), validar=validar)
@@ -0,0 +1,200 @@
+"""Módulo `src.services.simulador`.
+
+Simulación de eventos discretos de un día de servicio en tiempo virtual. Usa
+`GestorPedidos`, `EstacionCocina` y los `prep_time_min` del catálogo
+`PRODUCTS`, pero en lugar de `time.sleep` avanza un reloj virtual (minutos)
+sacando eventos de un heap, de modo que un día completo se simula en segundos.
+
+Eventos:
+- LLEGADA: se crea el pedido y se despacha con `GestorPedidos.despachar`; si
+  todas las estaciones están llenas espera en la cola de espera del gestor.
+- FIN: la estación finaliza el pedido; el hueco liberado lo ocupa en el acto
+  el primero de la cola de espera del gestor y la estación inicia su cola.
+
+Con `estaciones=ESTACIONES_ESPECIALIZADAS` (`--por-items`) cada estación
+prepara unas categorías y los pedidos se reparten en subpedidos que se
+preparan en paralelo; un pedido termina cuando termina su última parte.
+
+Ejemplo de uso:
+
+from src.services.simulador import simular_dia, formatear_reporte
+
+resultado = simular_dia(pedidos_por_hora=60, horas=12, semilla=1)
+print(formatear_reporte(resultado))
+
+o desde consola:
+
+    python -m src.services.simulador --pedidos-por-hora 60 --horas 12
+"""
+from __future__ import annotations
+from typing import Dict, List, Optional, Any, Tuple, Union
+import argparse
+import heapq
+import random
+import time
+
+from .gestor_pedidos import GestorPedidos
+from ..models.estacion_cocina import EstacionCocina
+from ..models.pedido import SubPedido
+from ..models.productos import PRODUCTS
+from ..utils.utils import percentil
+
+LLEGADA = 0
+FIN = 1
+
+ESTACIONES_POR_DEFECTO = {'A': 2, 'B': 3, 'C': 1, 'D': 3}
+# Mismas estaciones y capacidades, con A-C especializadas por categoría y D generalista
+ESTACIONES_ESPECIALIZADAS = {'A': (2, ['PIZ']), 'B': (3, ['HMB', 'SND', 'ACP', 'ENS']),
+                             'C': (1, ['BEB', 'PST', 'EXT']), 'D': 3}
+PERCENTILES = (50, 90, 95, 99)
+
+
+def _resumen(valores: List[float]) -> Dict[str, float]:
+    valores = sorted(valores)
+    resumen = {f"p{p}": percentil(valores, p) for p in PERCENTILES}
+    resumen['media'] = sum(valores) / len(valores) if valores else 0.0
+    resumen['max'] = valores[-1] if valores else 0.0
+    return resumen
+
+
+def _items_aleatorios(rnd: random.Random, productos: List[Dict]) -> List[Dict]:
+    elegidos = rnd.sample(productos, rnd.randint(1, min(3, len(productos))))
+    return [{'id': p.get('id'), 'name': p['name'], 'qty': rnd.randint(1, 2), 'prep_time_min': p['prep_time_min'],
+             'price': p['price']} for p in elegidos]
+
+
+def simular_dia(pedidos_por_hora: float = 60.0, horas: float = 12.0, semilla: Optional[int] = None,
+                estaciones: Optional[Dict[str, Union[int, Tuple[int, List[str]]]]] = None,
+                productos: Optional[List[Dict]] = None,
+                politica: str = 'menor_carga') -> Dict[str, Any]:
+    """Simular un día de servicio en tiempo virtual.
+
+    Parámetros:
+    - pedidos_por_hora: tasa media de llegadas (proceso de Poisson).
+    - horas: duración del periodo de llegadas; la simulación sigue hasta
+      terminar todos los pedidos.
+    - estaciones: {id: capacidad} o {id: (capacidad, categorías)}; por
+      defecto las de `src.main`.
+    - productos: catálogo; por defecto `PRODUCTS` (`src.models.productos`).
+    - politica: política de `GestorPedidos.despachar`.
+
+    Salida esperada: dict con throughput, longitudes de cola y percentiles
+    (p50/p90/p95/p99) de espera, preparación y tiempo total por pedido, en minutos.
+    """
+    if pedidos_por_hora <= 0 or horas <= 0:
+        raise ValueError("pedidos_por_hora y horas deben ser mayores que cero")
+    if productos is None:
+        productos = PRODUCTS
+    rnd = random.Random(semilla)
+
+    gestor = GestorPedidos()
+    for estacion_id, definicion in (estaciones or ESTACIONES_POR_DEFECTO).items():
+        capacidad, categorias = definicion if isinstance(definicion, tuple) else (definicion, None)
+        gestor.registrar_estacion(EstacionCocina(estacion_id, capacidad=capacidad, categorias=categorias))
+
+    eventos: List = []
+    secuencia = 0
+
+    def programar(t: float, tipo: int, dato: Any) -> None:
+        nonlocal secuencia
+        secuencia += 1
+        heapq.heappush(eventos, (t, secuencia, tipo, dato))
+
+    # Llegadas de Poisson durante el periodo de servicio (minutos virtuales)
+    t = 0.0
+    fin_llegadas = horas * 60.0
+    tasa_min = pedidos_por_hora / 60.0
+    while True:
+        t += rnd.expovariate(tasa_min)
+        if t > fin_llegadas:
+            break
+        programar(t, LLEGADA, _items_aleatorios(rnd, productos))
+
+    llegada: Dict[str, float] = {}
+    inicio: Dict[str, float] = {}
+    fin: Dict[str, float] = {}
+    max_cola = 0
+    area_cola = 0.0  # Integral de la longitud de cola en el tiempo (para la media)
+    reloj = 0.0
+
+    def longitud_cola() -> int:
+        return gestor.profundidad_espera() + sum(len(e._en_cola) for e in gestor.estaciones.values())
+
+    def arrancar(estacion: EstacionCocina, ahora: float) -> None:
+        for unidad in estacion.iniciar_preparacion():  # Pedidos enteros o subpedidos
+            pedido_id = unidad.padre.id if isinstance(unidad, SubPedido) else unidad.id
+            inicio.setdefault(pedido_id, ahora)  # El pedido empieza con su primera parte
+            programar(ahora + unidad.minutos_preparacion(), FIN, (estacion.id, unidad.id, pedido_id))
+
+    inicio_real = time.perf_counter()
+    while eventos:
+        ahora, _, tipo, dato = heapq.heappop(eventos)
+        cola_actual = longitud_cola()
+        area_cola += cola_actual * (ahora - reloj)
+        reloj = ahora
+        if tipo == LLEGADA:
+            pedido = gestor.crear_pedido(dato)
+            llegada[pedido.id] = ahora
+            gestor.despachar(pedido.id, politica=politica)  # Sin hueco: a la cola de espera del gestor
+            for unidad in gestor.partes_de(pedido.id) or [pedido]:
+                if unidad.estacion_id is not None:
+                    arrancar(gestor.estaciones[unidad.estacion_id], ahora)
+        else:
+            estacion_id, unidad_id, pedido_id = dato
+            estacion = gestor.estaciones[estacion_id]
+            estacion.finalizar_pedido(unidad_id)  # Su aviso drena la cola de espera hacia este hueco
+            if gestor.pedidos[pedido_id].estado == 'LISTO':  # Con subpedidos: al terminar la última parte
+                fin[pedido_id] = ahora
+            arrancar(estacion, ahora)
+        max_cola = max(max_cola, longitud_cola())
+    segundos_reales = time.perf_counter() - inicio_real
+
+    completados = list(fin)
+    duracion_h = reloj / 60.0 if reloj > 0 else 0.0
+    return {
+        'pedidos': len(llegada),
+        'completados': len(completados),
+        'duracion_virtual_min': reloj,
+        'segundos_reales': segundos_reales,
+        'throughput_por_hora': len(completados) / duracion_h if duracion_h else 0.0,
+        'cola': {'max': max_cola, 'media': area_cola / reloj if reloj > 0 else 0.0},
+        'espera_min': _resumen([inicio[p] - llegada[p] for p in completados]),
+        'preparacion_min': _resumen([fin[p] - inicio[p] for p in completados]),
+        'total_min': _resumen([fin[p] - llegada[p] for p in completados]),
+        'por_estacion': {e.id: len(gestor.listar_por_estacion(e.id)) for e in gestor.estaciones.values()},
+    }
+
+
+def formatear_reporte(resultado: Dict[str, Any]) -> str:
+    """Devolver el resultado de `simular_dia` como texto legible."""
+    lineas = [
+        f"Pedidos: {resultado['pedidos']}  completados: {resultado['completados']}",
+        f"Duración virtual: {resultado['duracion_virtual_min'] / 60:.1f} h  "
+        f"(simulado en {resultado['segundos_reales']:.2f} s)",
+        f"Throughput: {resultado['throughput_por_hora']:.1f} pedidos/h",
+        f"Cola: media {resultado['cola']['media']:.1f}  máx {resultado['cola']['max']}",
+    ]
+    for clave, titulo in (('espera_min', 'Espera'), ('preparacion_min', 'Preparación'), ('total_min', 'Total')):
+        r = resultado[clave]
+        lineas.append(f"{titulo:12s} " + '  '.join(f"p{p} {r[f'p{p}']:6.1f}" for p in PERCENTILES)
+                      + f"  media {r['media']:6.1f} min")
+    lineas.append('Pedidos por estación: ' + ', '.join(f"{k}={v}" for k, v in resultado['por_estacion'].items()))
+    return '\n'.join(lineas)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Simulación de un día de cocina en tiempo virtual')
+    parser.add_argument('--pedidos-por-hora', type=float, default=60.0)
+    parser.add_argument('--horas', type=float, default=12.0)
+    parser.add_argument('--semilla', type=int, default=None)
+    parser.add_argument('--politica', default='menor_carga')
+    parser.add_argument('--por-items', action='store_true',
+                        help='estaciones especializadas por categoría y pedidos repartidos en subpedidos')
+    args = parser.parse_args()
+    estaciones = ESTACIONES_ESPECIALIZADAS if args.por_items else None
+    print(formatear_reporte(simular_dia(args.pedidos_por_hora, args.horas, args.semilla, estaciones=estaciones,
+                                        politica=args.politica)))
+
+
+if __name__ == '__main__':
+    main()
@@ -4,23 +4,144 @@ Funciones responsables de calcular tiempos estimados y formatearlos.
 Contiene firmas y docstrings que explican valores de retorno esperados.
 """
 from __future__ import annotations
-from typing import Optional
+from typing import Optional, Dict, List, Sequence, Tuple, Union
+from itertools import accumulate
+import math
+
+try:  # NumPy es opcional: acelera los cálculos por lotes si está instalado
+    import numpy as np
+except ImportError:  # pragma: no cover - depende del entorno
+    np = None
 
 from ..models.pedido import Pedido
-from ..models.estacion_cocina import EstacionCocina
+from ..models.estacion_cocina import EstacionCocina, TrabajoEstacion
+
+
+def _minutos_propios(pedidos: Sequence[Pedido]) -> List[float]:
+    """Minutos de preparación (prep_time_min * qty) de cada pedido (total mantenido por `Pedido`, O(1))."""
+    return [float(p.minutos_preparacion()) for p in pedidos]
+
+
+def _esperas_estacion(trabajo: TrabajoEstacion, capacidad: int) -> Dict[Union[str, int], float]:
+    """Espera estimada de cada pedido en cola: (trabajo en preparación + trabajo delante) / capacidad."""
+    capacidad = max(capacidad, 1)
+    en_preparacion = sum(trabajo.en_preparacion.values())
+    ids = [pid for pid, _ in trabajo.cola]
+    if np is not None and ids:
+        cola = np.fromiter((minutos for _, minutos in trabajo.cola), dtype=np.float64, count=len(ids))
+        delante = np.concatenate(([0.0], np.cumsum(cola)[:-1]))
+        esperas = ((delante + en_preparacion) / capacidad).tolist()
+    else:
+        delante = accumulate((minutos for _, minutos in trabajo.cola[:-1]), initial=0)
+        esperas = [(d + en_preparacion) / capacidad for d in delante]
+    return dict(zip(ids, esperas))
+
+
+def _espera_sin_asignar(estacion: EstacionCocina) -> float:
+    """Trabajo pendiente de la estación / capacidad, con capacidad mínima 1 como en `_esperas_estacion`.
+
+    `fin_estimado()` devuelve inf con capacidad 0 (sirve para ordenar
+    estaciones), pero una estimación en minutos tiene que ser finita.
+    """
+    return estacion.minutos_pendientes() / max(estacion.capacidad, 1)
+
+
+def _espera_pedido(pedido_id: Union[str, int], estacion: EstacionCocina) -> float:
+    """Espera de un solo pedido en `estacion`, en Python puro: recorre la cola solo hasta encontrarlo."""
+    trabajo = estacion.trabajo()
+    if pedido_id in trabajo.en_preparacion:
+        return 0.0
+    delante = sum(trabajo.en_preparacion.values())
+    for pid, minutos in trabajo.cola:
+        if pid == pedido_id:
+            return delante / max(estacion.capacidad, 1)
+        delante += minutos
+    return _espera_sin_asignar(estacion)  # Aún no asignado
+
+
+def estimar_tiempos(pedidos: Sequence[Pedido], estacion: Optional[EstacionCocina] = None,
+                    estaciones: Optional[Dict[Union[str, int], EstacionCocina]] = None) -> List[int]:
+    """Calcular el tiempo estimado (minutos) de muchos pedidos a la vez.
+
+    La estación de cada pedido es `estacion` si se indica, o
+    `estaciones[pedido.estacion_id]`. Con estación, la estimación suma a los
+    minutos propios del pedido la espera de su cola:
+    - en preparación: sin espera;
+    - en cola: (trabajo en preparación + trabajo delante) / capacidad;
+    - aún no asignado: trabajo pendiente de la estación / capacidad.
+
+    Los minutos propios son el total que mantiene cada `Pedido`; las esperas
+    de cada cola se calculan una sola vez por lote, vectorizadas con NumPy si
+    está instalado.
+
+    Salida esperada: lista de enteros >= 0, en el mismo orden que `pedidos`.
+    """
+    propios = _minutos_propios(pedidos)
+    # id(estación) -> (minutos en preparación por id, espera por id en cola): una foto por estación y lote
+    por_estacion: Dict[int, Tuple[Dict[Union[str, int], int], Dict[Union[str, int], float]]] = {}
+    resultado = []
+    for pedido, minutos in zip(pedidos, propios):
+        est = estacion if estacion is not None else (estaciones or {}).get(pedido.estacion_id)
+        espera = 0.0
+        if est is not None:
+            datos = por_estacion.get(id(est))
+            if datos is None:
+                trabajo = est.trabajo()
+                datos = por_estacion[id(est)] = (trabajo.en_preparacion, _esperas_estacion(trabajo, est.capacidad))
+            en_preparacion, esperas = datos
+            if pedido.id not in en_preparacion:
+                espera = esperas.get(pedido.id, _espera_sin_asignar(est))
+        resultado.append(int(math.ceil(minutos + espera)))
+    return resultado
+
+
+def actualizar_tiempos_estimados(gestor) -> int:
+    """Recalcular `tiempo_estimado_min` de todos los pedidos abiertos del gestor.
+
+    Usa los índices por estado del gestor, así el coste depende de los pedidos
+    abiertos y no del historial. Pensado para llamarse tras cada cambio de estado.
+
+    Salida esperada: número de pedidos actualizados.
+    """
+    abiertos = []
+    for estado in ('PENDIENTE', 'EN_COLA', 'EN_PREPARACION'):
+        abiertos.extend(gestor.listar_pedidos(estado))
+    estimados = estimar_tiempos(abiertos, estaciones=gestor.estaciones)
+    # Pedidos repartidos en subpedidos: todas las partes en un solo lote y el máximo por pedido
+    partes = [(i, parte) for i, pedido in enumerate(abiertos) for parte in gestor.partes_de(pedido.id)]
+    if partes:
+        for i, _ in partes:
+            estimados[i] = 0
+        for (i, _), minutos in zip(partes, estimar_tiempos([p for _, p in partes], estaciones=gestor.estaciones)):
+            estimados[i] = max(estimados[i], minutos)
+    for pedido, minutos in zip(abiertos, estimados):
+        pedido.tiempo_estimado_min = minutos
+    return len(abiertos)
+
+
+def estimar_tiempo_partes(partes: Sequence[Pedido], estaciones: Dict[Union[str, int], EstacionCocina]) -> int:
+    """Tiempo estimado de un pedido repartido en subpedidos (`GestorPedidos.partes_de`).
+
+    Las partes se preparan en paralelo en sus estaciones, así que la
+    estimación es la de la parte que más tarda (cola incluida), no la suma.
+
+    Salida esperada: entero >= 0 (0 si no hay partes).
+    """
+    return max(estimar_tiempos(partes, estaciones=estaciones), default=0)
 
 
 def calcular_tiempo_estimado(pedido: Pedido, estacion: Optional[EstacionCocina] = None) -> int:
     """Calcular tiempo estimado total para completar un pedido en minutos.
 
+    Minutos propios más la espera en la cola de `estacion` (si se indica),
+    con el mismo criterio que `estimar_tiempos` pero en Python puro: para un
+    solo pedido no compensa montar arrays de NumPy. Para un pedido repartido
+    en subpedidos usar `estimar_tiempo_partes`.
+
     Salida esperada: entero > 0 con minutos estimados.
     """
-    minutos = 0
-    for item in pedido.items:
-        prep_time = item.get('prep_time_min', 0) # Obtener tiempo de preparación por unidad
-        qty = item.get('qty', 1) # Obtener cantidad de unidades
-        minutos += prep_time * qty # Sumar al tiempo total
-    return minutos
+    espera = _espera_pedido(pedido.id, estacion) if estacion is not None else 0.0
+    return int(math.ceil(pedido.minutos_preparacion() + espera))
 
 def formato_tiempo(minutos: int) -> str:
     """Devolver representación legible del tiempo.
@@ -1,6 +1,6 @@
 """Paquete `src.utils` con helpers y utilidades.
 """
 
-from .utils import generar_id, ahora_iso, validar_items
+from .utils import generar_id, ahora_iso, validar_items, percentil
 
-__all__ = ["generar_id", "ahora_iso", "validar_items"]
+__all__ = ["generar_id", "ahora_iso", "validar_items", "percentil"]
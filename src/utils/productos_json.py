@@ -1,69 +1,233 @@
 import json
 import os
-from typing import List, Dict, Any
+import threading
+from contextlib import contextmanager
+from typing import List, Dict, Any, Optional, Tuple, Iterator
 
-def leer_productos_desde_json(nombre_archivo: str) -> List[Dict[str, Any]]:
-    """Lee un archivo JSON y devuelve lista de productos."""
-    if not os.path.isabs(nombre_archivo):
-        nombre_archivo = os.path.abspath(nombre_archivo)
-    try:
-        with open(nombre_archivo, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
-        return []
 
-    productos: List[Dict[str, Any]] = []
+def _normalizar_producto(it: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        'id': it.get('id'),
+        'name': it.get('name'),
+        'prep_time_min': int(it.get('prep_time_min', 0)),
+        'price': float(it.get('price', 0.0)),
+    }
+
+
+def _parsear_productos(data: Any) -> List[Dict[str, Any]]:
+    """Normaliza el contenido JSON (dict de categorías o lista) a lista de productos."""
     if isinstance(data, dict):
-        for _, items in data.items():
-            if isinstance(items, list):
-                for it in items:
-                    try:
-                        productos.append({
-                            'id': it.get('id'),
-                            'name': it.get('name'),
-                            'prep_time_min': int(it.get('prep_time_min', 0)),
-                            'price': float(it.get('price', 0.0)),
-                        })
-                    except Exception:
-                        continue
+        crudos = [it for items in data.values() if isinstance(items, list) for it in items]
     elif isinstance(data, list):
-        for it in data:
+        crudos = data
+    else:
+        return []
+    productos: List[Dict[str, Any]] = []
+    for it in crudos:
+        try:
+            productos.append(_normalizar_producto(it))
+        except Exception:
+            continue
+    return productos
+
+
+def _escribir_atomico(nombre_archivo: str, contenido: Any, indent: Optional[int] = None) -> None:
+    """Escribe JSON en un temporal y lo renombra sobre el destino (nunca queda a medias)."""
+    temporal = f"{nombre_archivo}.{os.getpid()}.tmp"
+    separadores = (',', ':') if indent is None else None
+    try:
+        with open(temporal, 'w', encoding='utf-8') as f:
+            json.dump(contenido, f, indent=indent, separators=separadores, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporal, nombre_archivo)
+    except BaseException:
+        try:
+            os.remove(temporal)
+        except OSError:
+            pass
+        raise
+
+
+class CatalogoJSON:
+    """Catálogo de productos respaldado por un archivo JSON, con caché e índice por id.
+
+    - El contenido parseado se cachea y solo se relee si cambian mtime o tamaño.
+    - `obtener` y la detección de duplicados son O(1) gracias al índice id -> producto;
+      como en la versión original, `None` es un id más (dos productos sin id chocan).
+    - Las mutaciones dentro de `with catalogo.lote():` se escriben una sola vez
+      al salir, de forma atómica (temporal + rename).
+    - El caché solo se actualiza después de escribir: si la escritura falla,
+      memoria y archivo siguen coincidiendo.
+    """
+
+    def __init__(self, nombre_archivo: str) -> None:
+        self.nombre_archivo = os.path.abspath(nombre_archivo)
+        self._lock = threading.RLock()
+        self._firma: Optional[Tuple[int, int]] = None
+        self._productos: List[Dict[str, Any]] = []
+        self._por_id: Dict[Any, Dict[str, Any]] = {}
+        self._en_lote = 0
+        self._sucio = False
+
+    @staticmethod
+    def _indexar(productos: List[Dict[str, Any]]) -> Dict[Any, Dict[str, Any]]:
+        indice: Dict[Any, Dict[str, Any]] = {}
+        for p in productos:
             try:
-                productos.append({
-                    'id': it.get('id'),
-                    'name': it.get('name'),
-                    'prep_time_min': int(it.get('prep_time_min', 0)),
-                    'price': float(it.get('price', 0.0)),
-                })
-            except Exception:
-                continue
+                indice.setdefault(p.get('id'), p)  # Con ids repetidos gana el primero
+            except TypeError:
+                continue  # id no hashable: se conserva en la lista, sin indexar
+        return indice
 
-    return productos
+    def _firma_actual(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(self.nombre_archivo)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _asegurar_cargado(self) -> None:
+        if self._en_lote:
+            return  # Durante un lote manda el estado en memoria
+        firma = self._firma_actual()
+        if firma is not None and firma == self._firma:
+            return
+        productos: List[Dict[str, Any]] = []
+        if firma is not None:
+            try:
+                with open(self.nombre_archivo, 'r', encoding='utf-8') as f:
+                    productos = _parsear_productos(json.load(f))
+            except (FileNotFoundError, json.JSONDecodeError):
+                productos = []
+        self._productos = productos
+        self._por_id = self._indexar(productos)
+        self._firma = firma
+
+    def _trabajo(self) -> Tuple[List[Dict[str, Any]], Dict[Any, Dict[str, Any]]]:
+        """Estado sobre el que mutar: el propio dentro de un lote, una copia fuera."""
+        if self._en_lote:
+            return self._productos, self._por_id
+        return list(self._productos), dict(self._por_id)
+
+    def _confirmar(self, productos: List[Dict[str, Any]],
+                   indice: Dict[Any, Dict[str, Any]]) -> None:
+        """Escribe `productos` (salvo dentro de un lote) y solo entonces los adopta."""
+        if self._en_lote:
+            self._sucio = True
+        else:
+            _escribir_atomico(self.nombre_archivo, productos)
+            self._firma = self._firma_actual()
+        self._productos, self._por_id = productos, indice
+
+    @contextmanager
+    def lote(self) -> Iterator['CatalogoJSON']:
+        """Agrupar varias mutaciones en una única escritura a disco.
+
+        Si el bloque o la escritura final lanzan una excepción, el caché
+        vuelve al estado previo al lote y el archivo queda intacto.
+        """
+        with self._lock:
+            self._asegurar_cargado()
+            exterior = not self._en_lote
+            if exterior:
+                # El lote muta copias; los originales sirven para deshacer
+                previo = (self._productos, self._por_id)
+                self._productos, self._por_id = list(self._productos), dict(self._por_id)
+                self._sucio = False
+            self._en_lote += 1
+            try:
+                yield self
+            except BaseException:
+                self._en_lote -= 1
+                if exterior:
+                    self._productos, self._por_id = previo
+                    self._sucio = False
+                raise
+            self._en_lote -= 1
+            if not exterior or not self._sucio:
+                return
+            self._sucio = False
+            try:
+                _escribir_atomico(self.nombre_archivo, self._productos)
+            except BaseException:
+                self._productos, self._por_id = previo
+                raise
+            self._firma = self._firma_actual()
+
+    def productos(self) -> List[Dict[str, Any]]:
+        """Devuelve la lista de productos (copias, el caché no se expone)."""
+        with self._lock:
+            self._asegurar_cargado()
+            return [dict(p) for p in self._productos]
+
+    def obtener(self, producto_id: str) -> Optional[Dict[str, Any]]:
+        """Devuelve una copia del producto con ese id o None (O(1))."""
+        with self._lock:
+            self._asegurar_cargado()
+            p = self._por_id.get(producto_id)
+            return dict(p) if p is not None else None
+
+    def agregar(self, producto: Dict[str, Any]) -> bool:
+        """Agrega un producto; False si ya existe uno con el mismo id."""
+        with self._lock:
+            self._asegurar_cargado()
+            producto_id = producto.get('id')
+            if producto_id in self._por_id:
+                return False
+            productos, indice = self._trabajo()
+            nuevo = dict(producto)
+            productos.append(nuevo)
+            indice[producto_id] = nuevo
+            self._confirmar(productos, indice)
+            return True
+
+    def eliminar(self, producto_id: str) -> bool:
+        """Elimina los productos con ese id; False si no existía ninguno."""
+        with self._lock:
+            self._asegurar_cargado()
+            if producto_id not in self._por_id:
+                return False
+            productos = [p for p in self._productos if p.get('id') != producto_id]
+            indice = self._por_id if self._en_lote else dict(self._por_id)
+            del indice[producto_id]
+            self._confirmar(productos, indice)
+            return True
+
+    def reemplazar(self, productos: List[Dict[str, Any]]) -> None:
+        """Sustituye el catálogo completo por `productos`."""
+        with self._lock:
+            copia = [dict(p) for p in productos]
+            self._confirmar(copia, self._indexar(copia))
+
+
+_catalogos: Dict[str, CatalogoJSON] = {}
+_catalogos_lock = threading.Lock()
+
+
+def obtener_catalogo(nombre_archivo: str) -> CatalogoJSON:
+    """Devuelve el `CatalogoJSON` compartido para ese archivo."""
+    ruta = os.path.abspath(nombre_archivo)
+    with _catalogos_lock:
+        catalogo = _catalogos.get(ruta)
+        if catalogo is None:
+            catalogo = _catalogos[ruta] = CatalogoJSON(ruta)
+        return catalogo
+
+
+def leer_productos_desde_json(nombre_archivo: str) -> List[Dict[str, Any]]:
+    """Lee un archivo JSON y devuelve lista de productos."""
+    return obtener_catalogo(nombre_archivo).productos()
 
 def guardar_productos_en_json(nombre_archivo: str, productos: List[Dict[str, Any]]) -> None:
     """Guarda la lista de productos en JSON."""
-    with open(nombre_archivo, 'w', encoding='utf-8') as f:
-        json.dump(productos, f, indent=4, ensure_ascii=False)
+    obtener_catalogo(nombre_archivo).reemplazar(productos)
 
 def eliminar_producto(nombre_archivo: str, producto_id: str) -> bool:
     """Elimina un producto del archivo JSON por ID."""
-    productos = leer_productos_desde_json(nombre_archivo)
-    productos_filtrados = [p for p in productos if p.get('id') != producto_id]
-    
-    if len(productos_filtrados) < len(productos):
-        guardar_productos_en_json(nombre_archivo, productos_filtrados)
-        return True
-    return False
+    return obtener_catalogo(nombre_archivo).eliminar(producto_id)
 
 
 def agregar_producto_json(nombre_archivo: str, producto: Dict[str, Any]) -> bool:
     """Agrega un nuevo producto al archivo JSON."""
-    productos = leer_productos_desde_json(nombre_archivo)
-    
-    # Validar que el producto no exista
-    if any(p.get('id') == producto.get('id') for p in productos):
-        return False
-    
-    productos.append(producto)
-    guardar_productos_en_json(nombre_archivo, productos)
-    return True
+    return obtener_catalogo(nombre_archivo).agregar(producto)
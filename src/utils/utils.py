@@ -3,9 +3,11 @@
 Funciones helper para generar ids, timestamps y validaciones.
 """
 from __future__ import annotations
-from typing import Dict, Any
+from typing import Dict, Any, Sequence
 from datetime import datetime
 
+from ..models.validacion_items import VALIDADOR_ITEMS
+
 
 def generar_id(prefix: str = '') -> str:
     """Generar un id único legible para un nuevo pedido.
@@ -26,20 +28,19 @@ def ahora_iso() -> str:
 
 
 def validar_items(items: list) -> bool:
-    """Validar estructura básica de la lista de items.
+    """Validar la lista de items con las mismas reglas que `Pedido` (ver `VALIDADOR_ITEMS`).
 
     Salida esperada: True si la estructura es válida, False en caso contrario.
     """
-    if not isinstance(items, list):
-        return False
-    for it in items:
-        if not isinstance(it, dict):
-            return False
-        if 'name' not in it or 'qty' not in it:
-            return False
-        try:
-            if int(it.get('qty', 0)) <= 0:
-                return False
-        except Exception:
-            return False
-    return True
+    return VALIDADOR_ITEMS.es_valida(items)
+
+
+def percentil(valores_ordenados: Sequence[float], p: float) -> float:
+    """Percentil `p` (0-100) por rango más cercano sobre una secuencia ya ordenada.
+
+    Salida esperada: float; 0.0 si la secuencia está vacía.
+    """
+    if not valores_ordenados:
+        return 0.0
+    rango = max(1, -(-len(valores_ordenados) * p // 100))  # ceil(n * p / 100)
+    return float(valores_ordenados[min(int(rango), len(valores_ordenados)) - 1])
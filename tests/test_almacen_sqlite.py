@@ -0,0 +1,122 @@
+"""Pruebas del volcado por lotes de `AlmacenSQLite`."""
+import sqlite3
+import time
+
+import pytest
+
+from src.services.almacen_sqlite import AlmacenSQLite, abrir_sqlite
+from src.services.almacenamiento import JournalPedidos
+
+
+def _filas_en_disco(ruta) -> int:
+    # Otra conexión: solo ve lo que el almacén ya confirmó
+    conexion = sqlite3.connect(str(ruta))
+    try:
+        return conexion.execute('SELECT COUNT(*) FROM pedidos').fetchone()[0]
+    finally:
+        conexion.close()
+
+
+def test_lo_pendiente_se_vuelca_sin_mas_escrituras(tmp_path):
+    ruta = tmp_path / 'pedidos.db'
+    almacen = AlmacenSQLite(str(ruta), tam_lote=1000, intervalo_s=0.05)
+    almacen.guardar({'id': 'PED-0001', 'estado': 'PENDIENTE'})
+    assert _filas_en_disco(ruta) == 0
+    limite = time.monotonic() + 5
+    while _filas_en_disco(ruta) == 0 and time.monotonic() < limite:
+        time.sleep(0.01)
+    assert _filas_en_disco(ruta) == 1
+    almacen.cerrar()
+    assert almacen._hilo is None
+
+
+class _ConexionQueFalla:
+    """Envuelve la conexión y hace fallar el siguiente `executemany` (error transitorio)."""
+
+    def __init__(self, conexion):
+        self.conexion = conexion
+        self.fallar = True
+
+    def executemany(self, *args):
+        if self.fallar:
+            self.fallar = False
+            raise sqlite3.OperationalError('database is locked')
+        return self.conexion.executemany(*args)
+
+    def __getattr__(self, nombre):
+        return getattr(self.conexion, nombre)
+
+
+def test_un_volcado_fallido_conserva_el_lote(tmp_path):
+    almacen = AlmacenSQLite(str(tmp_path / 'pedidos.db'), tam_lote=1000, intervalo_s=60)
+    almacen.guardar_lote([{'id': 'PED-0001'}, {'id': 'PED-0002'}])
+    almacen._conexion = _ConexionQueFalla(almacen._conexion)
+    with pytest.raises(sqlite3.OperationalError):
+        almacen.flush()
+    almacen.guardar({'id': 'PED-0003'})  # Se suma a lo pendiente
+    assert [r['id'] for r in almacen.iterar()] == ['PED-0001', 'PED-0002', 'PED-0003']
+    almacen.cerrar()
+
+
+def test_registros_sin_id_se_rechazan_al_guardar(tmp_path):
+    almacen = AlmacenSQLite(str(tmp_path / 'pedidos.db'), tam_lote=1000, intervalo_s=60)
+    for invalido in ({'estado': 'LISTO'}, {'id': None}, {'id': ['PIZ']}):
+        with pytest.raises(ValueError, match="'id'"):
+            almacen.guardar(invalido)
+    almacen.guardar({'id': 7})
+    assert almacen.contar() == 1
+    almacen.cerrar()
+
+
+def test_las_operaciones_que_incumplen_restricciones_se_descartan(tmp_path, caplog):
+    ruta = tmp_path / 'pedidos.db'
+    almacen = AlmacenSQLite(str(ruta), tam_lote=1000, intervalo_s=60)
+    externa = sqlite3.connect(str(ruta), isolation_level=None)
+    externa.execute("CREATE TRIGGER fallo BEFORE INSERT ON pedidos WHEN NEW.id = 'MALO' "
+                    "BEGIN SELECT RAISE(ABORT, 'rechazado'); END")
+    externa.close()
+    almacen.guardar_lote([{'id': 'PED-0001'}, {'id': 'MALO'}, {'id': 'PED-0002'}])
+    almacen.flush()  # No se propaga: reintentar fallaría siempre
+    assert 'rechazado' in caplog.text
+    almacen.guardar({'id': 'PED-0003'})
+    assert [r['id'] for r in almacen.iterar()] == ['PED-0001', 'PED-0002', 'PED-0003']
+    almacen.cerrar()
+
+
+def test_migrar_omite_entradas_sin_id(tmp_path):
+    origen = tmp_path / 'pedidos.json'
+    origen.write_text('[{"id": "PED-0001"}, {"estado": "LISTO"}, 3]', encoding='utf-8')
+    almacen = abrir_sqlite(str(tmp_path / 'pedidos.db'), migrar_desde=str(origen), intervalo_s=0)
+    assert [r['id'] for r in almacen.iterar()] == ['PED-0001']
+    almacen.guardar({'id': 'PED-0002'})
+    almacen.cerrar()
+
+
+def test_cerrar_vuelca_y_para_el_hilo(tmp_path):
+    ruta = tmp_path / 'pedidos.db'
+    almacen = AlmacenSQLite(str(ruta), tam_lote=1000, intervalo_s=60)
+    hilo = almacen._hilo
+    almacen.guardar({'id': 'PED-0001'})
+    almacen.cerrar()
+    assert not hilo.is_alive()
+    assert _filas_en_disco(ruta) == 1
+    almacen.cerrar()  # Idempotente
+
+
+def test_ultimo_numero_id(tmp_path):
+    almacen = AlmacenSQLite(str(tmp_path / 'pedidos.db'), intervalo_s=0)
+    assert almacen.ultimo_numero_id() == 0
+    almacen.guardar_lote([{'id': 'PED-0009'}, {'id': 'PED-10000'}, {'id': 42}, {'id': 'PEDIDO-99999'},
+                          {'id': 'OTRO-50000'}])
+    assert almacen.ultimo_numero_id() == 10000
+    almacen.cerrar()
+
+
+def test_ultimo_numero_id_coincide_con_el_journal(tmp_path):
+    registros = [{'id': i} for i in ('PED-0003', 'PED-12', 'PED-0099-PIZ', 'PED-', 'PED-0050')]
+    sqlite = AlmacenSQLite(str(tmp_path / 'pedidos.db'), intervalo_s=0)
+    journal = JournalPedidos(str(tmp_path / 'journal'), fsync='nunca')
+    for almacen in (sqlite, journal):
+        almacen.guardar_lote(registros)
+        assert almacen.ultimo_numero_id() == 50
+        almacen.cerrar()
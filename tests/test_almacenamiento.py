@@ -0,0 +1,50 @@
+"""Pruebas de las posiciones del journal frente a la compactación."""
+import pytest
+
+from src.services.almacenamiento import _DESPLAZAMIENTO_SEGMENTO, JournalPedidos, PosicionObsoleta
+from src.services.historial import LectorHistorial
+
+
+def _journal(directorio, **opciones) -> JournalPedidos:
+    journal = JournalPedidos(str(directorio), fsync='nunca', max_bytes_segmento=200, compactar_desde=0, **opciones)
+    for i in range(1, 31):
+        journal.guardar({'id': f'PED-{i:04d}', 'estado': 'LISTO' if i % 2 else 'CANCELADO'})
+    return journal
+
+
+def test_posiciones_leen_los_registros_indexados(tmp_path):
+    journal = _journal(tmp_path)
+    posiciones = journal.posiciones(estado='LISTO')
+    assert [r['id'] for r in journal.leer_posiciones(posiciones[-3:])] == ['PED-0025', 'PED-0027', 'PED-0029']
+    journal.cerrar()
+
+
+def test_posiciones_anteriores_a_compactar_son_obsoletas(tmp_path):
+    journal = _journal(tmp_path, clave=lambda r: r['estado'])  # Al compactar quedan pocos registros
+    journal.rotar()
+    posiciones = journal.posiciones()
+    por_segmento = {}
+    for posicion in posiciones:
+        por_segmento.setdefault(posicion >> _DESPLAZAMIENTO_SEGMENTO, []).append(posicion)
+    primero, ultimo = min(por_segmento), max(por_segmento)
+    assert len(por_segmento) > 3
+    assert journal.compactar()
+    with pytest.raises(PosicionObsoleta, match='compactó'):
+        journal.leer_posiciones(por_segmento[ultimo])  # Reescrito con el mismo número
+    with pytest.raises(PosicionObsoleta, match='ya no existe'):
+        journal.leer_posiciones(por_segmento[primero])  # Fusionado y borrado
+    nuevas = journal.posiciones()
+    assert [r['id'] for r in journal.leer_posiciones(nuevas)] == \
+        [r['id'] for r in journal.iterar()]
+    journal.cerrar()
+
+
+def test_el_lector_paginado_se_recarga_tras_compactar(tmp_path):
+    journal = _journal(tmp_path)
+    lector = LectorHistorial(journal, tam_pagina=5, estado='LISTO')
+    primera = [r['id'] for r in lector.pagina(0)]
+    assert primera == ['PED-0029', 'PED-0027', 'PED-0025', 'PED-0023', 'PED-0021']
+    assert journal.compactar()
+    assert [r['id'] for r in lector.pagina(0)] == primera
+    assert [r['id'] for r in lector.pagina(2)] == ['PED-0009', 'PED-0007', 'PED-0005', 'PED-0003', 'PED-0001']
+    journal.cerrar()
@@ -0,0 +1,106 @@
+"""Pruebas de la caché analítica columnar (con y sin NumPy)."""
+import pytest
+
+from src.models.estacion_cocina import EstacionCocina
+from src.models.eventos import EventoTransicion
+from src.services import analitica as modulo
+from src.services.almacen_sqlite import AlmacenSQLite
+from src.services.analitica import AnaliticaPedidos
+from src.services.gestor_pedidos import GestorPedidos
+
+
+def _registro(pedido_id, creado, items, estado='LISTO'):
+    total = sum(it['qty'] * it['price'] for it in items)
+    return {'id': pedido_id, 'timestamp_creado': creado, 'estado': estado, 'items': items, 'total_price': total}
+
+
+def _taco(qty):
+    return {'name': 'Taco', 'qty': qty, 'prep_time_min': 10, 'price': 3.0}
+
+
+def _agua(qty):
+    return {'name': 'Agua', 'qty': qty, 'prep_time_min': 0, 'price': 1.5}
+
+
+HISTORIAL = [
+    _registro('PED-0001', '2025-11-18T12:10:00', [_taco(2), _agua(1)]),
+    _registro('PED-0002', '2025-11-18T12:40:00', [_taco(1)]),
+    _registro('PED-0003', '2025-11-18T13:05:00', [_agua(4)]),
+    _registro('PED-0004', '2025-11-19T12:30:00', [_taco(5)], estado='CANCELADO'),
+]
+
+
+@pytest.fixture(params=[True, False], ids=['numpy', 'python'])
+def analitica(request, monkeypatch):
+    if not request.param:
+        monkeypatch.setattr(modulo, 'np', None)
+    analitica = AnaliticaPedidos()
+    analitica.registrar_lote(HISTORIAL)
+    return analitica
+
+
+def test_ingresos_y_cantidades_sin_cancelados(analitica):
+    assert analitica.ingresos_por_producto() == {'Taco': 9.0, 'Agua': 7.5}
+    assert analitica.cantidades_por_producto() == {'Agua': 5, 'Taco': 3}
+    assert analitica.resumen() == {'pedidos': 4, 'cancelados': 1, 'ingresos': 16.5, 'ticket_medio': 5.5}
+
+
+def test_filtros_por_fecha_inclusivos(analitica):
+    assert analitica.ingresos_por_producto(desde='2025-11-18T12:40:00', hasta='2025-11-18T13:05:00') == \
+        {'Agua': 6.0, 'Taco': 3.0}
+    assert analitica.resumen(desde='2025-11-19T00:00:00')['pedidos'] == 1
+
+
+def test_pedidos_por_hora(analitica):
+    assert analitica.pedidos_por_hora() == {'2025-11-18T12:00': 2, '2025-11-18T13:00': 1,
+                                            '2025-11-19T12:00': 1}
+    por_hora = analitica.pedidos_por_hora(hora_del_dia=True)
+    assert len(por_hora) == 24 and (por_hora['12'], por_hora['13']) == (3, 1)
+
+
+def test_percentiles_teoricos_y_reales(analitica):
+    teoricos = analitica.percentiles_preparacion()
+    assert teoricos == {'n': 3, 'fuente': 'teorica', 'p50_min': 10.0, 'p95_min': 20.0}
+    # Duraciones reales por eventos (solo EN_PREPARACION -> LISTO cuenta como preparación)
+    analitica.publicar(EventoTransicion('PED-0001', 'EN_COLA', 'EN_PREPARACION', 100.0, 40.0))
+    analitica.publicar(EventoTransicion('PED-0001', 'EN_PREPARACION', 'LISTO', 700.0, 100.0))
+    analitica.publicar(EventoTransicion('PED-0002', 'EN_PREPARACION', 'CANCELADO', 900.0, 100.0))
+    analitica.publicar(EventoTransicion('PED-9999', 'EN_PREPARACION', 'LISTO', 1.0, 0.0))  # Desconocido
+    reales = analitica.percentiles_preparacion()
+    assert reales == {'n': 1, 'fuente': 'real', 'p50_min': 10.0, 'p95_min': 10.0}
+    assert analitica.percentiles_preparacion(real=False)['n'] == 2  # PED-0002 quedó cancelado
+    assert analitica.resumen()['cancelados'] == 2
+
+
+def test_numpy_y_python_coinciden(monkeypatch):
+    consultas = lambda a: (a.ingresos_por_producto(), a.cantidades_por_producto(), a.pedidos_por_hora(),
+                           a.percentiles_preparacion((50, 90, 99)), a.resumen())
+    analitica = AnaliticaPedidos()
+    analitica.registrar_lote([_registro(f'PED-{i:04d}', f'2025-11-{18 + i % 3}T{i % 24:02d}:00:00',
+                                        [_taco(1 + i % 3), _agua(i % 2 + 1)],
+                                        'CANCELADO' if i % 7 == 0 else 'LISTO') for i in range(200)])
+    con_numpy = consultas(analitica)
+    monkeypatch.setattr(modulo, 'np', None)
+    assert consultas(analitica) == con_numpy
+
+
+def test_almacen_envuelto_alimenta_la_analitica(tmp_path):
+    almacen = AlmacenSQLite(str(tmp_path / 'pedidos.db'), intervalo_s=0)
+    for registro in HISTORIAL[:2]:
+        almacen.guardar(registro)
+    almacen.flush()
+    analitica = AnaliticaPedidos.desde_almacen(almacen, tam_lote=1)
+    assert len(analitica) == 2
+    envuelto = analitica.envolver(almacen)
+    try:
+        gestor = GestorPedidos(almacen=envuelto)
+        gestor.registrar_estacion(EstacionCocina('A', capacidad=1))
+        pedido = gestor.crear_pedido([_taco(1)])
+        assert len(analitica) == 3
+        gestor.asignar_a_estacion(pedido.id, 'A')
+        gestor.estaciones['A'].iniciar_preparacion()
+        gestor.estaciones['A'].finalizar_pedido(pedido.id)
+        assert analitica.percentiles_preparacion(real=True)['n'] == 1  # Duración real llegó por el bus
+        assert envuelto.contar() == 3
+    finally:
+        envuelto.cerrar()
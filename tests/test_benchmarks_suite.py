@@ -0,0 +1,42 @@
+"""Pruebas de la suite de benchmarks: cada caso corre y la comparación marca regresiones."""
+import json
+
+import pytest
+
+from benchmarks import suite
+
+
+def test_todos_los_benchmarks_corren_con_un_tamano_pequeno(capsys):
+    resultados = suite.ejecutar_suite([20], memoria=True)
+    assert set(resultados) == {f"{nombre}@20" for nombre in suite.BENCHMARKS}
+    for r in resultados.values():
+        assert r['pasos'] > 0 and r['ops_s'] > 0
+        assert 0 <= r['p50_us'] <= r['p95_us'] <= r['p99_us']
+        assert r['memoria_pico_mb'] >= 0
+    assert suite.app._almacen is None  # guardar_pedido deja la app como estaba
+    assert capsys.readouterr().out.count('ops/s') == len(suite.BENCHMARKS)
+
+
+@pytest.mark.parametrize('actual, regresiones', [
+    ({'ops_s': 900.0, 'p95_us': 10.0, 'memoria_pico_mb': 1.0}, 0),   # Dentro de la tolerancia
+    ({'ops_s': 800.0, 'p95_us': 10.0, 'memoria_pico_mb': 1.0}, 1),   # Más lento
+    ({'ops_s': 1000.0, 'p95_us': 12.0, 'memoria_pico_mb': 1.0}, 1),  # Cola de latencia peor
+    ({'ops_s': 1000.0, 'p95_us': 10.0, 'memoria_pico_mb': 2.0}, 1),  # Más memoria
+    ({'ops_s': 500.0, 'p95_us': 20.0}, 2),                           # Sin pasada de memoria
+])
+def test_comparar_aplica_la_tolerancia(actual, regresiones):
+    base = {'x@10': {'ops_s': 1000.0, 'p95_us': 10.0, 'memoria_pico_mb': 1.0}}
+    assert len(suite.comparar({'x@10': actual, 'nuevo@10': actual}, base, 0.15)) == regresiones
+
+
+def test_main_guarda_la_linea_base_y_detecta_regresiones(tmp_path, monkeypatch, capsys):
+    ruta = tmp_path / 'base.json'
+    argumentos = ['--tamanos', '10', '--solo', 'pedido_init', '--sin-memoria']
+    assert suite.main(argumentos + ['--guardar', str(ruta)]) == 0
+    guardado = json.loads(ruta.read_text(encoding='utf-8'))
+    assert set(guardado['resultados']) == {'pedido_init@10'}
+    assert suite.main(argumentos + ['--comparar', str(ruta), '--tolerancia', '100']) == 0
+    guardado['resultados']['pedido_init@10']['ops_s'] = float('inf')  # Nada puede igualarlo
+    ruta.write_text(json.dumps(guardado), encoding='utf-8')
+    assert suite.main(argumentos + ['--comparar', str(ruta)]) == 1
+    assert 'REGRESIONES' in capsys.readouterr().out
@@ -0,0 +1,64 @@
+"""Pruebas del catálogo de productos y de los productos propios de cada pedido."""
+import pytest
+
+from src.models.catalogo import CATALOGO, CODIGO_LOCAL, CatalogoLineas
+from src.models.pedido import Pedido
+from src.models.productos import PRODUCTS
+from src.services.serializacion import CodecBinario, CodecJSON
+
+
+def test_los_productos_con_id_se_internan_por_id():
+    catalogo = CatalogoLineas()
+    pizza = catalogo.registrar('Especial', 10, 9.5, producto_id='PIZ-ESP')
+    hamburguesa = catalogo.registrar('Especial', 10, 9.5, producto_id='HMB-ESP')  # Mismos valores, otro id
+    assert pizza != hamburguesa
+    assert (catalogo.categoria(pizza), catalogo.categoria(hamburguesa)) == ('PIZ', 'HMB')
+    assert catalogo.registrar('Otro nombre', 1, 1.0, producto_id='PIZ-ESP') == pizza
+    assert catalogo.codigo_de_valores('Especial', 10, 9.5) == pizza  # El primero registrado con esos valores
+    assert catalogo.codigo_de_valores('Especial', 10, 9.9) is None
+
+
+def test_los_items_libres_no_hacen_crecer_el_catalogo():
+    antes = len(CATALOGO)
+    pedidos = [Pedido(f'PED-{i}', [{'name': f'Plato {i}', 'qty': 1, 'price': i},
+                                   {'id': 'XYZ-1', 'name': 'Raro', 'qty': 2, 'prep_time_min': 3}])
+               for i in range(200)]
+    pedidos[0].add_item({'name': 'Extra', 'qty': 1, 'prep_time_min': 4, 'price': 2.5})
+    assert len(CATALOGO) == antes
+    assert pedidos[7].total_price() == 7.0 and pedidos[7].minutos_preparacion() == 5 + 6
+    assert pedidos[7].categorias() == {'XYZ'}  # La categoría sale del id aunque no esté en el catálogo
+    assert [it['name'] for it in pedidos[0].items] == ['Plato 0', 'Raro', 'Extra']
+    assert all(c >= CODIGO_LOCAL for c in pedidos[0]._lineas[::2])
+
+
+def test_item_libre_igual_a_la_carta_usa_su_codigo():
+    producto = PRODUCTS[0]
+    libre = {'name': producto['name'], 'qty': 1, 'prep_time_min': producto['prep_time_min'],
+             'price': producto['price']}
+    pedido = Pedido('PED-1', [libre])
+    assert pedido._libres is None
+    assert pedido.items[0]['id'] == producto['id']
+
+
+@pytest.mark.parametrize('codec', [CodecJSON(), CodecBinario()], ids=['json', 'binario'])
+def test_ida_y_vuelta_conserva_ids_precios_y_categorias(codec):
+    producto = PRODUCTS[0]
+    pedido = Pedido('PED-0001', [{'id': producto['id'], 'qty': 2}, {'name': 'Taco', 'qty': 1, 'price': 3.5},
+                                 {'id': 'XYZ-9', 'name': 'Raro', 'qty': 1, 'price': 1.0}])
+    registro = codec.decodificar(codec.codificar(pedido.as_dict()))
+    assert registro['items'] == pedido.items
+    for recargado in (Pedido.desde_dicts([registro])[0], Pedido.from_dict(registro)):
+        assert recargado.items == pedido.items
+        assert recargado.total_price() == pedido.total_price()
+        assert recargado.categorias() == pedido.categorias()
+    assert Pedido.desde_dicts([registro])[0]._lineas[:2] == pedido._lineas[:2]  # Mismo código de la carta
+
+
+def test_recargar_con_otro_precio_conserva_el_del_registro():
+    producto = PRODUCTS[0]
+    registro = Pedido('PED-0001', [{'id': producto['id'], 'qty': 2}]).as_dict()
+    registro['items'] = [dict(registro['items'][0], price=producto['price'] + 1)]  # Precio de otra época
+    recargado, = Pedido.desde_dicts([registro])
+    assert recargado.items[0]['price'] == producto['price'] + 1
+    assert recargado.total_price() == round(2 * (producto['price'] + 1), 2)
+    assert recargado.categorias() == {producto['id'].split('-', 1)[0]}
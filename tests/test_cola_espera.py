@@ -0,0 +1,89 @@
+"""Pruebas de la cola de espera de `GestorPedidos.despachar` y de la sincronización de estaciones."""
+from src.models.estacion_cocina import EstacionCocina
+from src.services.gestor_pedidos import GestorPedidos
+
+ITEMS = [{'name': 'Guiso', 'qty': 1, 'prep_time_min': 5}]
+
+
+def _gestor(max_espera=None, capacidad=1) -> GestorPedidos:
+    gestor = GestorPedidos(max_espera=max_espera)
+    gestor.registrar_estacion(EstacionCocina('A', capacidad=capacidad))
+    return gestor
+
+
+def _terminar(estacion: EstacionCocina, pedido_id) -> None:
+    estacion.iniciar_pedido(pedido_id)
+    assert estacion.finalizar_pedido(pedido_id)
+
+
+def test_sin_hueco_el_pedido_espera_y_con_la_cola_llena_se_rechaza():
+    gestor = _gestor(max_espera=1)
+    primero, segundo, tercero = (gestor.crear_pedido(ITEMS) for _ in range(3))
+    assert gestor.despachar(primero.id)
+    assert primero.estacion_id == 'A'
+    assert gestor.despachar(segundo.id)
+    assert (segundo.estado, segundo.estacion_id) == ('PENDIENTE', None)
+    assert gestor.en_espera() == [segundo.id]
+    assert not gestor.despachar(tercero.id)
+    assert (tercero.estado, tercero.estacion_id) == ('PENDIENTE', None)
+    metricas = gestor.metricas_espera()
+    assert (metricas['admitidos'], metricas['rechazados'], metricas['profundidad']) == (1, 1, 1)
+
+
+def test_el_hueco_liberado_drena_la_espera_en_orden_de_llegada():
+    gestor = _gestor()
+    estacion = gestor.estaciones['A']
+    pedidos = [gestor.crear_pedido(ITEMS) for _ in range(3)]
+    for pedido in pedidos:
+        assert gestor.despachar(pedido.id)
+    assert gestor.en_espera() == [pedidos[1].id, pedidos[2].id]
+    _terminar(estacion, pedidos[0].id)
+    assert (pedidos[1].estado, pedidos[1].estacion_id) == ('EN_COLA', 'A')
+    assert gestor.en_espera() == [pedidos[2].id]
+    _terminar(estacion, pedidos[1].id)
+    assert pedidos[2].estacion_id == 'A'
+    metricas = gestor.metricas_espera()
+    assert (metricas['drenados'], metricas['profundidad'], metricas['max_profundidad']) == (2, 0, 2)
+
+
+def test_los_cancelados_en_espera_se_descartan_al_drenar():
+    gestor = _gestor()
+    pedidos = [gestor.crear_pedido(ITEMS) for _ in range(3)]
+    for pedido in pedidos:
+        gestor.despachar(pedido.id)
+    assert gestor.cancelar_pedido(pedidos[1].id)
+    _terminar(gestor.estaciones['A'], pedidos[0].id)
+    assert pedidos[2].estacion_id == 'A'
+    assert gestor.metricas_espera()['descartados'] == 1
+
+
+def test_reemplazar_una_estacion_en_el_dict_se_detecta():
+    gestor = _gestor()
+    vieja = gestor.estaciones['A']
+    ocupante = gestor.crear_pedido(ITEMS)
+    gestor.despachar(ocupante.id)
+    esperando = gestor.crear_pedido(ITEMS)
+    gestor.despachar(esperando.id)
+    # Mismo número de estaciones: contar no bastaría para notarlo
+    nueva = gestor.estaciones['A'] = EstacionCocina('A', capacidad=2)
+    otro = gestor.crear_pedido(ITEMS)
+    assert gestor.despachar(otro.id)
+    assert [p.id for p in nueva.cola] == [esperando.id, otro.id]  # La espera se drena hacia la nueva
+    assert [p.id for p in vieja.cola] == [ocupante.id]
+    # La vieja ya no es candidata aunque libere hueco
+    _terminar(vieja, ocupante.id)
+    ultimo = gestor.crear_pedido(ITEMS)
+    assert gestor.despachar(ultimo.id)
+    assert ultimo.estacion_id is None and gestor.en_espera() == [ultimo.id]
+    # Y los huecos de la nueva sí drenan la espera (el gestor la observa)
+    _terminar(nueva, esperando.id)
+    assert ultimo.estacion_id == 'A' and gestor.en_espera() == []
+
+
+def test_una_estacion_retirada_del_dict_deja_de_recibir_pedidos():
+    gestor = _gestor(capacidad=5)
+    gestor.estaciones['B'] = EstacionCocina('B', capacidad=5)
+    del gestor.estaciones['A']
+    pedidos = [gestor.crear_pedido(ITEMS) for _ in range(3)]
+    assert all(gestor.despachar(p.id) for p in pedidos)
+    assert {p.estacion_id for p in pedidos} == {'B'}
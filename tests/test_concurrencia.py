@@ -0,0 +1,86 @@
+"""Prueba de estrés de `GestorPedidos` con varios hilos a la vez."""
+import threading
+import time
+
+import pytest
+
+from src.models.estacion_cocina import EstacionCocina
+from src.services.gestor_pedidos import GestorPedidos
+
+HILOS = 8
+PEDIDOS_POR_HILO = 250
+ESTACIONES = {
+    'generales': {nombre: None for nombre in 'ABCD'},
+    'especializadas': {'HORNO': ['PIZ'], 'PLANCHA': ['HMB'], 'BARRA': ['BEB'], 'MIXTA': ['PIZ', 'HMB', 'BEB']},
+}
+MENUS = ([{'id': 'HMB', 'qty': 1}], [{'id': 'PIZ-PEP', 'qty': 1}, {'id': 'BEB', 'qty': 2}],
+         [{'id': 'HMB-DBL', 'qty': 1}, {'id': 'PIZ', 'qty': 1}, {'id': 'BEB-CAF', 'qty': 1}])
+
+
+def _cocinar(gestor: GestorPedidos, parar: threading.Event) -> None:
+    while True:
+        ocupada = False
+        for estacion in list(gestor.estaciones.values()):
+            estacion.iniciar_preparacion()
+            for pedido in estacion.en_preparacion:
+                ocupada |= estacion.finalizar_pedido(pedido.id)
+        if parar.is_set() and not ocupada and not gestor.en_espera() \
+                and all(e.carga_actual() == 0 for e in gestor.estaciones.values()):
+            return
+        time.sleep(0)
+
+
+@pytest.mark.parametrize('estaciones', sorted(ESTACIONES))
+def test_crear_despachar_terminar_y_cancelar_en_paralelo(estaciones):
+    gestor = GestorPedidos()
+    for nombre, categorias in ESTACIONES[estaciones].items():
+        gestor.registrar_estacion(EstacionCocina(nombre, capacidad=3, categorias=categorias))
+    creados = [[] for _ in range(HILOS)]
+    errores = []
+
+    def cliente(n: int) -> None:
+        try:
+            for i in range(PEDIDOS_POR_HILO):
+                pedido = gestor.crear_pedido(MENUS[(n + i) % len(MENUS)], cliente_info={'telefono': f'6000000{n:02d}'})
+                creados[n].append(pedido.id)
+                gestor.despachar(pedido.id)
+                if i % 5 == 0:
+                    gestor.cancelar_pedido(pedido.id)
+        except Exception as error:  # pragma: no cover - se informa en el assert
+            errores.append(error)
+
+    parar = threading.Event()
+    cocineros = [threading.Thread(target=_cocinar, args=(gestor, parar)) for _ in range(2)]
+    clientes = [threading.Thread(target=cliente, args=(n,)) for n in range(HILOS)]
+    for hilo in cocineros + clientes:
+        hilo.start()
+    for hilo in clientes:
+        hilo.join(timeout=60)
+    parar.set()
+    for hilo in cocineros:
+        hilo.join(timeout=60)
+    assert not any(hilo.is_alive() for hilo in cocineros + clientes), "Hilos bloqueados (¿interbloqueo?)"
+    assert errores == []
+
+    # Ni perdidos ni duplicados
+    ids = [pedido_id for lista in creados for pedido_id in lista]
+    assert len(ids) == len(set(ids)) == HILOS * PEDIDOS_POR_HILO
+    assert set(gestor.pedidos) == set(ids)
+    assert gestor.ultimo_id() == len(ids)
+
+    # Todos terminados o cancelados, y los índices coinciden con el estado real
+    estados = {pedido.id: pedido.estado for pedido in gestor.pedidos.values()}
+    assert set(estados.values()) <= {'LISTO', 'CANCELADO'}
+    for estado in ('PENDIENTE', 'EN_COLA', 'EN_PREPARACION', 'LISTO', 'CANCELADO'):
+        assert {p.id for p in gestor.listar_pedidos(estado=estado)} == \
+            {pedido_id for pedido_id, e in estados.items() if e == estado}
+    for n in range(HILOS):
+        assert [p.id for p in gestor.listar_por_cliente(f'6000000{n:02d}')] == creados[n]
+
+    # Estaciones vacías y cada pedido asignado indexado en su estación
+    assert gestor.en_espera() == []
+    assert all(gestor.partes_de(pedido_id) == [] for pedido_id in ids)
+    for estacion in gestor.estaciones.values():
+        assert estacion.carga_actual() == 0 and estacion.cola == [] and estacion.en_preparacion == []
+        assert {p.id for p in gestor.listar_por_estacion(estacion.id)} == \
+            {p.id for p in gestor.pedidos.values() if p.estacion_id == estacion.id}
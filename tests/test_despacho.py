@@ -0,0 +1,70 @@
+"""Pruebas del despacho automático de `GestorPedidos` (heap por política)."""
+import pytest
+
+from src.models.estacion_cocina import EstacionCocina
+from src.services.gestor_pedidos import GestorPedidos
+
+ITEMS = [{'name': 'Guiso', 'qty': 1, 'prep_time_min': 5}]
+
+
+def _gestor(*estaciones: EstacionCocina) -> GestorPedidos:
+    gestor = GestorPedidos()
+    for estacion in estaciones:
+        gestor.registrar_estacion(estacion)
+    return gestor
+
+
+def _despachar(gestor: GestorPedidos, n: int, politica: str = 'menor_carga', items=ITEMS):
+    return [gestor.asignar_automaticamente(gestor.crear_pedido(items).id, politica) for _ in range(n)]
+
+
+def test_con_empate_se_reparte_por_turnos_en_orden_de_id():
+    gestor = _gestor(*(EstacionCocina(e, capacidad=5) for e in ('C', 'A', 'B')))
+    assert _despachar(gestor, 7) == ['A', 'B', 'C', 'A', 'B', 'C', 'A']
+
+
+def test_elige_la_de_menor_carga_y_sigue_los_huecos_liberados():
+    gestor = _gestor(EstacionCocina('A', capacidad=5), EstacionCocina('B', capacidad=5))
+    primeros = [gestor.crear_pedido(ITEMS) for _ in range(3)]
+    for pedido in primeros:
+        gestor.asignar_a_estacion(pedido.id, 'A')
+    assert _despachar(gestor, 3) == ['B', 'B', 'B']
+    for pedido in primeros[:2]:  # A pasa a carga 1: el aviso de la estación la vuelve a poner delante
+        gestor.estaciones['A'].iniciar_pedido(pedido.id)
+        gestor.estaciones['A'].finalizar_pedido(pedido.id)
+    assert _despachar(gestor, 2) == ['A', 'A']
+
+
+def test_politicas_mas_libre_y_fin_mas_temprano():
+    gestor = _gestor(EstacionCocina('A', capacidad=1), EstacionCocina('B', capacidad=4))
+    assert _despachar(gestor, 1, 'mas_libre') == ['B']
+    largo = [{'name': 'Asado', 'qty': 1, 'prep_time_min': 60}]
+    gestor = _gestor(EstacionCocina('A', capacidad=1), EstacionCocina('B', capacidad=4))
+    assert _despachar(gestor, 1, 'fin_mas_temprano', largo) == ['A']
+    # A tiene 60 min pendientes y B ninguno
+    assert _despachar(gestor, 1, 'fin_mas_temprano') == ['B']
+    with pytest.raises(ValueError):
+        gestor.asignar_automaticamente(gestor.crear_pedido(ITEMS).id, 'al_azar')
+
+
+def test_si_la_mejor_rechaza_el_pedido_se_prueba_la_siguiente():
+    gestor = _gestor(EstacionCocina('HORNO', capacidad=5, categorias=['PIZ']),
+                     EstacionCocina('BARRA', capacidad=1, categorias=['BEB']))
+    # HORNO está menos cargado pero no prepara bebidas
+    assert _despachar(gestor, 1, items=[{'id': 'BEB', 'qty': 1}]) == ['BARRA']
+    # La candidata descartada vuelve al heap: sigue disponible para lo que sí acepta
+    assert _despachar(gestor, 1, items=[{'id': 'PIZ-PEP', 'qty': 1}]) == ['HORNO']
+    # BARRA llena y HORNO no acepta bebidas: ninguna
+    assert _despachar(gestor, 1, items=[{'id': 'BEB', 'qty': 1}]) == [None]
+
+
+def test_sin_hueco_no_asigna_y_el_heap_no_crece_sin_limite():
+    gestor = _gestor(EstacionCocina('A', capacidad=2))
+    assert _despachar(gestor, 3) == ['A', 'A', None]
+    estacion = gestor.estaciones['A']
+    for _ in range(200):  # Muchos avisos de cambio de carga: entradas obsoletas en el heap
+        pedido = estacion.en_preparacion[0] if estacion.en_preparacion else estacion.cola[0]
+        estacion.iniciar_pedido(pedido.id)
+        estacion.finalizar_pedido(pedido.id)
+        assert _despachar(gestor, 1) == ['A']
+    assert len(gestor._heaps['menor_carga']) <= 4 * len(gestor.estaciones) + 64
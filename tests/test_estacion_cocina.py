@@ -0,0 +1,75 @@
+"""Pruebas de la cola FIFO y de los avisos de `EstacionCocina`."""
+from src.models.estacion_cocina import EstacionCocina
+from src.models.pedido import Pedido
+
+
+def _pedidos(n: int):
+    return [Pedido(f'PED-{i:04d}', [{'id': 'BEB', 'qty': 1}]) for i in range(1, n + 1)]
+
+
+def test_fifo_tras_quitar_pedidos_de_en_medio():
+    estacion = EstacionCocina('A', capacidad=10)
+    pedidos = _pedidos(6)
+    for pedido in pedidos:
+        assert estacion.asignar_pedido(pedido)
+    assert estacion.remover_pedido('PED-0002')
+    assert estacion.remover_pedido('PED-0005')
+    assert not estacion.remover_pedido('PED-0005')
+    assert [p.id for p in estacion.cola] == ['PED-0001', 'PED-0003', 'PED-0004', 'PED-0006']
+    estacion.asignar_pedido(pedidos[1])  # Vuelve al final
+    assert [p.id for p in estacion.iniciar_preparacion()] == ['PED-0001', 'PED-0003', 'PED-0004',
+                                                               'PED-0006', 'PED-0002']
+    assert estacion.minutos_pendientes() == 5 * pedidos[0].minutos_preparacion()
+
+
+def test_la_cola_se_compacta_y_conserva_el_orden():
+    estacion = EstacionCocina('A', capacidad=1000)
+    pedidos = _pedidos(500)
+    for pedido in pedidos:
+        estacion.asignar_pedido(pedido)
+    for pedido in pedidos:
+        if int(pedido.id[4:]) % 10:
+            estacion.remover_pedido(pedido.id)
+    vivos = [p.id for p in pedidos if int(p.id[4:]) % 10 == 0]
+    assert [p.id for p in estacion.cola] == vivos
+    assert len(estacion._cola) <= 2 * len(vivos) + 32  # Las entradas borradas no se acumulan
+    assert estacion.carga_actual() == len(vivos)
+    assert [p.id for p in estacion.iniciar_preparacion()] == vivos
+
+
+def test_restaurar_conserva_orden_y_estados():
+    pedidos = _pedidos(4)
+    for pedido in pedidos[:2]:
+        pedido.update_estado('EN_COLA')
+    for pedido in pedidos[2:]:
+        pedido.update_estado('EN_PREPARACION')
+    estacion = EstacionCocina('A', capacidad=3)
+    avisos = []
+    estacion.agregar_observador(avisos.append)
+    estacion.restaurar(pedidos[:2], pedidos[2:])
+    assert avisos == [estacion]
+    assert [p.id for p in estacion.cola] == ['PED-0001', 'PED-0002']
+    assert [p.id for p in estacion.en_preparacion] == ['PED-0003', 'PED-0004']
+    assert [p.estado for p in pedidos] == ['EN_COLA', 'EN_COLA', 'EN_PREPARACION', 'EN_PREPARACION']
+    assert estacion.carga_actual() == 4  # Restaura la carga aunque supere la capacidad
+    assert estacion.finalizar_pedido('PED-0003')
+    assert [p.id for p in estacion.iniciar_preparacion()] == ['PED-0001', 'PED-0002']
+    assert [p.id for p in estacion.en_preparacion] == ['PED-0004', 'PED-0001', 'PED-0002']
+
+
+def test_los_observadores_se_avisan_sin_el_lock_de_la_estacion():
+    estacion = EstacionCocina('A', capacidad=2)
+    con_lock = []
+
+    def observador(e: EstacionCocina) -> None:
+        # `_is_owned` del RLock: True si este hilo tiene tomado el lock de la estación
+        con_lock.append(e._lock._is_owned())
+
+    estacion.agregar_observador(observador)
+    pedido, otro = _pedidos(2)
+    estacion.asignar_pedido(pedido)
+    estacion.asignar_pedidos([otro])
+    estacion.iniciar_preparacion()
+    estacion.finalizar_pedido(pedido.id)
+    estacion.remover_pedido(otro.id)
+    assert con_lock == [False] * 4
@@ -0,0 +1,125 @@
+"""Pruebas del bus de eventos de transición y sus sinks."""
+import logging
+
+import pytest
+
+from src.models.eventos import (BUS_EVENTOS, LIMITES_HISTOGRAMA, BusEventos, EventoTransicion, SinkEventos,
+                                SinkLogging, SinkMetricas, percentil_cubos)
+from src.models.estacion_cocina import EstacionCocina
+from src.models.pedido import Pedido
+from src.services.gestor_pedidos import GestorPedidos
+
+ITEMS = [{'name': 'Guiso', 'qty': 1, 'prep_time_min': 5}]
+
+
+class _Lista(SinkEventos):
+    def __init__(self):
+        self.eventos = []
+
+    def publicar(self, evento):
+        self.eventos.append(evento)
+
+
+@pytest.fixture
+def suscribir():
+    suscritos = []
+
+    def _suscribir(sink):
+        BUS_EVENTOS.suscribir(sink)
+        suscritos.append(sink)
+        return sink
+
+    yield _suscribir
+    for sink in suscritos:
+        BUS_EVENTOS.desuscribir(sink)
+
+
+def test_cada_transicion_publica_un_evento_sin_imprimir(suscribir, capsys):
+    lista = suscribir(_Lista())
+    pedido = Pedido('PED-0001', ITEMS)
+    for estado in ('EN_COLA', 'EN_PREPARACION', 'LISTO', 'ENTREGADO'):
+        pedido.update_estado(estado)
+    assert [e.transicion for e in lista.eventos] == ['PENDIENTE->EN_COLA', 'EN_COLA->EN_PREPARACION',
+                                                     'EN_PREPARACION->LISTO', 'LISTO->ENTREGADO']
+    assert all(e.pedido_id == 'PED-0001' and e.latencia_s >= 0 for e in lista.eventos)
+    assert capsys.readouterr().out == ''
+
+
+def test_una_transicion_invalida_no_publica(suscribir):
+    lista = suscribir(_Lista())
+    pedido = Pedido('PED-0001', ITEMS)
+    with pytest.raises(ValueError):
+        pedido.update_estado('LISTO')
+    assert lista.eventos == []
+
+
+def test_los_subpedidos_no_publican_solo_el_padre(suscribir):
+    lista = suscribir(_Lista())
+    gestor = GestorPedidos()
+    gestor.registrar_estacion(EstacionCocina('HORNO', capacidad=2, categorias=['PIZ']))
+    gestor.registrar_estacion(EstacionCocina('BARRA', capacidad=2, categorias=['BEB']))
+    pedido = gestor.crear_pedido([{'id': 'PIZ-PEP', 'qty': 1}, {'id': 'BEB', 'qty': 1}])
+    gestor.despachar(pedido.id)
+    assert len(gestor.partes_de(pedido.id)) == 2
+    assert [(e.pedido_id, e.transicion) for e in lista.eventos] == [(pedido.id, 'PENDIENTE->EN_COLA')]
+
+
+def test_un_sink_que_falla_no_corta_la_transicion_ni_a_los_demas(suscribir, caplog):
+    class Roto(SinkEventos):
+        def publicar(self, evento):
+            raise RuntimeError('sink caído')
+
+    suscribir(Roto())
+    lista = suscribir(_Lista())
+    pedido = Pedido('PED-0001', ITEMS)
+    with caplog.at_level(logging.ERROR, logger='src.models.eventos'):
+        pedido.update_estado('EN_COLA')
+    assert pedido.estado == 'EN_COLA'
+    assert len(lista.eventos) == 1
+    assert 'sink caído' in caplog.text
+
+
+def test_suscribir_es_idempotente_y_desuscribir_informa():
+    bus = BusEventos()
+    lista = _Lista()
+    assert not bus.activo
+    bus.suscribir(lista)
+    bus.suscribir(lista)
+    bus.publicar(EventoTransicion('P', 'PENDIENTE', 'EN_COLA', 2.0, 1.0))
+    assert len(lista.eventos) == 1
+    assert bus.desuscribir(lista) and not bus.desuscribir(lista)
+    assert not bus.activo
+
+
+def test_sink_metricas_cuenta_y_resume_latencias():
+    sink = SinkMetricas()
+    for latencia in (0.001, 0.002, 0.004, 1.0):
+        sink.publicar(EventoTransicion('P', 'EN_COLA', 'EN_PREPARACION', 10.0 + latencia, 10.0))
+    sink.publicar(EventoTransicion('P', 'PENDIENTE', 'EN_COLA', 5.0, None))  # Sin instante anterior
+    foto = sink.snapshot(con_cubos=True)
+    assert foto['total'] == 5
+    assert foto['transiciones']['PENDIENTE->EN_COLA'] == {'conteo': 1}
+    datos = foto['transiciones']['EN_COLA->EN_PREPARACION']
+    assert datos['conteo'] == 4 and sum(n for _, n in datos['cubos']) == 4
+    assert datos['min_s'] == pytest.approx(0.001) and datos['max_s'] == pytest.approx(1.0)
+    # Estimación por cubo: a lo sumo un factor 2 por encima y nunca más que el máximo
+    assert 0.002 <= datos['p50_s'] <= 0.004
+    assert datos['p99_s'] == pytest.approx(1.0)
+    sink.reiniciar()
+    assert sink.snapshot() == {'total': 0, 'transiciones': {}}
+
+
+def test_percentil_cubos():
+    cubos = [0] * (len(LIMITES_HISTOGRAMA) + 1)
+    assert percentil_cubos(cubos, 0, 0.0, 50) == 0.0
+    cubos[3] = 9
+    cubos[-1] = 1  # Uno por encima del mayor límite
+    assert percentil_cubos(cubos, 10, 1e9, 50) == LIMITES_HISTOGRAMA[3]
+    assert percentil_cubos(cubos, 10, 1e9, 100) == 1e9
+
+
+def test_sink_logging(caplog):
+    sink = SinkLogging(nivel=logging.WARNING)
+    with caplog.at_level(logging.WARNING, logger='src.models.eventos'):
+        sink.publicar(EventoTransicion('PED-0009', 'EN_COLA', 'EN_PREPARACION', 3.5, 1.0))
+    assert 'PED-0009' in caplog.text and 'EN_COLA -> EN_PREPARACION' in caplog.text
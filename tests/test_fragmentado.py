@@ -0,0 +1,70 @@
+"""Pruebas del enrutador `GestorFragmentado` (varios procesos trabajadores)."""
+import zlib
+
+import pytest
+
+from src.services.fragmentado import GestorFragmentado
+
+COCINAS = {'norte': [('A', 1), ('B', 1)], 'sur': [('C', 1)], 'este': [('D', 2)]}
+ITEMS = [{'name': 'Guiso', 'qty': 1, 'prep_time_min': 5}]
+ESTACIONES = {cocina: {e for e, _ in estaciones} for cocina, estaciones in COCINAS.items()}
+
+
+@pytest.fixture
+def motor():
+    motor = GestorFragmentado(COCINAS, procesos=2)
+    yield motor
+    motor.cerrar()
+
+
+def test_cada_pedido_vive_en_la_cocina_indicada(motor):
+    pedidos = {cocina: motor.crear_pedido(ITEMS, cocina=cocina) for cocina in COCINAS}
+    for cocina, pedido in pedidos.items():
+        assert motor.cocina_de(pedido.id) == cocina
+        assert [p.id for p in motor.listar_pedidos(cocina=cocina)] == [pedido.id]
+        # El despacho solo ve las estaciones de su cocina
+        assert motor.asignar_automaticamente(pedido.id) in ESTACIONES[cocina]
+    with pytest.raises(ValueError):
+        motor.crear_pedido(ITEMS, cocina='oeste')
+
+
+def test_sin_cocina_se_enruta_por_hash_estable_del_id(motor):
+    for _ in range(6):
+        pedido = motor.crear_pedido(ITEMS)
+        esperada = list(COCINAS)[zlib.crc32(pedido.id.encode('utf-8')) % len(COCINAS)]
+        assert motor.cocina_de(pedido.id) == esperada
+        assert motor.obtener_pedido(pedido.id).id == pedido.id
+
+
+def test_lote_despacha_en_cada_cocina_y_los_listados_se_fusionan(motor):
+    solicitudes = [{'items': ITEMS, 'cocina': 'sur'} for _ in range(3)]
+    solicitudes.insert(1, {'items': [{'name': 'Roto', 'qty': 0}], 'cocina': 'norte'})
+    ids = motor.crear_pedidos(solicitudes, politica='menor_carga')
+    assert ids[1] is None and None not in ids[:1] + ids[2:]
+    # 'sur' tiene un solo hueco: uno en cola y dos esperando en el gestor de esa cocina
+    assert [p.id for p in motor.listar_pedidos('EN_COLA')] == [ids[0]]
+    assert motor.metricas_espera()['sur']['profundidad'] == 2
+    assert motor.contar() == 3
+    motor.avanzar()  # Inicia el de la cola
+    assert motor.avanzar() == 1  # Lo finaliza y el hueco se rellena desde la espera
+    assert [p.id for p in motor.listar_pedidos('LISTO')] == [ids[0]]
+    assert motor.metricas_espera()['sur']['profundidad'] == 1
+    assert [p.id for p in motor.listar_pedidos()] == [pid for pid in ids if pid is not None]
+
+
+def test_un_error_del_trabajador_se_relanza_y_el_canal_sigue_util(motor):
+    pedido = motor.crear_pedido(ITEMS, cocina='norte')
+    with pytest.raises(ValueError):
+        motor.asignar_automaticamente(pedido.id, politica='inexistente')
+    assert motor.asignar_a_estacion(pedido.id, 'A')
+    assert motor.obtener_pedido(pedido.id).estacion_id == 'A'
+
+
+def test_cerrar_detiene_los_trabajadores_y_es_idempotente():
+    with GestorFragmentado(COCINAS, procesos=2) as motor:
+        procesos = list(motor._procesos)
+        assert motor.procesos == 2 and all(p.is_alive() for p in procesos)
+    assert not any(p.is_alive() for p in procesos)
+    assert all(p.exitcode == 0 for p in procesos)  # Salida ordenada por el mensaje 'fin'
+    assert motor.procesos == 0
+    motor.cerrar()
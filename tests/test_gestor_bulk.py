@@ -0,0 +1,64 @@
+"""Pruebas de las operaciones en bloque de `GestorPedidos`."""
+from src.models.estacion_cocina import EstacionCocina
+from src.services.gestor_pedidos import GestorPedidos
+
+ITEMS = [{'name': 'Taco', 'qty': 1, 'prep_time_min': 5, 'price': 30.0}]
+
+
+def _gestor_con_estacion(capacidad: int = 1):
+    gestor = GestorPedidos()
+    estacion = EstacionCocina('E1', capacidad=capacidad)
+    gestor.registrar_estacion(estacion)
+    return gestor, estacion
+
+
+def test_listo_en_bloque_libera_el_puesto():
+    gestor, estacion = _gestor_con_estacion()
+    a = gestor.crear_pedido(ITEMS)
+    assert gestor.despachar(a.id)
+    estacion.iniciar_preparacion()
+    resultado, = gestor.actualizar_estados_bulk([(a.id, 'LISTO')])
+    assert resultado.ok
+    assert a.estado == 'LISTO'
+    assert estacion.en_preparacion == []
+    assert estacion.carga_actual() == 0
+    b = gestor.crear_pedido(ITEMS)
+    assert gestor.despachar(b.id)
+    assert b.estacion_id == 'E1'
+    assert gestor.en_espera() == []
+
+
+def test_en_preparacion_en_bloque_ocupa_el_puesto():
+    gestor, estacion = _gestor_con_estacion()
+    a = gestor.crear_pedido(ITEMS)
+    gestor.despachar(a.id)
+    resultado, = gestor.actualizar_estados_bulk([(a.id, 'EN_PREPARACION')])
+    assert resultado.ok
+    assert [p.id for p in estacion.en_preparacion] == [a.id]
+    assert estacion.cola == []
+    resultado, = gestor.actualizar_estados_bulk([(a.id, 'LISTO')])
+    assert resultado.ok and estacion.carga_actual() == 0
+
+
+def test_transicion_invalida_en_bloque_no_toca_la_estacion():
+    gestor, estacion = _gestor_con_estacion()
+    a = gestor.crear_pedido(ITEMS)
+    gestor.despachar(a.id)
+    resultado, = gestor.actualizar_estados_bulk([(a.id, 'LISTO')])
+    assert not resultado.ok and 'Transición inválida' in resultado.error
+    assert [p.id for p in estacion.cola] == [a.id]
+
+
+def test_crear_en_bloque_aisla_los_registros_invalidos():
+    gestor = GestorPedidos()
+    resultados = gestor.crear_pedidos_bulk([
+        {'items': ITEMS},
+        {'items': ITEMS, 'cliente_info': 5},
+        {'items': [{'name': 'Taco', 'qty': 2 ** 40}]},
+        'no es un dict',
+        {'items': ITEMS, 'cliente_info': {'telefono': '600111222'}},
+    ])
+    assert [r.ok for r in resultados] == [True, False, False, False, True]
+    assert all(r.error for r in resultados if not r.ok)
+    assert len(gestor.pedidos) == 2
+    assert [p.id for p in gestor.listar_por_cliente('600111222')] == [resultados[4].id]
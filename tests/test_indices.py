@@ -0,0 +1,61 @@
+"""Pruebas de los índices secundarios de `GestorPedidos` (estado, estación y teléfono)."""
+import pytest
+
+from src.models.estacion_cocina import EstacionCocina
+from src.services.gestor_pedidos import GestorPedidos
+
+ITEMS = [{'name': 'Guiso', 'qty': 1, 'prep_time_min': 5}]
+
+
+@pytest.fixture
+def gestor():
+    gestor = GestorPedidos()
+    gestor.registrar_estacion(EstacionCocina('A', capacidad=5))
+    gestor.registrar_estacion(EstacionCocina('B', capacidad=5))
+    return gestor
+
+
+def _ids(pedidos):
+    return sorted(p.id for p in pedidos)
+
+
+def test_listar_por_cliente_usa_el_telefono_de_alta(gestor):
+    uno = gestor.crear_pedido(ITEMS, {'telefono': '600111222'})
+    dos = gestor.crear_pedido(ITEMS, {'telefono': 600111222})  # Se indexa como str
+    gestor.crear_pedido(ITEMS, {'telefono': '600999999'})
+    gestor.crear_pedido(ITEMS)
+    assert _ids(gestor.listar_por_cliente('600111222')) == [uno.id, dos.id]
+    assert gestor.listar_por_cliente('700000000') == []
+
+
+def test_alta_en_bloque_indexa_igual_que_una_a_una(gestor):
+    resultados = gestor.crear_pedidos_bulk([{'items': ITEMS, 'cliente_info': {'telefono': '600111222'}},
+                                            {'items': ITEMS}])
+    assert [p.id for p in gestor.listar_por_cliente('600111222')] == [resultados[0].id]
+    assert _ids(gestor.listar_pedidos('PENDIENTE')) == _ids(r for r in resultados)
+
+
+def test_cliente_info_es_de_solo_lectura(gestor):
+    pedido = gestor.crear_pedido(ITEMS, {'telefono': '600111222'})
+    with pytest.raises(AttributeError):
+        pedido.cliente_info = {'telefono': '600999999'}
+    pedido.cliente_info['telefono'] = '600999999'  # Es una copia
+    assert pedido.cliente_info == {'telefono': '600111222'}
+    assert gestor.listar_por_cliente('600111222') == [pedido]
+    assert gestor.listar_por_cliente('600999999') == []
+
+
+def test_los_indices_siguen_los_cambios_de_estado_y_estacion(gestor):
+    pedidos = [gestor.crear_pedido(ITEMS, {'telefono': '600111222'}) for _ in range(3)]
+    assert gestor.asignar_a_estacion(pedidos[0].id, 'A')
+    assert gestor.asignar_a_estacion(pedidos[1].id, 'B')
+    gestor.estaciones['A'].iniciar_preparacion()
+    assert gestor.cancelar_pedido(pedidos[2].id)
+    assert gestor.listar_pedidos('EN_PREPARACION') == [pedidos[0]]
+    assert gestor.listar_pedidos('EN_COLA') == [pedidos[1]]
+    assert gestor.listar_pedidos('CANCELADO') == [pedidos[2]]
+    assert gestor.listar_pedidos('PENDIENTE') == []
+    assert gestor.listar_por_estacion('B') == [pedidos[1]]
+    # Filtros combinados: intersección de índices
+    assert gestor.listar_pedidos('EN_COLA', estacion_id='B', telefono='600111222') == [pedidos[1]]
+    assert gestor.listar_pedidos('EN_COLA', estacion_id='A') == []
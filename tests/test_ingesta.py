@@ -0,0 +1,66 @@
+"""Pruebas de la ingesta sin interacción de `src.main` (`--ingest`)."""
+import json
+
+import pytest
+
+import src.main as app
+from src.services.almacen_sqlite import abrir_sqlite
+
+_CLIENTE = {'nombre': 'Ana Lopez', 'telefono': '600111222'}
+
+
+@pytest.fixture
+def almacen(tmp_path, monkeypatch):
+    almacen = abrir_sqlite(str(tmp_path / 'pedidos.db'))
+    monkeypatch.setattr(app, 'obtener_almacen', lambda: almacen)
+    monkeypatch.setattr(app, 'ESTADO_PATH', str(tmp_path / 'estado'))
+    monkeypatch.setattr(app, '_gestor', None)
+    yield almacen
+    almacen.cerrar()
+
+
+def _jsonl(tmp_path, lineas) -> str:
+    ruta = tmp_path / 'pedidos.jsonl'
+    ruta.write_text('\n'.join(linea if isinstance(linea, str) else json.dumps(linea) for linea in lineas),
+                    encoding='utf-8')
+    return str(ruta)
+
+
+def test_la_ingesta_guarda_el_estado_real(tmp_path, almacen):
+    lineas = [{'cliente': _CLIENTE, 'items': [{'id': 'HMB', 'qty': 1}]}] * 50
+    lineas.append({'cliente': _CLIENTE, 'items': [{'id': 'NO-EXISTE', 'qty': 1}]})
+
+    resumen = app.ingerir(_jsonl(tmp_path, lineas))
+
+    assert (resumen['ingeridos'], resumen['rechazados'], resumen['completados']) == (50, 1, 0)
+    assert resumen['en_espera'] > 0  # Más pedidos que huecos: algunos esperan
+    assert app._gestor is None and not (tmp_path / 'estado').exists()  # Ni gestor de la app ni recuperación
+    assert almacen.contar(estado='LISTO') == 0
+    assert almacen.contar(estado='PENDIENTE') == resumen['en_espera']
+    assert almacen.contar() == 50
+
+
+def test_completar_termina_el_lote(tmp_path, almacen):
+    lineas = [{'cliente': _CLIENTE, 'items': [{'id': 'HMB', 'qty': 1}]}] * 20
+    resumen = app.ingerir(_jsonl(tmp_path, lineas), completar=True)
+    assert resumen['completados'] == 20
+    assert almacen.contar(estado='LISTO') == 20
+
+
+def test_los_ids_continuan_la_numeracion_del_historial(tmp_path, almacen):
+    almacen.guardar_lote([{'id': 'PED-0007', 'estado': 'EN_COLA'}, {'id': 'PED-0012', 'estado': 'LISTO'}])
+    lineas = [{'cliente': _CLIENTE, 'items': [{'id': 'HMB', 'qty': 1}]}] * 3
+    app.ingerir(_jsonl(tmp_path, lineas))
+    assert [r['id'] for r in almacen.consultar()][2:] == ['PED-0013', 'PED-0014', 'PED-0015']
+    assert app._crear_gestor().ultimo_id() == 15  # La app también sigue tras lo ingerido
+
+
+def test_un_registro_malformado_no_aborta_la_ingesta(tmp_path, almacen):
+    lineas = [
+        {'cliente': _CLIENTE, 'items': [{'id': ['PIZ'], 'qty': 1}]},
+        {'cliente': _CLIENTE, 'items': [{'name': {'x': 1}, 'qty': 1}]},
+        'no es json',
+        {'cliente': _CLIENTE, 'items': [{'id': 'HMB', 'qty': 1}]},
+    ]
+    resumen = app.ingerir(_jsonl(tmp_path, lineas))
+    assert (resumen['ingeridos'], resumen['rechazados']) == (1, 3)
@@ -0,0 +1,100 @@
+"""Pruebas de las métricas rodantes en memoria fija (con reloj simulado)."""
+import pytest
+
+from src.models.estacion_cocina import EstacionCocina
+from src.models.metricas_rodantes import MetricasRodantes
+from src.services.gestor_pedidos import GestorPedidos
+
+
+class _Reloj:
+    def __init__(self, t: float = 0.0) -> None:
+        self.t = t
+
+    def __call__(self) -> float:
+        return self.t
+
+
+@pytest.fixture
+def reloj():
+    return _Reloj()
+
+
+def test_medias_ponderadas_por_tiempo(reloj):
+    metricas = MetricasRodantes(ventanas=10, intervalo_s=10, reloj=reloj)
+    metricas.registrar(profundidad=2, ocupados=1)
+    for _ in range(50):  # Registrar la misma carga muchas veces no cambia la media
+        metricas.registrar(profundidad=2, ocupados=1)
+    reloj.t = 30
+    metricas.registrar(profundidad=0, ocupados=0)
+    reloj.t = 60
+    foto = metricas.snapshot(capacidad=2)
+    assert foto['ventana_s'] == 60
+    assert foto['profundidad_media'] == pytest.approx(1.0)
+    assert foto['utilizacion'] == pytest.approx(0.25)
+    assert (foto['profundidad'], foto['profundidad_max'], foto['ocupados']) == (0, 2, 0)
+    assert metricas.snapshot()['utilizacion'] is None
+
+
+def test_contadores_y_percentiles_de_espera(reloj):
+    metricas = MetricasRodantes(ventanas=10, intervalo_s=10, reloj=reloj)
+    for espera in (1.0, 2.0, 3.0, 100.0):
+        metricas.registrar(profundidad=0, ocupados=1, iniciados=1, espera_s=espera)
+    metricas.registrar(profundidad=0, ocupados=0, finalizados=2)
+    reloj.t = 60
+    foto = metricas.snapshot()
+    assert (foto['iniciados'], foto['finalizados'], foto['esperas']) == (4, 2, 4)
+    assert foto['iniciados_min'] == pytest.approx(4.0)
+    assert foto['espera_max_s'] == 100.0
+    assert 2.0 <= foto['espera_p50_s'] <= 4.0  # Cubo de potencias de 2: error máximo un factor 2
+    assert foto['espera_p95_s'] == 100.0
+
+
+def test_las_franjas_antiguas_salen_de_la_ventana(reloj):
+    metricas = MetricasRodantes(ventanas=3, intervalo_s=10, reloj=reloj)
+    metricas.registrar(profundidad=5, ocupados=1, iniciados=1, espera_s=5.0)
+    reloj.t = 15
+    metricas.registrar(profundidad=1, ocupados=1, iniciados=1, espera_s=1.0)
+    assert metricas.snapshot()['iniciados'] == 2
+    reloj.t = 35  # La franja [0, 10) ya no está entre las 3 últimas
+    foto = metricas.snapshot(serie=True)
+    assert (foto['iniciados'], foto['esperas'], foto['espera_max_s']) == (1, 1, 1.0)
+    assert foto['profundidad_max'] == 5  # La cola tuvo 5 hasta t=15, ya dentro de [10, 20)
+    assert [f['inicio'] for f in foto['serie']] == [10.0, 20.0, 30.0]
+    reloj.t = 1005  # Mucho después: todo fuera, memoria del mismo tamaño
+    foto = metricas.snapshot()
+    assert (foto['iniciados'], foto['esperas'], foto['ventana_s']) == (0, 0, 25.0)
+    assert len(metricas._periodo) == 3 and len(metricas._esperas) == 3
+
+
+def test_reloj_hacia_atras_no_falla(reloj):
+    metricas = MetricasRodantes(ventanas=2, intervalo_s=10, reloj=reloj)
+    reloj.t = 100
+    metricas.registrar(profundidad=1, ocupados=1, iniciados=1, espera_s=1.0)
+    reloj.t = 5  # Intervalo que ya salió del anillo: se ignora
+    metricas.registrar(profundidad=1, ocupados=1, iniciados=1, espera_s=1.0)
+    reloj.t = 101
+    assert metricas.snapshot()['iniciados'] == 1
+
+
+@pytest.mark.parametrize('ventanas, intervalo_s', [(0, 60), (60, 0), (60, -1)])
+def test_parametros_invalidos(ventanas, intervalo_s):
+    with pytest.raises(ValueError):
+        MetricasRodantes(ventanas=ventanas, intervalo_s=intervalo_s)
+
+
+def test_estaciones_y_gestor_alimentan_sus_metricas():
+    gestor = GestorPedidos()
+    gestor.registrar_estacion(EstacionCocina('A', capacidad=2))
+    pedidos = [gestor.crear_pedido([{'name': 'Guiso', 'qty': 1, 'prep_time_min': 5}]) for _ in range(3)]
+    for pedido in pedidos:
+        gestor.despachar(pedido.id)
+    estacion = gestor.estaciones['A']
+    estacion.iniciar_preparacion()
+    estacion.finalizar_pedido(pedidos[0].id)
+    metricas = gestor.metricas_rodantes()
+    cocina, a = metricas['gestor'], metricas['estaciones']['A']
+    assert (cocina['iniciados'], cocina['finalizados']) == (2, 1)
+    assert (a['iniciados'], a['finalizados']) == (2, 1)
+    # Tras finalizar: el de la espera entró en cola de A y hay uno preparándose
+    assert (a['profundidad'], a['ocupados']) == (1, 1)
+    assert (cocina['profundidad'], cocina['ocupados']) == (1, 1)
@@ -0,0 +1,143 @@
+"""Pruebas del modo 'webhook' de `Notificador` contra un servidor HTTP local."""
+import json
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from src.models.pedido import Pedido
+from src.services.notificador import Notificador
+
+
+class _Receptor(HTTPServer):
+    """Servidor en un puerto efímero que responde 503 a las primeras `fallos` peticiones."""
+
+    def __init__(self, fallos: int) -> None:
+        super().__init__(('127.0.0.1', 0), _Manejador)
+        self.fallos = fallos
+        self.peticiones = []  # (instante, código devuelto, cuerpo JSON)
+        self.hilo = threading.Thread(target=self.serve_forever, daemon=True)
+        self.hilo.start()
+
+    @property
+    def url(self) -> str:
+        return f'http://127.0.0.1:{self.server_port}/eventos'
+
+    def cerrar(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+class _Manejador(BaseHTTPRequestHandler):
+    def do_POST(self) -> None:
+        cuerpo = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        codigo = 503 if len(self.server.peticiones) < self.server.fallos else 200
+        self.server.peticiones.append((time.monotonic(), codigo, cuerpo))
+        self.send_response(codigo)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+@pytest.fixture
+def receptor(request):
+    servidor = _Receptor(getattr(request, 'param', 0))
+    yield servidor
+    servidor.cerrar()
+
+
+def _pedidos(n: int):
+    return [Pedido(f'PED-{i:04d}', [{'id': 'BEB', 'qty': 1}], {'telefono': '600111222'}) for i in range(1, n + 1)]
+
+
+def _notificador(url: str, **opciones) -> Notificador:
+    base = dict(modo='webhook', url=url, trabajadores=1, tam_lote=10, espera_lote_s=0.2,
+                reintentos=3, backoff_s=0.05, timeout_s=2.0)
+    return Notificador(**{**base, **opciones})
+
+
+def test_agrupa_los_eventos_en_lotes(receptor):
+    notificador = _notificador(receptor.url, tam_lote=4)
+    for pedido in _pedidos(6):
+        assert notificador.enviar(pedido, 'CREADO')
+    notificador.cerrar()
+    lotes = [cuerpo['eventos'] for _, _, cuerpo in receptor.peticiones]
+    assert [len(lote) for lote in lotes] == [4, 2]
+    assert [e['pedido']['id'] for lote in lotes for e in lote] == [f'PED-{i:04d}' for i in range(1, 7)]
+    assert notificador.metricas()['lotes'] == 2
+
+
+@pytest.mark.parametrize('receptor', [2], indirect=True)
+def test_reintenta_con_backoff_ante_5xx(receptor):
+    notificador = _notificador(receptor.url)
+    for pedido in _pedidos(3):
+        notificador.enviar(pedido, 'LISTO', extra={'estacion': 'A'})
+    notificador.cerrar()
+    instantes, codigos, cuerpos = zip(*receptor.peticiones)
+    assert codigos == (503, 503, 200)
+    assert instantes[1] - instantes[0] >= 0.05  # backoff_s
+    assert instantes[2] - instantes[1] >= 0.1   # backoff_s * 2
+    eventos = cuerpos[-1]['eventos']
+    assert all(cuerpo == cuerpos[-1] for cuerpo in cuerpos)  # Se reintenta el mismo lote
+    assert [(e['evento'], e['pedido']['id'], e['extra']) for e in eventos] == \
+        [('LISTO', f'PED-{i:04d}', {'estacion': 'A'}) for i in range(1, 4)]
+    assert all(not clave.startswith('_') for e in eventos for clave in e)
+    metricas = notificador.metricas()
+    assert (metricas['reintentos'], metricas['entregados'], metricas['fallidos']) == (2, 3, 0)
+
+
+@pytest.mark.parametrize('receptor', [100], indirect=True)
+def test_descarta_el_lote_tras_agotar_los_reintentos(receptor):
+    notificador = _notificador(receptor.url, reintentos=1, backoff_s=0.01)
+    for pedido in _pedidos(2):
+        notificador.enviar(pedido, 'CREADO')
+    notificador.cerrar()
+    assert len(receptor.peticiones) == 2
+    metricas = notificador.metricas()
+    assert (metricas['entregados'], metricas['fallidos']) == (0, 2)
+
+
+def test_error_al_encolar_se_registra_con_logging(receptor, caplog, capsys):
+    class Roto:
+        def as_dict(self):
+            raise RuntimeError('sin datos')
+
+    notificador = _notificador(receptor.url)
+    with caplog.at_level(logging.WARNING, logger='src.services.notificador'):
+        assert not notificador.enviar(Roto(), 'CREADO')
+    notificador.cerrar()
+    assert 'sin datos' in caplog.text
+    assert capsys.readouterr().out == ''
+
+
+def test_enviar_y_cerrar_concurrentes_no_pierden_eventos_aceptados():
+    notificador = Notificador(modo='email', trabajadores=2, capacidad=8, tam_lote=4, espera_lote_s=0.001)
+    pedidos = _pedidos(4)
+    aceptados = []
+    arranque = threading.Barrier(5)
+
+    def productor(pedido):
+        arranque.wait()
+        n = 0
+        while notificador.enviar(pedido, 'CREADO'):
+            n += 1
+        aceptados.append(n)
+
+    hilos = [threading.Thread(target=productor, args=(p,)) for p in pedidos]
+    for hilo in hilos:
+        hilo.start()
+    arranque.wait()
+    time.sleep(0.05)
+    notificador.cerrar()
+    for hilo in hilos:
+        hilo.join(timeout=5)
+        assert not hilo.is_alive()
+    assert not notificador.enviar(pedidos[0], 'CREADO')
+    metricas = notificador.metricas()
+    # Todo lo aceptado antes del cierre se entregó y no quedó nada tras las señales de parada
+    assert metricas['encolados'] == metricas['entregados'] == sum(aceptados) > 0
+    assert metricas['profundidad'] == 0
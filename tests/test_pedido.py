@@ -0,0 +1,28 @@
+"""Pruebas del caché de `Pedido.as_dict`."""
+from src.models.pedido import Pedido
+
+ITEMS = [{'name': 'Guiso', 'qty': 2, 'prep_time_min': 5, 'price': 4.5}]
+
+
+def test_modificar_el_resultado_no_corrompe_el_cache():
+    pedido = Pedido('PED-0001', ITEMS, {'telefono': '600111222'})
+    esperado = pedido.as_dict()
+    for _ in range(2):  # Primera llamada tras el cálculo y acierto del caché
+        data = pedido.as_dict()
+        data['items'][0]['qty'] = 99
+        data['items'].append({'name': 'Intruso'})
+        data['cliente_info']['telefono'] = '600999999'
+        data['estado'] = 'LISTO'
+    assert pedido.as_dict() == esperado
+    assert pedido.as_dict()['items'] == [{'name': 'Guiso', 'qty': 2, 'prep_time_min': 5, 'price': 4.5}]
+
+
+def test_el_cache_se_invalida_con_cada_cambio():
+    pedido = Pedido('PED-0001', ITEMS)
+    assert pedido.as_dict()['estado'] == 'PENDIENTE'
+    pedido.update_estado('EN_PREPARACION')
+    pedido.tiempo_estimado_min = 12
+    pedido.add_item({'name': 'Agua', 'qty': 1, 'prep_time_min': 0, 'price': 1.0})
+    data = pedido.as_dict()
+    assert (data['estado'], data['tiempo_estimado_min'], data['total_price']) == ('EN_PREPARACION', 12, 10.0)
+    assert [it['name'] for it in data['items']] == ['Guiso', 'Agua']
@@ -0,0 +1,146 @@
+"""Pruebas del caché de `CatalogoJSON`."""
+import json
+import os
+
+import pytest
+
+import src.utils.productos_json as productos_json
+from src.utils.productos_json import CatalogoJSON
+
+
+def _producto(producto_id, nombre='Taco', prep=5, precio=10.0):
+    return {'id': producto_id, 'name': nombre, 'prep_time_min': prep, 'price': precio}
+
+
+def _escribir(ruta, contenido):
+    with open(ruta, 'w', encoding='utf-8') as f:
+        json.dump(contenido, f)
+
+
+@pytest.fixture
+def ruta(tmp_path):
+    ruta = tmp_path / 'productos.json'
+    _escribir(ruta, [_producto('P1'), _producto('P2', 'Agua', 0, 2.5)])
+    return str(ruta)
+
+
+@pytest.fixture
+def escrituras(monkeypatch):
+    llamadas = []
+    original = productos_json._escribir_atomico
+
+    def contar(*args, **kwargs):
+        llamadas.append(args[1])
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(productos_json, '_escribir_atomico', contar)
+    return llamadas
+
+
+def test_el_cache_se_invalida_cuando_cambia_el_archivo(ruta):
+    catalogo = CatalogoJSON(ruta)
+    assert [p['id'] for p in catalogo.productos()] == ['P1', 'P2']
+    _escribir(ruta, [_producto('P3')])
+    # Mismo mtime no basta: el tamaño distinto también invalida
+    os.utime(ruta, ns=(0, catalogo._firma[0]))
+    assert [p['id'] for p in catalogo.productos()] == ['P3']
+
+
+def test_sin_cambios_en_disco_no_se_relee(ruta, monkeypatch):
+    catalogo = CatalogoJSON(ruta)
+    catalogo.productos()
+    monkeypatch.setattr(productos_json, '_parsear_productos',
+                        lambda data: pytest.fail('se releyó el archivo'))
+    assert catalogo.obtener('P2')['name'] == 'Agua'
+
+
+def test_un_lote_escribe_una_sola_vez(ruta, escrituras):
+    catalogo = CatalogoJSON(ruta)
+    with catalogo.lote():
+        for i in range(3, 8):
+            assert catalogo.agregar(_producto(f'P{i}'))
+        assert catalogo.eliminar('P1')
+        assert escrituras == []
+    assert len(escrituras) == 1
+    with open(ruta, encoding='utf-8') as f:
+        assert [p['id'] for p in json.load(f)] == ['P2', 'P3', 'P4', 'P5', 'P6', 'P7']
+
+
+def test_lote_fallido_no_escribe_y_deshace(ruta, escrituras):
+    catalogo = CatalogoJSON(ruta)
+    with pytest.raises(RuntimeError):
+        with catalogo.lote():
+            catalogo.agregar(_producto('P9'))
+            raise RuntimeError('fallo')
+    assert escrituras == []
+    assert catalogo.obtener('P9') is None
+
+
+def test_escritura_atomica_sin_temporales(ruta, monkeypatch):
+    catalogo = CatalogoJSON(ruta)
+    catalogo.agregar(_producto('P3'))
+    assert os.listdir(os.path.dirname(ruta)) == ['productos.json']
+
+    def fallar(origen, destino):
+        raise OSError('disco lleno')
+
+    monkeypatch.setattr(productos_json.os, 'replace', fallar)
+    with pytest.raises(OSError):
+        catalogo.agregar(_producto('P4'))
+    # Ni temporal huérfano ni archivo a medias
+    assert os.listdir(os.path.dirname(ruta)) == ['productos.json']
+    with open(ruta, encoding='utf-8') as f:
+        assert [p['id'] for p in json.load(f)] == ['P1', 'P2', 'P3']
+
+
+@pytest.mark.parametrize('mutar', [
+    lambda c: c.agregar(_producto('P3')),
+    lambda c: c.eliminar('P1'),
+    lambda c: c.reemplazar([_producto('P3')]),
+])
+def test_si_la_escritura_falla_el_cache_no_cambia(ruta, monkeypatch, mutar):
+    catalogo = CatalogoJSON(ruta)
+    antes = catalogo.productos()
+
+    def fallar(*args, **kwargs):
+        raise OSError('disco lleno')
+
+    monkeypatch.setattr(productos_json, '_escribir_atomico', fallar)
+    with pytest.raises(OSError):
+        mutar(catalogo)
+    assert catalogo.productos() == antes
+
+
+def test_si_falla_la_escritura_del_lote_el_cache_no_cambia(ruta, monkeypatch):
+    catalogo = CatalogoJSON(ruta)
+    antes = catalogo.productos()
+
+    def fallar(*args, **kwargs):
+        raise OSError('disco lleno')
+
+    monkeypatch.setattr(productos_json, '_escribir_atomico', fallar)
+    with pytest.raises(OSError):
+        with catalogo.lote():
+            catalogo.agregar(_producto('P3'))
+            catalogo.eliminar('P1')
+    assert catalogo.productos() == antes
+
+
+def test_id_none_se_trata_como_un_id_mas(tmp_path):
+    catalogo = CatalogoJSON(str(tmp_path / 'productos.json'))
+    assert catalogo.agregar(_producto(None, 'Sin id'))
+    assert not catalogo.agregar(_producto(None, 'Otro sin id'))
+    assert catalogo.obtener(None)['name'] == 'Sin id'
+    assert catalogo.eliminar(None)
+    assert catalogo.productos() == []
+
+
+def test_ids_repetidos_en_el_archivo_se_conservan(tmp_path):
+    ruta = str(tmp_path / 'productos.json')
+    _escribir(ruta, [_producto(None, 'A'), _producto(None, 'B'), _producto('P1')])
+    catalogo = CatalogoJSON(ruta)
+    assert [p['name'] for p in catalogo.productos()] == ['A', 'B', 'Taco']
+    assert catalogo.obtener(None)['name'] == 'A'
+    # Como antes: eliminar borra todas las coincidencias
+    assert catalogo.eliminar(None)
+    assert [p['id'] for p in catalogo.productos()] == ['P1']
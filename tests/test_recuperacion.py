@@ -0,0 +1,42 @@
+"""Pruebas de `RecuperacionGestor` y del gestor único de `src.main`."""
+from src.models.estacion_cocina import EstacionCocina
+from src.services.gestor_pedidos import GestorPedidos
+from src.services.recuperacion import RecuperacionGestor
+
+ITEMS = [{'name': 'Taco', 'qty': 1, 'prep_time_min': 5, 'price': 30.0}]
+
+
+def _gestor() -> GestorPedidos:
+    gestor = GestorPedidos()
+    gestor.registrar_estacion(EstacionCocina('A', capacidad=2))
+    return gestor
+
+
+def test_la_foto_omite_los_pedidos_listos(tmp_path):
+    recuperacion = RecuperacionGestor(str(tmp_path), incluir_terminados=False, fsync='nunca')
+    gestor = _gestor()
+    recuperacion.restaurar(gestor)
+    listo = gestor.crear_pedido(ITEMS)
+    en_curso = gestor.crear_pedido(ITEMS)
+    gestor.despachar(listo.id)
+    gestor.despachar(en_curso.id)
+    estacion = gestor.estaciones['A']
+    estacion.iniciar_preparacion()
+    estacion.finalizar_pedido(listo.id)
+    assert recuperacion.checkpoint() == 1
+    recuperacion.cerrar()
+
+    nuevo = _gestor()
+    RecuperacionGestor(str(tmp_path), incluir_terminados=False, fsync='nunca').restaurar(nuevo)
+    assert list(nuevo.pedidos) == [en_curso.id]
+    assert [p.id for p in nuevo.estaciones['A'].en_preparacion] == [en_curso.id]
+    assert nuevo.crear_pedido(ITEMS).id == 'PED-0003'  # El contador de ids no retrocede
+
+
+def test_preparar_gestor_crea_un_solo_gestor_por_proceso(tmp_path, monkeypatch):
+    import src.main as app
+    monkeypatch.setattr(app, '_gestor', None)
+    monkeypatch.setattr(app, 'ESTADO_PATH', str(tmp_path))
+    monkeypatch.setattr(app, 'obtener_almacen', lambda: None)
+    gestor = app.preparar_gestor()
+    assert app.preparar_gestor() is gestor
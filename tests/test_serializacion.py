@@ -0,0 +1,70 @@
+"""Pruebas de los códecs de serialización y de `Pedido.from_dict`."""
+import pytest
+
+from src.models.pedido import Pedido
+from src.services.serializacion import (CodecBinario, codec_rapido, codecs_disponibles, decodificar_pedidos,
+                                        obtener_codec)
+
+CODECS = codecs_disponibles()
+
+
+def _pedidos():
+    uno = Pedido('PED-0001', [{'name': 'Taco', 'qty': 2, 'prep_time_min': 7, 'price': 3.25},
+                              {'name': 'Café con leche ñ', 'qty': 1, 'prep_time_min': 2, 'price': 1.5}],
+                 {'telefono': '600111222', 'nombre': 'Ana'})
+    uno.update_estado('EN_COLA')
+    uno.estacion_id = 'A'
+    uno.tiempo_estimado_min = 12
+    dos = Pedido(42, [{'name': 'Agua', 'qty': 3, 'prep_time_min': 0, 'price': 1.0}])
+    dos.estacion_id = 7
+    return [uno, dos]
+
+
+@pytest.mark.parametrize('nombre', CODECS)
+def test_ida_y_vuelta_de_un_registro_y_de_un_lote(nombre):
+    codec = obtener_codec(nombre)
+    registros = [p.as_dict() for p in _pedidos()]
+    for registro in registros:
+        assert codec.decodificar(codec.codificar(registro)) == registro
+    assert codec.decodificar_lote(codec.codificar_lote(registros)) == registros
+    assert codec.decodificar_lote(codec.codificar_lote([])) == []
+    if codec.lineal:
+        assert all(b'\n' not in codec.codificar(r) for r in registros)
+
+
+@pytest.mark.parametrize('nombre', CODECS)
+@pytest.mark.parametrize('validar', [True, False])
+def test_decodificar_pedidos_reconstruye_objetos(nombre, validar):
+    codec = obtener_codec(nombre)
+    originales = _pedidos()
+    pedidos = decodificar_pedidos(codec.codificar_lote([p.as_dict() for p in originales]), codec, validar=validar)
+    assert [p.as_dict() for p in pedidos] == [p.as_dict() for p in originales]
+    assert [(p.total_price(), p.minutos_preparacion(), p.num_items()) for p in pedidos] == \
+        [(p.total_price(), p.minutos_preparacion(), p.num_items()) for p in originales]
+
+
+def test_from_dict_valida_solo_si_se_pide():
+    registro = _pedidos()[0].as_dict()
+    for validar in (True, False):
+        assert Pedido.from_dict(registro, validar=validar).as_dict() == registro
+    with pytest.raises(ValueError):
+        Pedido.from_dict({**registro, 'estado': 'PERDIDO'})
+    with pytest.raises(ValueError):
+        Pedido.from_dict({**registro, 'items': [{'name': 'Taco', 'qty': -1}]})
+
+
+def test_binario_rechaza_lo_que_no_puede_representar():
+    codec = CodecBinario()
+    registro = _pedidos()[0].as_dict()
+    with pytest.raises(ValueError):
+        codec.codificar({**registro, 'estado': 'PERDIDO'})
+    with pytest.raises(ValueError):
+        codec.codificar({**registro, 'items': [{'name': 'x' * 0x8000, 'qty': 1}]})
+
+
+def test_seleccion_de_codec():
+    assert 'json' in CODECS and 'binario' in CODECS
+    assert codec_rapido().nombre in CODECS
+    assert codec_rapido(lineal=True).lineal
+    with pytest.raises(ValueError):
+        obtener_codec('xml')
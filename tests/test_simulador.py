@@ -0,0 +1,52 @@
+"""Pruebas de la simulación de eventos discretos en tiempo virtual."""
+import pytest
+
+from src.services.simulador import ESTACIONES_ESPECIALIZADAS, formatear_reporte, simular_dia
+
+GUISO = [{'id': None, 'name': 'Guiso', 'prep_time_min': 10, 'price': 5.0}]
+
+
+def _sin_tiempo_real(resultado):
+    return {k: v for k, v in resultado.items() if k != 'segundos_reales'}
+
+
+def test_misma_semilla_mismo_resultado():
+    a = simular_dia(pedidos_por_hora=40, horas=3, semilla=7)
+    b = simular_dia(pedidos_por_hora=40, horas=3, semilla=7)
+    assert _sin_tiempo_real(a) == _sin_tiempo_real(b)
+    assert a['pedidos'] > 0 and a['completados'] == a['pedidos']
+    assert sum(a['por_estacion'].values()) == a['pedidos']
+    assert 'Throughput' in formatear_reporte(a)
+
+
+def test_sin_contencion_no_hay_espera_y_la_preparacion_es_la_del_catalogo():
+    resultado = simular_dia(pedidos_por_hora=1, horas=4, semilla=3, estaciones={'A': 50}, productos=GUISO)
+    assert resultado['completados'] == resultado['pedidos'] > 0
+    assert resultado['espera_min']['max'] == 0.0
+    assert resultado['cola']['max'] == 0
+    # Un solo producto de 10 min con qty 1 o 2
+    assert 10.0 <= resultado['preparacion_min']['p50'] <= resultado['preparacion_min']['max'] <= 20.0
+    assert resultado['total_min'] == resultado['preparacion_min']
+
+
+def test_con_saturacion_se_forma_cola_y_el_throughput_lo_limita_la_capacidad():
+    resultado = simular_dia(pedidos_por_hora=30, horas=2, semilla=1, estaciones={'A': 1}, productos=GUISO)
+    assert resultado['completados'] == resultado['pedidos']
+    assert resultado['cola']['max'] > 1
+    assert resultado['espera_min']['p95'] > 0
+    # Capacidad 1 y al menos 10 min por pedido: como mucho 6 pedidos por hora
+    assert resultado['throughput_por_hora'] <= 6.0 + 1e-9
+    assert resultado['duracion_virtual_min'] >= 10.0 * resultado['completados']
+
+
+def test_estaciones_especializadas_terminan_todos_los_pedidos():
+    resultado = simular_dia(pedidos_por_hora=60, horas=2, semilla=5, estaciones=ESTACIONES_ESPECIALIZADAS)
+    assert resultado['completados'] == resultado['pedidos'] > 0
+    total, espera, prep = (resultado[k]['media'] for k in ('total_min', 'espera_min', 'preparacion_min'))
+    assert total == pytest.approx(espera + prep)
+
+
+@pytest.mark.parametrize('tasa, horas', [(0, 1), (10, 0), (-1, 2)])
+def test_parametros_invalidos(tasa, horas):
+    with pytest.raises(ValueError):
+        simular_dia(pedidos_por_hora=tasa, horas=horas)
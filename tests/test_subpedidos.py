@@ -0,0 +1,68 @@
+"""Pruebas del reparto de pedidos en subpedidos por categoría."""
+from src.models.estacion_cocina import EstacionCocina
+from src.services.gestor_pedidos import GestorPedidos
+
+ITEMS = [{'id': 'PIZ-PEP', 'qty': 1}, {'id': 'BEB', 'qty': 2}]
+
+
+def _gestor(capacidad: int = 2) -> GestorPedidos:
+    gestor = GestorPedidos()
+    gestor.registrar_estacion(EstacionCocina('HORNO', capacidad=capacidad, categorias=['PIZ']))
+    gestor.registrar_estacion(EstacionCocina('BARRA', capacidad=capacidad, categorias=['BEB']))
+    return gestor
+
+
+def test_las_partes_comparten_el_lock_del_padre():
+    gestor = _gestor()
+    pedido = gestor.crear_pedido(ITEMS)
+    assert gestor.despachar(pedido.id)
+    partes = gestor.partes_de(pedido.id)
+    assert len(partes) == 2
+    assert all(parte.lock_estado() is pedido.lock_estado() for parte in partes)
+
+
+def test_estacion_del_padre_coincide_con_el_indice():
+    gestor = _gestor()
+    pedido = gestor.crear_pedido(ITEMS)
+    gestor.despachar(pedido.id)
+    assert pedido.estado == 'EN_COLA'
+    assert pedido.estacion_id in ('HORNO', 'BARRA')
+    con_pedido = [e for e in gestor.estaciones if pedido in gestor.listar_por_estacion(e)]
+    assert con_pedido == [pedido.estacion_id]
+
+
+def test_recombina_y_queda_listo_con_la_ultima_parte():
+    gestor = _gestor()
+    pedido = gestor.crear_pedido(ITEMS)
+    gestor.despachar(pedido.id)
+    horno, barra = gestor.estaciones['HORNO'], gestor.estaciones['BARRA']
+    horno.iniciar_preparacion()
+    barra.iniciar_preparacion()
+    assert pedido.estado == 'EN_PREPARACION'
+    horno.finalizar_pedido(f'{pedido.id}/PIZ')
+    assert pedido.estado == 'EN_PREPARACION'
+    barra.finalizar_pedido(f'{pedido.id}/BEB')
+    assert pedido.estado == 'LISTO'
+    assert gestor.partes_de(pedido.id) == []
+
+
+def test_cancelar_pedido_repartido_en_cola_cancela_sus_partes():
+    gestor = _gestor()
+    pedido = gestor.crear_pedido(ITEMS)
+    gestor.despachar(pedido.id)
+    partes = gestor.partes_de(pedido.id)
+    assert pedido.estado == 'EN_COLA'
+    assert gestor.cancelar_pedido(pedido.id)
+    assert pedido.estado == 'CANCELADO'
+    assert all(parte.estado == 'CANCELADO' for parte in partes)
+    assert all(e.carga_actual() == 0 for e in gestor.estaciones.values())
+    assert gestor.partes_de(pedido.id) == []
+
+
+def test_cancelar_pedido_simple_en_cola_sigue_rechazado():
+    gestor = GestorPedidos()
+    gestor.registrar_estacion(EstacionCocina('A', capacidad=1))
+    pedido = gestor.crear_pedido([{'id': 'PIZ', 'qty': 1}])
+    gestor.despachar(pedido.id)
+    assert pedido.estado == 'EN_COLA'
+    assert not gestor.cancelar_pedido(pedido.id)
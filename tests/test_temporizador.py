@@ -0,0 +1,79 @@
+"""Pruebas de las estimaciones de `temporizador`: un pedido frente a lotes."""
+import random
+
+import pytest
+
+from src.models.estacion_cocina import EstacionCocina
+from src.models.pedido import Pedido
+from src.services import temporizador
+from src.services.temporizador import calcular_tiempo_estimado, estimar_tiempos
+
+
+def _pedido(i: int, qty: int) -> Pedido:
+    return Pedido(f'PED-{i:04d}', [{'name': 'Guiso', 'qty': qty, 'prep_time_min': 5}])
+
+
+@pytest.fixture
+def cocina():
+    # 2 en preparación (10 + 5 min) y 3 en cola (5, 15, 10 min); capacidad 2
+    estacion = EstacionCocina('A', capacidad=2)
+    pedidos = [_pedido(i, qty) for i, qty in enumerate((2, 1, 1, 3, 2, 4), start=1)]
+    estacion.restaurar(cola=pedidos[2:5], en_preparacion=pedidos[:2])
+    return estacion, pedidos  # pedidos[5] (20 min) no está asignado
+
+
+def test_trabajo_es_una_foto_de_la_estacion(cocina):
+    estacion, _ = cocina
+    trabajo = estacion.trabajo()
+    assert trabajo.en_preparacion == {'PED-0001': 10, 'PED-0002': 5}
+    assert trabajo.cola == [('PED-0003', 5), ('PED-0004', 15), ('PED-0005', 10)]
+
+
+@pytest.mark.parametrize('con_numpy', [True, False])
+def test_un_pedido_estima_igual_que_el_lote(cocina, monkeypatch, con_numpy):
+    if not con_numpy:
+        monkeypatch.setattr(temporizador, 'np', None)
+    estacion, pedidos = cocina
+    esperados = [10, 5, 5 + 8, 15 + 10, 10 + 18, 20 + 23]  # Propios + espera (trabajo delante / 2), redondeado arriba
+    assert estimar_tiempos(pedidos, estacion) == esperados
+    assert [calcular_tiempo_estimado(p, estacion) for p in pedidos] == esperados
+    assert [calcular_tiempo_estimado(p) for p in pedidos] == [10, 5, 5, 15, 10, 20]
+
+
+def test_un_pedido_no_usa_numpy(cocina, monkeypatch):
+    estacion, pedidos = cocina
+
+    class SinNumpy:
+        def __getattr__(self, nombre):
+            raise AssertionError(f"np.{nombre} en el camino escalar")
+
+    monkeypatch.setattr(temporizador, 'np', SinNumpy())
+    assert calcular_tiempo_estimado(pedidos[4], estacion) == 28
+
+
+@pytest.mark.parametrize('semilla', range(20))
+@pytest.mark.parametrize('con_numpy', [True, False])
+def test_escalar_y_lote_coinciden_en_estaciones_aleatorias(monkeypatch, semilla, con_numpy):
+    if not con_numpy:
+        monkeypatch.setattr(temporizador, 'np', None)
+    azar = random.Random(semilla)
+    capacidad = azar.randint(0, 4)
+    estacion = EstacionCocina('A', capacidad=capacidad)
+    pedidos = [Pedido(f'PED-{i:04d}', [{'name': 'Guiso', 'qty': azar.randint(1, 5),
+                                        'prep_time_min': azar.choice((0, 1, 3, 7, 12))}])
+               for i in range(azar.randint(0, 30))]
+    en_preparacion = azar.randint(0, min(capacidad, len(pedidos)))
+    asignados = azar.randint(en_preparacion, len(pedidos))
+    estacion.restaurar(cola=pedidos[en_preparacion:asignados], en_preparacion=pedidos[:en_preparacion])
+    azar.shuffle(pedidos)  # El lote no depende del orden de los pedidos
+    assert estimar_tiempos(pedidos, estacion) == [calcular_tiempo_estimado(p, estacion) for p in pedidos]
+
+
+def test_capacidad_cero_da_estimaciones_finitas():
+    estacion = EstacionCocina('A', capacidad=0)
+    pedidos = [_pedido(i, 2) for i in range(3)]
+    estacion.restaurar(cola=pedidos[:2], en_preparacion=[])
+    assert estacion.fin_estimado() == float('inf')  # Para ordenar estaciones sigue siendo la peor
+    # Como en la cola: capacidad mínima 1
+    assert estimar_tiempos(pedidos, estacion) == [10, 20, 30]
+    assert [calcular_tiempo_estimado(p, estacion) for p in pedidos] == [10, 20, 30]
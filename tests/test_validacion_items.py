@@ -0,0 +1,50 @@
+"""Pruebas de `ValidadorItems` y de la carta registrada en `CATALOGO`."""
+import subprocess
+import sys
+
+import pytest
+
+from src.models.pedido import Pedido
+from src.models.validacion_items import QTY_MAXIMA, VALIDADOR_ITEMS
+
+
+def test_qty_fuera_de_rango_es_value_error():
+    for qty in (0, -1, QTY_MAXIMA + 1, 2 ** 40, True, 1.0):
+        with pytest.raises(ValueError):
+            VALIDADOR_ITEMS.codificar({'name': 'Taco', 'qty': qty})
+    assert VALIDADOR_ITEMS.codificar({'id': 'PIZ-PEP', 'qty': QTY_MAXIMA})[1] == QTY_MAXIMA
+
+
+def test_item_libre_valida_tipos_y_minimos():
+    assert not VALIDADOR_ITEMS.es_valida([{'name': 'Taco', 'qty': 1, 'price': -1}])
+    assert not VALIDADOR_ITEMS.es_valida([{'name': 'Taco', 'qty': 1, 'prep_time_min': '5'}])
+    assert not VALIDADOR_ITEMS.es_valida([{'qty': 1}])
+    assert VALIDADOR_ITEMS.es_valida([{'name': 'Taco', 'qty': 1}])
+    codigo, qty = VALIDADOR_ITEMS.codificar({'name': 'Taco', 'qty': 2, 'prep_time_min': 6, 'price': 30})
+    assert qty == 2 and codigo == (None, 'Taco', 6, 30.0)  # Libre: la entrada la guarda el pedido
+
+
+def test_item_por_id_usa_el_catalogo():
+    pedido = Pedido('P1', [{'id': 'PIZ-PEP', 'qty': 2, 'price': 1.0}])
+    assert pedido.items[0]['name'] == 'Pizza de Pepperoni'
+    assert pedido.items[0]['price'] == 65.0
+
+
+def test_carta_registrada_sin_importar_src_main():
+    # En un proceso limpio (como un worker de `src.services.fragmentado`) los ids resuelven igual
+    codigo = ("import sys; from src.models.pedido import Pedido; "
+              "p = Pedido('P1', [{'id': 'HMB-DBL', 'qty': 1}]); "
+              "assert 'src.main' not in sys.modules; print(p.items[0]['name'])")
+    salida = subprocess.run([sys.executable, '-c', codigo], capture_output=True, text=True, check=True)
+    assert salida.stdout.strip() == 'Hamburguesa Doble'
+
+
+@pytest.mark.parametrize('campo', ['prep_time_min', 'price'])
+@pytest.mark.parametrize('valor', [float('inf'), float('-inf'), float('nan')])
+def test_numeros_no_finitos_son_value_error(campo, valor):
+    item = {'name': 'Taco', 'qty': 1, campo: valor}
+    assert not VALIDADOR_ITEMS.es_valida([item])
+    with pytest.raises(ValueError, match=campo):
+        VALIDADOR_ITEMS.codificar(item)
+    with pytest.raises(ValueError):
+        Pedido('PED-1', [item])